@@ -1,14 +1,18 @@
 from .agent import Agent, AgentStatus
 from .backtest import Backtest
 from .live import Live
+from .optimizer import Optimizer
 from .paper import Paper
 from .signal import Signal
+from .walk_forward import WalkForward
 
 __all__ = [
     "Agent",
     "AgentStatus",
     "Backtest",
     "Live",
+    "Optimizer",
     "Paper",
     "Signal",
+    "WalkForward",
 ]
@@ -17,7 +17,7 @@ from juno.components import Chandler, Events
 from juno.components.prices import InsufficientPrices
 from juno.config import get_module_type_constructor, get_type_name_and_kwargs, kwargs_for
 from juno.inspect import construct
-from juno.statistics import CoreStatistics, Statistician
+from juno.statistics import CoreStatistics, RunningStatisticsSnapshot, Statistician
 from juno.storages import Memory, Storage
 from juno.traders import Trader
 from juno.trading import TradingMode, TradingSummary
@@ -136,6 +136,11 @@ class Backtest(Agent):
             f"{self.get_name(state)}: finished with result "
             f"{json.dumps(serialization.config.serialize(stats), indent=4)}"
         )
+        if running_stats := self.build_running_statistics(config, state):
+            _log.info(
+                f"{self.get_name(state)}: running statistics "
+                f"{json.dumps(serialization.config.serialize(running_stats), indent=4)}"
+            )
         await self._events.emit(state.name, "finished", summary)
         return summary
 
@@ -144,3 +149,11 @@ class Backtest(Agent):
         trader_name, _ = get_type_name_and_kwargs(config.trader)
         trader = self._traders[trader_name]
         return trader.build_summary(state.result)
+
+    def build_running_statistics(
+        self, config: Config, state: State
+    ) -> Optional[RunningStatisticsSnapshot]:
+        assert state.result
+        trader_name, _ = get_type_name_and_kwargs(config.trader)
+        trader = self._traders[trader_name]
+        return trader.build_running_statistics(state.result)
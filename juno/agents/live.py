@@ -16,6 +16,7 @@ from juno import (
 from juno.components import Events, Informant
 from juno.config import get_module_type_constructor, get_type_name_and_kwargs, kwargs_for
 from juno.inspect import construct
+from juno.statistics import RunningStatisticsSnapshot
 from juno.statistics.core import CoreStatistics
 from juno.storages import Storage
 from juno.traders import Trader
@@ -113,6 +114,11 @@ class Live(Agent):
             f"{self.get_name(state)}: finished with result "
             f"{json.dumps(serialization.config.serialize(stats), indent=4)}"
         )
+        if running_stats := self.build_running_statistics(config, state):
+            _log.info(
+                f"{self.get_name(state)}: running statistics "
+                f"{json.dumps(serialization.config.serialize(running_stats), indent=4)}"
+            )
         await self._events.emit(state.name, "finished", summary)
         return summary
 
@@ -121,3 +127,11 @@ class Live(Agent):
         trader_name, _ = get_type_name_and_kwargs(config.trader)
         trader = self._traders[trader_name]
         return trader.build_summary(state.result)
+
+    def build_running_statistics(
+        self, config: Config, state: State
+    ) -> Optional[RunningStatisticsSnapshot]:
+        assert state.result
+        trader_name, _ = get_type_name_and_kwargs(config.trader)
+        trader = self._traders[trader_name]
+        return trader.build_running_statistics(state.result)
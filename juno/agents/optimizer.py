@@ -0,0 +1,430 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from decimal import Decimal
+from itertools import product
+from math import prod
+from random import Random
+from typing import Any, Callable, Iterable, Iterator, Literal, Optional
+
+import numpy as np
+
+from juno import (
+    Candle,
+    CandleMeta,
+    ExchangeInfo,
+    Interval,
+    Timestamp,
+    Timestamp_,
+    json,
+    serialization,
+    stop_loss,
+    strategies,
+    take_profit,
+)
+from juno.components import Chandler, Events, Informant, SharedCandles
+from juno.components.chandler import CandleArrays
+from juno.components.prices import InsufficientPrices
+from juno.components.shared_candles import SharedCandleArrays, iter_candles
+from juno.config import (
+    get_module_type_and_kwargs,
+    get_module_type_constructor,
+    get_type_name_and_kwargs,
+    kwargs_for,
+)
+from juno.constraints import Constraint
+from juno.inspect import construct
+from juno.statistics import CoreStatistics, ExtendedStatistics, Statistician
+from juno.storages import Memory, Storage
+from juno.strategies import Strategy
+from juno.traders import Basic, BasicConfig, BasicState, Trader
+from juno.trading import TradingMode, TradingSummary
+
+from .agent import Agent, AgentStatus
+
+_log = logging.getLogger(__name__)
+
+# Precision of candles published to shared memory. Prices match the smallest step size used by
+# exchanges. Volume is kept as float64, because volumes of assets with a huge supply do not fit
+# into int64 at that precision. Candles with prices which do not fit are not shared.
+_SHARED_CANDLE_PRECISION = {"open": 8, "high": 8, "low": 8, "close": 8}
+
+# Trader and candles of an optimizer worker process. Set once by the pool initializer so that the
+# candles are not sent to the worker along with every backtest.
+_worker_trader: Optional[Basic] = None
+_worker_candles: list[tuple[Candle, CandleMeta]] = []
+_worker_shared_candles: Optional[SharedCandles] = None
+_worker_shared_candle_arrays: Optional[tuple[SharedCandleArrays, CandleMeta]] = None
+
+
+def _init_worker(
+    exchange: str,
+    exchange_info: ExchangeInfo,
+    candles: list[tuple[Candle, CandleMeta]],
+    shared_candles: Optional[tuple[str, CandleMeta]],
+) -> None:
+    global _worker_trader, _worker_candles, _worker_shared_candles, _worker_shared_candle_arrays
+    informant = Informant(storage=Memory(), exchanges=[])
+    informant.set_exchange_info(exchange, exchange_info)
+    chandler = Chandler(storage=Memory(), exchanges=[])
+    _worker_trader = Basic(chandler=chandler, informant=informant)
+    _worker_candles = candles
+    if shared_candles is not None:
+        # Attached for the lifetime of the worker.
+        name, candle_meta = shared_candles
+        _worker_shared_candles = SharedCandles(chandler)
+        _worker_shared_candle_arrays = (_worker_shared_candles.attach(name), candle_meta)
+
+
+def _backtest(state: BasicState) -> TradingSummary:
+    assert _worker_trader
+    candles: Iterable[tuple[Candle, CandleMeta]]
+    if _worker_shared_candle_arrays is None:
+        candles = ((c, m) for c, m in _worker_candles if c.time >= state.next_)
+    else:
+        shared, candle_meta = _worker_shared_candle_arrays
+        i = int(np.searchsorted(shared.arrays.time, state.next_))
+        arrays = CandleArrays(*(a[i:] for a in shared.arrays))
+        candles = ((c, candle_meta) for c in iter_candles(arrays, shared.precision))
+    return _worker_trader.backtest(state, candles)
+
+
+class Optimizer(Agent):
+    """Searches for the best strategy parameters within the constraints of the strategy meta.
+
+    Backtests are run in parallel worker processes. If shared candles are available, workers
+    attach to candles in shared memory instead of each receiving a copy. Results are appended to
+    the results file as they complete. Parameters already found in the file are not backtested
+    again which allows resuming a search.
+    """
+
+    @dataclass(frozen=True)
+    class Config:
+        exchange: str
+        interval: Interval
+        quote: Decimal
+        trader: dict[str, Any]  # Only the basic trader supports preloaded candles.
+        strategy: dict[str, Any]  # Strategy type. Given parameters are not searched.
+        stop_loss: Optional[dict[str, Any]] = None
+        take_profit: Optional[dict[str, Any]] = None
+        name: Optional[str] = None
+        start: Optional[Timestamp] = None
+        end: Optional[Timestamp] = None
+        search: Literal["random", "grid"] = "random"
+        # Number of random samples or the max number of grid combinations, sampled uniformly from
+        # the grid. None means all grid combinations.
+        num_samples: Optional[int] = 100
+        seed: int = 0
+        # Field of either core or extended statistics to rank by.
+        metric: str = "roi"
+        minimize: bool = False
+        num_workers: Optional[int] = None  # None means the number of cores.
+        results_file: Optional[str] = None
+        fiat_exchange: Optional[str] = None
+        fiat_asset: str = "usdt"
+
+    @dataclass
+    class State:
+        name: str
+        status: AgentStatus
+        result: Optional[Any] = None
+
+    @dataclass(frozen=True)
+    class Result:
+        strategy: dict[str, Any]  # Serialized strategy parameters.
+        core: CoreStatistics
+        extended: Optional[ExtendedStatistics] = None
+
+    def __init__(
+        self,
+        traders: list[Trader],
+        informant: Informant,
+        statistician: Optional[Statistician] = None,
+        shared_candles: Optional[SharedCandles] = None,
+        events: Events = Events(),
+        storage: Storage = Memory(),
+        get_time_ms: Callable[[], int] = Timestamp_.now,
+    ) -> None:
+        self._traders = {type(t).__name__.lower(): t for t in traders}
+        self._informant = informant
+        self._statistician = statistician
+        self._shared_candles = shared_candles
+        self._events = events
+        self._storage = storage
+        self._get_time_ms = get_time_ms
+
+    async def on_running(self, config: Config, state: State) -> None:
+        await super().on_running(config, state)
+
+        now = self._get_time_ms()
+
+        assert config.start is None or config.start < now
+        assert config.end is None or config.end <= now
+        assert config.start is None or config.end is None or config.start < config.end
+
+        if config.search == "random" and config.num_samples is None:
+            raise ValueError("Number of samples required for random search")
+        if _is_extended_metric(config.metric) and not self._statistician:
+            raise ValueError(f"Statistician required for metric {config.metric}")
+
+        end = now if config.end is None else config.end
+
+        trader = self._get_trader(config)
+
+        if state.result is None:
+            state.result = (
+                _load_results(config.results_file)
+                if config.results_file and os.path.isfile(config.results_file)
+                else []
+            )
+        results: list[Optimizer.Result] = state.result
+        evaluated = {_params_key(r.strategy) for r in results}
+        if len(results) > 0:
+            _log.info(f"{self.get_name(state)}: resuming with {len(results)} existing results")
+
+        pending = []
+        for params in _generate_params(config):
+            key = _params_key(params)
+            if key not in evaluated:
+                evaluated.add(key)
+                pending.append(params)
+        if len(pending) == 0:
+            _log.info(f"{self.get_name(state)}: no parameters left to search")
+            return
+
+        trader_states = [
+            await trader.initialize(self._build_trader_config(config, state, end, params))
+            for params in pending
+        ]
+
+        # Candles are loaded once, starting from the earliest state, and shared by all backtests.
+        first_state = min(trader_states, key=lambda s: s.next_)
+        if any(
+            s.strategy.extra_candles != first_state.strategy.extra_candles for s in trader_states
+        ):
+            raise ValueError("Unable to share candles among strategies with different candles")
+        trader_config = first_state.config
+        candles: list[tuple[Candle, CandleMeta]] = []
+        shared: Optional[SharedCandleArrays] = None
+        if (
+            self._shared_candles
+            and len(first_state.strategy.extra_candles) == 0
+            and trader_config.candle_type == "regular"
+        ):
+            try:
+                shared = await self._shared_candles.acquire(
+                    exchange=config.exchange,
+                    symbol=trader_config.symbol,
+                    interval=trader_config.interval,
+                    start=first_state.next_,
+                    end=end,
+                    precision=_SHARED_CANDLE_PRECISION,
+                )
+            except ValueError as exc:
+                # Prices with more decimals than the precision. Truncating them would make the
+                # backtests run on different candles than a regular backtest.
+                _log.warning(f"{self.get_name(state)}: not sharing candles; {exc}")
+        if shared is not None:
+            num_candles = len(shared.arrays.time)
+        else:
+            candles = await trader.load_candles(first_state)
+            num_candles = len(candles)
+
+        num_workers = config.num_workers or os.cpu_count() or 1
+        _log.info(
+            f"{self.get_name(state)}: backtesting {len(pending)} parameter sets over "
+            f"{num_candles} candles with {num_workers} workers"
+        )
+
+        loop = asyncio.get_running_loop()
+        executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_init_worker,
+            initargs=(
+                config.exchange,
+                self._informant.get_exchange_info(config.exchange),
+                candles,
+                (
+                    None
+                    if shared is None
+                    else (shared.name, (trader_config.symbol, trader_config.interval, "regular"))
+                ),
+            ),
+        )
+
+        async def evaluate(params: dict[str, Any], trader_state: BasicState) -> None:
+            summary = await loop.run_in_executor(executor, _backtest, trader_state)
+            result = Optimizer.Result(
+                strategy=params,
+                core=CoreStatistics.compose(summary),
+                extended=await self._get_extended_statistics(config, summary),
+            )
+            results.append(result)
+            if config.results_file:
+                _append_result(config.results_file, result)
+
+        try:
+            await asyncio.gather(*(evaluate(p, s) for p, s in zip(pending, trader_states)))
+        finally:
+            # Waiting for the workers would block the event loop.
+            executor.shutdown(wait=False, cancel_futures=True)
+            if self._shared_candles and shared:
+                self._shared_candles.release(shared.name)
+
+    async def on_finally(self, config: Config, state: State) -> Any:
+        ranked = self.rank(config, state.result or [])
+        best = serialization.config.serialize(ranked[:10], list[Optimizer.Result])
+        _log.info(
+            f"{self.get_name(state)}: finished with best results by {config.metric} "
+            f"{json.dumps(best, indent=4)}"
+        )
+        await self._events.emit(state.name, "finished", ranked)
+        return ranked
+
+    def rank(self, config: Config, results: list[Result]) -> list[Result]:
+        if _is_extended_metric(config.metric):
+            return sorted(
+                (r for r in results if r.extended is not None),
+                key=lambda r: getattr(r.extended, config.metric),
+                reverse=not config.minimize,
+            )
+        return sorted(
+            results,
+            key=lambda r: getattr(r.core, config.metric),
+            reverse=not config.minimize,
+        )
+
+    def _get_trader(self, config: Config) -> Basic:
+        trader_name, _ = get_type_name_and_kwargs(config.trader)
+        trader = self._traders[trader_name]
+        if not isinstance(trader, Basic):
+            raise ValueError(f"Trader {trader_name} does not support optimization")
+        return trader
+
+    def _build_trader_config(
+        self, config: Config, state: State, end: Timestamp, params: dict[str, Any]
+    ) -> BasicConfig:
+        return construct(
+            BasicConfig,
+            config,
+            **kwargs_for(BasicConfig, get_type_name_and_kwargs(config.trader)[1]),
+            start=config.start,
+            end=end,
+            strategy=get_module_type_constructor(strategies, {**config.strategy, **params}),
+            stop_loss=(
+                None
+                if config.stop_loss is None
+                else get_module_type_constructor(stop_loss, config.stop_loss)
+            ),
+            take_profit=(
+                None
+                if config.take_profit is None
+                else get_module_type_constructor(take_profit, config.take_profit)
+            ),
+            channel=state.name,
+            mode=TradingMode.BACKTEST,
+        )
+
+    async def _get_extended_statistics(
+        self, config: Config, summary: TradingSummary
+    ) -> Optional[ExtendedStatistics]:
+        if not self._statistician:
+            return None
+        try:
+            stats = await self._statistician.get_statistics(
+                summary=summary,
+                exchange=config.fiat_exchange or config.exchange,
+                target_asset=config.fiat_asset,
+            )
+        except InsufficientPrices as exc:
+            _log.warning(f"unable to calculate extended statistics: {exc}")
+            return None
+        return stats.extended
+
+
+def _is_extended_metric(metric: str) -> bool:
+    if metric in {f.name for f in fields(CoreStatistics)}:
+        return False
+    if metric in {f.name for f in fields(ExtendedStatistics)}:
+        return True
+    raise ValueError(f"Unknown metric {metric}")
+
+
+def _generate_params(config: Optimizer.Config) -> Iterator[dict[str, Any]]:
+    # Yields serialized strategy parameters for the constraints not fixed by the config.
+    strategy_type, fixed = get_module_type_and_kwargs(strategies, config.strategy)
+    assert issubclass(strategy_type, Strategy)
+    searched: list[tuple[tuple[str, ...], Constraint]] = []
+    for names, constraint in strategy_type.meta().constraints.items():
+        # Normalize scalars into a single element tuples.
+        if not isinstance(names, tuple):
+            names = (names,)
+        num_fixed = sum(1 for n in names if n in fixed)
+        if num_fixed == len(names):
+            continue
+        if num_fixed > 0:
+            raise ValueError(f'Parameters {",".join(names)} must be either all fixed or searched')
+        searched.append((names, constraint))
+
+    combinations: Iterable[tuple[Any, ...]]
+    if config.search == "grid":
+        combinations = _sample_grid(
+            [list(c.values()) for _, c in searched], config.num_samples, Random(config.seed)
+        )
+    else:
+        random = Random(config.seed)
+        combinations = (
+            tuple(c.random(random) for _, c in searched) for _ in range(config.num_samples or 0)
+        )
+
+    for combination in combinations:
+        params: dict[str, Any] = {}
+        for (names, _), values in zip(searched, combination):
+            if len(names) == 1:
+                values = (values,)
+            params.update(zip(names, values))
+        yield serialization.config.serialize(params)
+
+
+def _sample_grid(
+    values: list[list[Any]], num_samples: Optional[int], random: Random
+) -> Iterator[tuple[Any, ...]]:
+    # Samples combinations uniformly from the whole grid instead of taking the first ones, which
+    # would only vary the last parameters. The same seed always yields the same samples first so
+    # that increasing the number of samples resumes a search.
+    total = prod(len(v) for v in values)
+    if num_samples is None or num_samples >= total:
+        yield from product(*values)
+        return
+    seen: set[int] = set()
+    while len(seen) < num_samples:
+        index = random.randrange(total)
+        if index in seen:
+            continue
+        seen.add(index)
+        combination = []
+        for choices in reversed(values):
+            index, i = divmod(index, len(choices))
+            combination.append(choices[i])
+        yield tuple(reversed(combination))
+
+
+def _params_key(params: dict[str, Any]) -> str:
+    return json.dumps(dict(sorted(params.items())))
+
+
+def _load_results(path: str) -> list[Optimizer.Result]:
+    with open(path, mode="r", encoding="utf-8") as f:
+        return [
+            serialization.config.deserialize(json.loads(line), Optimizer.Result)
+            for line in f
+            if line.strip()
+        ]
+
+
+def _append_result(path: str, result: Optimizer.Result) -> None:
+    # One result per line so that results are not lost when the search is interrupted.
+    with open(path, mode="a", encoding="utf-8") as f:
+        f.write(json.dumps(serialization.config.serialize(result)) + "\n")
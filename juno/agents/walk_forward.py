@@ -0,0 +1,250 @@
+import asyncio
+import logging
+import os
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from decimal import Decimal
+from typing import Any, Callable, Optional
+
+from juno import (
+    Candle,
+    CandleMeta,
+    ExchangeInfo,
+    Interval,
+    Interval_,
+    Timestamp,
+    Timestamp_,
+    json,
+    serialization,
+    stop_loss,
+    strategies,
+    take_profit,
+)
+from juno.components import Chandler, Events, Informant
+from juno.config import get_module_type_constructor, get_type_name_and_kwargs, kwargs_for
+from juno.inspect import construct
+from juno.statistics import CoreStatistics
+from juno.stop_loss import StopLoss
+from juno.storages import Memory, Storage
+from juno.strategies import Signal
+from juno.take_profit import TakeProfit
+from juno.traders import Basic, BasicConfig, BasicState, Trader
+from juno.trading import TradingMode, TradingSummary
+
+from .agent import Agent, AgentStatus
+
+_log = logging.getLogger(__name__)
+
+# Trader and candles of a walk-forward worker process. Set once by the pool initializer so that
+# the candles are not sent to the worker along with every window.
+_worker_trader: Optional[Basic] = None
+_worker_candles: list[tuple[Candle, CandleMeta]] = []
+_worker_candle_times: list[Timestamp] = []
+
+
+def _init_worker(
+    exchange: str, exchange_info: ExchangeInfo, candles: list[tuple[Candle, CandleMeta]]
+) -> None:
+    global _worker_trader, _worker_candles, _worker_candle_times
+    informant = Informant(storage=Memory(), exchanges=[])
+    informant.set_exchange_info(exchange, exchange_info)
+    _worker_trader = Basic(chandler=Chandler(storage=Memory(), exchanges=[]), informant=informant)
+    _worker_candles = candles
+    _worker_candle_times = [c.time for c, _ in candles]
+
+
+def _backtest_window(state: BasicState, snapshot: dict[str, Any]) -> TradingSummary:
+    assert _worker_trader
+    _restore(state, snapshot)
+    start = bisect_left(_worker_candle_times, state.start)
+    end = bisect_left(_worker_candle_times, state.config.end)
+    return _worker_trader.backtest(state, _worker_candles[start:end])
+
+
+class WalkForward(Agent):
+    """Backtests a strategy over consecutive or overlapping windows of time.
+
+    The strategy, stop loss and take profit are carried through the candles once and their state
+    is snapshotted at the start of every window. Each window starts from its snapshot instead of
+    warming up from scratch, as if the strategy had been running since the first candle. Windows
+    are backtested in parallel worker processes.
+    """
+
+    @dataclass(frozen=True)
+    class Config:
+        exchange: str
+        interval: Interval
+        quote: Decimal
+        trader: dict[str, Any]  # Only the basic trader supports preloaded candles.
+        strategy: dict[str, Any]
+        window: Interval  # Length of a window.
+        step: Optional[Interval] = None  # None means the window length; windows do not overlap.
+        stop_loss: Optional[dict[str, Any]] = None
+        take_profit: Optional[dict[str, Any]] = None
+        name: Optional[str] = None
+        start: Optional[Timestamp] = None
+        end: Optional[Timestamp] = None
+        num_workers: Optional[int] = None  # None means the number of cores.
+
+    @dataclass
+    class State:
+        name: str
+        status: AgentStatus
+        result: Optional[Any] = None
+
+    @dataclass(frozen=True)
+    class Result:
+        start: Timestamp
+        end: Timestamp
+        core: CoreStatistics
+
+    def __init__(
+        self,
+        traders: list[Trader],
+        informant: Informant,
+        events: Events = Events(),
+        storage: Storage = Memory(),
+        get_time_ms: Callable[[], int] = Timestamp_.now,
+    ) -> None:
+        self._traders = {type(t).__name__.lower(): t for t in traders}
+        self._informant = informant
+        self._events = events
+        self._storage = storage
+        self._get_time_ms = get_time_ms
+
+    async def on_running(self, config: Config, state: State) -> None:
+        await super().on_running(config, state)
+
+        now = self._get_time_ms()
+
+        assert config.start is None or config.start < now
+        assert config.end is None or config.end <= now
+        assert config.start is None or config.end is None or config.start < config.end
+        assert config.window > 0
+        assert config.step is None or config.step > 0
+
+        end = now if config.end is None else config.end
+        step = config.window if config.step is None else config.step
+
+        trader = self._get_trader(config)
+        trader_state = await trader.initialize(self._build_trader_config(config, state, end))
+        trader_config = trader_state.config
+        window_starts = list(range(trader_state.start, end, step))
+
+        # The candles of every window are loaded at once, including the ones for warming up the
+        # strategy of the first window.
+        candles = await trader.load_candles(trader_state)
+
+        # A single pass over the candles snapshots the state before the first candle of each
+        # window.
+        num_windows = len(window_starts)
+        snapshots: list[dict[str, Any]] = []
+        for candle, candle_meta in candles:
+            while len(snapshots) < num_windows and window_starts[len(snapshots)] <= candle.time:
+                snapshots.append(_snapshot(trader_state))
+            trader.warm_up(trader_state, candle, candle_meta)
+        while len(snapshots) < num_windows:
+            snapshots.append(_snapshot(trader_state))
+
+        window_states = [
+            await trader.initialize(
+                replace(
+                    trader_config,
+                    start=window_start,
+                    end=min(window_start + config.window, end),
+                    adjusted_start=None,
+                )
+            )
+            for window_start in window_starts
+        ]
+
+        num_workers = config.num_workers or os.cpu_count() or 1
+        _log.info(
+            f"{self.get_name(state)}: backtesting {num_windows} windows of "
+            f"{Interval_.format(config.window)} every {Interval_.format(step)} over "
+            f"{len(candles)} candles with {num_workers} workers"
+        )
+
+        loop = asyncio.get_running_loop()
+        executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_init_worker,
+            initargs=(
+                config.exchange,
+                self._informant.get_exchange_info(config.exchange),
+                candles,
+            ),
+        )
+        try:
+            summaries = await asyncio.gather(
+                *(
+                    loop.run_in_executor(executor, _backtest_window, window_state, snapshot)
+                    for window_state, snapshot in zip(window_states, snapshots)
+                )
+            )
+        finally:
+            # Waiting for the workers would block the event loop.
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        state.result = [
+            WalkForward.Result(
+                start=window_state.start,
+                end=window_state.config.end,
+                core=CoreStatistics.compose(summary),
+            )
+            for window_state, summary in zip(window_states, summaries)
+        ]
+
+    async def on_finally(self, config: Config, state: State) -> Any:
+        results = state.result or []
+        serialized = serialization.config.serialize(results, list[WalkForward.Result])
+        _log.info(
+            f"{self.get_name(state)}: finished with results {json.dumps(serialized, indent=4)}"
+        )
+        await self._events.emit(state.name, "finished", results)
+        return results
+
+    def _get_trader(self, config: Config) -> Basic:
+        trader_name, _ = get_type_name_and_kwargs(config.trader)
+        trader = self._traders[trader_name]
+        if not isinstance(trader, Basic):
+            raise ValueError(f"Trader {trader_name} does not support walk-forward backtesting")
+        return trader
+
+    def _build_trader_config(self, config: Config, state: State, end: Timestamp) -> BasicConfig:
+        return construct(
+            BasicConfig,
+            config,
+            **kwargs_for(BasicConfig, get_type_name_and_kwargs(config.trader)[1]),
+            start=config.start,
+            end=end,
+            strategy=get_module_type_constructor(strategies, config.strategy),
+            stop_loss=(
+                None
+                if config.stop_loss is None
+                else get_module_type_constructor(stop_loss, config.stop_loss)
+            ),
+            take_profit=(
+                None
+                if config.take_profit is None
+                else get_module_type_constructor(take_profit, config.take_profit)
+            ),
+            channel=state.name,
+            mode=TradingMode.BACKTEST,
+        )
+
+
+def _snapshot(state: BasicState) -> dict[str, Any]:
+    # Serialized into plain data which is detached from the state that keeps being updated.
+    return {
+        "strategy": serialization.raw.serialize(state.strategy),
+        "stop_loss": serialization.raw.serialize(state.stop_loss),
+        "take_profit": serialization.raw.serialize(state.take_profit),
+    }
+
+
+def _restore(state: BasicState, snapshot: dict[str, Any]) -> None:
+    state.strategy = serialization.raw.deserialize(snapshot["strategy"], Signal)
+    state.stop_loss = serialization.raw.deserialize(snapshot["stop_loss"], StopLoss)
+    state.take_profit = serialization.raw.deserialize(snapshot["take_profit"], TakeProfit)
@@ -1,4 +1,17 @@
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import heapq
 import logging
+import math
+import os
+import struct
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from itertools import count
+from typing import Callable, Iterator, Mapping, Optional
 
 import aiolimiter
 
@@ -16,3 +29,177 @@ class AsyncLimiter(aiolimiter.AsyncLimiter):
                 f"{timeout}s before retrying"
             )
         await super().acquire(amount)
+
+
+class Priority(IntEnum):
+    HIGH = 0  # For example, placing and cancelling orders.
+    NORMAL = 1
+    LOW = 2  # For example, backfilling historical data.
+
+
+# Share of the max weight each priority may use up in a window. The rest is left for requests of
+# higher priority.
+DEFAULT_SHARES: Mapping[Priority, float] = {
+    Priority.HIGH: 1.0,
+    Priority.NORMAL: 0.9,
+    Priority.LOW: 0.7,
+}
+
+_STATE = struct.Struct("dq")  # Window start and used weight.
+
+
+class RateLimiter:
+    """
+    Limits the weight of requests within fixed windows of `interval` seconds. Windows are aligned
+    to the clock, same as exchanges count weight, for example Binance `REQUEST_WEIGHT` per minute.
+    Pass `get_time` returning the server time to align them to the clock of the exchange.
+
+    Requests are only let through at least `margin` seconds away from the edges of a window. The
+    margin should cover clock skew and request latency, so that requests let through within a
+    window are also counted within the same window by the server.
+
+    Requests of higher priority are let through first. A request of lower priority may only use up
+    its share of the max weight, so that some of the weight is always left for the more important
+    requests.
+
+    Weight used by others, such as other processes sharing the same IP, can be reported from
+    server usage headers with `update_used`, along with the window the request was let through in.
+    Alternatively, local processes can share the window
+    through a lock file at `path`.
+    """
+
+    def __init__(
+        self,
+        max_weight: int,
+        interval: float,
+        shares: Mapping[Priority, float] = DEFAULT_SHARES,
+        path: Optional[str] = None,
+        get_time: Callable[[], float] = time.time,
+        margin: float = 0.0,
+    ) -> None:
+        if not 0.0 <= margin < interval / 2:
+            raise ValueError(f"Margin {margin} must be less than half of interval {interval}")
+
+        self.max_weight = max_weight
+        self.interval = interval
+        self.margin = margin
+        self._shares = shares
+        self._get_time = get_time
+
+        self._window_start = 0.0
+        self._used = 0
+
+        self._fd: Optional[int] = None if path is None else os.open(path, os.O_RDWR | os.O_CREAT)
+
+        self._waiters: list[tuple[Priority, int, int, asyncio.Future[float]]] = []
+        self._waiter_ids = count()
+        self._wake_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def used(self) -> int:
+        with self._state():
+            self._roll()
+            return self._used
+
+    def close(self) -> None:
+        if self._wake_handle:
+            self._wake_handle.cancel()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    async def acquire(self, weight: int = 1, priority: Priority = Priority.NORMAL) -> float:
+        """Waits until the weight can be used. Returns the start of the window it is counted in."""
+        # Waiters of the same or higher priority go first.
+        if (len(self._waiters) == 0 or self._waiters[0][0] > priority) and self._try_acquire(
+            weight, priority
+        ):
+            return self._window_start
+
+        _log.info(
+            f"rate limiter {self.max_weight}/{self.interval}s reached; waiting for {weight} "
+            f"weight of {priority.name.lower()} priority"
+        )
+        future: asyncio.Future[float] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._waiter_ids), weight, future))
+        self._schedule_wake()
+        # A cancelled waiter is removed once it reaches the top.
+        return await future
+
+    def update_used(self, used: int, window_start: Optional[float] = None) -> None:
+        """Updates weight used in the current window as reported by the server. Only ever
+        increases the local count, because the server also counts requests of others.
+
+        Pass `window_start` returned by `acquire` for the request. The report is then ignored if
+        the window has rolled over before the response arrived, since the server counted it in
+        the previous one."""
+        with self._state():
+            self._roll()
+            if window_start is not None and window_start != self._window_start:
+                return
+            if used > self._used:
+                self._used = used
+
+    def _try_acquire(self, weight: int, priority: Priority) -> bool:
+        with self._state():
+            now = self._roll()
+            if (
+                now < self._window_start + self.margin
+                or now >= self._window_start + self.interval - self.margin
+            ):
+                return False
+            limit = math.floor(self.max_weight * self._shares[priority])
+            # A request heavier than the limit goes through on its own in an empty window.
+            if self._used + weight <= limit or self._used == 0:
+                self._used += weight
+                return True
+            return False
+
+    def _roll(self) -> float:
+        now = self._get_time()
+        window_start = now // self.interval * self.interval
+        if window_start > self._window_start:
+            self._window_start = window_start
+            self._used = 0
+        return now
+
+    def _schedule_wake(self) -> None:
+        if self._wake_handle:
+            return
+        # Wakes up once the current window opens past its margin or else once the next one does.
+        now = self._get_time()
+        opening = self._window_start + self.margin
+        if now >= opening:
+            opening += self.interval
+        delay = opening - now
+        self._wake_handle = asyncio.get_running_loop().call_later(max(delay, 0.0), self._wake)
+
+    def _wake(self) -> None:
+        self._wake_handle = None
+        while len(self._waiters) > 0:
+            priority, _, weight, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+            elif self._try_acquire(weight, priority):
+                heapq.heappop(self._waiters)
+                future.set_result(self._window_start)
+            else:
+                self._schedule_wake()
+                break
+
+    @contextmanager
+    def _state(self) -> Iterator[None]:
+        # With a lock file, the window is read from and written back to the file while holding an
+        # exclusive lock. The lock is only held for the duration of a few syscalls.
+        if self._fd is None:
+            yield
+            return
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            data = os.pread(self._fd, _STATE.size, 0)
+            if len(data) == _STATE.size:
+                self._window_start, self._used = _STATE.unpack(data)
+            yield
+            os.pwrite(self._fd, _STATE.pack(self._window_start, self._used), 0)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
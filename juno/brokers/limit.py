@@ -434,8 +434,9 @@ class Limit(Broker):
                 if ctx.done_event.is_set():
                     break
 
-                asks = orderbook.list_asks()
-                bids = orderbook.list_bids()
+                # Placement strategies only look at the two best levels.
+                asks = orderbook.list_asks(2)
+                bids = orderbook.list_bids(2)
                 ob_side = bids if side is Side.BUY else asks
                 ob_other_side = asks if side is Side.BUY else bids
 
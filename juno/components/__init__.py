@@ -3,6 +3,7 @@ from .events import Events
 from .informant import Informant
 from .orderbook import Orderbook
 from .prices import Prices
+from .shared_candles import SharedCandles
 from .trades import Trades
 from .user import User
 
@@ -12,6 +13,7 @@ __all__ = [
     "Informant",
     "Orderbook",
     "Prices",
+    "SharedCandles",
     "Trades",
     "User",
 ]
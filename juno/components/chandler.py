@@ -1,12 +1,14 @@
 import asyncio
+import heapq
 import itertools
 import logging
-import math
 import sys
+from collections import deque
 from contextlib import AsyncExitStack, aclosing
 from decimal import Decimal
-from typing import AsyncGenerator, AsyncIterable, Callable, Iterable, Optional
+from typing import AsyncGenerator, AsyncIterable, Callable, Iterable, NamedTuple, Optional
 
+import numpy as np
 from asyncstdlib import list as list_async
 from tenacity import AsyncRetrying, before_sleep_log, retry_if_exception_type
 
@@ -21,12 +23,12 @@ from juno import (
     Timestamp,
     Timestamp_,
 )
-from juno.asyncio import aclose, first_async, gather_dict, stream_with_timeout
+from juno.asyncio import aclose, cancel, first_async, gather_dict, stream_with_timeout
 from juno.common import CandleType
 from juno.contextlib import AsyncContextManager
 from juno.exchanges import Exchange
-from juno.itertools import generate_missing_spans
-from juno.storages import Storage
+from juno.itertools import generate_missing_spans, paginate
+from juno.storages import Precision, Storage, get_field_precision, scale_decimals
 from juno.tenacity import stop_after_attempt_with_reset, wait_none_then_exponential
 
 from .trades import Trades
@@ -35,6 +37,22 @@ _log = logging.getLogger(__name__)
 
 _CANDLE_KEY = Candle.__name__.lower()
 _FIRST_CANDLE_KEY = f"first_{_CANDLE_KEY}"
+# Max number of already closed candles read ahead per stream when merging concurrent streams.
+_CONCURRENT_READ_AHEAD = 256
+
+
+class CandleArrays(NamedTuple):
+    """
+    Candles laid out as contiguous NumPy arrays. Time is int64. Prices and volume are float64 or
+    int64 scaled by `10 ** precision`.
+    """
+
+    time: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
 
 
 class Chandler(AsyncContextManager):
@@ -47,8 +65,13 @@ class Chandler(AsyncContextManager):
         storage_batch_size: int = 1000,
         exchange_earliest_start: int = 1293840000000,  # 2011-01-01
         exchange_timeout: Optional[float] = None,
+        backfill_concurrency: int = 1,
+        backfill_page_size: int = 1000,
+        resample_candles: bool = True,
     ) -> None:
         assert storage_batch_size > 0
+        assert backfill_concurrency > 0
+        assert backfill_page_size > 0
 
         self._storage = storage
         self._exchanges = {type(e).__name__.lower(): e for e in exchanges}
@@ -57,6 +80,9 @@ class Chandler(AsyncContextManager):
         self._storage_batch_size = storage_batch_size
         self._exchange_earliest_start = exchange_earliest_start
         self._exchange_timeout = exchange_timeout
+        self._backfill_concurrency = backfill_concurrency
+        self._backfill_page_size = backfill_page_size
+        self._resample_candles = resample_candles
 
     async def stream_concurrent_candles(
         self,
@@ -65,6 +91,10 @@ class Chandler(AsyncContextManager):
         start: Timestamp,
         end: Timestamp = Timestamp_.MAX_TIME,
     ) -> AsyncIterable[tuple[Candle, CandleMeta]]:
+        """
+        Merges candle streams in the order of candle close time. Candles closing at the same time
+        are ordered by interval descending.
+        """
         unique_entries = set(entries)
         desc_sorted_entries = sorted(unique_entries, key=lambda e: e[1], reverse=True)
         future_streams = [
@@ -83,23 +113,51 @@ class Chandler(AsyncContextManager):
             )
             for symbol, interval, type_ in desc_sorted_entries
         ]
+        buffers: list[deque[Optional[Candle]]] = [deque() for _ in future_streams]
+        # Candles which have already closed can be read ahead in batches. Reading ahead future
+        # candles would block on streams which have nothing to yield yet.
+        now = self._get_time_ms()
 
-        # For example:
-        # - with intervals 3 and 5, the greatest common interval would be 1.
-        # - with intervals 5 and 10, the greatest common interval would be 5.
-        greatest_common_interval = math.gcd(*(interval for _, interval, _ in unique_entries))
+        # A k-way merge. Every stream yields exactly one item (either a candle or `None` if
+        # missing) per interval. Hence, we know the close time of the next item of every stream
+        # without reading it. The heap is keyed by close time and stream index; the latter
+        # maintains the interval descending order for equal close times.
+        heap: list[tuple[Timestamp, int]] = []
+        for i, ((_, interval, _), _) in enumerate(future_streams):
+            close = Timestamp_.floor(start, interval) + interval
+            if close <= Timestamp_.floor(end, interval):
+                heap.append((close, i))
+        heapq.heapify(heap)
 
-        next_ = Timestamp_.floor(start, greatest_common_interval)
-        next_end = Timestamp_.floor(end, greatest_common_interval)
-        while next_ < next_end:
-            next_ += greatest_common_interval
-            for (symbol, interval, type_), stream in future_streams:
-                if Timestamp_.is_in_interval(next_, interval):
-                    optional_candle = await anext(stream)
-                    if optional_candle is not None:
-                        yield optional_candle, (symbol, interval, type_)
+        try:
+            while len(heap) > 0:
+                close, i = heap[0]
+                candle_meta, stream = future_streams[i]
+                interval = candle_meta[1]
+                last_close = Timestamp_.floor(end, interval)
 
-        await asyncio.gather(*(aclose(stream) for _, stream in future_streams))
+                buffer = buffers[i]
+                if len(buffer) == 0:
+                    count = 1
+                    if close <= now:
+                        historical_last_close = min(last_close, Timestamp_.floor(now, interval))
+                        count = min(
+                            _CONCURRENT_READ_AHEAD,
+                            (historical_last_close - close) // interval + 1,
+                        )
+                    for _ in range(count):
+                        buffer.append(await anext(stream))
+                optional_candle = buffer.popleft()
+
+                if close + interval <= last_close:
+                    heapq.heapreplace(heap, (close + interval, i))
+                else:
+                    heapq.heappop(heap)
+
+                if optional_candle is not None:
+                    yield optional_candle, candle_meta
+        finally:
+            await asyncio.gather(*(aclose(stream) for _, stream in future_streams))
 
     async def map_candles_fill_missing_with_none(
         self,
@@ -229,6 +287,113 @@ class Chandler(AsyncContextManager):
             )
         )
 
+    async def map_candle_arrays(
+        self,
+        exchange: str,
+        entries: list[CandleMeta],
+        start: Timestamp,
+        end: Timestamp = Timestamp_.MAX_TIME,
+        precision: Optional[Precision] = None,
+        fill_missing_with_nan: bool = False,
+    ) -> dict[CandleMeta, CandleArrays]:
+        unique_entries = set(entries)
+        return await gather_dict(
+            {
+                (symbol, interval, type_): self.get_candle_arrays(
+                    exchange=exchange,
+                    symbol=symbol,
+                    interval=interval,
+                    start=start,
+                    end=end,
+                    type_=type_,
+                    precision=precision,
+                    fill_missing_with_nan=fill_missing_with_nan,
+                )
+                for symbol, interval, type_ in unique_entries
+            }
+        )
+
+    async def get_candle_arrays(
+        self,
+        exchange: str,
+        symbol: Symbol,
+        interval: Interval,
+        start: Timestamp,
+        end: Timestamp = Timestamp_.MAX_TIME,
+        type_: CandleType = "regular",
+        precision: Optional[Precision] = None,
+        fill_missing_with_nan: bool = False,
+    ) -> CandleArrays:
+        """
+        Same as `list_candles` but returns candles as arrays. Locally stored candles are read
+        straight into arrays without constructing `Candle` objects. Missing candles are fetched
+        from an exchange and stored to local storage, same as in `stream_candles`.
+
+        If precision is specified, prices and volume are returned as int64 scaled by
+        `10 ** precision` instead of float64. The precision can also be given per column; columns
+        without one are float64. Scaling is exact; a value with more decimal places than the
+        precision or overflowing int64 raises `ValueError`. Without a precision, values are only
+        as exact as float64 allows.
+
+        If `fill_missing_with_nan` is set, the arrays contain an entry for every interval between
+        start and end; missing candles are filled with NaN.
+        """
+        if type_ not in {"regular", "heikin-ashi"}:
+            raise ValueError(f"Invalid candle type: {type_}")
+        if type_ == "heikin-ashi" and precision is not None:
+            raise ValueError("Heikin-Ashi candle arrays are only supported with float64")
+        if fill_missing_with_nan and precision is not None:
+            raise ValueError("Cannot fill missing int64 candle arrays with NaN")
+        if fill_missing_with_nan and interval >= Interval_.MONTH:
+            raise ValueError("Cannot fill missing candle arrays for irregular intervals")
+
+        start = Timestamp_.floor(start, interval)
+        end = Timestamp_.floor(end, interval)
+
+        if end <= start:
+            parts = [_candles_to_arrays([], precision)]
+        else:
+            parts = []
+            shard = Storage.key(exchange, symbol, interval)
+            candle_msg = f"{exchange} {symbol} {Interval_.format(interval)} candle(s)"
+            spans = await self._list_candle_spans(exchange, symbol, interval, start, end)
+            for span_start, span_end, exist_locally in spans:
+                period_msg = f"{Timestamp_.format_span(span_start, span_end)}"
+                if exist_locally:
+                    _log.info(f"local {candle_msg} exist between {period_msg}")
+                    columns = await self._storage.get_time_series_arrays(
+                        shard=shard,
+                        key=_CANDLE_KEY,
+                        type_=Candle,
+                        start=span_start,
+                        end=span_end,
+                        precision=precision,
+                    )
+                    parts.append(CandleArrays(**columns))
+                else:
+                    _log.info(f"missing {candle_msg} between {period_msg}")
+                    candles = await list_async(
+                        self._stream_and_store_missing_candles(
+                            exchange=exchange,
+                            symbol=symbol,
+                            interval=interval,
+                            start=span_start,
+                            end=span_end,
+                        )
+                    )
+                    parts.append(_candles_to_arrays(candles, precision))
+
+        result = (
+            parts[0]
+            if len(parts) == 1
+            else CandleArrays(*(np.concatenate(arrays) for arrays in zip(*parts)))
+        )
+        if type_ == "heikin-ashi":
+            result = _heikin_ashi_arrays(result, interval)
+        if fill_missing_with_nan:
+            result = _fill_missing_arrays_with_nan(result, interval, start, end)
+        return result
+
     async def stream_candles(
         self,
         exchange: str,
@@ -257,22 +422,7 @@ class Chandler(AsyncContextManager):
 
         shard = Storage.key(exchange, symbol, interval)
         candle_msg = f"{exchange} {symbol} {Interval_.format(interval)} candle(s)"
-
-        _log.info(f"checking for existing {candle_msg} in local storage")
-        existing_spans = await list_async(
-            self._storage.stream_time_series_spans(
-                shard=shard,
-                key=_CANDLE_KEY,
-                start=start,
-                end=end,
-            )
-        )
-        missing_spans = list(generate_missing_spans(start, end, existing_spans))
-
-        spans = [(a, b, True) for a, b in existing_spans] + [
-            (a, b, False) for a, b in missing_spans
-        ]
-        spans.sort(key=lambda s: s[0])
+        spans = await self._list_candle_spans(exchange, symbol, interval, start, end)
 
         last_candle: Optional[Candle] = None
         for span_start, span_end, exist_locally in spans:
@@ -288,7 +438,7 @@ class Chandler(AsyncContextManager):
                 )
             else:
                 _log.info(f"missing {candle_msg} between {period_msg}")
-                stream = self._stream_and_store_exchange_candles(
+                stream = self._stream_and_store_missing_candles(
                     exchange=exchange,
                     symbol=symbol,
                     interval=interval,
@@ -327,6 +477,277 @@ class Chandler(AsyncContextManager):
         elif not last_candle:
             _log.warning(f"missed all {candle_msg} between {Timestamp_.format_span(start, end)}")
 
+    async def _list_candle_spans(
+        self,
+        exchange: str,
+        symbol: Symbol,
+        interval: Interval,
+        start: Timestamp,
+        end: Timestamp,
+    ) -> list[tuple[Timestamp, Timestamp, bool]]:
+        """
+        Splits the range into spans which exist in local storage and spans which are missing.
+        Returns spans sorted by start together with a flag indicating whether they exist locally.
+        """
+        _log.info(
+            f"checking for existing {exchange} {symbol} {Interval_.format(interval)} candle(s) in "
+            "local storage"
+        )
+        existing_spans = await list_async(
+            self._storage.stream_time_series_spans(
+                shard=Storage.key(exchange, symbol, interval),
+                key=_CANDLE_KEY,
+                start=start,
+                end=end,
+            )
+        )
+        missing_spans = list(generate_missing_spans(start, end, existing_spans))
+
+        spans = [(a, b, True) for a, b in existing_spans] + [
+            (a, b, False) for a, b in missing_spans
+        ]
+        spans.sort(key=lambda s: s[0])
+        return spans
+
+    async def _stream_and_store_missing_candles(
+        self,
+        exchange: str,
+        symbol: Symbol,
+        interval: Interval,
+        start: Timestamp,
+        end: Timestamp,
+    ) -> AsyncGenerator[Candle, None]:
+        spans = (
+            await self._list_resample_spans(exchange, symbol, interval, start, end)
+            if self._resample_candles
+            else [(start, end, None)]
+        )
+        for span_start, span_end, source_interval in spans:
+            stream = (
+                self._stream_and_store_exchange_candles_backfilled(
+                    exchange=exchange,
+                    symbol=symbol,
+                    interval=interval,
+                    start=span_start,
+                    end=span_end,
+                )
+                if source_interval is None
+                else self._resample_and_store_candles(
+                    exchange=exchange,
+                    symbol=symbol,
+                    interval=interval,
+                    source_interval=source_interval,
+                    start=span_start,
+                    end=span_end,
+                )
+            )
+            async with aclosing(stream):
+                async for candle in stream:
+                    yield candle
+
+    async def _list_resample_spans(
+        self,
+        exchange: str,
+        symbol: Symbol,
+        interval: Interval,
+        start: Timestamp,
+        end: Timestamp,
+    ) -> list[tuple[Timestamp, Timestamp, Optional[Interval]]]:
+        """
+        Splits a missing span into parts which can be resampled from lower interval candles in
+        local storage and parts which need to be fetched from an exchange. The latter have no
+        source interval.
+        """
+        # Every lower interval that evenly divides the requested one produces identical candles.
+        # We prefer the coarsest because it requires reading the least amount of candles.
+        source_intervals = sorted(
+            (
+                i
+                for i in self._exchanges[exchange].list_candle_intervals()
+                if _is_resampleable(i, interval)
+            ),
+            reverse=True,
+        )
+        result: list[tuple[Timestamp, Timestamp, Optional[Interval]]] = []
+        remaining = [(start, end)]
+        for source_interval in source_intervals:
+            source_shard = Storage.key(exchange, symbol, source_interval)
+            next_remaining: list[tuple[Timestamp, Timestamp]] = []
+            for remaining_start, remaining_end in remaining:
+                covered = []
+                async for span_start, span_end in self._storage.stream_time_series_spans(
+                    shard=source_shard,
+                    key=_CANDLE_KEY,
+                    start=remaining_start,
+                    end=remaining_end,
+                ):
+                    # Only whole target intervals can be resampled.
+                    aligned_start = _ceil_exact(span_start, interval)
+                    aligned_end = Timestamp_.floor(span_end, interval)
+                    if aligned_end > aligned_start:
+                        covered.append((aligned_start, aligned_end))
+                result.extend((s, e, source_interval) for s, e in covered)
+                next_remaining.extend(
+                    generate_missing_spans(remaining_start, remaining_end, covered)
+                )
+            remaining = next_remaining
+        result.extend((s, e, None) for s, e in remaining)
+        result.sort(key=lambda s: s[0])
+        return result
+
+    async def _resample_and_store_candles(
+        self,
+        exchange: str,
+        symbol: Symbol,
+        interval: Interval,
+        source_interval: Interval,
+        start: Timestamp,
+        end: Timestamp,
+    ) -> AsyncGenerator[Candle, None]:
+        shard = Storage.key(exchange, symbol, interval)
+        _log.info(
+            f"resampling {exchange} {symbol} {Interval_.format(interval)} candle(s) between "
+            f"{Timestamp_.format_span(start, end)} from local "
+            f"{Interval_.format(source_interval)} candle(s)"
+        )
+        stream = self._stream_and_store_candle_batches(
+            shard=shard,
+            interval=interval,
+            stream=_resample_candles(
+                self._storage.stream_time_series(
+                    shard=Storage.key(exchange, symbol, source_interval),
+                    key=_CANDLE_KEY,
+                    type_=Candle,
+                    start=start,
+                    end=end,
+                ),
+                interval,
+            ),
+            start=start,
+            get_end=lambda: end,
+        )
+        async with aclosing(stream):
+            async for candle in stream:
+                yield candle
+
+    async def _stream_and_store_exchange_candles_backfilled(
+        self,
+        exchange: str,
+        symbol: Symbol,
+        interval: Interval,
+        start: Timestamp,
+        end: Timestamp,
+    ) -> AsyncGenerator[Candle, None]:
+        if self._backfill_concurrency > 1 and interval < Interval_.MONTH:
+            exchange_instance = self._exchanges[exchange]
+            if (
+                exchange_instance.can_stream_historical_candles
+                and interval in exchange_instance.list_candle_intervals()
+            ):
+                backfill_end = min(end, Timestamp_.floor(self._get_time_ms(), interval))
+                if backfill_end > start:
+                    async with aclosing(
+                        self._backfill_exchange_candles(
+                            exchange=exchange,
+                            symbol=symbol,
+                            interval=interval,
+                            start=start,
+                            end=backfill_end,
+                        )
+                    ) as stream:
+                        async for candle in stream:
+                            yield candle
+                    start = backfill_end
+
+        if start < end:
+            async with aclosing(
+                self._stream_and_store_exchange_candles(
+                    exchange=exchange,
+                    symbol=symbol,
+                    interval=interval,
+                    start=start,
+                    end=end,
+                )
+            ) as stream:
+                async for candle in stream:
+                    yield candle
+
+    async def _backfill_exchange_candles(
+        self,
+        exchange: str,
+        symbol: Symbol,
+        interval: Interval,
+        start: Timestamp,
+        end: Timestamp,
+    ) -> AsyncGenerator[Candle, None]:
+        # Splits the historical span into page aligned chunks and fetches up to
+        # `backfill_concurrency` chunks at once. Requests are still subject to the rate limiters of
+        # the exchange. Every chunk is stored with its own span as soon as it arrives. Candles are
+        # yielded in order; the pending tasks act as a reorder buffer which is bounded by the
+        # concurrency.
+        chunks = list(paginate(start, end, self._backfill_page_size * interval))
+        _log.info(
+            f"backfilling {exchange} {symbol} {Interval_.format(interval)} candle(s) between "
+            f"{Timestamp_.format_span(start, end)} in {len(chunks)} chunk(s) with concurrency "
+            f"{self._backfill_concurrency}"
+        )
+        tasks: dict[int, asyncio.Task[list[Candle]]] = {}
+
+        def schedule(i: int) -> None:
+            if i < len(chunks):
+                chunk_start, chunk_end = chunks[i]
+                tasks[i] = asyncio.create_task(
+                    self._fetch_and_store_exchange_candle_chunk(
+                        exchange, symbol, interval, chunk_start, chunk_end
+                    )
+                )
+
+        for i in range(self._backfill_concurrency):
+            schedule(i)
+        try:
+            for i in range(len(chunks)):
+                candles = await tasks.pop(i)
+                schedule(i + self._backfill_concurrency)
+                for candle in candles:
+                    yield candle
+        finally:
+            await cancel(*tasks.values())
+
+    async def _fetch_and_store_exchange_candle_chunk(
+        self,
+        exchange: str,
+        symbol: Symbol,
+        interval: Interval,
+        start: Timestamp,
+        end: Timestamp,
+    ) -> list[Candle]:
+        shard = Storage.key(exchange, symbol, interval)
+        async for attempt in AsyncRetrying(
+            stop=stop_after_attempt_with_reset(8, 300),
+            wait=wait_none_then_exponential(),
+            retry=retry_if_exception_type(ExchangeException),
+            before_sleep=before_sleep_log(_log, logging.WARNING),
+        ):
+            with attempt:
+                candles = await list_async(
+                    self._stream_exchange_candles(
+                        exchange=exchange,
+                        symbol=symbol,
+                        interval=interval,
+                        start=start,
+                        end=end,
+                        current=Timestamp_.floor(self._get_time_ms(), interval),
+                    )
+                )
+        await self._storage.store_time_series_and_span(
+            shard=shard,
+            key=_CANDLE_KEY,
+            items=candles,
+            start=start,
+            end=end,
+        )
+        return candles
+
     async def _stream_and_store_exchange_candles(
         self,
         exchange: str,
@@ -345,63 +766,89 @@ class Chandler(AsyncContextManager):
             before_sleep=before_sleep_log(_log, logging.WARNING),
         ):
             with attempt:
-                # We use a swap batch in order to swap the batch right before storing. With a
-                # single batch, it may happen that our program gets cancelled at an `await`
-                # point before we're able to clear the batch. This can cause same data to be
-                # stored twice, raising an integrity error.
-                batch = []
-                swap_batch: list[Candle] = []
                 current = Timestamp_.floor(self._get_time_ms(), interval)
-
+                last_candle: Optional[Candle] = None
+                stream = self._stream_and_store_candle_batches(
+                    shard=shard,
+                    interval=interval,
+                    stream=self._stream_exchange_candles(
+                        exchange=exchange,
+                        symbol=symbol,
+                        interval=interval,
+                        start=start,
+                        end=end,
+                        current=current,
+                    ),
+                    start=start,
+                    get_end=lambda: min(Timestamp_.floor(self._get_time_ms(), interval), end),
+                )
                 try:
-                    async with aclosing(
-                        self._stream_exchange_candles(
-                            exchange=exchange,
-                            symbol=symbol,
-                            interval=interval,
-                            start=start,
-                            end=end,
-                            current=current,
-                        )
-                    ) as stream:
-                        async for candle in stream:
-                            batch.append(candle)
-                            if len(batch) == self._storage_batch_size:
-                                del swap_batch[:]
-                                batch_start = start
-                                batch_end = batch[-1].time + interval
-                                start = batch_end
-                                swap_batch, batch = batch, swap_batch
-                                await self._storage.store_time_series_and_span(
-                                    shard=shard,
-                                    key=_CANDLE_KEY,
-                                    items=swap_batch,
-                                    start=batch_start,
-                                    end=batch_end,
-                                )
-                            yield candle
-                except (asyncio.CancelledError, ExchangeException):
-                    if len(batch) > 0:
-                        batch_start = start
-                        batch_end = batch[-1].time + interval
-                        start = batch_end
-                        await self._storage.store_time_series_and_span(
-                            shard=shard,
-                            key=_CANDLE_KEY,
-                            items=batch,
-                            start=batch_start,
-                            end=batch_end,
-                        )
-                    raise
-                else:
-                    current = Timestamp_.floor(self._get_time_ms(), interval)
+                    async for candle in stream:
+                        yield candle
+                        last_candle = candle
+                finally:
+                    await aclose(stream)
+                    # Everything yielded has been stored, so a retry continues after the last
+                    # candle.
+                    if last_candle:
+                        start = _ceil_exact(last_candle.time + 1, interval)
+
+    async def _stream_and_store_candle_batches(
+        self,
+        shard: str,
+        interval: Interval,
+        stream: AsyncIterable[Candle],
+        start: Timestamp,
+        get_end: Callable[[], Timestamp],
+    ) -> AsyncGenerator[Candle, None]:
+        # Stores candles from the stream in batches of `storage_batch_size` while yielding them.
+        # Each batch span ends where the next candle interval starts. The final span ends at
+        # `get_end()`, evaluated once the stream has been exhausted. If the stream is cancelled or
+        # fails with an exchange error, candles received so far are stored before re-raising.
+
+        # We use a swap batch in order to swap the batch right before storing. With a single
+        # batch, it may happen that our program gets cancelled at an `await` point before we're
+        # able to clear the batch. This can cause same data to be stored twice, raising an
+        # integrity error.
+        batch: list[Candle] = []
+        swap_batch: list[Candle] = []
+        try:
+            async for candle in stream:
+                batch.append(candle)
+                if len(batch) == self._storage_batch_size:
+                    del swap_batch[:]
+                    batch_start = start
+                    batch_end = _ceil_exact(batch[-1].time + 1, interval)
+                    start = batch_end
+                    swap_batch, batch = batch, swap_batch
                     await self._storage.store_time_series_and_span(
                         shard=shard,
                         key=_CANDLE_KEY,
-                        items=batch,
-                        start=start,
-                        end=min(current, end),
+                        items=swap_batch,
+                        start=batch_start,
+                        end=batch_end,
                     )
+                yield candle
+        except (asyncio.CancelledError, ExchangeException):
+            if len(batch) > 0:
+                await self._storage.store_time_series_and_span(
+                    shard=shard,
+                    key=_CANDLE_KEY,
+                    items=batch,
+                    start=start,
+                    end=_ceil_exact(batch[-1].time + 1, interval),
+                )
+            raise
+        else:
+            await self._storage.store_time_series_and_span(
+                shard=shard,
+                key=_CANDLE_KEY,
+                items=batch,
+                start=start,
+                end=get_end(),
+            )
+        finally:
+            await aclose(stream)
 
     async def _stream_exchange_candles(
         self,
@@ -734,3 +1181,113 @@ class Chandler(AsyncContextManager):
             return intervals
 
         return [i for i in intervals if i in patterns]
+
+
+def _ceil_exact(time: Timestamp, interval: Interval) -> Timestamp:
+    # Unlike `Timestamp_.ceil`, keeps aligned times as is and for months also resets the time of
+    # day.
+    floored = Timestamp_.floor(time, interval)
+    if floored == time:
+        return time
+    return (
+        Timestamp_.ceil(floored, interval) if interval >= Interval_.MONTH else floored + interval
+    )
+
+
+def _is_resampleable(source: Interval, target: Interval) -> bool:
+    if source >= target:
+        return False
+    if target < Interval_.WEEK:
+        return target % source == 0
+    # Weeks (with their offset) and months both start at a day boundary.
+    if target in {Interval_.WEEK, Interval_.MONTH}:
+        return Interval_.DAY % source == 0
+    return False
+
+
+async def _resample_candles(
+    candles: AsyncIterable[Candle], interval: Interval
+) -> AsyncGenerator[Candle, None]:
+    current: Optional[Candle] = None
+    async for candle in candles:
+        time = Timestamp_.floor(candle.time, interval)
+        if current is None:
+            current = candle._replace(time=time)
+        elif current.time == time:
+            current = Candle(
+                time=time,
+                open=current.open,
+                high=max(current.high, candle.high),
+                low=min(current.low, candle.low),
+                close=candle.close,
+                volume=current.volume + candle.volume,
+            )
+        else:
+            yield current
+            current = candle._replace(time=time)
+    if current is not None:
+        yield current
+
+
+def _candles_to_arrays(candles: list[Candle], precision: Optional[Precision]) -> CandleArrays:
+    prices = [
+        _decimals_to_array(values, get_field_precision(precision, name))
+        for name, values in zip(Candle._fields[1:], _columns(candles, 1))
+    ]
+    return CandleArrays(np.array([c.time for c in candles], dtype=np.int64), *prices)
+
+
+def _decimals_to_array(values: tuple[Decimal, ...], precision: Optional[int]) -> np.ndarray:
+    if precision is None:
+        return np.array(values, dtype=np.float64)
+    return scale_decimals(values, precision)
+
+
+def _columns(candles: list[Candle], offset: int) -> list[tuple[Decimal, ...]]:
+    if len(candles) == 0:
+        return [() for _ in Candle._fields[offset:]]
+    return list(zip(*candles))[offset:]
+
+
+def _heikin_ashi_arrays(arrays: CandleArrays, interval: Interval) -> CandleArrays:
+    # Same as `Candle.gen_heikin_ashi` but on floats. Close, high and low are vectorized; open
+    # depends on the previous Heikin-Ashi candle and is computed in a loop.
+    close = (arrays.open + arrays.high + arrays.low + arrays.close) / 4
+    open_ = np.empty_like(close)
+    times = arrays.time.tolist()
+    opens = arrays.open.tolist()
+    closes = close.tolist()
+    raw_closes = arrays.close.tolist()
+    last_time: Optional[int] = None
+    last_open = 0.0
+    for i, time in enumerate(times):
+        if last_time is None or time - last_time > interval:
+            last_open = (opens[i] + raw_closes[i]) / 2
+        else:
+            last_open = (last_open + closes[i - 1]) / 2
+        open_[i] = last_open
+        last_time = time
+    return CandleArrays(
+        time=arrays.time,
+        open=open_,
+        high=np.maximum(arrays.high, np.maximum(open_, close)),
+        low=np.minimum(arrays.low, np.minimum(open_, close)),
+        close=close,
+        volume=arrays.volume,
+    )
+
+
+def _fill_missing_arrays_with_nan(
+    arrays: CandleArrays, interval: Interval, start: Timestamp, end: Timestamp
+) -> CandleArrays:
+    time = np.arange(start, end, interval, dtype=np.int64)
+    if len(time) == len(arrays.time):
+        return arrays
+    _log.info(f"filling {len(time) - len(arrays.time)} candle(s) with NaN")
+    indices = (arrays.time - start) // interval
+    filled = [time]
+    for values in arrays[1:]:
+        column = np.full(len(time), np.nan, dtype=np.float64)
+        column[indices] = values
+        filled.append(column)
+    return CandleArrays(*filled)
@@ -20,6 +20,9 @@ class Events:
 
         return _on
 
+    def has_handlers(self, channel: str, *events: str) -> bool:
+        return any(self._handlers.get((channel, event)) for event in events)
+
     async def emit(self, channel: str, event: str, *args: Any) -> list[Any]:
         handlers = self._handlers[(channel, event)]
         results = await asyncio.gather(*(h(*args) for h in handlers), return_exceptions=True)
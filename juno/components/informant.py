@@ -100,19 +100,29 @@ class Informant:
     ) -> None:
         await cancel(self._exchange_info_sync_task, self._tickers_sync_task)
 
+    def get_exchange_info(self, exchange: str) -> ExchangeInfo:
+        return self._synced_data[exchange][_Timestamped[ExchangeInfo]].item
+
+    def set_exchange_info(self, exchange: str, exchange_info: ExchangeInfo) -> None:
+        """Uses the given exchange info instead of syncing it from the exchange. Allows
+        simulating trading in processes without access to the exchange."""
+        self._synced_data[exchange][_Timestamped[ExchangeInfo]] = _Timestamped(
+            time=self._get_time_ms(), item=exchange_info
+        )
+
     def get_asset_info(self, exchange: str, asset: Asset) -> AssetInfo:
-        exchange_info: ExchangeInfo = self._synced_data[exchange][_Timestamped[ExchangeInfo]].item
+        exchange_info = self.get_exchange_info(exchange)
         return _get_or_default(exchange_info.assets, asset)
 
     def get_fees_filters(self, exchange: str, symbol: Symbol) -> tuple[Fees, Filters]:
-        exchange_info: ExchangeInfo = self._synced_data[exchange][_Timestamped[ExchangeInfo]].item
+        exchange_info = self.get_exchange_info(exchange)
         fees = _get_or_default(exchange_info.fees, symbol)
         filters = _get_or_default(exchange_info.filters, symbol)
         return fees, filters
 
     def get_borrow_info(self, exchange: str, asset: Asset, account: Account) -> BorrowInfo:
         assert account != "spot"
-        exchange_info: ExchangeInfo = self._synced_data[exchange][_Timestamped[ExchangeInfo]].item
+        exchange_info = self.get_exchange_info(exchange)
         borrow_info = _get_or_default(exchange_info.borrow_info, account)
         return _get_or_default(borrow_info, asset)
 
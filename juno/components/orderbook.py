@@ -3,11 +3,13 @@ from __future__ import annotations
 import asyncio
 import logging
 import uuid
+from bisect import bisect_left
 from collections import defaultdict
 from contextlib import asynccontextmanager
 from decimal import Decimal
+from itertools import islice
 from types import TracebackType
-from typing import AsyncIterable, AsyncIterator, Optional
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, Optional
 
 from asyncstdlib import chain as chain_async
 from tenacity import AsyncRetrying, before_sleep_log, retry_if_exception_type
@@ -33,16 +35,81 @@ class _MissingInitialDepth(Exception):
     pass
 
 
+class PriceLevels:
+    """
+    One side of an order book. Maps prices to sizes and keeps the prices sorted from the best
+    level: ascending for asks and descending for bids.
+
+    Setting a level takes a dictionary lookup and, for new or removed levels only, a binary search
+    followed by a list insert or delete. The best level is read in O(1) and iterating over the top
+    k levels takes O(k).
+    """
+
+    __slots__ = ("_descending", "_sizes", "_prices")
+
+    def __init__(self, descending: bool = False) -> None:
+        self._descending = descending
+        self._sizes: dict[Decimal, Decimal] = {}
+        self._prices: list[Decimal] = []  # Ascending.
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def __contains__(self, price: Decimal) -> bool:
+        return price in self._sizes
+
+    def __getitem__(self, price: Decimal) -> Decimal:
+        return self._sizes[price]
+
+    def __iter__(self) -> Iterator[tuple[Decimal, Decimal]]:
+        sizes = self._sizes
+        prices = reversed(self._prices) if self._descending else self._prices
+        return ((price, sizes[price]) for price in prices)
+
+    def best(self) -> Optional[tuple[Decimal, Decimal]]:
+        if len(self._prices) == 0:
+            return None
+        price = self._prices[-1] if self._descending else self._prices[0]
+        return price, self._sizes[price]
+
+    def top(self, count: Optional[int] = None) -> list[tuple[Decimal, Decimal]]:
+        """Lists the `count` best levels or all of them if `None`."""
+        return list(self if count is None else islice(self, count))
+
+    def set(self, price: Decimal, size: Decimal) -> None:
+        """Sets the size of a level. A zero size removes the level."""
+        sizes = self._sizes
+        if size > 0:
+            if price not in sizes:
+                prices = self._prices
+                prices.insert(bisect_left(prices, price), price)
+            sizes[price] = size
+        elif price in sizes:
+            del sizes[price]
+            prices = self._prices
+            del prices[bisect_left(prices, price)]
+
+    def update(self, levels: Iterable[tuple[Decimal, Decimal]]) -> None:
+        # Receiving an event that removes a price level that is not in the local orderbook can
+        # happen and is normal for Binance, for example. Such removals are ignored.
+        for price, size in levels:
+            self.set(price, size)
+
+    def reset(self, levels: Iterable[tuple[Decimal, Decimal]]) -> None:
+        self._sizes = {price: size for price, size in levels if size > 0}
+        self._prices = sorted(self._sizes)
+
+
 class Orderbook:
     class SyncContext:
         def __init__(
-            self, symbol: Symbol, sides: Optional[dict[Side, dict[Decimal, Decimal]]] = None
+            self, symbol: Symbol, sides: Optional[dict[Side, PriceLevels]] = None
         ) -> None:
             self.symbol = symbol
             self.sides = (
                 {
-                    Side.BUY: {},
-                    Side.SELL: {},
+                    Side.BUY: PriceLevels(),
+                    Side.SELL: PriceLevels(descending=True),
                 }
                 if sides is None
                 else sides
@@ -50,11 +117,13 @@ class Orderbook:
             # Will not be set for initial data.
             self.updated: Event[None] = Event(autoclear=True)
 
-        def list_asks(self) -> list[tuple[Decimal, Decimal]]:
-            return sorted(self.sides[Side.BUY].items())
+        def list_asks(self, count: Optional[int] = None) -> list[tuple[Decimal, Decimal]]:
+            """Lists the `count` lowest asks or all of them if `None`."""
+            return self.sides[Side.BUY].top(count)
 
-        def list_bids(self) -> list[tuple[Decimal, Decimal]]:
-            return sorted(self.sides[Side.SELL].items(), reverse=True)
+        def list_bids(self, count: Optional[int] = None) -> list[tuple[Decimal, Decimal]]:
+            """Lists the `count` highest bids or all of them if `None`."""
+            return self.sides[Side.SELL].top(count)
 
         def find_order_asks(
             self,
@@ -71,7 +140,7 @@ class Orderbook:
             result = []
             base_asset = Symbol_.base_asset(self.symbol)
             if size is not None:
-                for aprice, asize in self.list_asks():
+                for aprice, asize in self.sides[Side.BUY]:
                     if asize >= size:
                         fee = round_half_up(size * fee_rate, filters.base_precision)
                         result.append(
@@ -97,7 +166,7 @@ class Orderbook:
                         )
                         size -= asize
             elif quote is not None:
-                for aprice, asize in self.list_asks():
+                for aprice, asize in self.sides[Side.BUY]:
                     aquote = aprice * asize
                     if aquote >= quote:
                         size = filters.size.round_down(quote / aprice)
@@ -143,7 +212,7 @@ class Orderbook:
             result = []
             base_asset, quote_asset = Symbol_.assets(self.symbol)
             if size is not None:
-                for bprice, bsize in self.list_bids():
+                for bprice, bsize in self.sides[Side.SELL]:
                     if bsize >= size:
                         rsize = filters.size.round_down(size)
                         if size != 0:
@@ -172,7 +241,7 @@ class Orderbook:
                         )
                         size -= bsize
             elif quote is not None:
-                for bprice, bsize in self.list_bids():
+                for bprice, bsize in self.sides[Side.SELL]:
                     rquote = bprice * bsize
                     if rquote >= quote:
                         size = filters.size.round_down(quote / bprice)
@@ -269,8 +338,8 @@ class Orderbook:
                 async for depth in self._stream_depth(exchange, symbol):
                     if isinstance(depth, Depth.Snapshot):
                         for ctx in ctxs.values():
-                            _set_orderbook_side(ctx.sides[Side.BUY], depth.asks)
-                            _set_orderbook_side(ctx.sides[Side.SELL], depth.bids)
+                            ctx.sides[Side.BUY].reset(depth.asks)
+                            ctx.sides[Side.SELL].reset(depth.bids)
 
                         if is_first:
                             is_first = False
@@ -283,8 +352,8 @@ class Orderbook:
                         # levels outside level 10. They will not publish messages to delete them.
                         assert not is_first
                         for ctx in ctxs.values():
-                            _update_orderbook_side(ctx.sides[Side.BUY], depth.asks)
-                            _update_orderbook_side(ctx.sides[Side.SELL], depth.bids)
+                            ctx.sides[Side.BUY].update(depth.asks)
+                            ctx.sides[Side.SELL].update(depth.bids)
 
                         for ctx in ctxs.values():
                             ctx.updated.set()
@@ -354,25 +423,3 @@ class Orderbook:
                             yield update
                             last_update_id = update.last_id
                             is_first = False
-
-
-def _set_orderbook_side(
-    orderbook_side: dict[Decimal, Decimal], values: list[tuple[Decimal, Decimal]]
-) -> None:
-    orderbook_side.clear()
-    for price, size in values:
-        orderbook_side[price] = size
-
-
-def _update_orderbook_side(
-    orderbook_side: dict[Decimal, Decimal], values: list[tuple[Decimal, Decimal]]
-) -> None:
-    for price, size in values:
-        if size > 0:
-            orderbook_side[price] = size
-        elif price in orderbook_side:
-            del orderbook_side[price]
-        else:
-            # Receiving an event that removes a price level that is not in the local orderbook can
-            # happen and is normal for Binance, for example.
-            pass
@@ -1,8 +1,12 @@
 import asyncio
 import logging
+from collections import OrderedDict
+from dataclasses import dataclass
 from decimal import Decimal
 from typing import Collection, Iterable, Optional
 
+import numpy as np
+
 from juno import Asset, Candle, Interval, Interval_, Symbol, Symbol_, Timestamp, Timestamp_
 from juno.asyncio import gather_dict
 from juno.components import Chandler, Informant
@@ -16,10 +20,44 @@ class InsufficientPrices(Exception):
     pass
 
 
+@dataclass(frozen=True)
+class PriceMatrix:
+    assets: list[Asset]
+    # Assets x ticks. The first price is the opening price of the first candle, followed by the
+    # closing price of each candle.
+    prices: np.ndarray
+
+    def as_dict(self) -> dict[Asset, np.ndarray]:
+        return dict(zip(self.assets, self.prices))
+
+
+@dataclass(frozen=True)
+class _PriceSeries:
+    start: Timestamp  # Time of the first candle.
+    opens: np.ndarray
+    # Missing candles have the close of the previous candle as their open and close. Missing
+    # candles without a previous one are NaN.
+    closes: np.ndarray
+    missing: np.ndarray
+
+    def end(self, interval: Interval) -> Timestamp:
+        return self.start + len(self.closes) * interval
+
+
 class Prices(AsyncContextManager):
-    def __init__(self, informant: Informant, chandler: Chandler) -> None:
+    """
+    Maps prices of assets to a target asset. Price series of symbols are kept in a least recently
+    used cache of `cache_size` series. A cached series is extended with the missing candles when a
+    wider span is requested instead of being fetched again.
+    """
+
+    def __init__(self, informant: Informant, chandler: Chandler, cache_size: int = 256) -> None:
+        assert cache_size > 0
+
         self._informant = informant
         self._chandler = chandler
+        self._cache_size = cache_size
+        self._cache: OrderedDict[tuple[str, Symbol, Interval], _PriceSeries] = OrderedDict()
 
     # In the returned prices, the first price is always the opening price of the first candle.
     # When matching with end of period results, don't forget to offset price index by one.
@@ -32,7 +70,11 @@ class Prices(AsyncContextManager):
         interval: Interval = Interval_.DAY,
         target_asset: Asset = "usdt",
     ) -> dict[Asset, list[Decimal]]:
-        """Creates a mapping of assets to target asset prices."""
+        """
+        Creates a mapping of assets to target asset prices. Prices are exact decimals; indirect
+        prices are products of the decimal prices. Unlike `map_asset_price_matrix`, the prices are
+        not cached.
+        """
         result: dict[str, list[Decimal]] = {}
 
         start = floor_multiple(start, interval)
@@ -66,7 +108,9 @@ class Prices(AsyncContextManager):
         async def assign_direct(symbol: Symbol) -> None:
             base_asset = Symbol_.base_asset(symbol)
             assert base_asset not in result
-            result[base_asset] = await self._list_prices(exchange, symbol, interval, start, end)
+            result[base_asset] = await self._list_decimal_prices(
+                exchange, symbol, interval, start, end
+            )
 
         await asyncio.gather(*(assign_direct(s) for s in direct_symbols))
 
@@ -82,7 +126,7 @@ class Prices(AsyncContextManager):
 
             _log.info(f"have to indirectly map {indirect_assets}")
 
-            btc_prices = await self._list_prices(
+            btc_prices = await self._list_decimal_prices(
                 exchange, f"btc-{target_asset}", interval, start, end
             )
 
@@ -90,7 +134,7 @@ class Prices(AsyncContextManager):
             async def assign_indirect(asset: Asset) -> None:
                 assert asset not in result
                 intermediary_symbol = f"{asset}-btc"
-                intermediary_prices = await self._list_prices(
+                intermediary_prices = await self._list_decimal_prices(
                     exchange, intermediary_symbol, interval, start, end
                 )
                 result[asset] = [a * b for a, b in zip(intermediary_prices, btc_prices)]
@@ -103,6 +147,73 @@ class Prices(AsyncContextManager):
 
         return result
 
+    async def map_asset_price_matrix(
+        self,
+        exchange: str,
+        assets: Iterable[Asset],
+        start: Timestamp,
+        end: Timestamp,
+        interval: Interval = Interval_.DAY,
+        target_asset: Asset = "usdt",
+    ) -> PriceMatrix:
+        """
+        Same as `map_asset_prices` but returns the prices as a float matrix. Price series are
+        cached, so this is the one to use for repeated mappings where float precision suffices.
+        """
+        start = floor_multiple(start, interval)
+        end = floor_multiple(end, interval)
+        unique_assets = list(dict.fromkeys(assets))
+
+        _log.info(
+            f"mapping {target_asset} prices from {exchange} between "
+            f"{Timestamp_.format_span(start, end)} for {unique_assets}"
+        )
+
+        supported_symbols = set(self._informant.list_symbols(exchange))
+
+        # We can fetch prices directly for these symbols.
+        direct_symbols = [
+            symbol
+            for a in unique_assets
+            if a != target_asset and (symbol := f"{a}-{target_asset}") in supported_symbols
+        ]
+        _log.info(f"can directly map {direct_symbols}")
+
+        # We need to use an intermediary asset to find these prices. Currently we only support BTC
+        # for that.
+        indirect_assets = [
+            a
+            for a in unique_assets
+            if a != target_asset and f"{a}-{target_asset}" not in supported_symbols
+        ]
+        intermediary_symbols = []
+        if len(indirect_assets) > 0:
+            assert target_asset != "btc"
+            _log.info(f"have to indirectly map {indirect_assets}")
+            intermediary_symbols = [f"btc-{target_asset}"] + [f"{a}-btc" for a in indirect_assets]
+
+        # Only direct prices are validated to cover the span.
+        symbols = list(dict.fromkeys(direct_symbols + intermediary_symbols))
+        direct = set(direct_symbols)
+        symbol_prices = await gather_dict(
+            {
+                s: self._get_prices(exchange, s, interval, start, end, validate=s in direct)
+                for s in symbols
+            }
+        )
+
+        num_prices = (end - start) // interval + 1 if end > start else 0
+        result = np.empty((len(unique_assets), num_prices), dtype=np.float64)
+        for i, asset in enumerate(unique_assets):
+            if asset == target_asset:
+                # Fiat currency itself if it's specified as a quote of any symbol.
+                result[i] = 1.0
+            elif asset in indirect_assets:
+                result[i] = symbol_prices[f"{asset}-btc"] * symbol_prices[f"btc-{target_asset}"]
+            else:
+                result[i] = symbol_prices[f"{asset}-{target_asset}"]
+        return PriceMatrix(assets=unique_assets, prices=result)
+
     async def map_asset_prices_for_timestamp(
         self,
         exchange: str,
@@ -167,6 +278,70 @@ class Prices(AsyncContextManager):
 
         return {asset: symbol_prices.get(asset, Decimal("1.0")) for asset in assets}
 
+    async def _get_prices(
+        self,
+        exchange: str,
+        symbol: Symbol,
+        interval: Interval,
+        start: Timestamp,
+        end: Timestamp,
+        validate: bool,
+    ) -> np.ndarray:
+        if end <= start:
+            return np.empty(0, dtype=np.float64)
+
+        key = (exchange, symbol, interval)
+        series = self._cache.get(key)
+        if series is None or start < series.start or end > series.end(interval):
+            if validate:
+                await self._validate_sufficient_data(exchange, symbol, interval, start, end)
+            series = await self._extend_series(series, exchange, symbol, interval, start, end)
+        self._cache[key] = series
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+        i = (start - series.start) // interval
+        j = (end - series.start) // interval
+        if series.missing[i]:
+            raise ValueError("Candle missing from start")
+        return np.concatenate((series.opens[i : i + 1], series.closes[i:j]))
+
+    async def _extend_series(
+        self,
+        series: Optional[_PriceSeries],
+        exchange: str,
+        symbol: Symbol,
+        interval: Interval,
+        start: Timestamp,
+        end: Timestamp,
+    ) -> _PriceSeries:
+        if series is None:
+            return await self._list_prices(exchange, symbol, interval, start, end)
+
+        # Only the candles outside of the cached span are fetched. The spans are contiguous even
+        # if the requested span does not overlap with the cached one.
+        series_end = series.end(interval)
+        parts = [series]
+        if start < series.start:
+            parts.insert(
+                0, await self._list_prices(exchange, symbol, interval, start, series.start)
+            )
+        if end > series_end:
+            parts.append(await self._list_prices(exchange, symbol, interval, series_end, end))
+        _log.info(
+            f"extended cached {exchange} {symbol} {Interval_.format(interval)} prices to "
+            f"{Timestamp_.format_span(parts[0].start, parts[-1].end(interval))}"
+        )
+        return _fill_missing(
+            _PriceSeries(
+                start=parts[0].start,
+                opens=np.concatenate([p.opens for p in parts]),
+                closes=np.concatenate([p.closes for p in parts]),
+                missing=np.concatenate([p.missing for p in parts]),
+            )
+        )
+
     async def _list_prices(
         self,
         exchange: str,
@@ -174,6 +349,39 @@ class Prices(AsyncContextManager):
         interval: Interval,
         start: Timestamp,
         end: Timestamp,
+    ) -> _PriceSeries:
+        opens: list[float] = []
+        closes: list[float] = []
+        async for candle in self._chandler.stream_candles_fill_missing_with_none(
+            exchange=exchange,
+            symbol=symbol,
+            interval=interval,
+            start=start,
+            end=end,
+        ):
+            if candle is None:
+                opens.append(np.nan)
+                closes.append(np.nan)
+            else:
+                opens.append(float(candle.open))
+                closes.append(float(candle.close))
+        opens_array = np.array(opens, dtype=np.float64)
+        return _fill_missing(
+            _PriceSeries(
+                start=start,
+                opens=opens_array,
+                closes=np.array(closes, dtype=np.float64),
+                missing=np.isnan(opens_array),
+            )
+        )
+
+    async def _list_decimal_prices(
+        self,
+        exchange: str,
+        symbol: Symbol,
+        interval: Interval,
+        start: Timestamp,
+        end: Timestamp,
     ) -> list[Decimal]:
         prices: list[Decimal] = []
         last_candle: Optional[Candle] = None
@@ -218,3 +426,16 @@ class Prices(AsyncContextManager):
                 f"candle at {Timestamp_.format(last.time)} but requested end at "
                 f"{Timestamp_.format(end)}"
             )
+
+
+def _fill_missing(series: _PriceSeries) -> _PriceSeries:
+    # Index of the latest present candle at or before each candle, -1 before the first one.
+    present = ~series.missing
+    indices = np.maximum.accumulate(np.where(present, np.arange(len(present)), -1))
+    filled = np.where(indices >= 0, series.closes[np.maximum(indices, 0)], np.nan)
+    return _PriceSeries(
+        start=series.start,
+        opens=np.where(present, series.opens, filled),
+        closes=np.where(present, series.closes, filled),
+        missing=series.missing,
+    )
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import sys
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+from functools import partial
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from types import TracebackType
+from typing import Any, Callable, Iterator, NamedTuple, Optional
+
+import numpy as np
+
+from juno import Candle, Interval, Interval_, Symbol, Timestamp, Timestamp_
+from juno.common import CandleType
+from juno.contextlib import AsyncContextManager
+from juno.storages import Precision, get_field_precision
+
+from .chandler import CandleArrays, Chandler
+
+_log = logging.getLogger(__name__)
+
+# Header of a segment: [ready flag, number of candles, precision of every column or -1 for
+# float64].
+_HEADER_SIZE = 2 + len(CandleArrays._fields)
+_ITEM_SIZE = 8
+_READY_POLL_INTERVAL = 0.01
+_READY_TIMEOUT = 60.0
+
+
+class SharedCandleArrays(NamedTuple):
+    # Name of the shared memory segment. Other processes on the same host can attach to the
+    # candles by this name.
+    name: str
+    arrays: CandleArrays
+    precision: Optional[Precision]
+
+
+@dataclass
+class _Segment:
+    memory: SharedMemory
+    candles: SharedCandleArrays
+    owned: bool  # Whether the segment was published by this process.
+    refs: int = 0
+
+    @property
+    def size(self) -> int:
+        return self.memory.size
+
+
+class SharedCandles(AsyncContextManager):
+    """
+    Publishes candle arrays loaded through `Chandler` into shared memory segments keyed by
+    exchange, symbol, interval, candle type, span and precision. Processes on the same host attach
+    to published segments instead of loading and keeping their own copy of the candles.
+
+    Segments are reference counted within a process. Unreferenced segments are closed in least
+    recently used order once the segments mapped by the process exceed `max_size` bytes. The
+    publisher also unlinks the segment; processes which have already attached to it keep their
+    mapping until they release it.
+    """
+
+    def __init__(self, chandler: Chandler, max_size: int = 1024 * 1024 * 1024) -> None:
+        assert max_size > 0
+
+        self._chandler = chandler
+        self._max_size = max_size
+        self._segments: OrderedDict[str, _Segment] = OrderedDict()
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        for segment in list(self._segments.values()):
+            if not self._close(segment) and segment.owned:
+                # Nobody else can attach anymore. The memory is freed once the views are gone.
+                segment.memory.unlink()
+
+    @property
+    def size(self) -> int:
+        return sum(s.size for s in self._segments.values())
+
+    async def acquire(
+        self,
+        exchange: str,
+        symbol: Symbol,
+        interval: Interval,
+        start: Timestamp,
+        end: Timestamp = Timestamp_.MAX_TIME,
+        type_: CandleType = "regular",
+        precision: Optional[Precision] = None,
+    ) -> SharedCandleArrays:
+        """
+        Same as `Chandler.get_candle_arrays` but the arrays are read-only views into shared
+        memory. Attaches to a segment published by any process on the host or loads the candles
+        and publishes them. Must be released when no longer used.
+        """
+        start = Timestamp_.floor(start, interval)
+        end = Timestamp_.floor(end, interval)
+        name = _segment_name(exchange, symbol, interval, start, end, type_, precision)
+
+        segment = self._segments.get(name)
+        if segment is None:
+            segment = await self._attach(name)
+        if segment is None:
+            arrays = await self._chandler.get_candle_arrays(
+                exchange=exchange,
+                symbol=symbol,
+                interval=interval,
+                start=start,
+                end=end,
+                type_=type_,
+                precision=precision,
+            )
+            # Another process or task may have published the same candles in the meanwhile.
+            segment = self._publish(name, arrays, precision) or await self._attach(name)
+            assert segment
+            _log.info(
+                f"published {len(arrays.time)} {exchange} {symbol} {Interval_.format(interval)} "
+                f"candle(s) between {Timestamp_.format_span(start, end)} to {name}"
+            )
+        return self._reference(segment)
+
+    def attach(self, name: str) -> SharedCandleArrays:
+        """Attaches to candles already published by another process. Must be released when no
+        longer used."""
+        segment = self._segments.get(name)
+        if segment is None:
+            memory = _open(name)
+            if memory is None or not _is_ready(memory):
+                raise ValueError(f"Shared candles {name} not published")
+            segment = _Segment(memory=memory, candles=_shared_arrays(memory), owned=False)
+        return self._reference(segment)
+
+    def release(self, name: str) -> None:
+        """Releases candles by their name. Unreferenced candles are only closed once their arrays
+        are no longer in use."""
+        segment = self._segments[name]
+        assert segment.refs > 0
+        segment.refs -= 1
+        self._evict()
+
+    def _reference(self, segment: _Segment) -> SharedCandleArrays:
+        name = segment.candles.name
+        self._segments[name] = segment
+        self._segments.move_to_end(name)
+        segment.refs += 1
+        self._evict()
+        return segment.candles
+
+    def _publish(
+        self, name: str, arrays: CandleArrays, precision: Optional[Precision]
+    ) -> Optional[_Segment]:
+        length = len(arrays.time)
+        try:
+            memory = SharedMemory(
+                name=name,
+                create=True,
+                size=(_HEADER_SIZE + len(arrays) * length) * _ITEM_SIZE,
+            )
+        except FileExistsError:
+            return None
+
+        precisions = _column_precisions(precision)
+        header = _view(memory, np.int64, 0, _HEADER_SIZE)
+        header[1] = length
+        header[2:] = precisions
+        for array, view in zip(arrays, _column_views(memory, length, precisions)):
+            view[:] = array
+        # Readers wait for the flag. Set last so they never see partially written candles.
+        header[0] = 1
+        return _Segment(memory=memory, candles=_shared_arrays(memory), owned=True)
+
+    async def _attach(self, name: str) -> Optional[_Segment]:
+        memory = _open(name)
+        if memory is None:
+            return None
+        waited = 0.0
+        while not _is_ready(memory):
+            if waited >= _READY_TIMEOUT:
+                memory.close()
+                raise TimeoutError(f"Shared candles {name} were not published in time")
+            await asyncio.sleep(_READY_POLL_INTERVAL)
+            waited += _READY_POLL_INTERVAL
+        return _Segment(memory=memory, candles=_shared_arrays(memory), owned=False)
+
+    def _evict(self) -> None:
+        size = self.size
+        for segment in list(self._segments.values()):
+            if size <= self._max_size:
+                break
+            if segment.refs == 0 and self._close(segment):
+                size -= segment.size
+
+    def _close(self, segment: _Segment) -> bool:
+        name = segment.candles.name
+        # The segment can only be closed after all views into it are gone.
+        views = [weakref.ref(a) for a in segment.candles.arrays]
+        segment.candles = segment.candles._replace(arrays=CandleArrays(*[np.empty(0)] * 6))
+        if any(v() is not None for v in views):
+            # Closing is retried on the next eviction.
+            _log.debug(f"deferred closing shared candles {name}; arrays still in use")
+            segment.candles = _shared_arrays(segment.memory)
+            return False
+        segment.memory.close()
+        if segment.owned:
+            segment.memory.unlink()
+        del self._segments[name]
+        return True
+
+
+def iter_candles(arrays: CandleArrays, precision: Optional[Precision]) -> Iterator[Candle]:
+    """Lazily constructs candles from candle arrays."""
+    to_decimals = [
+        _get_to_decimal(get_field_precision(precision, name)) for name in Candle._fields[1:]
+    ]
+    for time, *values in zip(*(a.tolist() for a in arrays)):
+        yield Candle(time, *(to_decimal(v) for to_decimal, v in zip(to_decimals, values)))
+
+
+def _get_to_decimal(precision: Optional[int]) -> Callable[[Any], Decimal]:
+    return _float_to_decimal if precision is None else partial(_scaled_to_decimal, precision)
+
+
+def _float_to_decimal(value: float) -> Decimal:
+    return Decimal(repr(value))
+
+
+def _scaled_to_decimal(precision: int, value: int) -> Decimal:
+    return Decimal(value).scaleb(-precision)
+
+
+def _open(name: str) -> Optional[SharedMemory]:
+    # Only the publisher may register the segment with the resource tracker. Otherwise the
+    # tracker would unlink the segment when an attached process exits. Before Python 3.13,
+    # attaching always registers so registering is temporarily disabled.
+    try:
+        if sys.version_info >= (3, 13):
+            return SharedMemory(name=name, track=False)
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+    except FileNotFoundError:
+        return None
+
+
+def _is_ready(memory: SharedMemory) -> bool:
+    return bool(_view(memory, np.int64, 0, 1)[0])
+
+
+def _segment_name(
+    exchange: str,
+    symbol: Symbol,
+    interval: Interval,
+    start: Timestamp,
+    end: Timestamp,
+    type_: CandleType,
+    precision: Optional[Precision],
+) -> str:
+    precisions = "_".join(map(str, _column_precisions(precision)))
+    key = f"{exchange}_{symbol}_{interval}_{type_}_{start}_{end}_{precisions}"
+    # Segment names are limited in length on some platforms.
+    return f"juno_{hashlib.sha1(key.encode()).hexdigest()[:24]}"
+
+
+def _column_precisions(precision: Optional[Precision]) -> list[int]:
+    # Time is not a decimal column and is always int64.
+    precisions = (get_field_precision(precision, name) for name in CandleArrays._fields[1:])
+    return [-1] + [-1 if p is None else p for p in precisions]
+
+
+def _column_views(memory: SharedMemory, length: int, precisions: list[int]) -> list[np.ndarray]:
+    return [
+        _view(
+            memory,
+            np.int64 if i == 0 or precision >= 0 else np.float64,
+            _HEADER_SIZE + i * length,
+            length,
+        )
+        for i, precision in enumerate(precisions)
+    ]
+
+
+def _view(memory: SharedMemory, dtype: type[np.generic], offset: int, count: int) -> np.ndarray:
+    # Unlike `np.ndarray(buffer=...)`, `np.frombuffer` holds on to the buffer. The segment cannot
+    # be closed while the view exists and accessing it can never crash.
+    assert memory.buf is not None
+    return np.frombuffer(memory.buf, dtype=dtype, count=count, offset=offset * _ITEM_SIZE)
+
+
+def _shared_arrays(memory: SharedMemory) -> SharedCandleArrays:
+    header = _view(memory, np.int64, 0, _HEADER_SIZE)
+    length, precisions = int(header[1]), [int(p) for p in header[2:]]
+    del header
+    views = _column_views(memory, length, precisions)
+    for view in views:
+        view.flags.writeable = False
+    # Strip the leading slash some platforms add to the name.
+    return SharedCandleArrays(
+        name=memory.name.lstrip("/"),
+        arrays=CandleArrays(*views),
+        precision=_from_column_precisions(precisions),
+    )
+
+
+def _from_column_precisions(precisions: list[int]) -> Optional[Precision]:
+    result = {n: p for n, p in zip(CandleArrays._fields, precisions) if p >= 0}
+    if len(result) == 0:
+        return None
+    if len(set(result.values())) == 1 and len(result) == len(precisions) - 1:
+        return next(iter(result.values()))
+    return result
@@ -4,7 +4,9 @@ from types import ModuleType
 from typing import Any, Mapping, Optional
 
 from juno import serialization
+from juno.indicators.numeric import NumericConstructor
 from juno.inspect import (
+    Constructor,
     GenericConstructor,
     get_module_type,
     isnamedtuple,
@@ -131,11 +133,12 @@ def init_module_instance(module: ModuleType, config: dict[str, Any]) -> Any:
     return init_instance(type_, config)
 
 
-def get_module_type_constructor(
-    module: ModuleType, config: dict[str, Any]
-) -> GenericConstructor[Any]:
+def get_module_type_constructor(module: ModuleType, config: dict[str, Any]) -> Constructor[Any]:
     type_, kwargs = get_module_type_and_kwargs(module, config)
-    return GenericConstructor.from_type(type_, **kwargs)
+    constructor = GenericConstructor.from_type(type_, **kwargs)
+    # Optional numeric backend for the indicators of the constructed type, i.e `"float"`.
+    numeric = config.get("numeric")
+    return constructor if numeric is None else NumericConstructor(constructor, numeric)
 
 
 def get_type_name_and_kwargs(config: dict[str, Any]) -> tuple[str, dict[str, Any]]:
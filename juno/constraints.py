@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
 from decimal import Decimal
+from itertools import chain, product
 from random import Random
-from typing import Any, Callable
+from typing import Any, Callable, Iterable
 
 
 class Constraint(ABC):
@@ -11,6 +12,10 @@ class Constraint(ABC):
     def random(self, random: Random) -> Any:
         pass
 
+    def values(self) -> Iterable[Any]:
+        """Enumerates every value `random` can produce. Used for grid search."""
+        raise NotImplementedError(f"{type(self).__name__} cannot be enumerated")
+
 
 class Constant(Constraint):
     def __init__(self, value: Any) -> None:
@@ -22,6 +27,9 @@ class Constant(Constraint):
     def random(self, random: Random) -> Any:
         return self._value
 
+    def values(self) -> Iterable[Any]:
+        return [self._value]
+
     def get(self) -> Any:
         return self._value
 
@@ -36,6 +44,9 @@ class Choice(Constraint):
     def random(self, random: Random) -> Any:
         return random.choice(self._choices)
 
+    def values(self) -> Iterable[Any]:
+        return list(self._choices)
+
 
 class ConstraintChoice(Constraint):
     def __init__(self, choices: list[Constraint]) -> None:
@@ -47,6 +58,10 @@ class ConstraintChoice(Constraint):
     def random(self, random: Random) -> Any:
         return random.choice(self._choices).random(random)
 
+    def values(self) -> Iterable[Any]:
+        # Distinct values in order of appearance.
+        return list(dict.fromkeys(chain.from_iterable(c.values() for c in self._choices)))
+
 
 class Uniform(Constraint):
     def __init__(self, min_: Decimal, max_: Decimal) -> None:
@@ -78,6 +93,9 @@ class Uniform(Constraint):
         # https://stackoverflow.com/a/40972516/1466456
         return Decimal(random.randrange(self._min_int, self._max_int)) / self._factor
 
+    def values(self) -> Iterable[Decimal]:
+        return (Decimal(i) / self._factor for i in range(self._min_int, self._max_int))
+
 
 class Int(Constraint):
     def __init__(self, min_: int, max_: int) -> None:
@@ -90,6 +108,9 @@ class Int(Constraint):
     def random(self, random: Random) -> int:
         return random.randrange(self._min, self._max)
 
+    def values(self) -> Iterable[int]:
+        return range(self._min, self._max)
+
 
 class Pair(Constraint):
     def __init__(self, a: Constraint, op: Callable[[Any, Any], bool], b: Constraint) -> None:
@@ -108,6 +129,11 @@ class Pair(Constraint):
                 break
         return a, b
 
+    def values(self) -> Iterable[tuple[Any, Any]]:
+        return (
+            (a, b) for a, b in product(self._a.values(), self._b.values()) if self.validate(a, b)
+        )
+
 
 class Triple(Constraint):
     def __init__(
@@ -141,3 +167,10 @@ class Triple(Constraint):
             if self.validate(a, b, c):
                 break
         return a, b, c
+
+    def values(self) -> Iterable[tuple[Any, Any, Any]]:
+        return (
+            (a, b, c)
+            for a, b, c in product(self._a.values(), self._b.values(), self._c.values())
+            if self.validate(a, b, c)
+        )
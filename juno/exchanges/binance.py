@@ -5,13 +5,24 @@ import hashlib
 import hmac
 import logging
 import math
+import os
 import urllib.parse
 import uuid
 from collections import defaultdict
 from contextlib import asynccontextmanager
 from decimal import Decimal
+from itertools import count
 from types import TracebackType
-from typing import Any, AsyncIterable, AsyncIterator, Optional, TypedDict
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Mapping,
+    Optional,
+    TypedDict,
+)
 
 import aiohttp
 from multidict import MultiDict, istr
@@ -58,7 +69,7 @@ from juno import (
     Trade,
     json,
 )
-from juno.aiolimiter import AsyncLimiter
+from juno.aiolimiter import AsyncLimiter, Priority, RateLimiter
 from juno.asyncio import Event, cancel, create_task_sigint_on_exception, stream_queue
 from juno.filters import (
     Filters,
@@ -69,7 +80,12 @@ from juno.filters import (
     Price,
     Size,
 )
-from juno.http import ClientResponse, ClientSession, connect_refreshing_stream
+from juno.http import (
+    ClientResponse,
+    ClientSession,
+    ClientWebSocketResponse,
+    connect_refreshing_stream,
+)
 from juno.itertools import paginate
 
 from .exchange import Exchange
@@ -105,6 +121,16 @@ _LIMITERS_ONCE_PER_SEC = 3
 
 _BINANCE_START = Timestamp_.parse("2017-07-01")
 
+_MAX_STREAMS_PER_CONNECTION = 1024
+# Max difference in event times of combined stream events sent at the same time.
+_SWITCH_OVER_SKEW = Interval_.SEC
+# Seconds requests are kept away from the edges of rate limit windows.
+_RATE_LIMIT_MARGIN = 0.2
+
+_ZERO_SIZE = Decimal("0.00000000")
+_MAX_LEVEL_PRICES = 100_000
+_level_prices: dict[str, Decimal] = {}
+
 _log = logging.getLogger(__name__)
 
 
@@ -124,7 +150,13 @@ class Binance(Exchange):
     can_edit_order: bool = True
     can_edit_order_atomic: bool = False
 
-    def __init__(self, api_key: str, secret_key: str, high_precision: bool = True) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        secret_key: str,
+        high_precision: bool = True,
+        rate_limit_dir: Optional[str] = None,
+    ) -> None:
         if not high_precision:
             _log.warning("high precision updates disabled")
 
@@ -142,20 +174,41 @@ class Binance(Exchange):
             # headers={'Connection': 'close'},
         )
 
-        # Rate limiters.
-        x = 1.5  # We use this factor to be on the safe side and not use up the entire bucket.
-        self._reqs_per_min_limiter = AsyncLimiter(1200, 60 * x)
-        self._raw_reqs_limiter = AsyncLimiter(5000, 300 * x)
-        self._orders_per_sec_limiter = AsyncLimiter(10, 1 * x)
-        self._orders_per_day_limiter = AsyncLimiter(
-            100_000, Interval_.to_seconds(Interval_.DAY) * x
+        # Rate limiters. Limits are counted per IP (and orders per account), so processes sharing
+        # them can share limiters through lock files in `rate_limit_dir`. Windows are aligned to
+        # the server time and kept clear of their edges by a margin for latency and clock skew.
+        def limiter(max_weight: int, interval: float, name: str) -> RateLimiter:
+            return RateLimiter(
+                max_weight,
+                interval,
+                path=(
+                    None
+                    if rate_limit_dir is None
+                    else os.path.join(rate_limit_dir, f"binance_{name}.lock")
+                ),
+                get_time=self._server_time,
+                margin=_RATE_LIMIT_MARGIN,
+            )
+
+        self._reqs_per_min_limiter = limiter(1200, 60, "reqs_per_min")
+        self._raw_reqs_limiter = limiter(5000, 300, "raw_reqs")
+        self._orders_per_sec_limiter = limiter(10, 1, "orders_per_sec")
+        self._orders_per_day_limiter = limiter(
+            100_000, Interval_.to_seconds(Interval_.DAY), "orders_per_day"
         )
+        # Limits of these are not documented. We use a factor of 1.5 to be on the safe side.
         self._once_per_sec_limiters: dict[str, AsyncLimiter] = defaultdict(
-            lambda: AsyncLimiter(1, 1 * x)
+            lambda: AsyncLimiter(1, 1 * 1.5)
         )
+        # Usage reported by the server in response headers.
+        self._limiters_by_header = {
+            istr("X-MBX-USED-WEIGHT-1M"): self._reqs_per_min_limiter,
+            istr("X-MBX-ORDER-COUNT-1D"): self._orders_per_day_limiter,
+        }
 
         self._clock = Clock(self)
         self._user_data_streams: dict[str, UserDataStream] = {}
+        self._combined_streams: list[CombinedStream] = []
 
     async def __aenter__(self) -> Binance:
         await self._session.__aenter__()
@@ -173,9 +226,17 @@ class Binance(Exchange):
             # self._cross_margin_user_data_stream.__aexit__(exc_type, exc, tb),
             # self._spot_user_data_stream.__aexit__(exc_type, exc, tb),
             *(s.__aexit__(exc_type, exc, tb) for s in self._user_data_streams.values()),
+            *(s.__aexit__(exc_type, exc, tb) for s in self._combined_streams),
             self._clock.__aexit__(exc_type, exc, tb),
         )
         await self._session.__aexit__(exc_type, exc, tb)
+        for limiter in [
+            self._reqs_per_min_limiter,
+            self._raw_reqs_limiter,
+            self._orders_per_sec_limiter,
+            self._orders_per_day_limiter,
+        ]:
+            limiter.close()
 
     def list_candle_intervals(self) -> list[int]:
         return [
@@ -462,7 +523,7 @@ class Binance(Exchange):
         """
 
         async def inner(
-            stream: AsyncIterable[dict[str, Any]]
+            stream: AsyncIterable[dict[str, Any]],
         ) -> AsyncIterable[dict[str, Balance]]:
             async for data in stream:
                 result = {}
@@ -498,10 +559,11 @@ class Binance(Exchange):
             url="/api/v3/depth",
             weight=LIMIT_TO_WEIGHT[LIMIT],
             data={"limit": LIMIT, "symbol": _to_http_symbol(symbol)},
+            loads=json.loads_fast,
         )
         return Depth.Snapshot(
-            bids=[(Decimal(x[0]), Decimal(x[1])) for x in content["bids"]],
-            asks=[(Decimal(x[0]), Decimal(x[1])) for x in content["asks"]],
+            bids=_to_levels(content["bids"]),
+            asks=_to_levels(content["asks"]),
             last_id=content["lastUpdateId"],
         )
 
@@ -516,21 +578,16 @@ class Binance(Exchange):
         async def inner(ws: AsyncIterable[Any]) -> AsyncIterable[Depth.Update]:
             async for data in ws:
                 yield Depth.Update(
-                    bids=[(Decimal(m[0]), Decimal(m[1])) for m in data["b"]],
-                    asks=[(Decimal(m[0]), Decimal(m[1])) for m in data["a"]],
+                    bids=_to_levels(data["b"]),
+                    asks=_to_levels(data["a"]),
                     first_id=data["U"],
                     last_id=data["u"],
                 )
 
-        url = f"/ws/{_to_ws_symbol(symbol)}@depth"
+        stream = f"{_to_ws_symbol(symbol)}@depth"
         if self._high_precision:  # Low precision is every 1000ms.
-            url += "@100ms"
-        async with self._connect_refreshing_stream(
-            url=url,
-            interval=12 * Interval_.to_seconds(Interval_.HOUR),
-            name="depth",
-            raise_on_disconnect=True,
-        ) as ws:
+            stream += "@100ms"
+        async with self._subscribe_stream(stream) as ws:
             yield inner(ws)
 
     async def list_open_orders(
@@ -829,6 +886,8 @@ class Binance(Exchange):
                     "endTime": binance_end,
                     "limit": limit,
                 },
+                loads=json.loads_fast,
+                priority=Priority.LOW,
             )
             for c in content:
                 # Binance can return bad candles where the time does not fall within the requested
@@ -852,10 +911,6 @@ class Binance(Exchange):
         self, symbol: Symbol, interval: Interval
     ) -> AsyncIterator[AsyncIterable[Candle]]:
         """https://binance-docs.github.io/apidocs/spot/en/#kline-candlestick-streams"""
-        # Binance disconnects a websocket connection every 24h. Therefore, we reconnect every 12h.
-        # Note that two streams will send events with matching evt_times.
-        # This can be used to switch from one stream to another and avoiding the edge case where
-        # we miss out on the very last update to a candle.
 
         async def inner(ws: AsyncIterable[Any]) -> AsyncIterable[Candle]:
             async for data in ws:
@@ -870,11 +925,8 @@ class Binance(Exchange):
                         volume=Decimal(c["v"]),
                     )
 
-        async with self._connect_refreshing_stream(
-            url=f"/ws/{_to_ws_symbol(symbol)}@kline_{Interval_.format(interval)}",
-            interval=12 * Interval_.HOUR,
-            name="candles",
-            raise_on_disconnect=True,
+        async with self._subscribe_stream(
+            f"{_to_ws_symbol(symbol)}@kline_{Interval_.format(interval)}"
         ) as ws:
             yield inner(ws)
 
@@ -901,6 +953,8 @@ class Binance(Exchange):
                 method="GET",
                 url="/api/v3/aggTrades",
                 data=payload,
+                loads=json.loads_fast,
+                priority=Priority.LOW,
             )
             for t in content:
                 time = t["T"]
@@ -930,12 +984,7 @@ class Binance(Exchange):
                     size=Decimal(data["q"]),
                 )
 
-        async with self._connect_refreshing_stream(
-            url=f"/ws/{_to_ws_symbol(symbol)}@trade",
-            interval=12 * Interval_.to_seconds(Interval_.HOUR),
-            name="trades",
-            raise_on_disconnect=True,
-        ) as ws:
+        async with self._subscribe_stream(f"{_to_ws_symbol(symbol)}@trade") as ws:
             yield inner(ws)
 
     async def transfer(
@@ -1226,12 +1275,20 @@ class Binance(Exchange):
         limiters: int = _LIMITERS_BASIC,
         security: int = _SEC_NONE,
         data: Optional[Any] = None,
+        loads: Callable[[str], Any] = json.loads,
+        priority: Optional[Priority] = None,
     ) -> Any:
         # Request.
         response = await self._api_request(
-            method=method, url=url, weight=weight, limiters=limiters, security=security, data=data
+            method=method,
+            url=url,
+            weight=weight,
+            limiters=limiters,
+            security=security,
+            data=data,
+            priority=priority,
         )
-        content = await response.json()
+        content = await response.json(loads)
 
         # Error handling.
         if isinstance(content, dict) and (error_code := content.get("code")) is not None:
@@ -1254,19 +1311,30 @@ class Binance(Exchange):
         limiters: int = _LIMITERS_BASIC,
         security: int = _SEC_NONE,
         data: Optional[Any] = None,
+        priority: Optional[Priority] = None,
     ) -> Any:
-        limiter_tasks = [
-            self._raw_reqs_limiter.acquire(),
-            self._reqs_per_min_limiter.acquire(weight),
-        ]
+        # Orders outrank everything else.
+        if priority is None:
+            priority = Priority.HIGH if limiters == _LIMITERS_ORDER else Priority.NORMAL
+
+        weighted_limiters = [(self._raw_reqs_limiter, 1), (self._reqs_per_min_limiter, weight)]
         if limiters == _LIMITERS_ORDER:
-            limiter_tasks.extend(
-                (self._orders_per_day_limiter.acquire(), self._orders_per_sec_limiter.acquire())
+            weighted_limiters.extend(
+                ((self._orders_per_day_limiter, 1), (self._orders_per_sec_limiter, 1))
             )
-        elif limiters == _LIMITERS_ONCE_PER_SEC:
+        limiter_tasks: list[Awaitable[Any]] = [
+            limiter.acquire(w, priority) for limiter, w in weighted_limiters
+        ]
+        if limiters == _LIMITERS_ONCE_PER_SEC:
             limiter_tasks.append(self._once_per_sec_limiters[url].acquire())
 
-        await asyncio.gather(*limiter_tasks)
+        # Windows the request is counted in by each of the limiters.
+        window_starts: dict[RateLimiter, float] = dict(
+            zip(
+                (limiter for limiter, _ in weighted_limiters),
+                await asyncio.gather(*limiter_tasks),
+            )
+        )
 
         kwargs: dict[str, Any] = {}
 
@@ -1291,7 +1359,21 @@ class Binance(Exchange):
         if data:
             kwargs["params" if method == "GET" else "data"] = data
 
-        return await self._request(method=method, url=_BASE_API_URL + url, **kwargs)
+        response = await self._request(method=method, url=_BASE_API_URL + url, **kwargs)
+        self._update_used_weight(response.headers, window_starts)
+        return response
+
+    def _update_used_weight(
+        self, headers: Mapping[str, str], window_starts: Mapping[RateLimiter, float]
+    ) -> None:
+        # The server counts requests of all processes sharing our IP and account.
+        for header, limiter in self._limiters_by_header.items():
+            if (used := headers.get(header)) is not None and limiter in window_starts:
+                limiter.update_used(int(used), window_starts[limiter])
+
+    def _server_time(self) -> float:
+        # In seconds. Local time until the clock has been synced by a signed request.
+        return (Timestamp_.now() + self._clock.time_diff) / 1000
 
     async def _internal_request_json(self, method: str, url: str, **kwargs: Any) -> Any:
         response = await self._request(method, _BASE_INTERNAL_API_URL + url, **kwargs)
@@ -1320,19 +1402,42 @@ class Binance(Exchange):
             _log.warning(f"request exc: {e}")
             raise ExchangeException(str(e))
 
+    @asynccontextmanager
+    async def _subscribe_stream(self, stream: str) -> AsyncIterator[AsyncIterable[Any]]:
+        # Market data streams of all symbols are multiplexed over shared combined stream
+        # connections. A new connection is only opened once the existing ones are full.
+        combined = next((c for c in self._combined_streams if stream in c), None) or next(
+            (c for c in self._combined_streams if len(c) < _MAX_STREAMS_PER_CONNECTION), None
+        )
+        if combined is None:
+            combined = CombinedStream(self)
+            self._combined_streams.append(combined)
+        async with combined.subscribe(stream) as data:
+            yield data
+
     @asynccontextmanager
     async def _connect_refreshing_stream(
-        self, url: str, interval: float, name: str, raise_on_disconnect: bool = False
+        self,
+        url: str,
+        interval: float,
+        name: str,
+        raise_on_disconnect: bool = False,
+        take_until: Callable[[Any, Any], bool] = lambda old, new: old["E"] < new["E"],
+        on_connect: Optional[Callable[[ClientWebSocketResponse], Awaitable[None]]] = None,
+        loads: Callable[[str], Any] = json.loads,
+        passthrough: Optional[Callable[[Any], bool]] = None,
     ) -> AsyncIterator[AsyncIterable[Any]]:
         try:
             async with connect_refreshing_stream(
                 self._session,
                 url=_BASE_WS_URL + url,
                 interval=interval,
-                loads=json.loads,
-                take_until=lambda old, new: old["E"] < new["E"],
+                loads=loads,
+                take_until=take_until,
                 name=name,
                 raise_on_disconnect=raise_on_disconnect,
+                on_connect=on_connect,
+                passthrough=passthrough,
             ) as stream:
                 yield stream
         except (
@@ -1469,6 +1574,241 @@ class Clock:
         self._synced.set()
 
 
+class CombinedStream:
+    """Multiplexes market data streams of many symbols over a single combined stream connection.
+
+    https://binance-docs.github.io/apidocs/spot/en/#live-subscribing-unsubscribing-to-streams
+
+    Streams are subscribed to and unsubscribed from on the fly over the open connection. Messages
+    are fanned out to the subscribers of each stream through bounded queues. A subscriber falling
+    behind by a full queue fails with an `ExchangeException` instead of holding up the rest.
+
+    Binance disconnects a websocket connection every 24h. Therefore, the connection is refreshed
+    every 12h the same way as a connection to a single stream. Event times of different streams
+    are not in order, so when switching over, the previous connection is streamed from until its
+    events are past the first event of the new connection by `_SWITCH_OVER_SKEW`. Events of a
+    stream already passed on from the previous connection are skipped.
+    """
+
+    def __init__(
+        self,
+        binance: Binance,
+        refresh_interval: float = 12 * Interval_.to_seconds(Interval_.HOUR),
+        queue_size: int = 1000,
+    ) -> None:
+        self._binance = binance
+        self._refresh_interval = refresh_interval
+        self._queue_size = queue_size
+        # Binance allows 5 incoming messages per second per connection.
+        self._messages_limiter = AsyncLimiter(5, 1 * 1.5)
+        self._request_ids = count(1)
+
+        self._connected: Optional[asyncio.Future[None]] = None
+        self._stream_task: Optional[asyncio.Task[None]] = None
+        self._ws: Optional[ClientWebSocketResponse] = None
+        self._subscribed: set[str] = set()  # Streams subscribed to over the latest connection.
+
+        self._queues: dict[str, dict[str, asyncio.Queue]] = {}
+        # Event time and events of the latest events passed on per stream.
+        self._latest_events: dict[str, tuple[Timestamp, list[Any]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._queues)
+
+    def __contains__(self, stream: object) -> bool:
+        return stream in self._queues
+
+    async def __aenter__(self) -> CombinedStream:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        await self._cancel()
+
+    @asynccontextmanager
+    async def subscribe(self, stream: str) -> AsyncIterator[AsyncIterable[Any]]:
+        queue_id = str(uuid.uuid4())
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        stream_queues = self._queues.setdefault(stream, {})
+        stream_queues[queue_id] = queue
+
+        _log.info(f"subscribing to {stream} stream with queue id {queue_id}")
+        try:
+            await self._ensure_connection()
+            if stream not in self._subscribed:
+                await self._update_subscription("SUBSCRIBE", stream)
+            _log.info(f"subscribed to {stream} stream with queue id {queue_id}")
+
+            yield stream_queue(queue, raise_on_exc=True)
+        finally:
+            _log.info(f"unsubscribing from {stream} stream with queue id {queue_id}")
+            stream_queues.pop(queue_id, None)
+            # Queues of failed subscribers may have been removed already.
+            if len(stream_queues) == 0 and self._queues.get(stream) is stream_queues:
+                del self._queues[stream]
+                self._latest_events.pop(stream, None)
+                if len(self._queues) == 0:
+                    _log.info("no subscriptions left; closing combined stream")
+                    await self._cancel()
+                elif stream in self._subscribed:
+                    await self._update_subscription("UNSUBSCRIBE", stream)
+            _log.info(f"unsubscribed from {stream} stream with queue id {queue_id}")
+
+    async def _cancel(self) -> None:
+        to_cancel = self._stream_task
+        self._stream_task = None
+        if self._connected and not self._connected.done():
+            self._connected.cancel()
+        await cancel(to_cancel)
+
+    async def _ensure_connection(self) -> None:
+        if not self._stream_task or self._stream_task.done():
+            self._connected = asyncio.get_running_loop().create_future()
+            self._stream_task = create_task_sigint_on_exception(self._stream())
+        assert self._connected
+        await asyncio.shield(self._connected)
+
+    async def _stream(self) -> None:
+        assert self._connected
+        try:
+            async with self._binance._connect_refreshing_stream(
+                url="/stream",
+                interval=self._refresh_interval,
+                name="combined",
+                raise_on_disconnect=True,
+                take_until=_take_until_combined,
+                on_connect=self._on_connect,
+                # Market data carries decimal values as strings.
+                loads=json.loads_fast,
+                # Responses to subscription requests have no event time.
+                passthrough=_is_response,
+            ) as stream:
+                self._connected.set_result(None)
+                async for msg in stream:
+                    if "stream" in msg:
+                        self._route(msg["stream"], msg["data"])
+                    elif "error" in msg:
+                        _log.warning(f"combined stream request failed: {msg}")
+        except ExchangeException as e:
+            if not self._connected.done():
+                self._connected.set_exception(e)
+            # Failed subscribers are no longer routed to. The next subscription reconnects.
+            for stream_queues in self._queues.values():
+                for queue in stream_queues.values():
+                    _put_exception(queue, e)
+                stream_queues.clear()
+        finally:
+            self._ws = None
+            self._subscribed = set()
+
+    async def _on_connect(self, ws: ClientWebSocketResponse) -> None:
+        # Subscriptions made while connecting are sent over the new connection by the subscribers
+        # themselves.
+        self._ws = ws
+        self._subscribed = set()
+        while len(missing := self._queues.keys() - self._subscribed) > 0:
+            streams = sorted(missing)
+            self._subscribed.update(streams)
+            request_id = await self._send(ws, "SUBSCRIBE", streams)
+            # Events of the streams already subscribed to are skipped until the response arrives.
+            # The previous connection, if any, is still being streamed from until switching over.
+            async for msg in ws:
+                if msg.type is not aiohttp.WSMsgType.TEXT:
+                    continue
+                data = json.loads_fast(msg.data)
+                if data.get("id") == request_id:
+                    if "error" in data:
+                        raise ExchangeException(f"Failed to subscribe to {streams}: {data}")
+                    break
+            else:
+                raise ExchangeException("Server closed WS connection while subscribing")
+
+    async def _update_subscription(self, method: str, stream: str) -> None:
+        # Without a connection, subscriptions are sent once connected.
+        if not (ws := self._ws):
+            return
+        if method == "SUBSCRIBE":
+            self._subscribed.add(stream)
+        else:
+            self._subscribed.discard(stream)
+        try:
+            await self._send(ws, method, [stream])
+        except ConnectionError as e:
+            # The stream task fails the subscribers if the connection is lost.
+            _log.warning(f"failed to send {method} {stream}: {e}")
+
+    async def _send(self, ws: ClientWebSocketResponse, method: str, streams: list[str]) -> int:
+        request_id = next(self._request_ids)
+        await self._messages_limiter.acquire()
+        await ws.send_json({"method": method, "params": streams, "id": request_id})
+        return request_id
+
+    def _route(self, stream: str, data: Any) -> None:
+        if not (stream_queues := self._queues.get(stream)):
+            return
+
+        time = data["E"]
+        latest_time, latest_events = self._latest_events.get(stream, (0, []))
+        if time < latest_time or (time == latest_time and data in latest_events):
+            return
+        if time > latest_time:
+            self._latest_events[stream] = (time, [data])
+        else:
+            latest_events.append(data)
+
+        full_queue_ids = []
+        for queue_id, queue in stream_queues.items():
+            try:
+                queue.put_nowait(data)
+            except asyncio.QueueFull:
+                full_queue_ids.append(queue_id)
+        for queue_id in full_queue_ids:
+            _log.warning(f"{stream} stream subscriber with queue id {queue_id} fell behind")
+            _put_exception(
+                stream_queues.pop(queue_id),
+                ExchangeException(
+                    f"Subscriber fell behind {stream} stream by {self._queue_size} messages"
+                ),
+            )
+
+
+def _to_levels(levels: list[list[str]]) -> list[tuple[Decimal, Decimal]]:
+    # Parsing decimals is the bulk of decoding depth. Prices of levels repeat from one update to
+    # another, so parsed prices are reused. Removed levels have a size of zero.
+    prices = _level_prices
+    return [
+        (prices.get(p) or _parse_level_price(p), _ZERO_SIZE if s == "0.00000000" else Decimal(s))
+        for p, s in levels
+    ]
+
+
+def _parse_level_price(value: str) -> Decimal:
+    if len(_level_prices) >= _MAX_LEVEL_PRICES:
+        _level_prices.clear()
+    price = _level_prices[value] = Decimal(value)
+    return price
+
+
+def _take_until_combined(old: Any, new: Any) -> bool:
+    return old["data"]["E"] < new["data"]["E"] + _SWITCH_OVER_SKEW
+
+
+def _is_response(data: Any) -> bool:
+    return "data" not in data
+
+
+def _put_exception(queue: asyncio.Queue, exc: Exception) -> None:
+    # Pending messages are discarded to make room. The subscriber fails on the exception anyway.
+    while not queue.empty():
+        queue.get_nowait()
+        queue.task_done()
+    queue.put_nowait(exc)
+
+
 class CreateListenKeyResult(TypedDict):
     listenKey: str
 
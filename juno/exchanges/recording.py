@@ -0,0 +1,553 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import inspect
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass
+from decimal import Decimal
+from itertools import count
+from types import TracebackType
+from typing import (
+    IO,
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Literal,
+    Optional,
+    get_args,
+    get_type_hints,
+)
+
+from aiohttp import web
+from typing_inspect import is_union_type
+
+from juno import BadOrder, ExchangeException, config, json, serialization
+from juno.asyncio import cancel
+from juno.contextlib import AsyncContextManager
+from juno.http import ClientSession
+from juno.inspect import get_fully_qualified_name, get_type_by_fully_qualified_name
+
+from .exchange import Exchange
+
+_log = logging.getLogger(__name__)
+
+# Kinds of exchange methods.
+_CALL = 0  # Coroutine, i.e `get_depth`.
+_STREAM = 1  # Async generator, i.e `stream_historical_candles`.
+_CONNECT = 2  # Async context manager of a stream, i.e `connect_stream_depth`.
+
+# Errors raised by exchanges as part of their normal operation. These are recorded and raised
+# again when replayed.
+_ERRORS = (ExchangeException, BadOrder)
+
+_CAPABILITIES = [n for n in vars(Exchange) if n.startswith("can_")]
+
+
+def _map_methods() -> dict[str, tuple[int, Any]]:
+    # Maps names of exchange methods to their kind and the type of their result or stream items.
+    result = {}
+    for name, fn in inspect.getmembers(Exchange, inspect.isfunction):
+        if name.startswith("_"):
+            continue
+        return_type = get_type_hints(fn)["return"]
+        wrapped = getattr(fn, "__wrapped__", None)
+        if wrapped is not None and inspect.isasyncgenfunction(wrapped):
+            (stream_type,) = get_args(return_type)
+            result[name] = (_CONNECT, get_args(stream_type)[0])
+        elif inspect.isasyncgenfunction(fn):
+            result[name] = (_STREAM, get_args(return_type)[0])
+        elif inspect.iscoroutinefunction(fn):
+            result[name] = (_CALL, return_type)
+    return result
+
+
+_METHODS = _map_methods()
+_SIGNATURES = {name: inspect.signature(getattr(Exchange, name)) for name in _METHODS}
+
+
+@dataclass(frozen=True)
+class RecordingConfig:
+    mode: Literal["record", "replay"]
+    directory: str = "recordings"
+    # Replays from a `RecordingServer` instead of reading recordings from the directory.
+    url: Optional[str] = None
+    # Speed relative to the recording. None to replay as fast as possible.
+    speed: Optional[float] = 1.0
+
+
+def init_exchanges(config_: dict[str, Any]) -> list[Exchange]:
+    """Initializes exchanges mentioned in config. With an `exchange_recording` section, the
+    exchanges are either recorded or replayed instead."""
+
+    if (recording_config := config_.get("exchange_recording")) is None:
+        return config.init_instances_mentioned_in_config(Exchange, config_)
+
+    recording = serialization.config.deserialize(recording_config, RecordingConfig)
+    if recording.mode == "record":
+        os.makedirs(recording.directory, exist_ok=True)
+        return [
+            record(e, _recording_path(recording.directory, type(e).__name__.lower()))
+            for e in config.init_instances_mentioned_in_config(Exchange, config_)
+        ]
+    return [
+        replay(
+            name,
+            (
+                Recording(_recording_path(recording.directory, name), recording.speed)
+                if recording.url is None
+                else RemoteRecording(recording.url, name)
+            ),
+        )
+        for name in config.list_names(config_, "exchange")
+    ]
+
+
+def record(exchange: Exchange, path: str) -> Exchange:
+    return _named(Recorder, type(exchange).__name__)(exchange, path)
+
+
+def replay(name: str, source: RecordingSource) -> Exchange:
+    return _named(Replayer, name)(source)
+
+
+def _named(type_: type[Any], name: str) -> type[Any]:
+    # Components look up exchanges by their type name. This also keeps the types of several
+    # exchanges apart in the dependency container.
+    return type(name, (type_,), {})
+
+
+def _recording_path(directory: str, name: str) -> str:
+    return os.path.join(directory, f"{name}.jsonl.gz")
+
+
+class Recorder(Exchange):
+    """Records results and stream items of an exchange, with timing, to a gzip compressed file of
+    JSON lines. The recording can be replayed with `Replayer`."""
+
+    def __init__(self, exchange: Exchange, path: str) -> None:
+        self._exchange = exchange
+        self._path = path
+        self._file: Optional[IO[str]] = None
+        self._ids = count()
+        self._start = 0.0
+        for capability in _CAPABILITIES:
+            setattr(self, capability, getattr(exchange, capability))
+
+    async def __aenter__(self) -> Recorder:
+        await self._exchange.__aenter__()
+        self._start = time.monotonic()
+        self._file = gzip.open(self._path, "wt")
+        try:
+            candle_intervals: Optional[list[int]] = self._exchange.list_candle_intervals()
+        except NotImplementedError:
+            candle_intervals = None
+        self._write(
+            {
+                "type": "exchange",
+                "capabilities": {c: getattr(self._exchange, c) for c in _CAPABILITIES},
+                "candle_intervals": candle_intervals,
+            }
+        )
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        await self._exchange.__aexit__(exc_type, exc, tb)
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def generate_client_id(self) -> str:
+        return self._exchange.generate_client_id()
+
+    def list_candle_intervals(self) -> list[int]:
+        return self._exchange.list_candle_intervals()
+
+    async def get_exchange_info(self) -> Any:
+        return await self._call("get_exchange_info", (), {})
+
+    async def _call(self, method: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+        record = self._begin(method, args, kwargs)
+        try:
+            result = await getattr(self._exchange, method)(*args, **kwargs)
+        except _ERRORS as exc:
+            self._end_call(record, error=exc)
+            raise
+        self._end_call(record, result=result)
+        return result
+
+    async def _stream(
+        self, method: str, args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> AsyncIterable[Any]:
+        record = self._begin(method, args, kwargs)
+        self._end_call(record)
+        async for item in self._record_items(
+            record, getattr(self._exchange, method)(*args, **kwargs)
+        ):
+            yield item
+
+    @asynccontextmanager
+    async def _connect(
+        self, method: str, args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> AsyncIterator[AsyncIterable[Any]]:
+        record = self._begin(method, args, kwargs)
+        async with AsyncExitStack() as stack:
+            try:
+                stream = await stack.enter_async_context(
+                    getattr(self._exchange, method)(*args, **kwargs)
+                )
+            except _ERRORS as exc:
+                self._end_call(record, error=exc)
+                raise
+            self._end_call(record)
+            yield self._record_items(record, stream)
+
+    async def _record_items(
+        self, call_record: dict[str, Any], items: AsyncIterable[Any]
+    ) -> AsyncIterable[Any]:
+        id_ = call_record["id"]
+        _, item_type = _METHODS[call_record["method"]]
+        error: Optional[BaseException] = None
+        try:
+            async for item in items:
+                record = {
+                    "type": "item",
+                    "id": id_,
+                    "time": self._now(),
+                    "value": serialization.raw.serialize(item),
+                }
+                # Members of a union are serialized alike. Keep track of the actual type.
+                if is_union_type(item_type):
+                    record["value_type"] = get_fully_qualified_name(type(item))
+                self._write(record)
+                yield item
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            # Ended by any error, otherwise replaying would wait for more items forever. A stream
+            # closed or cancelled by the consumer is left open, same as when recording stops.
+            if not isinstance(error, (GeneratorExit, asyncio.CancelledError)):
+                end_record: dict[str, Any] = {"type": "end", "id": id_, "time": self._now()}
+                if error is not None:
+                    end_record["error"] = _serialize_error(error)
+                self._write(end_record)
+
+    def _begin(self, method: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "type": "call",
+            "id": next(self._ids),
+            "method": method,
+            "args": _serialize_args(method, args, kwargs),
+            "time": self._now(),
+        }
+
+    def _end_call(
+        self,
+        record: dict[str, Any],
+        result: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        record["latency"] = self._now() - record["time"]
+        if error is None:
+            record["result"] = serialization.raw.serialize(result)
+        else:
+            record["error"] = _serialize_error(error)
+        self._write(record)
+
+    def _now(self) -> float:
+        return time.monotonic() - self._start
+
+    def _write(self, record: dict[str, Any]) -> None:
+        assert self._file
+        self._file.write(json.dumps(record) + "\n")
+
+
+class RecordingSource(AsyncContextManager, ABC):
+    async def __aenter__(self) -> RecordingSource:
+        return self
+
+    @abstractmethod
+    async def get_header(self) -> dict[str, Any]:
+        pass
+
+    @abstractmethod
+    async def call(self, method: str, args: dict[str, Any]) -> dict[str, Any]:
+        """Finds the next recorded call of `method`, preferably with the same arguments. Returns
+        after the latency of the call."""
+
+    @abstractmethod
+    def stream_items(self, id_: int) -> AsyncIterable[dict[str, Any]]:
+        """Streams item records of a call, followed by an end record if the stream ended."""
+
+
+class Recording(RecordingSource):
+    def __init__(self, path: str, speed: Optional[float] = 1.0) -> None:
+        self._speed = speed
+        self._header: dict[str, Any] = {}
+        self._calls: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        self._call_ends: dict[int, Decimal] = {}
+        self._items: dict[int, list[dict[str, Any]]] = defaultdict(list)
+
+        with gzip.open(path, "rt") as f:
+            try:
+                for line in f:
+                    record = json.loads(line)
+                    if record["type"] == "call":
+                        self._calls[record["method"]].append(record)
+                        self._call_ends[record["id"]] = record["time"] + record["latency"]
+                    elif record["type"] == "exchange":
+                        self._header = record
+                    else:
+                        self._items[record["id"]].append(record)
+            except EOFError:
+                # The recording process was killed before closing the file.
+                _log.warning(f"recording {path} is truncated; replaying until the end of it")
+
+    async def get_header(self) -> dict[str, Any]:
+        return self._header
+
+    async def call(self, method: str, args: dict[str, Any]) -> dict[str, Any]:
+        records = self._calls[method]
+        if len(records) == 0:
+            raise ValueError(f"No recorded calls of {method} left")
+        index = next((i for i, r in enumerate(records) if r["args"] == args), None)
+        if index is None:
+            # For example, arguments depending on current time.
+            _log.warning(
+                f"no recorded call of {method} with {args}; replaying the next one with "
+                f"{records[0]['args']}"
+            )
+            index = 0
+        record = records.pop(index)
+        await self._sleep(record["latency"])
+        return record
+
+    async def stream_items(self, id_: int) -> AsyncIterable[dict[str, Any]]:
+        records = self._items.pop(id_, [])
+        loop = asyncio.get_running_loop()
+        # Paced relative to the call having returned.
+        start, call_end = loop.time(), self._call_ends[id_]
+        for record in records:
+            await self._sleep(record["time"] - call_end, since=loop.time() - start)
+            yield record
+        if len(records) == 0 or records[-1]["type"] != "end":
+            # The stream was still open when recording stopped.
+            await asyncio.Event().wait()
+
+    async def _sleep(self, delay: Decimal, since: float = 0.0) -> None:
+        # Also yields control when replaying as fast as possible, same as a network would. Note
+        # that times are parsed as decimals.
+        await asyncio.sleep(
+            0.0 if self._speed is None else max(float(delay) / self._speed - since, 0.0)
+        )
+
+
+class RemoteRecording(RecordingSource):
+    def __init__(self, url: str, name: str) -> None:
+        self._url = f"{url.rstrip('/')}/{name}"
+        self._session = ClientSession(raise_for_status=True, name=type(self).__name__)
+
+    async def __aenter__(self) -> RemoteRecording:
+        await self._session.__aenter__()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        await self._session.__aexit__(exc_type, exc, tb)
+
+    async def get_header(self) -> dict[str, Any]:
+        async with self._session.request("GET", self._url) as response:
+            return await response.json()
+
+    async def call(self, method: str, args: dict[str, Any]) -> dict[str, Any]:
+        async with self._session.request(
+            "POST", f"{self._url}/call", data=json.dumps({"method": method, "args": args})
+        ) as response:
+            return await response.json()
+
+    async def stream_items(self, id_: int) -> AsyncIterable[dict[str, Any]]:
+        async with self._session.ws_connect(f"{self._url}/items/{id_}") as ws:
+            async for msg in ws:
+                yield json.loads(msg.data)
+
+
+class RecordingServer:
+    """Serves recordings in a directory to `Replayer`s with a `RemoteRecording`. Replaying then
+    also includes the cost of receiving and decoding the data over a network connection.
+
+    A recording is reloaded every time a replayer connects, so the same recordings can be
+    replayed many times without restarting the server."""
+
+    def __init__(self, directory: str, speed: Optional[float] = 1.0) -> None:
+        self._directory = directory
+        self._speed = speed
+        self._recordings: dict[str, Recording] = {}
+
+        self.app = web.Application()
+        self.app.router.add_get("/{name}", self._get_header)
+        self.app.router.add_post("/{name}/call", self._call)
+        self.app.router.add_get("/{name}/items/{id}", self._stream_items)
+
+    async def _get_header(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        recording = Recording(_recording_path(self._directory, name), self._speed)
+        self._recordings[name] = recording
+        return web.json_response(await recording.get_header(), dumps=json.dumps)
+
+    async def _call(self, request: web.Request) -> web.Response:
+        recording = self._recordings[request.match_info["name"]]
+        body = await request.json(loads=json.loads)
+        try:
+            record = await recording.call(body["method"], body["args"])
+        except ValueError as exc:
+            raise web.HTTPNotFound(text=str(exc))
+        return web.json_response(record, dumps=json.dumps)
+
+    async def _stream_items(self, request: web.Request) -> web.WebSocketResponse:
+        recording = self._recordings[request.match_info["name"]]
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        async def send() -> None:
+            async for record in recording.stream_items(int(request.match_info["id"])):
+                await ws.send_str(json.dumps(record))
+
+        send_task = asyncio.create_task(send())
+        try:
+            # Until the replayer closes the connection.
+            await ws.receive()
+        finally:
+            await cancel(send_task)
+        return ws
+
+
+class Replayer(Exchange):
+    """Replays a recording of `Recorder` in place of the recorded exchange."""
+
+    def __init__(self, source: RecordingSource) -> None:
+        self._source = source
+        self._candle_intervals: Optional[list[int]] = None
+
+    async def __aenter__(self) -> Replayer:
+        await self._source.__aenter__()
+        header = await self._source.get_header()
+        for capability, value in header["capabilities"].items():
+            setattr(self, capability, value)
+        self._candle_intervals = header["candle_intervals"]
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        await self._source.__aexit__(exc_type, exc, tb)
+
+    def list_candle_intervals(self) -> list[int]:
+        if self._candle_intervals is None:
+            raise NotImplementedError()
+        return self._candle_intervals
+
+    async def get_exchange_info(self) -> Any:
+        return await self._call("get_exchange_info", (), {})
+
+    async def _call(self, method: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+        record = await self._source.call(method, _serialize_args(method, args, kwargs))
+        _raise_if_error(record)
+        _, result_type = _METHODS[method]
+        return serialization.raw.deserialize(record["result"], result_type)
+
+    async def _stream(
+        self, method: str, args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> AsyncIterable[Any]:
+        record = await self._source.call(method, _serialize_args(method, args, kwargs))
+        _raise_if_error(record)
+        async for item in self._replay_items(record):
+            yield item
+
+    @asynccontextmanager
+    async def _connect(
+        self, method: str, args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> AsyncIterator[AsyncIterable[Any]]:
+        record = await self._source.call(method, _serialize_args(method, args, kwargs))
+        _raise_if_error(record)
+        yield self._replay_items(record)
+
+    async def _replay_items(self, call_record: dict[str, Any]) -> AsyncIterable[Any]:
+        _, item_type = _METHODS[call_record["method"]]
+        async for record in self._source.stream_items(call_record["id"]):
+            if record["type"] == "end":
+                _raise_if_error(record)
+                return
+            value_type = (
+                get_type_by_fully_qualified_name(record["value_type"])
+                if "value_type" in record
+                else item_type
+            )
+            yield serialization.raw.deserialize(record["value"], value_type)
+
+
+def _delegate(method: str) -> Callable[..., Any]:
+    kind, _ = _METHODS[method]
+    if kind == _CALL:
+
+        async def call(self: Any, *args: Any, **kwargs: Any) -> Any:
+            return await self._call(method, args, kwargs)
+
+        return call
+    if kind == _STREAM:
+
+        def stream(self: Any, *args: Any, **kwargs: Any) -> AsyncIterable[Any]:
+            return self._stream(method, args, kwargs)
+
+        return stream
+
+    def connect(self: Any, *args: Any, **kwargs: Any) -> Any:
+        return self._connect(method, args, kwargs)
+
+    return connect
+
+
+# Routes every exchange method which is not implemented explicitly to the generic ones above.
+for _type in [Recorder, Replayer]:
+    for _method in _METHODS:
+        if _method not in vars(_type):
+            setattr(_type, _method, _delegate(_method))
+
+
+def _serialize_args(method: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> dict[str, Any]:
+    bound = _SIGNATURES[method].bind(None, *args, **kwargs)
+    bound.apply_defaults()
+    return {k: serialization.raw.serialize(v) for k, v in list(bound.arguments.items())[1:]}
+
+
+def _serialize_error(error: BaseException) -> dict[str, Any]:
+    return {"type": get_fully_qualified_name(type(error)), "msg": str(error)}
+
+
+def _raise_if_error(record: dict[str, Any]) -> None:
+    if (error := record.get("error")) is None:
+        return
+    try:
+        exc = get_type_by_fully_qualified_name(error["type"])(error["msg"])
+    except Exception:
+        # For example, errors constructed with more than a message, such as `WebSocketError`.
+        exc = ExchangeException(f"{error['type']}: {error['msg']}")
+    raise exc
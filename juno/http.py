@@ -11,17 +11,17 @@ from typing import (
     AsyncContextManager,
     AsyncIterable,
     AsyncIterator,
+    Awaitable,
     Callable,
     Iterator,
     Optional,
 )
 
 import aiohttp
-from asyncstdlib import chain as chain_async
 from multidict import CIMultiDictProxy
 
 from . import json
-from .asyncio import cancel, resolved_stream
+from .asyncio import cancel
 from .itertools import generate_random_words
 
 _log = logging.getLogger(__name__)
@@ -44,8 +44,8 @@ class ClientResponse:
     async def text(self) -> str:
         return await self._response.text()
 
-    async def json(self) -> Any:
-        return await self._response.json(loads=json.loads)
+    async def json(self, loads: Callable[[str], Any] = json.loads) -> Any:
+        return await self._response.json(loads=loads)
 
     def raise_for_status(self) -> None:
         self._response.raise_for_status()
@@ -153,81 +153,208 @@ async def connect_refreshing_stream(
     take_until: Callable[[Any, Any], bool],
     name: Optional[str] = None,
     raise_on_disconnect: bool = False,
+    on_connect: Optional[Callable[[ClientWebSocketResponse], Awaitable[None]]] = None,
+    passthrough: Optional[Callable[[Any], bool]] = None,
 ) -> AsyncIterator[AsyncIterable[Any]]:
     """Streams messages over WebSocket. The connection is restarted every `interval` seconds.
     Ensures no data is lost during restart when switching from one connection to another.
+
+    `on_connect` is awaited with every new connection before any of its messages are streamed.
+    Useful for subscribing to channels over the connection.
+
+    Messages for which `passthrough` returns true are streamed from either connection as they
+    are and are not used in switching over. Useful for responses to requests sent over the
+    connection.
     """
     name = name or next(_random_words)
     counter = cycle(range(0, 10))
     ctx, to_close_ctx = None, None
-    timeout_task, receive_task = None, None
+    # The refresh is due every `interval` seconds. If a receive on the current connection is
+    # waiting for a message by then, it is interrupted. This keeps tasks and timeouts out of
+    # receiving messages.
+    refresh_handle: Optional[asyncio.TimerHandle] = None
+    refresh_due = False
+    receiving_task: Optional[asyncio.Task[Any]] = None
+    interrupted = False
+    # If messages are pending on the current connection when refreshing, the first message of
+    # the new connection is received in the background while messages keep being streamed from
+    # the current one. The switch over happens on the first message received after that.
+    first_msg_task: Optional[asyncio.Task[tuple[_WSConnectionContext, list[Any], Any]]] = None
+
+    def passes_through(data: Any) -> bool:
+        return passthrough is not None and passthrough(data)
+
+    def schedule_refresh() -> None:
+        nonlocal refresh_handle, refresh_due
+        refresh_due = False
+        refresh_handle = asyncio.get_running_loop().call_later(interval, on_refresh_due)
+
+    def on_refresh_due() -> None:
+        nonlocal refresh_due, interrupted
+        refresh_due = True
+        if receiving_task:
+            interrupted = True
+            receiving_task.cancel()
+
+    def cancel_refresh_handle() -> None:
+        nonlocal refresh_handle
+        if refresh_handle:
+            refresh_handle.cancel()
+        refresh_handle = None
+
+    async def receive_first(
+        new_ctx: _WSConnectionContext,
+    ) -> tuple[_WSConnectionContext, list[Any], Any]:
+        # Returns messages passed through before the first message to switch over on.
+        passed: list[Any] = []
+        try:
+            while True:
+                new_msg = await _receive(new_ctx.ws)
+                assert new_msg.type is aiohttp.WSMsgType.TEXT
+                new_data = loads(new_msg.data)
+                if not passes_through(new_data):
+                    return new_ctx, passed, new_data
+                passed.append(new_data)
+        except BaseException:
+            await new_ctx.close()
+            raise
+
+    async def refresh() -> Optional[aiohttp.WSMessage]:
+        # Returns a message pending on the current connection or None if switched over.
+        nonlocal ctx, refresh_due, first_msg_task
+        assert ctx
+        _log.info("refreshing ws %s connection", ctx.name)
+        receive_task = asyncio.create_task(_receive(ctx.ws))
+        try:
+            new_ctx = await _WSConnectionContext.connect(session, url, name, counter, on_connect)
+        except BaseException:
+            await cancel(receive_task)
+            raise
+
+        if not receive_task.done():
+            # Nothing pending on the current connection. Switch over without waiting for a
+            # message, which may never come on a quiet stream.
+            await cancel(receive_task)
+            await ctx.close()
+            ctx = new_ctx
+            schedule_refresh()
+            return None
+
+        first_msg_task = asyncio.create_task(receive_first(new_ctx))
+        refresh_due = False
+        return receive_task.result()
+
+    async def cancel_first_msg() -> None:
+        nonlocal first_msg_task
+        if first_msg_task:
+            if not first_msg_task.done():
+                await cancel(first_msg_task)
+            # A failed refresh is only raised when switching over.
+            if not first_msg_task.cancelled() and first_msg_task.exception() is None:
+                await first_msg_task.result()[0].close()
+        first_msg_task = None
 
     async def inner() -> AsyncIterable[Any]:
-        nonlocal ctx, to_close_ctx
-        nonlocal timeout_task, receive_task
+        nonlocal ctx, to_close_ctx, receiving_task, interrupted, first_msg_task
         assert ctx
+        task = asyncio.current_task()
+        assert task
+        schedule_refresh()
         while True:
-            to_close_ctx = None
-            timeout_task = asyncio.create_task(asyncio.sleep(interval))
-            while True:
-                receive_task = asyncio.create_task(_receive(ctx.ws))
-                done, _pending = await asyncio.wait(
-                    (receive_task, timeout_task), return_when=asyncio.FIRST_COMPLETED
-                )
-
-                if timeout_task in done:
-                    _log.info("refreshing ws %s connection", ctx.name)
-                    to_close_ctx = ctx
-                    ctx = await _WSConnectionContext.connect(session, url, name, counter)
-
-                    if receive_task.done():
+            if refresh_due:
+                if (pending_msg := await refresh()) is None:
+                    continue
+                msg = pending_msg
+            else:
+                receiving_task = None if first_msg_task else task
+                try:
+                    msg = await _receive(ctx.ws)
+                except asyncio.CancelledError:
+                    if not interrupted:
+                        raise
+                    interrupted = False
+                    if task.uncancel() > 0:
+                        raise
+                    continue
+                finally:
+                    receiving_task = None
+
+            if first_msg_task and (first_msg_task.done() or msg.type is aiohttp.WSMsgType.CLOSED):
+                # If the current connection closed, it cannot be streamed from anymore while
+                # waiting for the new one.
+                to_close_ctx = ctx
+                ctx, passed, new_data = await first_msg_task
+                first_msg_task = None
+
+                for data in passed:
+                    yield data
+                old_data = None if msg.type is aiohttp.WSMsgType.CLOSED else loads(msg.data)
+                if old_data is None or passes_through(old_data) or take_until(old_data, new_data):
+                    # Messages are taken from the current connection until it catches up with
+                    # the new one.
+                    while old_data is not None and (
+                        passes_through(old_data) or take_until(old_data, new_data)
+                    ):
+                        yield old_data
+                        old_msg = await _receive(to_close_ctx.ws)
+                        old_data = (
+                            None
+                            if old_msg.type is aiohttp.WSMsgType.CLOSED
+                            else loads(old_msg.data)
+                        )
+                else:
+                    # The current connection got ahead while connecting the new one. Messages of
+                    # the new connection, other than ones passed through, are skipped until it
+                    # catches up.
+                    yield old_data
+                    while True:
                         new_msg = await _receive(ctx.ws)
                         assert new_msg.type is aiohttp.WSMsgType.TEXT
                         new_data = loads(new_msg.data)
-                        async for old_msg in chain_async(
-                            resolved_stream(receive_task.result()), to_close_ctx.ws
-                        ):
-                            if old_msg.type is aiohttp.WSMsgType.CLOSED:
-                                break
-                            old_data = loads(old_msg.data)
-                            if take_until(old_data, new_data):
-                                yield old_data
-                            else:
-                                break
-                        yield new_data
-
-                    await to_close_ctx.close()
-                    break
-
-                msg = receive_task.result()
-                if msg.type is aiohttp.WSMsgType.CLOSED:
-                    if raise_on_disconnect:
-                        _log.warning(
-                            "server closed ws %s connection; data: %s; raising exception",
-                            ctx.name,
-                            msg.data,
-                        )
-                        raise aiohttp.WebSocketError(
-                            aiohttp.WSCloseCode.GOING_AWAY,
-                            "Server unexpectedly closed WS connection",
-                        )
-                    else:
-                        _log.warning(
-                            "server closed ws %s connection; data: %s; reconnecting",
-                            ctx.name,
-                            msg.data,
-                        )
-                        await asyncio.gather(ctx.close(), cancel(timeout_task))
-                        ctx = await _WSConnectionContext.connect(session, url, name, counter)
-                        break
-
-                yield loads(msg.data)
+                        if passes_through(new_data):
+                            yield new_data
+                        elif take_until(old_data, new_data):
+                            break
+                yield new_data
+
+                await to_close_ctx.close()
+                to_close_ctx = None
+                schedule_refresh()
+                continue
+
+            if msg.type is aiohttp.WSMsgType.CLOSED:
+                if raise_on_disconnect:
+                    _log.warning(
+                        "server closed ws %s connection; data: %s; raising exception",
+                        ctx.name,
+                        msg.data,
+                    )
+                    raise aiohttp.WebSocketError(
+                        aiohttp.WSCloseCode.GOING_AWAY,
+                        "Server unexpectedly closed WS connection",
+                    )
+                else:
+                    _log.warning(
+                        "server closed ws %s connection; data: %s; reconnecting",
+                        ctx.name,
+                        msg.data,
+                    )
+                    cancel_refresh_handle()
+                    await ctx.close()
+                    ctx = await _WSConnectionContext.connect(
+                        session, url, name, counter, on_connect
+                    )
+                    schedule_refresh()
+                    continue
+
+            yield loads(msg.data)
 
     try:
-        ctx = await _WSConnectionContext.connect(session, url, name, counter)
+        ctx = await _WSConnectionContext.connect(session, url, name, counter, on_connect)
         yield inner()
     finally:
-        await cancel(receive_task, timeout_task)
+        cancel_refresh_handle()
+        await cancel_first_msg()
         if ctx:
             await ctx.close()
         if to_close_ctx:
@@ -253,11 +380,22 @@ class _WSConnectionContext:
 
     @staticmethod
     async def connect(
-        session: ClientSession, url: str, name: str, counter: Iterator[int]
+        session: ClientSession,
+        url: str,
+        name: str,
+        counter: Iterator[int],
+        on_connect: Optional[Callable[[ClientWebSocketResponse], Awaitable[None]]] = None,
     ) -> _WSConnectionContext:
         name = f"{name}-{next(counter)}"
         conn = session.ws_connect(url, name=name)
         ws = await conn.__aenter__()
+        if on_connect:
+            try:
+                await on_connect(ws)
+            except BaseException as exc:
+                await ws.close()
+                await conn.__aexit__(type(exc), exc, exc.__traceback__)
+                raise
         ctx = _WSConnectionContext()
         ctx.name = name
         ctx.conn = conn
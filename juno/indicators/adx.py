@@ -1,13 +1,18 @@
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import to_numeric
 from .dx import DX
+from .numeric import NumericType, get_numeric_type
 from .smma import Smma
 
 
 # Average Directional Index
 class Adx:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
+    _num: NumericType
     _dx: DX
     _smma: Smma
 
@@ -15,6 +20,8 @@ class Adx:
         if period < 2:
             raise ValueError(f"Invalid period ({period})")
 
+        self._num = get_numeric_type()
+        self.value = self._num("0.0")
         self._dx = DX(period)
         self._smma = Smma(period)
 
@@ -29,8 +36,18 @@ class Adx:
     def update(self, high: Decimal, low: Decimal) -> Decimal:
         self._dx.update(high, low)
         if self._dx.value == 0:
-            self.value = Decimal("0.0")
+            self.value = self._num("0.0")
         else:
             self._smma.update(self._dx.value)
             self.value = self._smma.value
         return self.value
+
+    def compute(self, high: np.ndarray, low: np.ndarray) -> np.ndarray:
+        dx = self._dx.compute(high, low)
+        result = np.zeros(len(dx))
+        # Zero values are not smoothed.
+        nonzero = dx != 0
+        result[nonzero] = self._smma.compute(dx[nonzero])
+        if len(result) > 0:
+            self.value = to_numeric(self._num, result[-1])
+        return result
@@ -1,12 +1,16 @@
 from collections import deque
 from decimal import Decimal
 
+import numpy as np
+
 from .adx import Adx
+from .batch import to_numeric
+from .numeric import get_numeric_type
 
 
 # Average Directional Movement Index Rating
 class Adxr:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
     _adx: Adx
     _historical_adx: deque[Decimal]
@@ -16,6 +20,7 @@ class Adxr:
     _t3: int
 
     def __init__(self, period: int) -> None:
+        self.value = get_numeric_type()("0.0")
         self._adx = Adx(period)
         self._historical_adx = deque(maxlen=period)
         self._t1 = self._adx.maturity
@@ -41,3 +46,17 @@ class Adxr:
             self.value = (self._adx.value + self._historical_adx.popleft()) / 2
 
         return self.value
+
+    def compute(self, high: np.ndarray, low: np.ndarray) -> np.ndarray:
+        adx = self._adx.compute(high, low)
+        n = len(adx)
+        result = np.zeros(n)
+        num = type(self.value)
+        lag = self._t2 - self._t1
+        if n >= self._t2:
+            result[self._t2 - 1 :] = (adx[self._t2 - 1 :] + adx[self._t1 - 1 : n - lag]) / 2
+            self.value = to_numeric(num, result[-1])
+        historical_adx = adx[max(self._t1 - 1, n - lag) :]
+        self._historical_adx.extend(to_numeric(num, v) for v in historical_adx)
+        self._t = min(n, self._t3)
+        return result
@@ -4,11 +4,17 @@ from collections import deque
 from decimal import ROUND_FLOOR, Decimal
 from typing import Optional
 
+import numpy as np
+
+from .batch import as_array, sliding_window, to_numeric
+from .numeric import NumericType, get_numeric_type
+
 
 # Arnaud Legoux Moving Average
 class Alma:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
+    _num: NumericType
     _weights: list[Decimal]
     _prices: deque[Decimal]
 
@@ -31,7 +37,10 @@ class Alma:
         s = period * Decimal("1.0") / sig
         tmp = [(-(i - m) * (i - m) / (2 * s * s)).exp() for i in range(period)]
         sw = sum(tmp)
-        self._weights = [w / sw for w in tmp]
+        self._num = get_numeric_type()
+        self.value = self._num("0.0")
+        # Weights are computed with decimals and only then converted to the numeric backend.
+        self._weights = [self._num(w / sw) for w in tmp]
 
         self._prices = deque(maxlen=period)
 
@@ -48,9 +57,23 @@ class Alma:
     def update(self, price: Decimal) -> Decimal:
         self._t = min(self._t + 1, self._t1)
 
-        self._prices.append(price)
+        self._prices.append(self._num(price))
 
         if self.mature:
-            self.value = sum((p * w for p, w in zip(self._prices, self._weights)), Decimal("0.0"))
+            self.value = sum(
+                (p * w for p, w in zip(self._prices, self._weights)), self._num("0.0")
+            )
 
         return self.value
+
+    def compute(self, prices: np.ndarray) -> np.ndarray:
+        prices = as_array(prices)
+        n = len(prices)
+        result = np.zeros(n)
+        if n >= self._t1:
+            weights = as_array(self._weights)
+            result[self._t1 - 1 :] = sliding_window(prices, self._t1) @ weights
+            self.value = to_numeric(self._num, result[-1])
+        self._prices.extend(to_numeric(self._num, p) for p in prices[-self._t1 :])
+        self._t = min(n, self._t1)
+        return result
@@ -1,22 +1,31 @@
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import as_array, ewm, to_numeric
+from .numeric import NumericType, get_numeric_type
+
 
 # Average True Range
 class Atr:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
+    _num: NumericType
     _per: Decimal
     _t: int = 0
     _t1: int
     _t2: int
-    _sum: Decimal = Decimal("0.0")
+    _sum: Decimal
     _prev_close: Decimal
 
     def __init__(self, period: int) -> None:
         if period < 2:
             raise ValueError(f"Invalid period ({period})")
 
-        self._per = Decimal("1.0") / period
+        self._num = get_numeric_type()
+        self.value = self._num("0.0")
+        self._sum = self._num("0.0")
+        self._per = self._num("1.0") / period
         self._t1 = period
         self._t2 = period + 1
 
@@ -29,6 +38,7 @@ class Atr:
         return self._t >= self._t1
 
     def update(self, high: Decimal, low: Decimal, close: Decimal) -> Decimal:
+        high, low, close = self._num(high), self._num(low), self._num(close)
         self._t = min(self._t + 1, self._t2)
 
         if self._t == 1:
@@ -45,6 +55,25 @@ class Atr:
         self._prev_close = close
         return self.value
 
+    def compute(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+        high, low, close = as_array(high), as_array(low), as_array(close)
+        n = len(close)
+        result = np.zeros(n)
+
+        truerange = np.concatenate((high[:1] - low[:1], _calc_trueranges(high, low, close)))
+        self._sum = to_numeric(self._num, truerange[: self._t1].sum())
+        if n >= self._t1:
+            result[self._t1 - 1 :] = ewm(
+                np.concatenate(([float(self._sum) / self._t1], truerange[self._t1 :])),
+                float(self._per),
+            )
+            self.value = to_numeric(self._num, result[-1])
+
+        if n > 0:
+            self._prev_close = to_numeric(self._num, close[-1])
+        self._t = min(n, self._t2)
+        return result
+
 
 def _calc_truerange(high: Decimal, low: Decimal, prev_close: Decimal) -> Decimal:
     ych = abs(high - prev_close)
@@ -55,3 +84,12 @@ def _calc_truerange(high: Decimal, low: Decimal, prev_close: Decimal) -> Decimal
     if ycl > v:
         return ycl
     return v
+
+
+def _calc_trueranges(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    # Vectorized `_calc_truerange` for each candle after the first one.
+    high, low, prev_close = high[1:], low[1:], close[:-1]
+    ych = np.abs(high - prev_close)
+    ycl = np.abs(low - prev_close)
+    v = high - low
+    return np.where(ych > v, ych, np.where(ycl > v, ycl, v))
@@ -1,7 +1,11 @@
 from decimal import Decimal
 from typing import Literal, Optional
 
+import numpy as np
+
+from .batch import as_array, to_numeric
 from .ema2 import Ema2 as Ema
+from .numeric import NumericType, get_numeric_type
 from .sma import Sma
 from .smma import Smma
 from .wma import Wma
@@ -11,19 +15,21 @@ _MAType = Literal["ema", "rma", "sma", "wma"]
 
 
 class Atr2:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
+    _num: NumericType
     _ma: _MA
     _t: int = 0
     _t1: int
     _t2: int
-    _sum: Decimal = Decimal("0.0")
     _prev_close: Optional[Decimal] = None
 
     def __init__(self, period: int, ma: _MAType = "rma") -> None:
         if period < 1:
             raise ValueError(f"Invalid period ({period})")
 
+        self._num = get_numeric_type()
+        self.value = self._num("0.0")
         self._ma = _get_ma(period, ma)
         self._t1 = period
 
@@ -36,6 +42,7 @@ class Atr2:
         return self._t >= self._t1
 
     def update(self, high: Decimal, low: Decimal, close: Decimal) -> Decimal:
+        high, low, close = self._num(high), self._num(low), self._num(close)
         self._t = min(self._t + 1, self._t1)
 
         tr = _calc_truerange(high, low, self._prev_close)
@@ -46,6 +53,34 @@ class Atr2:
         self._prev_close = close
         return self.value
 
+    def compute(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+        high, low, close = as_array(high), as_array(low), as_array(close)
+        n = len(close)
+        result = np.zeros(n)
+
+        prev_close = close[:-1]
+        truerange = np.concatenate(
+            (
+                high[:1] - low[:1],
+                np.maximum.reduce(
+                    [
+                        high[1:] - low[1:],
+                        np.abs(high[1:] - prev_close),
+                        np.abs(low[1:] - prev_close),
+                    ]
+                ),
+            )
+        )
+        ma = self._ma.compute(truerange)
+        if n >= self._t1:
+            result[self._t1 - 1 :] = ma[self._t1 - 1 :]
+            self.value = to_numeric(self._num, result[-1])
+
+        if n > 0:
+            self._prev_close = to_numeric(self._num, close[-1])
+        self._t = min(n, self._t1)
+        return result
+
 
 def _calc_truerange(high: Decimal, low: Decimal, prev_close: Optional[Decimal]) -> Decimal:
     if prev_close is None:
@@ -0,0 +1,66 @@
+from decimal import Decimal
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+# Helpers for the batch `compute` methods of indicators.
+#
+# `compute` takes whole input arrays of a fresh indicator and returns float64 arrays of the same
+# length. Element `i` matches what `update` would have returned for the `i`-th input, including the
+# values before the indicator is mature. Afterwards, the indicator is in the same state as if all
+# inputs had been passed to `update`, so it can continue streaming from where the batch ended.
+# Calculations are done in float64 regardless of the numeric backend; the streaming state is
+# converted back to the backend type.
+
+
+def as_array(values: Any) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def to_numeric(num: Callable[[Any], Decimal], value: Any) -> Decimal:
+    """Converts a batch result to the number type of a numeric backend."""
+    return num(float(value))
+
+
+def ewm(values: np.ndarray, alpha: float, adjust: bool = False) -> np.ndarray:
+    """Exponentially weighted mean. Without adjustment, the first value is used as is and the
+    rest follow `y = y + (x - y) * alpha`."""
+    if len(values) == 0:
+        return np.empty(0)
+    return pd.Series(values).ewm(alpha=alpha, adjust=adjust).mean().to_numpy()
+
+
+def decay(initial: float, values: np.ndarray, factor: float) -> np.ndarray:
+    """Returns `initial` followed by `y = y * factor + x` for each value."""
+    alpha = 1.0 - factor
+    if alpha == 0.0:
+        return initial + np.concatenate(([0.0], np.cumsum(values)))
+    return ewm(np.concatenate(([initial * alpha], values)), alpha) / alpha
+
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """Sum of each full window. The result is `window - 1` elements shorter than the input."""
+    if len(values) < window:
+        return np.empty(0)
+    cumsum = np.concatenate(([0.0], np.cumsum(values)))
+    return cumsum[window:] - cumsum[:-window]
+
+
+def sliding_window(values: np.ndarray, window: int) -> np.ndarray:
+    """Read-only view of each full window."""
+    if len(values) < window:
+        return np.empty((0, window))
+    return np.lib.stride_tricks.sliding_window_view(values, window)
+
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """Maximum of each window. Windows at the start are partial, like a deque with a `maxlen`."""
+    padded = np.concatenate((np.full(window - 1, -np.inf), values))
+    return sliding_window(padded, window).max(axis=1)
+
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """Minimum of each window. Windows at the start are partial, like a deque with a `maxlen`."""
+    padded = np.concatenate((np.full(window - 1, np.inf), values))
+    return sliding_window(padded, window).min(axis=1)
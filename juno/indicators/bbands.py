@@ -1,16 +1,22 @@
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import as_array, rolling_sum, to_numeric
+from .numeric import NumericType, get_numeric_type, sqrt
+from .window import Window
+
 
 # Bollinger Bands
 class Bbands:
-    upper: Decimal = Decimal("0.0")
-    middle: Decimal = Decimal("0.0")
-    lower: Decimal = Decimal("0.0")
+    upper: Decimal
+    middle: Decimal
+    lower: Decimal
 
+    _num: NumericType
     _stddev: Decimal
-    _sum: Decimal = Decimal("0.0")
-    _sum2: Decimal = Decimal("0.0")
-    _prices: list[Decimal]
+    _sum2: Decimal
+    _prices: Window
     _t: int = 0
     _t1: int
 
@@ -18,9 +24,12 @@ class Bbands:
         if period < 1:
             raise ValueError(f"Invalid period ({period})")
 
-        self._stddev = stddev
-        self._scale = Decimal("1.0") / period
-        self._prices = []
+        self._num = get_numeric_type()
+        self.upper = self.middle = self.lower = self._num("0.0")
+        self._sum2 = self._num("0.0")
+        self._stddev = self._num(stddev)
+        self._scale = self._num("1.0") / period
+        self._prices = Window(period, with_sum=True)
         self._t1 = period
 
     @property
@@ -32,20 +41,41 @@ class Bbands:
         return self._t >= self._t1
 
     def update(self, price: Decimal) -> tuple[Decimal, Decimal, Decimal]:
+        price = self._num(price)
         self._t = min(self._t + 1, self._t1)
 
-        self._sum += price
-        self._sum2 += price**2
+        self._push_price(price)
 
         if self._t >= self._t1:
-            sd = (self._sum2 * self._scale - (self._sum * self._scale) ** 2).sqrt()
-            self.middle = self._sum * self._scale
+            sd = sqrt(self._sum2 * self._scale - (self._prices.sum * self._scale) ** 2)
+            self.middle = self._prices.sum * self._scale
             self.upper = self.middle + self._stddev * sd
             self.lower = self.middle - self._stddev * sd
 
-            old_price = self._prices.pop(0)
-            self._sum -= old_price
-            self._sum2 -= old_price**2
-
-        self._prices.append(price)
         return self.lower, self.middle, self.upper
+
+    def compute(self, prices: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        prices = as_array(prices)
+        n = len(prices)
+        lower, middle, upper = np.zeros(n), np.zeros(n), np.zeros(n)
+        if n >= self._t1:
+            scale, stddev = float(self._scale), float(self._stddev)
+            middle[self._t1 - 1 :] = rolling_sum(prices, self._t1) * scale
+            variance = rolling_sum(prices**2, self._t1) * scale - middle[self._t1 - 1 :] ** 2
+            sd = np.sqrt(np.maximum(variance, 0.0))
+            upper[self._t1 - 1 :] = middle[self._t1 - 1 :] + stddev * sd
+            lower[self._t1 - 1 :] = middle[self._t1 - 1 :] - stddev * sd
+            self.lower = to_numeric(self._num, lower[-1])
+            self.middle = to_numeric(self._num, middle[-1])
+            self.upper = to_numeric(self._num, upper[-1])
+
+        for price in prices[-self._t1 :]:
+            self._push_price(to_numeric(self._num, price))
+        self._t = min(n, self._t1)
+        return lower, middle, upper
+
+    def _push_price(self, price: Decimal) -> None:
+        evicted = self._prices.append(price)
+        self._sum2 += price**2
+        if evicted is not None:
+            self._sum2 -= evicted**2
@@ -1,22 +1,31 @@
 from collections import deque
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import as_array, sliding_window, to_numeric
+from .numeric import NumericType, get_numeric_type
 from .sma import Sma
 
 
 # Commodity Channel Index
 class Cci:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
+    _num: NumericType
     _sma: Sma
     _scale: Decimal
+    _constant: Decimal
     _typical_prices: deque[Decimal]
     _t: int = 0
     _t1: int
 
     def __init__(self, period: int) -> None:
+        self._num = get_numeric_type()
+        self.value = self._num("0.0")
         self._sma = Sma(period)
-        self._scale = Decimal("1.0") / period
+        self._scale = self._num("1.0") / period
+        self._constant = self._num("0.015")
         self._typical_prices = deque(maxlen=period)
         self._t1 = period * 2 - 1
 
@@ -31,12 +40,32 @@ class Cci:
     def update(self, high: Decimal, low: Decimal, close: Decimal) -> Decimal:
         self._t = min(self._t + 1, self._t1)
 
-        typical_price = (high + low + close) / 3
+        typical_price = (self._num(high) + self._num(low) + self._num(close)) / 3
         self._typical_prices.append(typical_price)
         self._sma.update(typical_price)
 
         if self._t == self._t1:
             acc = sum(abs(self._sma.value - tp) for tp in self._typical_prices)
-            self.value = (typical_price - self._sma.value) / (acc * self._scale * Decimal("0.015"))
+            self.value = (typical_price - self._sma.value) / (acc * self._scale * self._constant)
 
         return self.value
+
+    def compute(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+        typical_prices = (as_array(high) + as_array(low) + as_array(close)) / 3
+        n = len(typical_prices)
+        result = np.zeros(n)
+        period = self._sma.maturity
+
+        sma = self._sma.compute(typical_prices)
+        if n >= self._t1:
+            windows = sliding_window(typical_prices, period)[period - 1 :]
+            acc = np.abs(sma[self._t1 - 1 :, None] - windows).sum(axis=1)
+            scale, constant = float(self._scale), float(self._constant)
+            result[self._t1 - 1 :] = (typical_prices[self._t1 - 1 :] - sma[self._t1 - 1 :]) / (
+                acc * scale * constant
+            )
+            self.value = to_numeric(self._num, result[-1])
+
+        self._typical_prices.extend(to_numeric(self._num, p) for p in typical_prices[-period:])
+        self._t = min(n, self._t1)
+        return result
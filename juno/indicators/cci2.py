@@ -2,22 +2,31 @@ from collections import deque
 from decimal import Decimal
 from typing import Iterable
 
+import numpy as np
+
+from .batch import as_array, sliding_window, to_numeric
+from .numeric import NumericType, get_numeric_type
 from .sma import Sma
 
 
 # Commodity Channel Index from TradingView
 class Cci2:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
+    _num: NumericType
     _sma: Sma
     _scale: Decimal
+    _constant: Decimal
     _prices: deque[Decimal]
     _t: int = 0
     _t1: int
 
     def __init__(self, period: int) -> None:
+        self._num = get_numeric_type()
+        self.value = self._num("0.0")
         self._sma = Sma(period)
-        self._scale = Decimal("1.0") / period
+        self._scale = self._num("1.0") / period
+        self._constant = self._num("0.015")
         self._prices = deque(maxlen=period)
         self._t1 = period * 2 - 1
 
@@ -30,6 +39,7 @@ class Cci2:
         return self._t >= self._t1
 
     def update(self, price: Decimal) -> Decimal:
+        price = self._num(price)
         self._t = min(self._t + 1, self._t1)
 
         self._prices.append(price)
@@ -37,10 +47,30 @@ class Cci2:
 
         if self._t == self._t1:
             acc = sum(abs(self._sma.value - tp) for tp in self._prices)
-            self.value = (price - self._sma.value) / (acc * self._scale * Decimal("0.015"))
+            self.value = (price - self._sma.value) / (acc * self._scale * self._constant)
 
         return self.value
 
+    def compute(self, prices: np.ndarray) -> np.ndarray:
+        prices = as_array(prices)
+        n = len(prices)
+        result = np.zeros(n)
+        period = self._sma.maturity
+
+        sma = self._sma.compute(prices)
+        if n >= self._t1:
+            windows = sliding_window(prices, period)[period - 1 :]
+            acc = np.abs(sma[self._t1 - 1 :, None] - windows).sum(axis=1)
+            scale, constant = float(self._scale), float(self._constant)
+            result[self._t1 - 1 :] = (prices[self._t1 - 1 :] - sma[self._t1 - 1 :]) / (
+                acc * scale * constant
+            )
+            self.value = to_numeric(self._num, result[-1])
+
+        self._prices.extend(to_numeric(self._num, p) for p in prices[-period:])
+        self._t = min(n, self._t1)
+        return result
+
     @staticmethod
     def for_period(prices: Iterable[Decimal], period: int) -> Decimal:
         cci = Cci2(period)
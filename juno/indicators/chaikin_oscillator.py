@@ -1,16 +1,24 @@
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import as_array, to_numeric
 from .ema import Ema
+from .numeric import NumericType, get_numeric_type
 
 
 class ChaikinOscillator:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
-    _money_flow_volume: Decimal = Decimal("0.0")
+    _num: NumericType
+    _money_flow_volume: Decimal
     _short_ema: Ema
     _long_ema: Ema
 
     def __init__(self, short_period: int, long_period: int) -> None:
+        self._num = get_numeric_type()
+        self.value = self._num("0.0")
+        self._money_flow_volume = self._num("0.0")
         self._short_ema = Ema.with_com(short_period, adjust=True)
         self._long_ema = Ema.with_com(long_period, adjust=True)
 
@@ -23,12 +31,29 @@ class ChaikinOscillator:
         return self._long_ema.mature and self._short_ema.mature
 
     def update(self, high: Decimal, low: Decimal, close: Decimal, volume: Decimal) -> Decimal:
+        high, low, close = self._num(high), self._num(low), self._num(close)
         if high != low:
             money_flow_multiplier = ((close - low) - (high - close)) / (high - low)
-            self._money_flow_volume += money_flow_multiplier * volume
+            self._money_flow_volume += money_flow_multiplier * self._num(volume)
 
         self._short_ema.update(self._money_flow_volume)
         self._long_ema.update(self._money_flow_volume)
 
         self.value = self._short_ema.value - self._long_ema.value
         return self.value
+
+    def compute(
+        self, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray
+    ) -> np.ndarray:
+        high, low, close = as_array(high), as_array(low), as_array(close)
+        hl = high - low
+        with np.errstate(divide="ignore", invalid="ignore"):
+            money_flow_multiplier = np.where(hl != 0, ((close - low) - (high - close)) / hl, 0.0)
+        money_flow_volume = np.cumsum(money_flow_multiplier * as_array(volume))
+        result = self._short_ema.compute(money_flow_volume) - self._long_ema.compute(
+            money_flow_volume
+        )
+        if len(result) > 0:
+            self._money_flow_volume = to_numeric(self._num, money_flow_volume[-1])
+            self.value = to_numeric(self._num, result[-1])
+        return result
@@ -1,23 +1,28 @@
-from collections import deque
 from decimal import Decimal
 
+import numpy as np
+
 from .atr2 import Atr2 as Atr
+from .batch import as_array, rolling_max, rolling_min, to_numeric
+from .numeric import NumericType, get_numeric_type
+from .window import Window
 
 
 # Ref: https://www.tradingview.com/script/AqXxNS7j-Chandelier-Exit/
 class ChandelierExit:
-    long: Decimal = Decimal("0.0")
-    short: Decimal = Decimal("0.0")
+    long: Decimal
+    short: Decimal
 
-    _prev_long: Decimal = Decimal("0.0")
-    _prev_short: Decimal = Decimal("0.0")
-    _prev_close: Decimal = Decimal("0.0")
+    _num: NumericType
+    _prev_long: Decimal
+    _prev_short: Decimal
+    _prev_close: Decimal
 
     _atr: Atr
     _atr_multiplier: int
     _use_close: bool
-    _highs: deque[Decimal]
-    _lows: deque[Decimal]
+    _highs: Window
+    _lows: Window
     _t: int = 0
     _t1: int
 
@@ -34,11 +39,14 @@ class ChandelierExit:
         if short_period < 1:
             raise ValueError(f"Invalid short period ({short_period})")
 
+        self._num = get_numeric_type()
+        self.long = self.short = self._num("0.0")
+        self._prev_long = self._prev_short = self._prev_close = self._num("0.0")
         self._atr = Atr(period=atr_period)
         self._atr_multiplier = atr_multiplier
         self._use_close = use_close
-        self._highs = deque(maxlen=long_period)
-        self._lows = deque(maxlen=short_period)
+        self._highs = Window(long_period, with_max=True)
+        self._lows = Window(short_period, with_min=True)
         self._t1 = max(long_period, short_period)
 
     @property
@@ -50,6 +58,7 @@ class ChandelierExit:
         return self._t >= self._t1 and self._atr.mature
 
     def update(self, high: Decimal, low: Decimal, close: Decimal) -> tuple[Decimal, Decimal]:
+        high, low, close = self._num(high), self._num(low), self._num(close)
         self._t = min(self._t + 1, self._t1)
 
         self._atr.update(high=high, low=low, close=close)
@@ -58,8 +67,8 @@ class ChandelierExit:
 
         if self.mature:
             multiplied_atr = self._atr.value * self._atr_multiplier
-            self.long = max(self._highs) - multiplied_atr
-            self.short = min(self._lows) + multiplied_atr
+            self.long = self._highs.max - multiplied_atr
+            self.short = self._lows.min + multiplied_atr
 
             if self._prev_long == 0:
                 self._prev_long = self.long
@@ -83,3 +92,41 @@ class ChandelierExit:
         self._prev_close = close
 
         return self.long, self.short
+
+    def compute(
+        self, high: np.ndarray, low: np.ndarray, close: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        high, low, close = as_array(high), as_array(low), as_array(close)
+        n = len(close)
+        long, short = np.zeros(n), np.zeros(n)
+        long_period, short_period = self._highs.size, self._lows.size
+
+        atr = self._atr.compute(high, low, close)
+        highs = close if self._use_close else high
+        lows = close if self._use_close else low
+        highest = rolling_max(highs, long_period)
+        lowest = rolling_min(lows, short_period)
+
+        # The stops only move in the direction of the trend so they are calculated one by one.
+        prev_long, prev_short = float(self._prev_long), float(self._prev_short)
+        for i in range(self.maturity - 1, n):
+            multiplied_atr = atr[i] * self._atr_multiplier
+            long_ = highest[i] - multiplied_atr
+            short_ = lowest[i] + multiplied_atr
+            if prev_long == 0:
+                prev_long = long_
+            if prev_short == 0:
+                prev_short = short_
+            prev_close = close[i - 1] if i > 0 else 0.0
+            long[i] = prev_long = max(long_, prev_long) if prev_close > prev_long else long_
+            short[i] = prev_short = min(short_, prev_short) if prev_close < prev_short else short_
+        if n >= self.maturity:
+            self.long = self._prev_long = to_numeric(self._num, prev_long)
+            self.short = self._prev_short = to_numeric(self._num, prev_short)
+
+        self._highs.extend(to_numeric(self._num, v) for v in highs[-long_period:])
+        self._lows.extend(to_numeric(self._num, v) for v in lows[-short_period:])
+        if n > 0:
+            self._prev_close = to_numeric(self._num, close[-1])
+        self._t = min(n, self._t1)
+        return long, short
@@ -1,20 +1,28 @@
-from collections import deque
 from decimal import Decimal
+from typing import Optional
+
+import numpy as np
+
+from .batch import as_array, rolling_max, rolling_min, to_numeric
+from .numeric import NumericType, get_numeric_type
+from .window import Window
 
 
 class DarvasBox:
-    top_box: Decimal = Decimal("0.0")
-    bottom_box: Decimal = Decimal("0.0")
+    top_box: Decimal
+    bottom_box: Decimal
 
+    _num: NumericType
     _boxp: int
 
-    _previous_k1: Decimal = Decimal("inf")
-    _ll_deque: deque[Decimal]
-    _k1_deque: deque[Decimal]
-    _k2_deque: deque[Decimal]
-    _k3_deque: deque[Decimal]
+    _previous_k1: Decimal
+    _ll_window: Window
+    _k1_window: Window
+    _k2_window: Window
+    # Empty when the box length is 2.
+    _k3_window: Optional[Window]
     _bars_since_high_gt_previous_k1: int = 0
-    _nh: Decimal = Decimal("0.0")
+    _nh: Decimal
 
     _t: int = 0
 
@@ -22,11 +30,14 @@ class DarvasBox:
         if boxp < 2:
             raise ValueError("Length cannot be less than 2")
 
+        self._num = get_numeric_type()
+        self.top_box = self.bottom_box = self._nh = self._num("0.0")
+        self._previous_k1 = self._num("inf")
         self._boxp = boxp
-        self._ll_deque = deque(maxlen=boxp)
-        self._k1_deque = deque(maxlen=boxp)
-        self._k2_deque = deque(maxlen=boxp - 1)
-        self._k3_deque = deque(maxlen=boxp - 2)
+        self._ll_window = Window(boxp, with_min=True)
+        self._k1_window = Window(boxp, with_max=True)
+        self._k2_window = Window(boxp - 1, with_max=True)
+        self._k3_window = Window(boxp - 2, with_max=True) if boxp > 2 else None
 
     @property
     def maturity(self) -> int:
@@ -37,17 +48,19 @@ class DarvasBox:
         return self._t >= self._boxp
 
     def update(self, high: Decimal, low: Decimal) -> tuple[Decimal, Decimal]:
+        high, low = self._num(high), self._num(low)
         self._t = min(self._t + 1, self._boxp)
 
-        self._ll_deque.append(low)
-        self._k1_deque.append(high)
-        self._k2_deque.append(high)
-        self._k3_deque.append(high)
+        self._ll_window.append(low)
+        self._k1_window.append(high)
+        self._k2_window.append(high)
+        if self._k3_window is not None:
+            self._k3_window.append(high)
 
-        ll = min(self._ll_deque, default=Decimal("0.0"))
-        k1 = max(self._k1_deque, default=Decimal("0.0"))
-        k2 = max(self._k2_deque, default=Decimal("0.0"))
-        k3 = max(self._k3_deque, default=Decimal("0.0"))
+        ll = self._ll_window.min
+        k1 = self._k1_window.max
+        k2 = self._k2_window.max
+        k3 = self._k3_window.max if self._k3_window is not None else self._num("0.0")
 
         if high > self._previous_k1:
             self._nh = high
@@ -62,3 +75,43 @@ class DarvasBox:
 
         self._previous_k1 = k1
         return self.top_box, self.bottom_box
+
+    def compute(self, high: np.ndarray, low: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        high, low = as_array(high), as_array(low)
+        n = len(high)
+        indices = np.arange(n)
+
+        ll = rolling_min(low, self._boxp)
+        k1 = rolling_max(high, self._boxp)
+        k2 = rolling_max(high, self._boxp - 1)
+        k3 = rolling_max(high, self._boxp - 2) if self._boxp > 2 else np.zeros(n)
+
+        # Bars are counted from the last new high. Before any, the count starts from the
+        # beginning.
+        new_high = high > np.concatenate(([np.inf], k1[:-1]))
+        last_high = np.maximum.accumulate(np.where(new_high, indices, -1))
+        bars_since_high = np.where(last_high >= 0, indices - last_high, indices + 1)
+        nh = np.where(last_high >= 0, high[last_high], 0.0)
+
+        # Boxes are carried forward until the next box is formed.
+        new_box = (bars_since_high == self._boxp - 2) & (k3 < k2)
+        last_box = np.maximum.accumulate(np.where(new_box, indices, -1))
+        top_box = np.where(last_box >= 0, nh[last_box], 0.0)
+        bottom_box = np.where(last_box >= 0, ll[last_box], 0.0)
+
+        if n > 0:
+            self.top_box = to_numeric(self._num, top_box[-1])
+            self.bottom_box = to_numeric(self._num, bottom_box[-1])
+            self._nh = to_numeric(self._num, nh[-1])
+            self._bars_since_high_gt_previous_k1 = int(bars_since_high[-1])
+            self._previous_k1 = to_numeric(self._num, k1[-1])
+        for window, values in [
+            (self._ll_window, low),
+            (self._k1_window, high),
+            (self._k2_window, high),
+            (self._k3_window, high),
+        ]:
+            if window is not None:
+                window.extend(to_numeric(self._num, v) for v in values[-window.size :])
+        self._t = min(n, self._boxp)
+        return top_box, bottom_box
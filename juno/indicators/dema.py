@@ -1,11 +1,15 @@
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import as_array, to_numeric
 from .ema import Ema
+from .numeric import get_numeric_type
 
 
 # Double Exponential Moving Average
 class Dema:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
     _ema1: Ema
     _ema2: Ema
@@ -14,6 +18,7 @@ class Dema:
     _t2: int
 
     def __init__(self, period: int) -> None:
+        self.value = get_numeric_type()("0.0")
         self._ema1 = Ema(period)
         self._ema2 = Ema(period)
         self._t1 = period
@@ -38,6 +43,20 @@ class Dema:
         if self._t >= self._t1:
             self._ema2.update(self._ema1.value)
             if self._t >= self._t2:
-                self.value = self._ema1.value * Decimal("2.0") - self._ema2.value
+                self.value = self._ema1.value * 2 - self._ema2.value
 
         return self.value
+
+    def compute(self, prices: np.ndarray) -> np.ndarray:
+        prices = as_array(prices)
+        n = len(prices)
+        result = np.zeros(n)
+
+        ema1 = self._ema1.compute(prices)
+        # The second EMA receives both the price and the first EMA when the first one matures.
+        ema2 = self._ema2.compute(np.concatenate((prices[: self._t1], ema1[self._t1 - 1 :])))
+        if n >= self._t2:
+            result[self._t2 - 1 :] = ema1[self._t2 - 1 :] * 2 - ema2[self._t2 :]
+            self.value = to_numeric(type(self.value), result[-1])
+        self._t = min(n, self._t2)
+        return result
@@ -1,18 +1,23 @@
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import as_array, decay, to_numeric
 from .dm import DM
+from .numeric import NumericType, get_numeric_type
 
 
 # Directional Indicator
 class DI:
-    plus_value: Decimal = Decimal("0.0")
-    minus_value: Decimal = Decimal("0.0")
+    plus_value: Decimal
+    minus_value: Decimal
 
+    _num: NumericType
     _dm: DM
-    _atr: Decimal = Decimal("0.0")
+    _atr: Decimal
     _per: Decimal
 
-    _prev_close: Decimal = Decimal("0.0")
+    _prev_close: Decimal
 
     _t: int = 0
     _t1: int = 2
@@ -20,8 +25,11 @@ class DI:
     _t3: int
 
     def __init__(self, period: int) -> None:
+        self._num = get_numeric_type()
+        self.plus_value = self.minus_value = self._num("0.0")
+        self._atr = self._prev_close = self._num("0.0")
         self._dm = DM(period)
-        self._per = (period - 1) / Decimal(period)
+        self._per = (period - 1) / self._num(period)
 
         self._t2 = period
         self._t3 = period + 1
@@ -35,6 +43,7 @@ class DI:
         return self._t >= self._t2
 
     def update(self, high: Decimal, low: Decimal, close: Decimal) -> tuple[Decimal, Decimal]:
+        high, low, close = self._num(high), self._num(low), self._num(close)
         self._t = min(self._t + 1, self._t3)
 
         self._dm.update(high, low)
@@ -53,6 +62,33 @@ class DI:
         self._prev_close = close
         return self.plus_value, self.minus_value
 
+    def compute(
+        self, high: np.ndarray, low: np.ndarray, close: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        high, low, close = as_array(high), as_array(low), as_array(close)
+        n = len(close)
+        plus, minus = np.zeros(n), np.zeros(n)
+
+        dm_plus, dm_minus = self._dm.compute(high, low)
+        truerange = _calc_trueranges(close[:-1], high[1:], low[1:])
+        if n >= self._t2:
+            # True ranges are summed until the indicator matures and smoothed afterwards.
+            atr = decay(
+                truerange[: self._t2 - 1].sum(), truerange[self._t2 - 1 :], float(self._per)
+            )
+            plus[self._t2 - 1 :] = 100 * dm_plus[self._t2 - 1 :] / atr
+            minus[self._t2 - 1 :] = 100 * dm_minus[self._t2 - 1 :] / atr
+            self._atr = to_numeric(self._num, atr[-1])
+            self.plus_value = to_numeric(self._num, plus[-1])
+            self.minus_value = to_numeric(self._num, minus[-1])
+        elif n > 1:
+            self._atr = to_numeric(self._num, truerange.sum())
+
+        if n > 0:
+            self._prev_close = to_numeric(self._num, close[-1])
+        self._t = min(n, self._t3)
+        return plus, minus
+
 
 def _calc_truerange(prev_close: Decimal, high: Decimal, low: Decimal) -> Decimal:
     ych = abs(high - prev_close)
@@ -63,3 +99,7 @@ def _calc_truerange(prev_close: Decimal, high: Decimal, low: Decimal) -> Decimal
     if ycl > v:
         v = ycl
     return v
+
+
+def _calc_trueranges(prev_close: np.ndarray, high: np.ndarray, low: np.ndarray) -> np.ndarray:
+    return np.maximum.reduce([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
@@ -1,17 +1,24 @@
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import as_array, decay, to_numeric
+from .numeric import NumericType, get_numeric_type
+
 
 # Directional Movement Indicator
 class DM:
-    plus_value: Decimal = Decimal("0.0")
-    minus_value: Decimal = Decimal("0.0")
+    plus_value: Decimal
+    minus_value: Decimal
 
+    _num: NumericType
+    _zero: Decimal
     _per: Decimal
 
-    _dmup: Decimal = Decimal("0.0")
-    _dmdown: Decimal = Decimal("0.0")
-    _prev_high: Decimal = Decimal("0.0")
-    _prev_low: Decimal = Decimal("0.0")
+    _dmup: Decimal
+    _dmdown: Decimal
+    _prev_high: Decimal
+    _prev_low: Decimal
 
     _t: int = 0
     _t1: int = 2
@@ -22,7 +29,12 @@ class DM:
         if period < 1:
             raise ValueError(f"Invalid period ({period})")
 
-        self._per = (period - 1) / Decimal(period)
+        self._num = get_numeric_type()
+        self._zero = self._num("0.0")
+        self.plus_value = self.minus_value = self._zero
+        self._dmup = self._dmdown = self._num("0.0")
+        self._prev_high = self._prev_low = self._num("0.0")
+        self._per = (period - 1) / self._num(period)
 
         self._t2 = period
         self._t3 = period + 1
@@ -44,10 +56,11 @@ class DM:
         return self.plus_value + self.minus_value
 
     def update(self, high: Decimal, low: Decimal) -> tuple[Decimal, Decimal]:
+        high, low = self._num(high), self._num(low)
         self._t = min(self._t + 1, self._t3)
 
         if self._t >= self._t1 and self._t < self._t3:
-            dp, dm = _calc_direction(self._prev_high, self._prev_low, high, low)
+            dp, dm = _calc_direction(self._prev_high, self._prev_low, high, low, self._zero)
             self._dmup += dp
             self._dmdown += dm
 
@@ -55,7 +68,7 @@ class DM:
             self.plus_value = self._dmup
             self.minus_value = self._dmdown
         elif self._t >= self._t3:
-            dp, dm = _calc_direction(self._prev_high, self._prev_low, high, low)
+            dp, dm = _calc_direction(self._prev_high, self._prev_low, high, low, self._zero)
             self._dmup = self._dmup * self._per + dp
             self._dmdown = self._dmdown * self._per + dm
             self.plus_value = self._dmup
@@ -65,21 +78,56 @@ class DM:
         self._prev_low = low
         return self.plus_value, self.minus_value
 
+    def compute(self, high: np.ndarray, low: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        high, low = as_array(high), as_array(low)
+        n = len(high)
+        plus, minus = np.zeros(n), np.zeros(n)
+
+        if n >= self._t2:
+            ups, downs = _calc_directions(high, low)
+            # Directions are summed until the indicator matures and smoothed afterwards.
+            per = float(self._per)
+            dmup = decay(ups[: self._t2 - 1].sum(), ups[self._t2 - 1 :], per)
+            dmdown = decay(downs[: self._t2 - 1].sum(), downs[self._t2 - 1 :], per)
+            plus[self._t2 - 1 :] = dmup
+            minus[self._t2 - 1 :] = dmdown
+            self._dmup = self.plus_value = to_numeric(self._num, dmup[-1])
+            self._dmdown = self.minus_value = to_numeric(self._num, dmdown[-1])
+        elif n > 1:
+            ups, downs = _calc_directions(high, low)
+            self._dmup = to_numeric(self._num, ups.sum())
+            self._dmdown = to_numeric(self._num, downs.sum())
+
+        if n > 0:
+            self._prev_high = to_numeric(self._num, high[-1])
+            self._prev_low = to_numeric(self._num, low[-1])
+        self._t = min(n, self._t3)
+        return plus, minus
+
 
 def _calc_direction(
-    prev_high: Decimal, prev_low: Decimal, high: Decimal, low: Decimal
+    prev_high: Decimal, prev_low: Decimal, high: Decimal, low: Decimal, zero: Decimal
 ) -> tuple[Decimal, Decimal]:
     up = high - prev_high
     down = prev_low - low
 
     if up < 0:
-        up = Decimal("0.0")
+        up = zero
     elif up > down:
-        down = Decimal("0.0")
+        down = zero
 
     if down < 0:
-        down = Decimal("0.0")
+        down = zero
     elif down > up:
-        up = Decimal("0.0")
+        up = zero
+
+    return up, down
+
 
+def _calc_directions(high: np.ndarray, low: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Vectorized `_calc_direction` for each pair of consecutive highs and lows.
+    up = np.diff(high)
+    down = -np.diff(low)
+    up, down = np.where(up < 0, 0.0, up), np.where((up >= 0) & (up > down), 0.0, down)
+    down, up = np.where(down < 0, 0.0, down), np.where((down >= 0) & (down > up), 0.0, up)
     return up, down
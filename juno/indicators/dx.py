@@ -1,17 +1,22 @@
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import to_numeric
 from .dm import DM
+from .numeric import get_numeric_type
 
 
 # Directional Movement Index
 class DX:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
     _dm: DM
     _t: int = 0
     _t1: int
 
     def __init__(self, period: int) -> None:
+        self.value = get_numeric_type()("0.0")
         self._dm = DM(period)
         self._t1 = period
 
@@ -32,3 +37,14 @@ class DX:
             self.value = self._dm.diff / self._dm.sum * 100
 
         return self.value
+
+    def compute(self, high: np.ndarray, low: np.ndarray) -> np.ndarray:
+        plus, minus = self._dm.compute(high, low)
+        n = len(plus)
+        result = np.zeros(n)
+        if n >= self._t1:
+            plus, minus = plus[self._t1 - 1 :], minus[self._t1 - 1 :]
+            result[self._t1 - 1 :] = np.abs(plus - minus) / (plus + minus) * 100
+            self.value = to_numeric(type(self.value), result[-1])
+        self._t = min(n, self._t1)
+        return result
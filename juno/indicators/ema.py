@@ -2,18 +2,25 @@ from __future__ import annotations
 
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import as_array, decay, ewm, to_numeric
+from .numeric import NumericType, get_numeric_type
+
 
 # Exponential Moving Average
 class Ema:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
+    _num: NumericType
     _adjust: bool
     _a: Decimal
     _a_inv: Decimal
 
-    # Only used when `adjust=True`.
-    _prices: list[Decimal]
-    _denominator: Decimal = Decimal("0.0")
+    # Only used when `adjust=True`. Sums of the prices and their weights, where the weight of the
+    # latest price is 1 and each older one is `1 - a` times the next.
+    _numerator: Decimal
+    _denominator: Decimal
 
     _t: int = 0
     _t1: int
@@ -22,9 +29,11 @@ class Ema:
         if period < 1:
             raise ValueError(f"Invalid period ({period})")
 
+        self._num = get_numeric_type()
+        self.value = self._num("0.0")
         self._adjust = adjust
         if adjust:
-            self._prices = []
+            self._numerator = self._denominator = self._num("0.0")
         # Decay calculated in terms of span.
         self.set_smoothing_factor(Decimal("2.0") / (period + 1))
         self._t1 = period
@@ -38,24 +47,17 @@ class Ema:
         return self._t >= self._t1
 
     def set_smoothing_factor(self, a: Decimal) -> None:
-        self._a = a
+        self._a = self._num(a)
         self._a_inv = 1 - self._a
 
     def update(self, price: Decimal) -> Decimal:
+        price = self._num(price)
         self._t = min(self._t + 1, self._t1)
 
         if self._adjust:
-            self._prices.append(price)
-            numerator = sum(
-                (self._a_inv**i * p for i, p in enumerate(reversed(self._prices))),
-                Decimal("0.0"),
-            )
-            # self._denominator = sum(
-            #     (self._a_inv**i for i in range(len(self._prices))),
-            #     Decimal('0.0'),
-            # )
-            self._denominator += self._a_inv ** (len(self._prices) - 1)
-            self.value = numerator / self._denominator
+            self._numerator = self._numerator * self._a_inv + price
+            self._denominator = self._denominator * self._a_inv + 1
+            self.value = self._numerator / self._denominator
         else:
             if self._t == 1:
                 self.value = price
@@ -64,6 +66,22 @@ class Ema:
 
         return self.value
 
+    def compute(self, prices: np.ndarray) -> np.ndarray:
+        prices = as_array(prices)
+        n = len(prices)
+        if n == 0:
+            return np.empty(0)
+
+        result = ewm(prices, float(self._a), adjust=self._adjust)
+
+        self._t = min(n, self._t1)
+        if self._adjust:
+            a_inv = float(self._a_inv)
+            self._numerator = to_numeric(self._num, decay(0.0, prices, a_inv)[-1])
+            self._denominator = to_numeric(self._num, decay(0.0, np.ones(n), a_inv)[-1])
+        self.value = to_numeric(self._num, result[-1])
+        return result
+
     @staticmethod
     def with_smoothing(period: int, a: Decimal, adjust: bool = False) -> Ema:
         ema = Ema(period, adjust=adjust)  # Dummy period.
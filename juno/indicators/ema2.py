@@ -2,12 +2,17 @@ from __future__ import annotations
 
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import as_array, ewm, to_numeric
+from .numeric import NumericType, get_numeric_type
 from .sma import Sma
 
 
 class Ema2:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
+    _num: NumericType
     _sma: Sma
     _a: Decimal
     _t: int = 0
@@ -18,9 +23,11 @@ class Ema2:
         if period < 1:
             raise ValueError(f"Invalid period ({period})")
 
+        self._num = get_numeric_type()
+        self.value = self._num("0.0")
         self._sma = Sma(period)
 
-        self._a = Decimal("2.0") / (period + 1)
+        self._a = self._num("2.0") / (period + 1)
 
         self._t1 = period
         self._t2 = period + 1
@@ -34,6 +41,7 @@ class Ema2:
         return self._t >= self._t1
 
     def update(self, price: Decimal) -> Decimal:
+        price = self._num(price)
         self._t = min(self._t + 1, self._t2)
 
         if self._t <= self._t1:
@@ -45,3 +53,16 @@ class Ema2:
             self.value = (price - self.value) * self._a + self.value
 
         return self.value
+
+    def compute(self, prices: np.ndarray) -> np.ndarray:
+        prices = as_array(prices)
+        n = len(prices)
+        result = np.zeros(n)
+        sma = self._sma.compute(prices[: self._t1])
+        if n >= self._t1:
+            result[self._t1 - 1 :] = ewm(
+                np.concatenate((sma[-1:], prices[self._t1 :])), float(self._a)
+            )
+            self.value = to_numeric(self._num, result[-1])
+        self._t = min(n, self._t2)
+        return result
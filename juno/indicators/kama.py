@@ -3,17 +3,26 @@ from __future__ import annotations
 from collections import deque
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import as_array, sliding_window, to_numeric
+from .numeric import NumericType, get_numeric_type
+from .window import Window
+
 
 # Kaufman's Adaptive Moving Average
 class Kama:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
+    _num: NumericType
     _short_alpha: Decimal
     _long_alpha: Decimal
 
     # _prev_price: Decimal
     _prices: deque[Decimal]
-    _diffs: deque[Decimal]
+    _diffs: Window
+    # Number of non-zero diffs in the window. Tells whether the sum is zero regardless of rounding.
+    _nonzero_diffs: int = 0
 
     _t: int = 0
     _t1: int
@@ -23,11 +32,13 @@ class Kama:
         if period < 1:
             raise ValueError(f"Invalid period ({period})")
 
-        self._short_alpha = Decimal("2.0") / (Decimal("2.0") + 1)
-        self._long_alpha = Decimal("2.0") / (Decimal("30.0") + 1)
+        self._num = get_numeric_type()
+        self.value = self._num("0.0")
+        self._short_alpha = self._num("2.0") / (self._num("2.0") + 1)
+        self._long_alpha = self._num("2.0") / (self._num("30.0") + 1)
 
         self._prices = deque(maxlen=period)
-        self._diffs = deque(maxlen=period)
+        self._diffs = Window(period, with_sum=True)
 
         self._t1 = period
         self._t2 = period + 1
@@ -41,23 +52,58 @@ class Kama:
         return self._t >= self._t2
 
     def update(self, price: Decimal) -> Decimal:
+        price = self._num(price)
         self._t = min(self._t + 1, self._t2)
 
         if len(self._prices) > 0:
-            self._diffs.append(abs(price - self._prices[-1]))
+            self._push_diff(abs(price - self._prices[-1]))
 
         if self._t == self._t1:
             self.value = price
         elif self._t >= self._t2:
-            # TODO: Can optimize this.
-            diff_sum = sum(self._diffs)
-            if diff_sum == 0:
-                er = Decimal("1.0")
+            if self._nonzero_diffs == 0:
+                er = self._num("1.0")
             else:
-                er = abs(price - self._prices[0]) / diff_sum
+                er = abs(price - self._prices[0]) / self._diffs.sum
             sc = (er * (self._short_alpha - self._long_alpha) + self._long_alpha) ** 2
 
             self.value += sc * (price - self.value)
 
         self._prices.append(price)
         return self.value
+
+    def compute(self, prices: np.ndarray) -> np.ndarray:
+        prices = as_array(prices)
+        n = len(prices)
+        result = np.zeros(n)
+        period = self._t1
+
+        diffs = np.abs(np.diff(prices))
+        if n >= self._t1:
+            diff_sum = sliding_window(diffs, period).sum(axis=1)
+            change = np.abs(prices[period:] - prices[:-period])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                er = np.where(diff_sum == 0, 1.0, change / diff_sum)
+            short_alpha, long_alpha = float(self._short_alpha), float(self._long_alpha)
+            sc = (er * (short_alpha - long_alpha) + long_alpha) ** 2
+
+            # The smoothing constant changes with every price so it is applied one by one.
+            value = prices[period - 1]
+            result[period - 1] = value
+            for i, (price, c) in enumerate(zip(prices[period:].tolist(), sc.tolist()), period):
+                value += c * (price - value)
+                result[i] = value
+            self.value = to_numeric(self._num, value)
+
+        self._prices.extend(to_numeric(self._num, p) for p in prices[-period:])
+        for diff in diffs[-period:]:
+            self._push_diff(to_numeric(self._num, diff))
+        self._t = min(n, self._t2)
+        return result
+
+    def _push_diff(self, diff: Decimal) -> None:
+        evicted = self._diffs.append(diff)
+        if evicted is not None and evicted != 0:
+            self._nonzero_diffs -= 1
+        if diff != 0:
+            self._nonzero_diffs += 1
@@ -1,17 +1,22 @@
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import as_array, to_numeric
 from .ema import Ema
+from .numeric import NumericType, get_numeric_type
 
 
 # Klinger Volume Oscillator
 class Kvo:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
+    _num: NumericType
     _short_ema: Ema
     _long_ema: Ema
-    _prev_hlc: Decimal = Decimal("0.0")
-    _prev_dm: Decimal = Decimal("0.0")
-    _cm: Decimal = Decimal("0.0")
+    _prev_hlc: Decimal
+    _prev_dm: Decimal
+    _cm: Decimal
     _trend: int = 0
     _t: int = 0
     _t1: int = 2
@@ -24,6 +29,9 @@ class Kvo:
                 f"Long period ({long_period}) cannot be shorter than short period ({short_period})"
             )
 
+        self._num = get_numeric_type()
+        self.value = self._num("0.0")
+        self._prev_hlc = self._prev_dm = self._cm = self._num("0.0")
         self._short_ema = Ema(short_period)
         self._long_ema = Ema(long_period)
 
@@ -38,7 +46,8 @@ class Kvo:
     def update(self, high: Decimal, low: Decimal, close: Decimal, volume: Decimal) -> Decimal:
         self._t = min(self._t + 1, self._t1)
 
-        hlc = high + low + close
+        high, low = self._num(high), self._num(low)
+        hlc = high + low + self._num(close)
         dm = high - low
 
         if self._t > 1:
@@ -50,7 +59,7 @@ class Kvo:
                 self._cm = self._prev_dm
             self._cm += dm
 
-            vf = volume * abs(dm / self._cm * 2 - 1) * 100 * self._trend
+            vf = self._num(volume) * abs(dm / self._cm * 2 - 1) * 100 * self._trend
 
             self._short_ema.update(vf)
             self._long_ema.update(vf)
@@ -60,3 +69,38 @@ class Kvo:
         self._prev_dm = dm
         self._prev_hlc = hlc
         return self.value
+
+    def compute(
+        self, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray
+    ) -> np.ndarray:
+        high, low = as_array(high), as_array(low)
+        n = len(high)
+        result = np.zeros(n)
+        indices = np.arange(n - 1)
+
+        hlc = high + low + as_array(close)
+        dm = high - low
+
+        # The trend follows the last change in the direction of `hlc`.
+        direction = np.sign(np.diff(hlc))
+        last_direction = np.maximum.accumulate(np.where(direction != 0, indices, -1))
+        trend = np.where(last_direction >= 0, direction[last_direction], 0.0)
+        # The cumulative measurement restarts from the previous `dm` whenever the trend changes.
+        trend_change = trend != np.concatenate(([0.0], trend[:-1]))
+        last_trend_change = np.maximum.accumulate(np.where(trend_change, indices, -1))
+        dm_cumsum = np.concatenate(([0.0], np.cumsum(dm)))
+        cm = dm_cumsum[2:] - np.where(
+            last_trend_change >= 0, dm_cumsum[np.maximum(last_trend_change, 0)], dm_cumsum[1]
+        )
+        vf = as_array(volume)[1:] * np.abs(dm[1:] / cm * 2 - 1) * 100 * trend
+
+        result[1:] = self._short_ema.compute(vf) - self._long_ema.compute(vf)
+        if n > 1:
+            self._cm = to_numeric(self._num, cm[-1])
+            self._trend = int(trend[-1])
+            self.value = to_numeric(self._num, result[-1])
+        if n > 0:
+            self._prev_hlc = to_numeric(self._num, hlc[-1])
+            self._prev_dm = to_numeric(self._num, dm[-1])
+        self._t = min(n, self._t1)
+        return result
@@ -1,15 +1,21 @@
-from collections import deque
 from decimal import Decimal
-from typing import Sequence
+
+import numpy as np
+
+from .batch import as_array, sliding_window, to_numeric
+from .numeric import NumericType, get_numeric_type
+from .window import Window
 
 
 # Least Square Moving Average
 class Lsma:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
-    _prices: deque[Decimal]
+    _num: NumericType
+    # Prices are the y values and x is the 1-based position of a price in the window.
+    _prices: Window
+    _xy_sum: Decimal
 
-    _x: range
     _x_sum: Decimal
     _x2_sum: Decimal
     _divisor: Decimal
@@ -21,11 +27,13 @@ class Lsma:
         if period < 1:
             raise ValueError(f"Invalid period ({period})")
 
-        self._prices = deque(maxlen=period)
+        self._num = get_numeric_type()
+        self.value = self._num("0.0")
+        self._prices = Window(period, with_sum=True)
+        self._xy_sum = self._num("0.0")
 
-        self._x = range(1, period + 1)
-        self._x_sum = Decimal("0.5") * period * (period + 1)
-        self._x2_sum = self._x_sum * (2 * period + 1) / Decimal("3.0")
+        self._x_sum = self._num("0.5") * period * (period + 1)
+        self._x2_sum = self._x_sum * (2 * period + 1) / self._num("3.0")
         self._divisor = period * self._x2_sum - self._x_sum * self._x_sum
 
         self._t1 = period
@@ -41,19 +49,43 @@ class Lsma:
     def update(self, price: Decimal) -> Decimal:
         self._t = min(self._t + 1, self._t1)
 
-        self._prices.append(price)
+        self._push_price(self._num(price))
 
         if self._t >= self._t1:
-            self.value = self._linreg(self._prices)
+            self.value = self._linreg()
 
         return self.value
 
+    def compute(self, prices: np.ndarray) -> np.ndarray:
+        prices = as_array(prices)
+        n = len(prices)
+        result = np.zeros(n)
+        if n >= self._t1:
+            windows = sliding_window(prices, self._t1)
+            x_sum, x2_sum, divisor = float(self._x_sum), float(self._x2_sum), float(self._divisor)
+            y_sum = windows.sum(axis=1)
+            xy_sum = windows @ np.arange(1, self._t1 + 1, dtype=np.float64)
+            m = (self._t1 * xy_sum - x_sum * y_sum) / divisor
+            b = (y_sum * x2_sum - x_sum * xy_sum) / divisor
+            result[self._t1 - 1 :] = m * self._t1 + b
+            self.value = to_numeric(self._num, result[-1])
+        for price in prices[-self._t1 :]:
+            self._push_price(to_numeric(self._num, price))
+        self._t = min(n, self._t1)
+        return result
+
+    def _push_price(self, price: Decimal) -> None:
+        if self._prices.full:
+            # Every remaining price moves one position back and the new price takes the last one.
+            self._xy_sum += self._t1 * price - self._prices.sum
+        else:
+            self._xy_sum += (len(self._prices) + 1) * price
+        self._prices.append(price)
+
     # Ref:
     # https://github.com/twopirllc/pandas-ta/blob/development/pandas_ta/overlap/linreg.py
-    def _linreg(self, values: Sequence[Decimal]) -> Decimal:
-        y_sum = sum(values, Decimal("0.0"))
-        xy_sum = sum((a * b for a, b in zip(self._x, values)), Decimal("0.0"))
-
-        m = (self._t1 * xy_sum - self._x_sum * y_sum) / self._divisor
-        b = (y_sum * self._x2_sum - self._x_sum * xy_sum) / self._divisor
+    def _linreg(self) -> Decimal:
+        y_sum = self._prices.sum
+        m = (self._t1 * self._xy_sum - self._x_sum * y_sum) / self._divisor
+        b = (y_sum * self._x2_sum - self._x_sum * self._xy_sum) / self._divisor
         return m * self._t1 + b
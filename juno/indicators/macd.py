@@ -1,13 +1,17 @@
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import as_array, to_numeric
 from .ema import Ema
+from .numeric import get_numeric_type
 
 
 # Moving Average Convergence Divergence
 class Macd:
-    value: Decimal = Decimal("0.0")
-    signal: Decimal = Decimal("0.0")
-    histogram: Decimal = Decimal("0.0")
+    value: Decimal
+    signal: Decimal
+    histogram: Decimal
 
     _short_ema: Ema
     _long_ema: Ema
@@ -22,6 +26,8 @@ class Macd:
                 f"({short_period})"
             )
 
+        self.value = self.signal = self.histogram = get_numeric_type()("0.0")
+
         # A bit hacky but is what is usually expected.
         if short_period == 12 and long_period == 26:
             self._short_ema = Ema.with_smoothing(short_period, Decimal("0.15"))
@@ -51,3 +57,21 @@ class Macd:
             self.histogram = self.value - self.signal
 
         return self.value, self.signal, self.histogram
+
+    def compute(self, prices: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        prices = as_array(prices)
+        n = len(prices)
+        value, signal, histogram = np.zeros(n), np.zeros(n), np.zeros(n)
+
+        short = self._short_ema.compute(prices)
+        long = self._long_ema.compute(prices)
+        start = max(self._long_ema.maturity, self._short_ema.maturity) - 1
+        value[start:] = short[start:] - long[start:]
+        signal[start:] = self._signal_ema.compute(value[start:])
+        histogram[start:] = value[start:] - signal[start:]
+        if n > start:
+            num = type(self.value)
+            self.value = to_numeric(num, value[-1])
+            self.signal = to_numeric(num, signal[-1])
+            self.histogram = to_numeric(num, histogram[-1])
+        return value, signal, histogram
@@ -1,17 +1,29 @@
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right, insort
 from collections import deque
 from decimal import Decimal
-from statistics import median
 
-from more_itertools import pairwise
+import numpy as np
+
+from .batch import as_array, sliding_window, to_numeric
+from .numeric import NumericType, get_numeric_type
+
+# Number of windows for which medians are computed at once in batch computation.
+_CHUNK_SIZE = 1024
 
 
 # Market Meanness Index
 class Mmi:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
+    _num: NumericType
     _prices: deque[Decimal]
+    # Prices of the window in sorted order for the median.
+    _sorted_prices: list[Decimal]
+    # Sorted prices of the window which are higher / lower than their previous price.
+    _rising_prices: list[Decimal]
+    _falling_prices: list[Decimal]
 
     _t: int = 0
     _t1: int
@@ -21,7 +33,12 @@ class Mmi:
         if period < 1:
             raise ValueError(f"Invalid period ({period})")
 
+        self._num = get_numeric_type()
+        self.value = self._num("0.0")
         self._prices = deque(maxlen=period)
+        self._sorted_prices = []
+        self._rising_prices = []
+        self._falling_prices = []
 
         self._t1 = period
 
@@ -36,17 +53,69 @@ class Mmi:
     def update(self, price: Decimal) -> Decimal:
         self._t = min(self._t + 1, self._t1)
 
-        self._prices.append(price)
+        self._push_price(self._num(price))
 
         if self._t >= self._t1:
-            med = median(self._prices)
-            nh = 0
-            nl = 0
-            for prev_price, next_price in pairwise(self._prices):
-                if next_price > med and next_price > prev_price:
-                    nl += 1
-                if next_price < med and next_price < prev_price:
-                    nh += 1
-            self.value = Decimal("100.0") * (nl + nh) / (self._t1 - 1)
+            med = self._median()
+            nl = len(self._rising_prices) - bisect_right(self._rising_prices, med)
+            nh = bisect_left(self._falling_prices, med)
+            self.value = self._num("100.0") * (nl + nh) / (self._t1 - 1)
 
         return self.value
+
+    def compute(self, prices: np.ndarray) -> np.ndarray:
+        prices = as_array(prices)
+        n = len(prices)
+        result = np.zeros(n)
+        period = self._t1
+
+        windows = sliding_window(prices, period)
+        rising = windows[:, 1:] > windows[:, :-1]
+        falling = windows[:, 1:] < windows[:, :-1]
+        # Medians need a copy of the windows so they are computed in chunks to limit memory.
+        for start in range(0, len(windows), _CHUNK_SIZE):
+            chunk = slice(start, start + _CHUNK_SIZE)
+            med = np.median(windows[chunk], axis=1)[:, None]
+            nl = ((windows[chunk, 1:] > med) & rising[chunk]).sum(axis=1)
+            nh = ((windows[chunk, 1:] < med) & falling[chunk]).sum(axis=1)
+            result[start + period - 1 : start + period - 1 + len(med)] = (
+                100.0 * (nl + nh) / (period - 1)
+            )
+        if n >= period:
+            self.value = to_numeric(self._num, result[-1])
+
+        for price in prices[-period:]:
+            self._push_price(to_numeric(self._num, price))
+        self._t = min(n, self._t1)
+        return result
+
+    def _push_price(self, price: Decimal) -> None:
+        if len(self._prices) == self._t1:
+            oldest = self._prices.popleft()
+            _remove(self._sorted_prices, oldest)
+            # The next price no longer has a previous price in the window.
+            if len(self._prices) > 0:
+                next_ = self._prices[0]
+                if next_ > oldest:
+                    _remove(self._rising_prices, next_)
+                elif next_ < oldest:
+                    _remove(self._falling_prices, next_)
+        if len(self._prices) > 0:
+            last = self._prices[-1]
+            if price > last:
+                insort(self._rising_prices, price)
+            elif price < last:
+                insort(self._falling_prices, price)
+        insort(self._sorted_prices, price)
+        self._prices.append(price)
+
+    def _median(self) -> Decimal:
+        n = len(self._sorted_prices)
+        i = n // 2
+        if n % 2 == 1:
+            return self._sorted_prices[i]
+        return (self._sorted_prices[i - 1] + self._sorted_prices[i]) / 2
+
+
+def _remove(sorted_values: list[Decimal], value: Decimal) -> None:
+    del sorted_values[bisect_left(sorted_values, value)]
@@ -1,29 +1,38 @@
 from __future__ import annotations
 
-from collections import deque
 from decimal import Decimal
 
-from more_itertools import pairwise
+import numpy as np
+
+from .batch import as_array, rolling_sum, to_numeric
+from .numeric import NumericType, get_numeric_type
+from .window import Window
 
 
 # Momersion Indicator.
 # When the Momersion(n) indicator is below the 50% line, price action is dominated by
 # mean-reversion and when it is above it, it is dominated by momentum.
 class Momersion:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
-    _prev_price: Decimal = Decimal("0.0")
-    _returns: deque[Decimal]
+    _num: NumericType
+    _prev_price: Decimal
+    _prev_return: Decimal
+    # Whether each pair of consecutive returns has the same sign (1) or not (0).
+    _momentum: Window
 
     _t: int = 0
     _t1: int
 
     # Common period of 250.
     def __init__(self, period: int) -> None:
-        if period < 1:
+        # At least two returns are needed to compare.
+        if period < 3:
             raise ValueError(f"Invalid period ({period})")
 
-        self._returns = deque(maxlen=period - 1)
+        self._num = get_numeric_type()
+        self.value = self._prev_price = self._prev_return = self._num("0.0")
+        self._momentum = Window(period - 2, with_sum=True)
 
         self._t1 = period
 
@@ -36,20 +45,39 @@ class Momersion:
         return self._t >= self._t1
 
     def update(self, price: Decimal) -> Decimal:
+        price = self._num(price)
         self._t = min(self._t + 1, self._t1)
 
         if self._t > 1:
-            self._returns.append(price - self._prev_price)
+            ret = price - self._prev_price
+            if self._t > 2:
+                self._momentum.append(
+                    self._num("1.0") if self._prev_return * ret > 0 else self._num("0.0")
+                )
+            self._prev_return = ret
 
             if self.mature:
-                mc = 0
-                mrc = 0
-                for prev_ret, next_ret in pairwise(self._returns):
-                    if prev_ret * next_ret > 0:
-                        mc += 1
-                    else:
-                        mrc += 1
-                self.value = Decimal("100.0") * mc / (mc + mrc)
+                self.value = self._num("100.0") * self._momentum.sum / self._momentum.size
 
         self._prev_price = price
         return self.value
+
+    def compute(self, prices: np.ndarray) -> np.ndarray:
+        prices = as_array(prices)
+        n = len(prices)
+        result = np.zeros(n)
+        period = self._t1
+
+        returns = np.diff(prices)
+        momentum = (returns[1:] * returns[:-1] > 0).astype(np.float64)
+        if n >= period:
+            result[period - 1 :] = 100.0 * rolling_sum(momentum, period - 2) / (period - 2)
+            self.value = to_numeric(self._num, result[-1])
+
+        self._momentum.extend(to_numeric(self._num, m) for m in momentum[-(period - 2) :])
+        if n > 1:
+            self._prev_return = to_numeric(self._num, returns[-1])
+        if n > 0:
+            self._prev_price = to_numeric(self._num, prices[-1])
+        self._t = min(n, self._t1)
+        return result
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import math
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Iterator, Literal, TypeVar
+
+from juno.inspect import Constructor, GenericConstructor
+
+T = TypeVar("T")
+
+# Numeric backend used by indicators for their arithmetic. Decimal is exact and is the default.
+# Float is considerably faster and is meant for backtesting and optimization where small rounding
+# differences do not matter.
+Numeric = Literal["decimal", "float"]
+# Number type of a backend. Typed as `Decimal` so that indicators keep their annotations; with the
+# float backend, values are floats at runtime.
+NumericType = type[Decimal]
+
+_NUMERIC_TYPES: dict[str, NumericType] = {
+    "decimal": Decimal,
+    "float": float,  # type: ignore
+}
+
+_numeric_type: ContextVar[NumericType] = ContextVar("numeric_type", default=Decimal)
+
+
+def get_numeric_type() -> NumericType:
+    """Returns the number type of the current backend. Indicators capture it when constructed."""
+    return _numeric_type.get()
+
+
+@contextmanager
+def numeric(name: Numeric) -> Iterator[None]:
+    """Indicators constructed within the context use the given numeric backend."""
+    type_ = _NUMERIC_TYPES.get(name)
+    if type_ is None:
+        raise ValueError(f"Invalid numeric backend ({name})")
+    token = _numeric_type.set(type_)
+    try:
+        yield
+    finally:
+        _numeric_type.reset(token)
+
+
+def sqrt(value: Decimal) -> Decimal:
+    if isinstance(value, Decimal):
+        return value.sqrt()
+    # Float rounding may produce tiny negative values where the exact result is zero.
+    return math.sqrt(max(value, 0.0))  # type: ignore
+
+
+@dataclass(frozen=True)
+class NumericConstructor(Constructor[T]):
+    """Constructs a type (usually a strategy) with its indicators using a numeric backend."""
+
+    constructor: GenericConstructor[T]
+    numeric: Numeric = "float"
+
+    def construct(self) -> T:
+        with numeric(self.numeric):
+            return self.constructor.construct()
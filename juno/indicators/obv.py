@@ -1,14 +1,24 @@
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import as_array, to_numeric
+from .numeric import NumericType, get_numeric_type
+
 
 # On-Balance Volume
 class Obv:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
-    _last_price: Decimal = Decimal("0.0")
+    _num: NumericType
+    _last_price: Decimal
     _t: int = 0
     _t1: int = 1
 
+    def __init__(self) -> None:
+        self._num = get_numeric_type()
+        self.value = self._last_price = self._num("0.0")
+
     @property
     def maturity(self) -> int:
         return 0
@@ -18,12 +28,23 @@ class Obv:
         return True
 
     def update(self, price: Decimal, volume: Decimal) -> Decimal:
+        price = self._num(price)
         if self._t > 0:
             if price > self._last_price:
-                self.value += volume
+                self.value += self._num(volume)
             elif price < self._last_price:
-                self.value -= volume
+                self.value -= self._num(volume)
 
         self._last_price = price
         self._t = min(self._t + 1, self._t1)
         return self.value
+
+    def compute(self, prices: np.ndarray, volume: np.ndarray) -> np.ndarray:
+        prices = as_array(prices)
+        changes = np.sign(np.diff(prices)) * as_array(volume)[1:]
+        result = np.concatenate((np.zeros(min(len(prices), 1)), np.cumsum(changes)))
+        if len(prices) > 0:
+            self.value = to_numeric(self._num, result[-1])
+            self._last_price = to_numeric(self._num, prices[-1])
+        self._t = min(len(prices), self._t1)
+        return result
@@ -1,15 +1,22 @@
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import as_array, to_numeric
 from .ema import Ema
+from .numeric import NumericType, get_numeric_type
 
 
 class Obv2:
-    value: Decimal = Decimal("0.0")
-    ema: Decimal = Decimal("0.0")
+    value: Decimal
+    ema: Decimal
+    _num: NumericType
     _ema: Ema
-    _last_price: Decimal = Decimal("0.0")
+    _last_price: Decimal
 
     def __init__(self, period: int) -> None:
+        self._num = get_numeric_type()
+        self.value = self.ema = self._last_price = self._num("0.0")
         self._ema = Ema.with_com(period, adjust=True)
 
     @property
@@ -21,12 +28,25 @@ class Obv2:
         return True
 
     def update(self, price: Decimal, volume: Decimal) -> tuple[Decimal, Decimal]:
+        price = self._num(price)
         if price > self._last_price:
-            self.value += volume
+            self.value += self._num(volume)
         elif price < self._last_price:
-            self.value -= volume
+            self.value -= self._num(volume)
 
         self.ema = self._ema.update(self.value)
 
         self._last_price = price
         return self.value, self.ema
+
+    def compute(self, prices: np.ndarray, volume: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        prices = as_array(prices)
+        # The first price is compared against zero.
+        prev_prices = np.concatenate(([0.0], prices[:-1]))
+        value = np.cumsum(np.sign(prices - prev_prices) * as_array(volume))
+        ema = self._ema.compute(value)
+        if len(prices) > 0:
+            self.value = to_numeric(self._num, value[-1])
+            self.ema = to_numeric(self._num, ema[-1])
+            self._last_price = to_numeric(self._num, prices[-1])
+        return value, ema
@@ -1,12 +1,21 @@
 from decimal import Decimal
 
+import numpy as np
+
+from .numeric import get_numeric_type
+
 
 class PivotPoints:
-    value: Decimal = Decimal("0.0")
-    support1: Decimal = Decimal("0.0")
-    support2: Decimal = Decimal("0.0")
-    resistance1: Decimal = Decimal("0.0")
-    resistance2: Decimal = Decimal("0.0")
+    value: Decimal
+    support1: Decimal
+    support2: Decimal
+    resistance1: Decimal
+    resistance2: Decimal
+
+    def __init__(self) -> None:
+        zero = get_numeric_type()("0.0")
+        self.value = self.support1 = self.support2 = zero
+        self.resistance1 = self.resistance2 = zero
 
     @property
     def maturity(self) -> int:
@@ -24,3 +33,8 @@ class PivotPoints:
         self.support2 = self.value - diff
         self.resistance1 = 2 * self.value - low
         self.resistance2 = self.value + diff
+
+    def compute(
+        self, high: np.ndarray, low: np.ndarray, close: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        raise NotImplementedError()
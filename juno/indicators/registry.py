@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import pickle
+from typing import Any, Optional
+
+
+class IndicatorRegistry:
+    """
+    Deduplicates identical indicators used side by side, for example by many parameter sets of a
+    strategy backtested over the same candles. Indicators are shared through `SharedIndicator`
+    wrappers. Indicators of the same type and state which receive the same input on the same tick
+    are only updated once; the rest of the wrappers reuse the outputs.
+
+    Identical indicators must keep receiving identical inputs on every tick. An indicator diverging
+    from the ones it is shared with raises a `ValueError`.
+    """
+
+    def __init__(self) -> None:
+        self._tick = 0
+        self._entries: dict[tuple[bytes, tuple[Any, ...]], _Entry] = {}
+
+    @property
+    def size(self) -> int:
+        """Number of unique indicators being updated."""
+        return len(self._entries)
+
+    def share(self, indicator: Any) -> SharedIndicator:
+        return SharedIndicator(self, indicator)
+
+    def advance(self) -> None:
+        """Moves on to the next tick. Must be called before updating indicators with a new
+        input."""
+        self._tick += 1
+
+    def _bind(self, indicator: Any, inputs: tuple[Any, ...]) -> _Entry:
+        # An indicator joins another one which has the same state and received the same first
+        # input on the same tick. Otherwise it starts a new entry.
+        key = (pickle.dumps(indicator), inputs)
+        entry = self._entries.get(key)
+        if entry is None or entry.count != 1 or entry.tick != self._tick:
+            entry = _Entry(indicator)
+            self._entries[key] = entry
+        return entry
+
+
+class SharedIndicator:
+    """Wraps an indicator registered in an `IndicatorRegistry`. Behaves like the indicator."""
+
+    __slots__ = ("_registry", "_indicator", "_entry", "_count")
+
+    def __init__(self, registry: IndicatorRegistry, indicator: Any) -> None:
+        self._registry = registry
+        self._indicator = indicator
+        self._entry: Optional[_Entry] = None
+        self._count = 0
+
+    def update(self, *inputs: Any) -> Any:
+        entry = self._entry
+        if entry is None:
+            entry = self._entry = self._registry._bind(self._indicator, inputs)
+
+        tick = self._registry._tick
+        if entry.count == self._count:
+            entry.outputs = entry.indicator.update(*inputs)
+            entry.inputs = inputs
+            entry.tick = tick
+            entry.count += 1
+        elif entry.count != self._count + 1 or entry.tick != tick or entry.inputs != inputs:
+            raise ValueError(
+                f"Shared {type(self._indicator).__name__} indicator diverged from identical ones"
+            )
+        self._count += 1
+        return entry.outputs
+
+    def __getattr__(self, name: str) -> Any:
+        entry = self._entry
+        return getattr(self._indicator if entry is None else entry.indicator, name)
+
+
+class _Entry:
+    __slots__ = ("indicator", "count", "tick", "inputs", "outputs")
+
+    def __init__(self, indicator: Any) -> None:
+        self.indicator = indicator
+        self.count = 0  # Number of updates.
+        self.tick = 0  # Tick of the latest update.
+        self.inputs: tuple[Any, ...] = ()
+        self.outputs: Any = None
+
+
+def is_indicator(value: Any) -> bool:
+    """Whether the value is an indicator from this package which is not shared yet."""
+    return (
+        type(value).__module__.startswith(f"{__package__}.")
+        and not isinstance(value, SharedIndicator)
+        and callable(getattr(value, "update", None))
+    )
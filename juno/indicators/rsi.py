@@ -1,20 +1,27 @@
 from decimal import Decimal
 from typing import Iterable
 
+import numpy as np
+
+from .batch import as_array, to_numeric
+from .numeric import NumericType, get_numeric_type
 from .smma import Smma
 
 
 # Relative Strength Index
 class Rsi:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
+    _num: NumericType
     _mean_down: Smma
     _mean_up: Smma
-    _last_price: Decimal = Decimal("0.0")
+    _last_price: Decimal
     _t: int = 0
     _t1: int
 
     def __init__(self, period: int) -> None:
+        self._num = get_numeric_type()
+        self.value = self._last_price = self._num("0.0")
         self._mean_down = Smma(period)
         self._mean_up = Smma(period)
         self._t1 = period + 1
@@ -28,11 +35,12 @@ class Rsi:
         return self._t >= self._t1
 
     def update(self, price: Decimal) -> Decimal:
+        price = self._num(price)
         self._t = min(self._t + 1, self._t1)
 
         if self._t > 1:
-            up = Decimal("0.0")
-            down = Decimal("0.0")
+            up = self._num("0.0")
+            down = self._num("0.0")
             if price > self._last_price:
                 up = price - self._last_price
             elif price < self._last_price:
@@ -43,9 +51,9 @@ class Rsi:
 
             if self._t == self._t1:
                 if self._mean_down.value == 0 and self._mean_up.value != 0:
-                    self.value = Decimal("100.0")
+                    self.value = self._num("100.0")
                 elif self._mean_down.value == 0:
-                    self.value = Decimal("0.0")
+                    self.value = self._num("0.0")
                 else:
                     rs = self._mean_up.value / self._mean_down.value
                     self.value = 100 - (100 / (1 + rs))
@@ -53,6 +61,26 @@ class Rsi:
         self._last_price = price
         return self.value
 
+    def compute(self, prices: np.ndarray) -> np.ndarray:
+        prices = as_array(prices)
+        n = len(prices)
+        result = np.zeros(n)
+
+        diffs = np.diff(prices)
+        mean_up = self._mean_up.compute(np.maximum(diffs, 0.0))
+        mean_down = self._mean_down.compute(np.maximum(-diffs, 0.0))
+        if n >= self._t1:
+            up, down = mean_up[self._t1 - 2 :], mean_down[self._t1 - 2 :]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values = 100 - (100 / (1 + up / down))
+            result[self._t1 - 1 :] = np.where(down == 0, np.where(up != 0, 100.0, 0.0), values)
+            self.value = to_numeric(self._num, result[-1])
+
+        if n > 0:
+            self._last_price = to_numeric(self._num, prices[-1])
+        self._t = min(n, self._t1)
+        return result
+
     @staticmethod
     def for_period(prices: Iterable[Decimal], period: int) -> Decimal:
         rsi = Rsi(period)
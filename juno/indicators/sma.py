@@ -1,13 +1,18 @@
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import as_array, to_numeric
+from .numeric import NumericType, get_numeric_type
+from .window import Window
+
 
 # Simple Moving Average
 class Sma:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
-    _prices: list[Decimal]
-    _i: int = 0
-    _sum: Decimal = Decimal("0.0")
+    _num: NumericType
+    _prices: Window
     _t: int = 0
     _t1: int
 
@@ -15,7 +20,9 @@ class Sma:
         if period < 1:
             raise ValueError(f"Invalid period ({period})")
 
-        self._prices = [Decimal("0.0")] * period
+        self._num = get_numeric_type()
+        self.value = self._num("0.0")
+        self._prices = Window(period, with_sum=True)
         self._t1 = period
 
     @property
@@ -27,12 +34,28 @@ class Sma:
         return self._t >= self._t1
 
     def update(self, price: Decimal) -> Decimal:
+        price = self._num(price)
         self._t = min(self._t + 1, self._t1)
 
-        last = self._prices[self._i]
-        self._prices[self._i] = price
-        self._i = (self._i + 1) % len(self._prices)
-        self._sum = self._sum - last + price
-        self.value = self._sum / len(self._prices)
+        # Before the indicator is mature, the missing prices count as zeros.
+        self._prices.append(price)
+        self.value = self._prices.sum / self._t1
 
         return self.value
+
+    def compute(self, prices: np.ndarray) -> np.ndarray:
+        prices = as_array(prices)
+        n = len(prices)
+        period = self._t1
+        if n == 0:
+            return np.empty(0)
+
+        # Before the indicator is mature, the missing prices count as zeros.
+        cumsum = np.cumsum(prices)
+        sums = np.concatenate((cumsum[:period], cumsum[period:] - cumsum[:-period]))
+        result = sums / period
+
+        self._t = min(n, self._t1)
+        self._prices.extend(to_numeric(self._num, p) for p in prices[-period:])
+        self.value = to_numeric(self._num, result[-1])
+        return result
@@ -1,12 +1,17 @@
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import as_array, ewm, to_numeric
+from .numeric import NumericType, get_numeric_type
 from .sma import Sma
 
 
 # Smoothed Moving Average
 class Smma:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
+    _num: NumericType
     _sma: Sma
     _weight: int
     _t: int = 0
@@ -14,6 +19,8 @@ class Smma:
     _t2: int
 
     def __init__(self, period: int) -> None:
+        self._num = get_numeric_type()
+        self.value = self._num("0.0")
         self._sma = Sma(period)
         self._weight = period
         self._t1 = period
@@ -28,6 +35,7 @@ class Smma:
         return self._t >= self._t2
 
     def update(self, price: Decimal) -> Decimal:
+        price = self._num(price)
         self._t = min(self._t + 1, self._t2)
 
         if self._t <= self._t1:
@@ -39,3 +47,16 @@ class Smma:
             self.value = (self.value * (self._weight - 1) + price) / self._weight
 
         return self.value
+
+    def compute(self, prices: np.ndarray) -> np.ndarray:
+        prices = as_array(prices)
+        n = len(prices)
+        result = np.zeros(n)
+        sma = self._sma.compute(prices[: self._t1])
+        if n >= self._t1:
+            result[self._t1 - 1 :] = ewm(
+                np.concatenate((sma[-1:], prices[self._t1 :])), 1.0 / self._weight
+            )
+            self.value = to_numeric(self._num, result[-1])
+        self._t = min(n, self._t2)
+        return result
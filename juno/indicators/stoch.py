@@ -1,16 +1,22 @@
-from collections import deque
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import as_array, sliding_window, to_numeric
+from .numeric import NumericType, get_numeric_type
 from .sma import Sma
+from .window import Window
 
 
 # Full Stochastic Oscillator
 class Stoch:
-    k: Decimal = Decimal("0.0")
-    d: Decimal = Decimal("0.0")
+    k: Decimal
+    d: Decimal
+
+    _num: NumericType
 
-    _k_high_window: deque[Decimal]
-    _k_low_window: deque[Decimal]
+    _k_high_window: Window
+    _k_low_window: Window
 
     _k_sma: Sma
     _d_sma: Sma
@@ -24,8 +30,10 @@ class Stoch:
         if k_period < 1:
             raise ValueError(f"Invalid period ({k_period})")
 
-        self._k_high_window = deque(maxlen=k_period)
-        self._k_low_window = deque(maxlen=k_period)
+        self._num = get_numeric_type()
+        self.k = self.d = self._num("0.0")
+        self._k_high_window = Window(k_period, with_max=True)
+        self._k_low_window = Window(k_period, with_min=True)
 
         self._k_sma = Sma(k_sma_period)
         self._d_sma = Sma(d_sma_period)
@@ -45,13 +53,13 @@ class Stoch:
     def update(self, high: Decimal, low: Decimal, close: Decimal) -> tuple[Decimal, Decimal]:
         self._t = min(self._t + 1, self._t3)
 
-        self._k_high_window.append(high)
-        self._k_low_window.append(low)
+        self._k_high_window.append(self._num(high))
+        self._k_low_window.append(self._num(low))
 
         if self._t >= self._t1:
-            max_high = max(self._k_high_window)
-            min_low = min(self._k_low_window)
-            fast_k = 100 * (close - min_low) / (max_high - min_low)
+            max_high = self._k_high_window.max
+            min_low = self._k_low_window.min
+            fast_k = 100 * (self._num(close) - min_low) / (max_high - min_low)
 
             self._k_sma.update(fast_k)
 
@@ -63,3 +71,27 @@ class Stoch:
                 self.d = self._d_sma.value
 
         return self.k, self.d
+
+    def compute(
+        self, high: np.ndarray, low: np.ndarray, close: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        high, low, close = as_array(high), as_array(low), as_array(close)
+        n = len(close)
+        k, d = np.zeros(n), np.zeros(n)
+        k_period = self._t1
+
+        max_high = sliding_window(high, k_period).max(axis=1)
+        min_low = sliding_window(low, k_period).min(axis=1)
+        fast_k = 100 * (close[k_period - 1 :] - min_low) / (max_high - min_low)
+        k_sma = self._k_sma.compute(fast_k)
+        d_sma = self._d_sma.compute(k_sma[self._t2 - self._t1 :])
+        if n >= self._t3:
+            k[self._t3 - 1 :] = k_sma[self._t3 - self._t1 :]
+            d[self._t3 - 1 :] = d_sma[self._t3 - self._t2 :]
+            self.k = to_numeric(self._num, k[-1])
+            self.d = to_numeric(self._num, d[-1])
+
+        self._k_high_window.extend(to_numeric(self._num, v) for v in high[-k_period:])
+        self._k_low_window.extend(to_numeric(self._num, v) for v in low[-k_period:])
+        self._t = min(n, self._t3)
+        return k, d
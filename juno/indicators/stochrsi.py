@@ -1,19 +1,24 @@
 from __future__ import annotations
 
-from collections import deque
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import sliding_window, to_numeric
+from .numeric import NumericType, get_numeric_type
 from .rsi import Rsi
+from .window import Window
 
 
 # Stochastic Relative Strength Index
 class StochRsi:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
+    _num: NumericType
     _rsi: Rsi
-    _min: Decimal = Decimal("0.0")
-    _max: Decimal = Decimal("0.0")
-    _rsi_values: deque[Decimal]
+    _min: Decimal
+    _max: Decimal
+    _rsi_values: Window
     _t: int = 0
     _t1: int
     _t2: int
@@ -22,8 +27,10 @@ class StochRsi:
         if period < 2:
             raise ValueError(f"Invalid period ({period})")
 
+        self._num = get_numeric_type()
+        self.value = self._min = self._max = self._num("0.0")
         self._rsi = Rsi(period)
-        self._rsi_values = deque(maxlen=period)
+        self._rsi_values = Window(period, with_min=True, with_max=True)
         self._t1 = period + 1
         self._t2 = period * 2
 
@@ -44,12 +51,34 @@ class StochRsi:
             self._rsi_values.append(self._rsi.value)
 
         if self._t >= self._t2:
-            self._min = min(self._rsi_values)
-            self._max = max(self._rsi_values)
+            self._min = self._rsi_values.min
+            self._max = self._rsi_values.max
             diff = self._max - self._min
             if diff == 0:
-                self.value = Decimal("0.0")
+                self.value = self._num("0.0")
             else:
                 self.value = (self._rsi.value - self._min) / diff
 
         return self.value
+
+    def compute(self, prices: np.ndarray) -> np.ndarray:
+        rsi = self._rsi.compute(prices)
+        n = len(rsi)
+        result = np.zeros(n)
+        period = self._t2 - self._t1 + 1
+
+        rsi_values = rsi[self._t1 - 1 :]
+        if n >= self._t2:
+            windows = sliding_window(rsi_values, period)
+            min_, max_ = windows.min(axis=1), windows.max(axis=1)
+            diff = max_ - min_
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values = (rsi[self._t2 - 1 :] - min_) / diff
+            result[self._t2 - 1 :] = np.where(diff == 0, 0.0, values)
+            self._min = to_numeric(self._num, min_[-1])
+            self._max = to_numeric(self._num, max_[-1])
+            self.value = to_numeric(self._num, result[-1])
+
+        self._rsi_values.extend(to_numeric(self._num, v) for v in rsi_values[-period:])
+        self._t = min(n, self._t2)
+        return result
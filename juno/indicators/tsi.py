@@ -1,17 +1,22 @@
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import as_array, to_numeric
 from .ema2 import Ema2
+from .numeric import NumericType, get_numeric_type
 
 
 # True Strength Index
 class Tsi:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
+    _num: NumericType
     _pc_ema_smoothed: Ema2
     _pc_ema_dbl_smoothed: Ema2
     _abs_pc_ema_smoothed: Ema2
     _abs_pc_ema_dbl_smoothed: Ema2
-    _last_price: Decimal = Decimal("0.0")
+    _last_price: Decimal
     _t: int = 0
     _t1: int = 2
     _t2: int
@@ -19,6 +24,8 @@ class Tsi:
 
     # Common long: 25, short: 13
     def __init__(self, long_period: int, short_period: int) -> None:
+        self._num = get_numeric_type()
+        self.value = self._last_price = self._num("0.0")
         self._pc_ema_smoothed = Ema2(long_period)
         self._pc_ema_dbl_smoothed = Ema2(short_period)
         self._abs_pc_ema_smoothed = Ema2(long_period)
@@ -35,6 +42,7 @@ class Tsi:
         return self._t >= self._t3
 
     def update(self, price: Decimal) -> Decimal:
+        price = self._num(price)
         self._t = min(self._t + 1, self._t3)
 
         if self._t >= self._t1:
@@ -54,3 +62,23 @@ class Tsi:
 
         self._last_price = price
         return self.value
+
+    def compute(self, prices: np.ndarray) -> np.ndarray:
+        prices = as_array(prices)
+        n = len(prices)
+        result = np.zeros(n)
+
+        pc = np.diff(prices)
+        pc_ema = self._pc_ema_smoothed.compute(pc)
+        abs_pc_ema = self._abs_pc_ema_smoothed.compute(np.abs(pc))
+        pc_ema_dbl = self._pc_ema_dbl_smoothed.compute(pc_ema[self._t2 - 2 :])
+        abs_pc_ema_dbl = self._abs_pc_ema_dbl_smoothed.compute(abs_pc_ema[self._t2 - 2 :])
+        if n >= self._t3:
+            offset = self._t3 - self._t2
+            result[self._t3 - 1 :] = 100 * (pc_ema_dbl[offset:] / abs_pc_ema_dbl[offset:])
+            self.value = to_numeric(self._num, result[-1])
+
+        if n > 0:
+            self._last_price = to_numeric(self._num, prices[-1])
+        self._t = min(n, self._t3)
+        return result
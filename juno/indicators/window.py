@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from collections import deque
+from decimal import Decimal
+from typing import Iterable, Iterator, Optional
+
+from .numeric import get_numeric_type
+
+
+class Window:
+    """Ring buffer of the latest `size` values.
+
+    Optionally keeps a rolling sum, minimum and maximum of the values. Appending is O(1). The
+    minimum and maximum are kept in monotonic deques so they are amortized O(1) as well.
+    """
+
+    _size: int
+    _values: list[Decimal]
+    # Position of the oldest value in `_values` once the window is full.
+    _i: int = 0
+    # Number of values appended so far. Used to expire the extremes.
+    _t: int = 0
+
+    _sum: Optional[Decimal] = None
+    # Candidates for the extremes along with the time they were appended. Values of the minimum
+    # deque are increasing and values of the maximum deque decreasing.
+    _mins: Optional[deque[tuple[int, Decimal]]] = None
+    _maxs: Optional[deque[tuple[int, Decimal]]] = None
+
+    def __init__(
+        self, size: int, with_sum: bool = False, with_min: bool = False, with_max: bool = False
+    ) -> None:
+        if size < 1:
+            raise ValueError(f"Invalid size ({size})")
+
+        self._size = size
+        self._values = []
+        if with_sum:
+            self._sum = get_numeric_type()("0.0")
+        if with_min:
+            self._mins = deque()
+        if with_max:
+            self._maxs = deque()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def full(self) -> bool:
+        return len(self._values) == self._size
+
+    @property
+    def sum(self) -> Decimal:
+        assert self._sum is not None
+        return self._sum
+
+    @property
+    def min(self) -> Decimal:
+        assert self._mins is not None
+        return self._mins[0][1]
+
+    @property
+    def max(self) -> Decimal:
+        assert self._maxs is not None
+        return self._maxs[0][1]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getitem__(self, index: int) -> Decimal:
+        length = len(self._values)
+        if index < -length or index >= length:
+            raise IndexError("Window index out of range")
+        return self._values[(self._i + index) % length]
+
+    def __iter__(self) -> Iterator[Decimal]:
+        yield from self._values[self._i :]
+        yield from self._values[: self._i]
+
+    def append(self, value: Decimal) -> Optional[Decimal]:
+        """Appends a value. Returns the oldest value if it was evicted to make room."""
+        evicted = None
+        if len(self._values) < self._size:
+            self._values.append(value)
+        else:
+            evicted = self._values[self._i]
+            self._values[self._i] = value
+            self._i = (self._i + 1) % self._size
+
+        if self._sum is not None:
+            self._sum += value
+            if evicted is not None:
+                self._sum -= evicted
+
+        expired = self._t - self._size
+        if self._mins is not None:
+            while len(self._mins) > 0 and self._mins[-1][1] >= value:
+                self._mins.pop()
+            self._mins.append((self._t, value))
+            if self._mins[0][0] <= expired:
+                self._mins.popleft()
+        if self._maxs is not None:
+            while len(self._maxs) > 0 and self._maxs[-1][1] <= value:
+                self._maxs.pop()
+            self._maxs.append((self._t, value))
+            if self._maxs[0][0] <= expired:
+                self._maxs.popleft()
+
+        self._t += 1
+        return evicted
+
+    def extend(self, values: Iterable[Decimal]) -> None:
+        for value in values:
+            self.append(value)
@@ -1,12 +1,21 @@
-from collections import deque
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import as_array, sliding_window, to_numeric
+from .numeric import NumericType, get_numeric_type
+from .window import Window
+
 
 # Weighted Moving Average
 class Wma:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
-    _prices: deque[Decimal]
+    _num: NumericType
+    _prices: Window
+    # Sum of the prices weighted by their 1-based position in the window.
+    _weighted_sum: Decimal
+    _weight_sum: int
     _t: int = 0
     _t1: int
 
@@ -14,7 +23,11 @@ class Wma:
         if period < 1:
             raise ValueError(f"Invalid period ({period})")
 
-        self._prices = deque(maxlen=period)
+        self._num = get_numeric_type()
+        self.value = self._num("0.0")
+        self._prices = Window(period, with_sum=True)
+        self._weighted_sum = self._num("0.0")
+        self._weight_sum = period * (period + 1) // 2
         self._t1 = period
 
     @property
@@ -27,15 +40,30 @@ class Wma:
 
     def update(self, price: Decimal) -> Decimal:
         self._t = min(self._t + 1, self._t1)
-        self._prices.append(price)
+        self._push_price(self._num(price))
 
         if self._t >= self._t1:
-            norm = Decimal("0.0")
-            sum = Decimal("0.0")
-            for i in range(self._t1):
-                weight = (self._t1 - i) * self._t1
-                norm += weight
-                sum += self._prices[len(self._prices) - i - 1] * weight
-            self.value = sum / norm
+            self.value = self._weighted_sum / self._weight_sum
 
         return self.value
+
+    def compute(self, prices: np.ndarray) -> np.ndarray:
+        prices = as_array(prices)
+        n = len(prices)
+        result = np.zeros(n)
+        weights = np.arange(1, self._t1 + 1, dtype=np.float64)
+        if n >= self._t1:
+            result[self._t1 - 1 :] = sliding_window(prices, self._t1) @ (weights / weights.sum())
+            self.value = to_numeric(self._num, result[-1])
+        for price in prices[-self._t1 :]:
+            self._push_price(to_numeric(self._num, price))
+        self._t = min(n, self._t1)
+        return result
+
+    def _push_price(self, price: Decimal) -> None:
+        if self._prices.full:
+            # Every remaining price moves one position back and the new price takes the last one.
+            self._weighted_sum += self._t1 * price - self._prices.sum
+        else:
+            self._weighted_sum += (len(self._prices) + 1) * price
+        self._prices.append(price)
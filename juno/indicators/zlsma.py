@@ -1,12 +1,16 @@
 from decimal import Decimal
 
+import numpy as np
+
+from .batch import to_numeric
 from .lsma import Lsma
+from .numeric import get_numeric_type
 
 
 # Zero Lag least Square Moving Average
 # Ref: https://www.tradingview.com/script/3LGnSrQN-ZLSMA-Zero-Lag-LSMA/
 class Zlsma:
-    value: Decimal = Decimal("0.0")
+    value: Decimal
 
     _lsma: Lsma
     _lsma2: Lsma
@@ -19,6 +23,7 @@ class Zlsma:
         if period < 2:
             raise ValueError(f"Invalid period ({period})")
 
+        self.value = get_numeric_type()("0.0")
         self._period = period
         self._lsma = Lsma(period)
         self._lsma2 = Lsma(period)
@@ -44,3 +49,17 @@ class Zlsma:
                 self.value = lsma + eq
 
         return self.value
+
+    def compute(self, prices: np.ndarray) -> np.ndarray:
+        lsma = self._lsma.compute(prices)
+        n = len(lsma)
+        result = np.zeros(n)
+        period = self._lsma.maturity
+
+        lsma2 = self._lsma2.compute(lsma[period - 1 :])
+        if n >= self._t1:
+            eq = lsma[self._t1 - 1 :] - lsma2[period - 1 :]
+            result[self._t1 - 1 :] = lsma[self._t1 - 1 :] + eq
+            self.value = to_numeric(type(self.value), result[-1])
+        self._t = min(n, self._t1)
+        return result
@@ -304,6 +304,14 @@ class Discord(Plugin):
                     lang="json",
                 )
             )
+            if statistics := trader_ctx.instance.build_running_statistics(trader_ctx.state):
+                await send_message(
+                    format_message(
+                        "running statistics",
+                        json.dumps(serialization.config.serialize(statistics), indent=4),
+                        lang="json",
+                    )
+                )
             await asyncio.gather(
                 *(
                     self._send_open_position_status(ctx.channel.id, agent_type, agent_name, p)
@@ -56,6 +56,13 @@ def deserialize(value: Any, type_: Any) -> Any:
     if isenum(resolved_type):
         return type_(value)
 
+    if resolved_type is type:
+        return get_type_by_fully_qualified_name(value)
+
+    # Floats are parsed back as decimals from JSON.
+    if resolved_type is float and isinstance(value, Decimal):
+        return float(value)
+
     # Needs to be a list because type_ can be non-hashable for lookup in a set.
     if resolved_type in {bool, int, float, str, Decimal}:
         return value
@@ -153,6 +160,9 @@ def serialize(value: Any, type_: Any = None) -> Any:
     if isinstance(value, Enum):
         return value.value
 
+    if isinstance(value, type):
+        return get_fully_qualified_name(value)
+
     # Data class and regular class. We don't want to use `dataclasses.asdict` because it is
     # recursive in converting dataclasses.
     if (value_dict := getattr(value, "__dict__", None)) is not None:
@@ -2,12 +2,15 @@ from __future__ import annotations
 
 from .core import CoreStatistics
 from .extended import ExtendedStatistics
+from .running import RunningStatistics, RunningStatisticsSnapshot
 from .statistician import Statistician
 from .statistics import Statistics
 
 __all__ = [
     "CoreStatistics",
     "ExtendedStatistics",
+    "RunningStatistics",
+    "RunningStatisticsSnapshot",
     "Statistician",
     "Statistics",
 ]
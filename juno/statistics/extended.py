@@ -1,12 +1,10 @@
 from __future__ import annotations
 
-from collections import defaultdict
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Any, Callable
+from typing import Callable, Mapping, Sequence, Union
 
 import numpy as np
-import pandas as pd
 
 from juno import Asset, Interval, Interval_, Symbol_, Timestamp
 from juno.math import floor_multiple
@@ -15,6 +13,8 @@ from juno.trading import TradingSummary
 Operator = Callable[[Decimal, Decimal], Decimal]
 _SQRT_365 = np.sqrt(365)
 
+AssetPrices = Mapping[Asset, Union[Sequence[Decimal], np.ndarray]]
+
 
 @dataclass(frozen=True)
 class ExtendedStatistics:
@@ -32,7 +32,7 @@ class ExtendedStatistics:
     @staticmethod
     def compose(
         summary: TradingSummary,
-        asset_prices: dict[Asset, list[Decimal]],
+        asset_prices: AssetPrices,
         interval: Interval = Interval_.DAY,
         benchmark_asset: Asset = "btc",
     ) -> ExtendedStatistics:
@@ -50,115 +50,109 @@ class ExtendedStatistics:
                     f"Expected at least {num_ticks} price points for {asset} but got {len(prices)}"
                 )
 
-        trades = _get_trades_from_summary(summary, interval)
-        asset_performance = _get_asset_performance(
-            summary, start, end, asset_prices, trades, interval
-        )
-        portfolio_performance = pd.Series(
-            [float(sum(v for v in apd.values())) for apd in asset_performance]
-        )
-        benchmark_performance = pd.Series([float(p) for p in asset_prices[benchmark_asset]])
+        # Assets x ticks. The first tick is the opening price.
+        assets = list(asset_prices.keys())
+        price_matrix = np.array(
+            [np.asarray(asset_prices[a], dtype=np.float64)[: num_ticks + 1] for a in assets],
+            dtype=np.float64,
+        ).reshape(len(assets), -1)
+        holdings = _get_holdings(summary, assets, start, num_ticks, interval)
+        # Mark-to-market portfolio value of each tick.
+        portfolio_performance = np.einsum("ij,ij->j", holdings, price_matrix)
+        benchmark_performance = np.asarray(asset_prices[benchmark_asset], dtype=np.float64)
 
         return _calculate_statistics(portfolio_performance, benchmark_performance)
 
 
-def _get_trades_from_summary(
-    summary: TradingSummary, interval: Interval
-) -> dict[Timestamp, list[tuple[Asset, Decimal]]]:
-    trades: dict[Timestamp, list[tuple[Asset, Decimal]]] = defaultdict(list)
+def _get_holdings(
+    summary: TradingSummary,
+    assets: list[Asset],
+    start: Timestamp,
+    num_ticks: int,
+    interval: Interval,
+) -> np.ndarray:
+    asset_indices = {a: i for i, a in enumerate(assets)}
+
+    # Trades of a tick are applied before marking it to market. Since the first tick is the
+    # opening price, a trade at time `t` applies from tick `(t - start) // interval + 1` onwards.
+    rows: list[int] = []
+    cols: list[int] = []
+    sizes: list[float] = []
+
+    def add(asset: Asset, time: Timestamp, size: Decimal) -> None:
+        # Only holdings of priced assets are part of the portfolio.
+        if (row := asset_indices.get(asset)) is None:
+            return
+        col = (floor_multiple(time, interval) - start) // interval + 1
+        if 1 <= col <= num_ticks:
+            rows.append(row)
+            cols.append(col)
+            sizes.append(float(size))
+
     for pos in summary.positions:
         base_asset, quote_asset = Symbol_.assets(pos.symbol)
         # Open.
-        time = floor_multiple(pos.open_time, interval)
-        day_trades = trades[time]
-        day_trades.append((quote_asset, -pos.cost))
-        day_trades.append((base_asset, +pos.base_gain))
+        add(quote_asset, pos.open_time, -pos.cost)
+        add(base_asset, pos.open_time, +pos.base_gain)
         # Close.
-        time = floor_multiple(pos.close_time, interval)
-        day_trades = trades[time]
-        day_trades.append((base_asset, -pos.base_cost))
-        day_trades.append((quote_asset, +pos.gain))
-    return trades
-
-
-def _get_asset_performance(
-    summary: TradingSummary,
-    start_day: Timestamp,
-    end_day: Timestamp,
-    asset_prices: dict[Asset, list[Decimal]],
-    trades: dict[Timestamp, list[tuple[Asset, Decimal]]],
-    interval: Interval,
-) -> list[dict[str, Decimal]]:
-    asset_holdings: dict[str, Decimal] = defaultdict(lambda: Decimal("0.0"))
-    asset_holdings.update(summary.starting_assets)
-
-    asset_performance: list[dict[str, Decimal]] = []
+        add(base_asset, pos.close_time, -pos.base_cost)
+        add(quote_asset, pos.close_time, +pos.gain)
 
-    asset_performance.append(
-        _get_asset_performance_entry_from_holdings(asset_holdings, asset_prices, 0)
-    )
-
-    # Offset the open price, hence enumrate starting from 1.
-    for price_i, time_day in enumerate(range(start_day, end_day, interval), 1):
-        # Update holdings.
-        day_trades = trades.get(time_day)
-        if day_trades:
-            for asset, size in day_trades:
-                asset_holdings[asset] = asset_holdings[asset] + size
+    deltas = np.zeros((len(assets), num_ticks + 1), dtype=np.float64)
+    for asset, size in summary.starting_assets.items():
+        if (row := asset_indices.get(asset)) is not None:
+            deltas[row, 0] += float(size)
+    np.add.at(deltas, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), sizes)
+    return np.cumsum(deltas, axis=1)
 
-        # Update asset performance (mark-to-market portfolio).
-        asset_performance.append(
-            _get_asset_performance_entry_from_holdings(asset_holdings, asset_prices, price_i)
-        )
 
-    return asset_performance
+def _get_g_returns(performance: np.ndarray) -> np.ndarray:
+    # Log returns. Undefined ones are NaN but keep their position for pairing with the benchmark.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.log(performance[1:] / performance[:-1])
 
 
-def _get_asset_performance_entry_from_holdings(
-    asset_holdings: dict[Asset, Decimal], asset_prices: dict[Asset, list[Decimal]], price_i: int
-) -> dict[str, Decimal]:
-    asset_performance = {k: Decimal("0.0") for k in asset_prices.keys()}
-    for asset, prices in asset_prices.items():
-        asset_performance[asset] = asset_holdings[asset] * prices[price_i]
-    return asset_performance
+def _mean(values: np.ndarray) -> float:
+    values = values[~np.isnan(values)]
+    return float(values.mean()) if len(values) > 0 else np.nan
 
 
-def _get_g_returns(performance: pd.Series) -> Any:
-    a_returns = performance.pct_change().dropna()
-    return np.log(a_returns + 1)
+def _std(values: np.ndarray) -> float:
+    values = values[~np.isnan(values)]
+    return float(values.std()) if len(values) > 0 else np.nan
 
 
 def _calculate_statistics(
-    performance: pd.Series, benchmark_performance: pd.Series
+    performance: np.ndarray, benchmark_performance: np.ndarray
 ) -> ExtendedStatistics:
     g_returns = _get_g_returns(performance)
-    neg_g_returns = g_returns[g_returns < 0].dropna()
+    neg_g_returns = g_returns[g_returns < 0]
     benchmark_g_returns = _get_g_returns(benchmark_performance)
 
     # Compute statistics.
-    total_return = performance.iloc[-1] / performance.iloc[0] - 1
-    annualized_return = 365 * g_returns.mean()
-    annualized_volatility = _SQRT_365 * g_returns.std(ddof=0)
-    annualized_downside_risk = _SQRT_365 * neg_g_returns.std(ddof=0)
+    total_return = float(performance[-1] / performance[0] - 1)
+    annualized_return = 365 * _mean(g_returns)
+    annualized_volatility = float(_SQRT_365 * _std(g_returns))
+    annualized_downside_risk = float(_SQRT_365 * _std(neg_g_returns))
 
-    sharpe_ratio = (
-        annualized_return / annualized_volatility if annualized_volatility else Decimal("0.0")
-    )
+    sharpe_ratio = annualized_return / annualized_volatility if annualized_volatility else 0.0
     sortino_ratio = (
-        annualized_return / annualized_downside_risk
-        if annualized_downside_risk
-        else Decimal("0.0")
+        annualized_return / annualized_downside_risk if annualized_downside_risk else 0.0
     )
-    cagr = ((performance.iloc[-1] / performance.iloc[0]) ** (1 / (performance.size / 365))) - 1
+    cagr = float((performance[-1] / performance[0]) ** (1 / (performance.size / 365)) - 1)
 
-    # If benchmark provided, calculate alpha and beta.
+    # If benchmark provided, calculate alpha and beta. Returns are paired by tick; the benchmark
+    # may have more ticks than the portfolio.
     alpha, beta = 0.0, 0.0
-    covariance_matrix = pd.concat([g_returns, benchmark_g_returns], axis=1).dropna().cov(ddof=0)
-    y = covariance_matrix.iloc[1].iloc[1]
+    length = min(len(g_returns), len(benchmark_g_returns))
+    paired = np.stack((g_returns[:length], benchmark_g_returns[:length]))
+    paired = paired[:, ~np.isnan(paired).any(axis=0)]
+    covariance_matrix = np.cov(paired, ddof=0) if paired.shape[1] > 0 else np.full((2, 2), np.nan)
+    y = covariance_matrix[1, 1]
     if y != 0:
-        x = covariance_matrix.iloc[0].iloc[1]
-        beta = x / y
-        alpha = annualized_return - (beta * 365 * benchmark_g_returns.mean())
+        x = covariance_matrix[0, 1]
+        beta = float(x / y)
+        alpha = annualized_return - (beta * 365 * _mean(benchmark_g_returns))
 
     return ExtendedStatistics(
         total_return=total_return,
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Mapping
+
+from juno import Interval, Interval_, Symbol, Symbol_, Timestamp
+from juno.common import Fill
+from juno.trading import Position
+
+
+@dataclass(frozen=True)
+class RunningStatisticsSnapshot:
+    time: Timestamp  # Time of the latest equity sample.
+    equity: Decimal  # Mark-to-market value in quote asset.
+    total_return: float
+    annualized_return: float
+    annualized_volatility: float
+    annualized_downside_risk: float
+    sharpe_ratio: float
+    sortino_ratio: float
+    drawdown: float
+    max_drawdown: float
+    num_positions: int
+    num_positions_in_profit: int
+    num_positions_in_loss: int
+    num_open_positions: int
+
+
+class RunningStatistics:
+    """
+    Incrementally tracks the performance of a trading session. Fed with positions as they are
+    opened and closed and with prices as candles arrive. Every price update samples the
+    mark-to-market equity of the session.
+
+    Return moments are accumulated with Welford's algorithm and drawdowns against a running peak,
+    so that taking a snapshot costs the same regardless of how long the session has been running.
+    Returns are annualized the same way as in `ExtendedStatistics`, but from a sample per price
+    update instead of per day.
+
+    Updates are sampled on every candle of a backtest, so moments and drawdowns are kept in floats.
+    Samples of unchanged equity are only counted and merged into the moments in bulk.
+    """
+
+    _starting_quote: Decimal
+    _quote: Decimal
+    _periods_per_year: float
+    # Quote value and base amount of an open position per symbol.
+    _holdings: dict[Symbol, tuple[Decimal, Decimal]]
+    _prices: dict[Symbol, Decimal]
+
+    _time: Timestamp = 0
+    _equity: Decimal = Decimal("0.0")
+    _peak: Decimal = Decimal("0.0")
+    _max_drawdown: float = 0.0
+
+    # Welford accumulators of log returns and negative log returns.
+    _count: int = 0
+    _mean: float = 0.0
+    _m2: float = 0.0
+    _neg_count: int = 0
+    _neg_mean: float = 0.0
+    _neg_m2: float = 0.0
+    # Zero log returns not yet merged into the accumulators.
+    _zero_count: int = 0
+
+    _num_positions: int = 0
+    _num_positions_in_profit: int = 0
+    _num_positions_in_loss: int = 0
+
+    def __init__(self, quote: Decimal, interval: Interval = Interval_.DAY) -> None:
+        self._starting_quote = quote
+        self._quote = quote
+        self._periods_per_year = 365 * Interval_.DAY / interval
+        self._holdings = {}
+        self._prices = {}
+        self._equity = quote
+        self._peak = quote
+
+    @staticmethod
+    def restore(
+        quote: Decimal,
+        interval: Interval,
+        positions: list[Position.Closed],
+        open_positions: list[Position.Open],
+    ) -> RunningStatistics:
+        """
+        Rebuilds statistics from the positions of a session which did not keep them. Equity samples
+        are not available, so returns and drawdowns only cover the session from here on.
+        """
+        statistics = RunningStatistics(quote, interval)
+        for position in positions:
+            # Same as opening and closing the position.
+            statistics._quote -= position.cost
+            statistics._add_closed(position)
+        statistics._equity = statistics._peak = statistics._quote
+        for open_position in open_positions:
+            statistics.open_position(open_position)
+        return statistics
+
+    def open_position(self, position: Position.Open) -> None:
+        assert position.symbol not in self._holdings
+        self._quote -= position.cost
+        # Valued at the fill price until the next price update.
+        self._prices.setdefault(position.symbol, Fill.mean_price(position.fills))
+        if isinstance(position, Position.OpenLong):
+            self._holdings[position.symbol] = (Decimal("0.0"), position.base_gain)
+        else:
+            # The collateral and the proceeds of selling the borrowed amount are held until the
+            # borrowed amount is bought back.
+            base_asset, quote_asset = Symbol_.assets(position.symbol)
+            proceeds = _proceeds(position.fills, base_asset, quote_asset)
+            self._holdings[position.symbol] = (
+                position.collateral + proceeds,
+                -position.borrowed,
+            )
+
+    def close_position(self, position: Position.Closed) -> None:
+        del self._holdings[position.symbol]
+        self._add_closed(position)
+
+    def _add_closed(self, position: Position.Closed) -> None:
+        self._quote += position.gain
+        self._num_positions += 1
+        if position.profit >= 0:
+            self._num_positions_in_profit += 1
+        else:
+            self._num_positions_in_loss += 1
+
+    def update(self, time: Timestamp, prices: Mapping[Symbol, Decimal]) -> None:
+        """Updates the latest prices of symbols and samples the equity at the given time."""
+        self._prices.update(prices)
+        equity = self._mark_to_market()
+
+        previous = self._equity
+        self._time = time
+        if equity == previous:
+            # For example, while no position is open. Neither drawdown nor peak change.
+            if previous > 0:
+                self._zero_count += 1
+            return
+        self._equity = equity
+
+        # A log return is undefined once equity is gone, for example due to a short position
+        # losing more than its collateral.
+        if previous > 0 and equity > 0:
+            value = math.log(float(equity) / float(previous))
+            self._merge_zeros()
+            self._count, self._mean, self._m2 = _welford(self._count, self._mean, self._m2, value)
+            if value < 0:
+                self._neg_count, self._neg_mean, self._neg_m2 = _welford(
+                    self._neg_count, self._neg_mean, self._neg_m2, value
+                )
+
+        if equity > self._peak:
+            self._peak = equity
+        elif self._peak > 0:
+            self._max_drawdown = max(self._max_drawdown, 1 - float(equity) / float(self._peak))
+
+    def snapshot(self) -> RunningStatisticsSnapshot:
+        # Equity is revalued because positions may have been opened or closed since the latest
+        # sample.
+        equity = self._mark_to_market()
+        drawdown = (
+            1 - float(equity) / float(self._peak)
+            if self._peak > 0 and equity < self._peak
+            else 0.0
+        )
+
+        self._merge_zeros()
+        periods = self._periods_per_year
+        annualized_return = periods * self._mean
+        annualized_volatility = math.sqrt(periods * _variance(self._count, self._m2))
+        annualized_downside_risk = math.sqrt(periods * _variance(self._neg_count, self._neg_m2))
+
+        return RunningStatisticsSnapshot(
+            time=self._time,
+            equity=equity,
+            total_return=float(equity / self._starting_quote - 1),
+            annualized_return=annualized_return,
+            annualized_volatility=annualized_volatility,
+            annualized_downside_risk=annualized_downside_risk,
+            sharpe_ratio=(
+                annualized_return / annualized_volatility if annualized_volatility else 0.0
+            ),
+            sortino_ratio=(
+                annualized_return / annualized_downside_risk if annualized_downside_risk else 0.0
+            ),
+            drawdown=drawdown,
+            max_drawdown=max(self._max_drawdown, drawdown),
+            num_positions=self._num_positions,
+            num_positions_in_profit=self._num_positions_in_profit,
+            num_positions_in_loss=self._num_positions_in_loss,
+            num_open_positions=len(self._holdings),
+        )
+
+    def _merge_zeros(self) -> None:
+        # Same as a Welford update per zero, merged as a group of samples with zero mean and
+        # variance (Chan et al.). Zeros are not negative, so only the first moments change.
+        if self._zero_count == 0:
+            return
+        count = self._count + self._zero_count
+        delta = -self._mean
+        self._mean += delta * self._zero_count / count
+        self._m2 += delta * delta * self._count * self._zero_count / count
+        self._count = count
+        self._zero_count = 0
+
+    def _mark_to_market(self) -> Decimal:
+        equity = self._quote
+        for symbol, (quote, base) in self._holdings.items():
+            equity += quote
+            if base:
+                equity += base * self._prices[symbol]
+        return equity
+
+
+def _welford(count: int, mean: float, m2: float, value: float) -> tuple[int, float, float]:
+    count += 1
+    delta = value - mean
+    mean += delta / count
+    m2 += delta * (value - mean)
+    return count, mean, m2
+
+
+def _variance(count: int, m2: float) -> float:
+    # Population variance, same as `std(ddof=0)` in `ExtendedStatistics`.
+    return m2 / count if count > 0 else 0.0
+
+
+def _proceeds(fills: list[Fill], base_asset: str, quote_asset: str) -> Decimal:
+    result = Decimal("0.0")
+    for fill in fills:
+        result += fill.quote
+        if fill.fee_asset == quote_asset:
+            result -= fill.fee
+        elif fill.fee_asset == base_asset:
+            result -= fill.fee * fill.price
+    return result
@@ -31,7 +31,7 @@ class Statistician(AsyncContextManager):
             Symbol_.iter_assets(p.symbol for p in summary.positions),
             [benchmark_asset],
         )
-        prices = await self._prices.map_asset_prices(
+        prices = await self._prices.map_asset_price_matrix(
             exchange=exchange,
             assets=assets,
             start=summary.start,
@@ -42,7 +42,7 @@ class Statistician(AsyncContextManager):
 
         return Statistics.compose(
             summary=summary,
-            asset_prices=prices,
+            asset_prices=prices.as_dict(),
             interval=interval,
             benchmark_asset=benchmark_asset,
         )
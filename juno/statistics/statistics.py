@@ -1,13 +1,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from decimal import Decimal
 
 from juno import Interval, Interval_
 from juno.trading import TradingSummary
 
 from .core import CoreStatistics
-from .extended import ExtendedStatistics
+from .extended import AssetPrices, ExtendedStatistics
 
 
 @dataclass(frozen=True)
@@ -18,7 +17,7 @@ class Statistics:
     @staticmethod
     def compose(
         summary: TradingSummary,
-        asset_prices: dict[str, list[Decimal]],
+        asset_prices: AssetPrices,
         interval: Interval = Interval_.DAY,
         benchmark_asset: str = "btc",
     ) -> Statistics:
@@ -1,9 +1,14 @@
+from .columnar import Columnar
 from .memory import Memory
 from .sqlite import SQLite
-from .storage import Storage
+from .storage import Precision, Storage, get_field_precision, scale_decimals
 
 __all__ = [
+    "Columnar",
     "Memory",
+    "Precision",
     "SQLite",
     "Storage",
+    "get_field_precision",
+    "scale_decimals",
 ]
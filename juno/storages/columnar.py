@@ -0,0 +1,546 @@
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import logging
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from decimal import Decimal
+from pathlib import Path
+from threading import Lock
+from types import TracebackType
+from typing import (
+    Any,
+    AsyncIterable,
+    Callable,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    TypeVar,
+    get_type_hints,
+)
+
+import numpy as np
+
+from juno import Interval, Timestamp, Timestamp_
+from juno.inspect import isnamedtuple
+from juno.itertools import generate_missing_spans, merge_adjacent_spans
+from juno.path import home_path, load_json_file, save_json_file
+
+from .sqlite import SQLite
+from .storage import Precision, get_field_precision
+
+_log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_META_FILE = "meta.json"
+_LOCK_FILE = "write.lock"
+# Number of decimal places kept for decimal columns of newly created series. Matches the smallest
+# step size used by exchanges.
+_DECIMAL_PRECISION = 8
+# Number of rows converted to Python objects at once when materializing items.
+_MATERIALIZE_BATCH_SIZE = 4096
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+class Columnar(SQLite):
+    """
+    Stores time series as fixed-width columns in append-only memory-mapped files. Each field of
+    an item is kept in a separate file; decimals are stored as integers scaled by a per-column
+    precision. The precision is fixed when a series is created. If a batch contains a value which
+    cannot be represented exactly, such as a volume overflowing int64 at that precision, the whole
+    series is moved to SQLite and kept there. A small span index maps every stored span to its row
+    range in the column files. Writers take a file lock per series, so multiple processes can share
+    the same data.
+
+    Range queries binary search the time column of the overlapping spans and slice the mapped
+    files without copying. Items are only materialized when the stream is iterated.
+
+    Anything that is not a time series is stored in SQLite.
+    """
+
+    def __init__(
+        self, version: Optional[str] = None, decimal_precision: int = _DECIMAL_PRECISION
+    ) -> None:
+        super().__init__(version)
+        self._decimal_precision = decimal_precision
+        self._series: dict[Path, _Series] = {}
+        self._series_lock = Lock()
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        with self._series_lock:
+            self._series.clear()
+        await super().__aexit__(exc_type, exc, tb)
+
+    async def stream_time_series_spans(
+        self, shard: str, key: str, start: Timestamp = 0, end: Timestamp = Timestamp_.MAX_TIME
+    ) -> AsyncIterable[tuple[Timestamp, Timestamp]]:
+        def inner() -> Optional[list[tuple[Timestamp, Timestamp]]]:
+            _log.info(
+                f"streaming span(s) between {Timestamp_.format_span(start, end)} from shard "
+                f"{shard} {key}"
+            )
+            series = self._get_series(shard, key)
+            with series.lock:
+                meta = series.load_meta()
+            if meta is None:
+                return []
+            if meta.fallback:
+                return None
+            return [(s.start, s.end) for s in meta.spans if s.start < end and s.end > start]
+
+        spans = await asyncio.get_running_loop().run_in_executor(None, inner)
+        if spans is None:
+            async for span in super().stream_time_series_spans(shard, key, start, end):
+                yield span
+            return
+        for span_start, span_end in merge_adjacent_spans(spans):
+            yield max(span_start, start), min(span_end, end)
+
+    async def stream_time_series(
+        self,
+        shard: str,
+        key: str,
+        type_: type[T],
+        start: Timestamp = 0,
+        end: Timestamp = Timestamp_.MAX_TIME,
+    ) -> AsyncIterable[T]:
+        columns = await self._read_columns(shard, key, type_, start, end)
+        if columns is None:
+            return
+        if columns is _FALLBACK:
+            async for item in super().stream_time_series(shard, key, type_, start, end):
+                yield item
+            return
+        decoders = [
+            (array, _get_decoder(columns.precisions[name]))
+            for name, array in columns.arrays.items()
+        ]
+        length = len(columns.arrays["time"])
+        for i in range(0, length, _MATERIALIZE_BATCH_SIZE):
+            j = min(i + _MATERIALIZE_BATCH_SIZE, length)
+            values = [decode(array[i:j]) for array, decode in decoders]
+            for row in zip(*values):
+                yield type_(*row)
+
+    async def get_time_series_arrays(
+        self,
+        shard: str,
+        key: str,
+        type_: type[Any],
+        start: Timestamp,
+        end: Timestamp,
+        precision: Optional[Precision] = None,
+    ) -> dict[str, np.ndarray]:
+        columns = await self._read_columns(shard, key, type_, start, end)
+        if columns is _FALLBACK:
+            return await super().get_time_series_arrays(shard, key, type_, start, end, precision)
+        if columns is None:
+            return {
+                name: np.empty(
+                    0, dtype=_get_array_dtype(codec, get_field_precision(precision, name))
+                )
+                for name, codec in _get_fields(type_).items()
+            }
+        # Non-decimal columns and decimal columns already at the requested precision are returned
+        # as read-only views into the mapped files.
+        return {
+            name: _rescale_array(
+                array, columns.precisions[name], get_field_precision(precision, name)
+            )
+            for name, array in columns.arrays.items()
+        }
+
+    async def store_time_series_and_span(
+        self, shard: str, key: str, items: list[Any], start: Timestamp, end: Timestamp
+    ) -> None:
+        # Even if items list is empty, we still want to store a span for the period!
+        if len(items) > 0:
+            if start > items[0].time:
+                raise ValueError(f"Span start {start} bigger than first item time {items[0].time}")
+            if end <= items[-1].time:
+                raise ValueError(
+                    f"Span end {end} smaller than or equal to last item time {items[-1].time}"
+                )
+
+        def inner() -> Optional[list[tuple[Timestamp, Timestamp, list[Any]]]]:
+            # Returns spans and their items to move to SQLite if the series falls back to it.
+            series = self._get_series(shard, key)
+            with series.write_lock():
+                meta = series.load_meta() or _Meta()
+                if meta.fallback:
+                    return []
+                if len(items) > 0 and len(meta.columns) == 0:
+                    meta = _Meta.create(
+                        _get_fields(type(items[0])), meta.spans, self._decimal_precision
+                    )
+
+                existing_spans = [
+                    (s.start, s.end) for s in meta.spans if s.start < end and s.end > start
+                ]
+                missing_spans = list(
+                    generate_missing_spans(start, end, merge_adjacent_spans(existing_spans))
+                )
+                if len(missing_spans) == 0:
+                    return None
+
+                try:
+                    for mstart, mend in missing_spans:
+                        mitems = (
+                            items
+                            if len(existing_spans) == 0
+                            else [i for i in items if i.time >= mstart and i.time < mend]
+                        )
+                        _log.info(
+                            f"inserting {len(mitems)} item(s) between "
+                            f"{Timestamp_.format_span(mstart, mend)} to shard {shard} {key}"
+                        )
+                        series.append(meta, mitems)
+                        meta.add_span(_Span(mstart, mend, meta.length - len(mitems), len(mitems)))
+                except _Unrepresentable as exc:
+                    _log.warning(f"{exc}; moving shard {shard} {key} to sqlite")
+                    # Spans appended before the failing one are not committed to meta yet and
+                    # are stored to SQLite along with the rest of the batch.
+                    committed = series.load_meta() or _Meta()
+                    moved = series.read_spans(committed, type(items[0]))
+                    # Column files are left in place for readers which still have them mapped.
+                    committed.fallback = True
+                    series.save_meta(committed)
+                    return moved
+                series.save_meta(meta)
+                return None
+
+        moved = await asyncio.get_running_loop().run_in_executor(None, inner)
+        if moved is None:
+            return
+        for mstart, mend, mitems in moved:
+            await super().store_time_series_and_span(shard, key, mitems, mstart, mend)
+        await super().store_time_series_and_span(shard, key, items, start, end)
+
+    async def _read_columns(
+        self,
+        shard: str,
+        key: str,
+        type_: type[Any],
+        start: Timestamp,
+        end: Timestamp,
+    ) -> Any:
+        """
+        Returns raw column arrays for the items within the range. If the range is covered by a
+        single stored span, the arrays are views into the memory-mapped files. Returns `_FALLBACK`
+        if the series has been moved to SQLite.
+        """
+
+        def inner() -> Any:
+            _log.info(
+                f"streaming items between {Timestamp_.format_span(start, end)} from shard {shard} "
+                f"{key}"
+            )
+            series = self._get_series(shard, key)
+            with series.lock:
+                meta = series.load_meta()
+                if meta is None:
+                    return None
+                if meta.fallback:
+                    return _FALLBACK
+                if len(meta.columns) == 0:
+                    return None
+                if meta.columns.keys() != _get_fields(type_).keys():
+                    raise TypeError(f"Stored columns {list(meta.columns)} do not match {type_}")
+
+                times = series.map_column(meta, "time")
+                ranges = []
+                for span in meta.spans:
+                    if span.start >= end or span.end <= start or span.count == 0:
+                        continue
+                    segment = times[span.offset : span.offset + span.count]
+                    lo = span.offset + int(np.searchsorted(segment, start, side="left"))
+                    hi = span.offset + int(np.searchsorted(segment, end, side="left"))
+                    if hi > lo:
+                        ranges.append((lo, hi))
+
+                arrays = {}
+                for name in meta.columns.keys():
+                    column = series.map_column(meta, name)
+                    if len(ranges) == 0:
+                        arrays[name] = column[0:0]
+                    elif len(ranges) == 1:
+                        lo, hi = ranges[0]
+                        arrays[name] = column[lo:hi]
+                    else:
+                        arrays[name] = np.concatenate([column[lo:hi] for lo, hi in ranges])
+                return _Columns(arrays=arrays, precisions=dict(meta.columns))
+
+        return await asyncio.get_running_loop().run_in_executor(None, inner)
+
+    def _get_series(self, shard: str, key: str) -> _Series:
+        # The series directory is only created on write.
+        path = home_path("data") / f"{self._version}_{shard}" / key
+        with self._series_lock:
+            series = self._series.get(path)
+            if series is None:
+                series = _Series(path)
+                self._series[path] = series
+        return series
+
+
+# Returned when a series has been moved to SQLite.
+_FALLBACK = object()
+
+
+class _Unrepresentable(ValueError):
+    pass
+
+
+class _Columns(NamedTuple):
+    arrays: dict[str, np.ndarray]
+    # Decimal precision of a column or -1 if the column is not a scaled decimal.
+    precisions: dict[str, int]
+
+
+# Codec is a string describing how a field is stored:
+# - "i8" - 64-bit integer;
+# - "f8" - 64-bit float;
+# - "b1" - boolean;
+# - "d" - decimal scaled to a 64-bit integer.
+_TYPE_CODECS: dict[Any, str] = {
+    int: "i8",
+    Interval: "i8",
+    Timestamp: "i8",
+    float: "f8",
+    bool: "b1",
+    Decimal: "d",
+}
+
+
+def _get_fields(type_: type[Any]) -> dict[str, str]:
+    if not isnamedtuple(type_):
+        raise NotImplementedError(f"Columnar storage only supports named tuples; got {type_}")
+    result = {}
+    for name, field_type in get_type_hints(type_).items():
+        codec = _TYPE_CODECS.get(field_type)
+        if codec is None:
+            raise NotImplementedError(f"Missing column codec for {name} of type {field_type}")
+        result[name] = codec
+    if "time" not in result:
+        raise NotImplementedError(f"Time series type {type_} must have a time field")
+    return result
+
+
+def _get_dtype(codec: str) -> np.dtype:
+    return np.dtype("i8" if codec == "d" else codec)
+
+
+def _get_decoder(precision: int) -> Callable[[np.ndarray], list[Any]]:
+    if precision < 0:
+        return np.ndarray.tolist
+    return lambda array: [Decimal(v).scaleb(-precision) for v in array.tolist()]
+
+
+def _get_array_dtype(codec: str, precision: Optional[int]) -> np.dtype:
+    if codec == "d":
+        return np.dtype(np.float64 if precision is None else np.int64)
+    return _get_dtype(codec)
+
+
+def _rescale_array(array: np.ndarray, from_: int, to: Optional[int]) -> np.ndarray:
+    if from_ < 0:  # Not a decimal column.
+        return array
+    if to is None:
+        return array / float(10**from_)
+    if to == from_:
+        return array
+    if to > from_:
+        factor = 10 ** (to - from_)
+        if np.any(np.abs(array) > np.iinfo(np.int64).max // factor):
+            raise ValueError(f"Values with precision {to} do not fit into int64")
+        return array * factor
+    factor = 10 ** (from_ - to)
+    if np.any(array % factor):
+        raise ValueError(f"Values cannot be represented with precision {to}")
+    return array // factor
+
+
+def _get_decimal_places(value: Decimal) -> int:
+    exponent = value.as_tuple().exponent
+    if not isinstance(exponent, int):
+        raise ValueError(f"Cannot store non-finite value {value}")
+    return max(-exponent, 0)
+
+
+def _encode_decimals(values: Iterable[Decimal], precision: int) -> list[int]:
+    result = []
+    for value in values:
+        if _get_decimal_places(value.normalize()) > precision:
+            raise _Unrepresentable(
+                f"Value {value} cannot be represented with precision {precision}"
+            )
+        scaled = int(value.scaleb(precision))
+        if abs(scaled) > _INT64_MAX:
+            raise _Unrepresentable(
+                f"Value {value} with precision {precision} does not fit into int64"
+            )
+        result.append(scaled)
+    return result
+
+
+@dataclass
+class _Span:
+    start: Timestamp
+    end: Timestamp
+    offset: int  # Index of the first row in column files.
+    count: int  # Number of rows.
+
+
+@dataclass
+class _Meta:
+    # Column name to decimal precision (or -1 if not a decimal column). Insertion ordered by
+    # item fields.
+    columns: dict[str, int] = field(default_factory=dict)
+    codecs: dict[str, str] = field(default_factory=dict)
+    # Number of committed rows. Column files may contain more data if a write was interrupted.
+    length: int = 0
+    spans: list[_Span] = field(default_factory=list)
+    # Set once the series has been moved to SQLite.
+    fallback: bool = False
+
+    @staticmethod
+    def create(codecs: dict[str, str], spans: list[_Span], precision: int) -> _Meta:
+        return _Meta(
+            columns={name: (precision if codec == "d" else -1) for name, codec in codecs.items()},
+            codecs=codecs,
+            spans=spans,
+        )
+
+    def add_span(self, span: _Span) -> None:
+        # Spans are kept sorted by start. Adjacent spans which are also contiguous in the column
+        # files are merged to keep the index small.
+        spans = self.spans
+        i = 0
+        while i < len(spans) and spans[i].start < span.start:
+            i += 1
+        if i > 0:
+            prev = spans[i - 1]
+            if prev.end == span.start and prev.offset + prev.count == span.offset:
+                prev.end = span.end
+                prev.count += span.count
+                return
+        spans.insert(i, span)
+
+    @staticmethod
+    def from_json(value: dict[str, Any]) -> _Meta:
+        return _Meta(
+            columns=value["columns"],
+            codecs=value["codecs"],
+            length=value["length"],
+            spans=[_Span(*s) for s in value["spans"]],
+            fallback=value.get("fallback", False),
+        )
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "columns": self.columns,
+            "codecs": self.codecs,
+            "length": self.length,
+            "spans": [[s.start, s.end, s.offset, s.count] for s in self.spans],
+            "fallback": self.fallback,
+        }
+
+
+class _Series:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.lock = Lock()
+        self._maps: dict[str, np.memmap] = {}
+
+    @contextmanager
+    def write_lock(self) -> Iterator[None]:
+        # The thread lock guards the maps of this process while the file lock serializes writers
+        # across processes. Readers do not need the file lock: column data is synced before the
+        # meta file referencing it is atomically replaced.
+        with self.lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            with open(self.path / _LOCK_FILE, "wb") as f:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def load_meta(self) -> Optional[_Meta]:
+        meta_path = self.path / _META_FILE
+        if not meta_path.exists():
+            return None
+        return _Meta.from_json(load_json_file(str(meta_path)))
+
+    def save_meta(self, meta: _Meta) -> None:
+        meta_path = self.path / _META_FILE
+        tmp_path = self.path / f"{_META_FILE}.tmp"
+        save_json_file(meta.to_json(), str(tmp_path))
+        os.replace(tmp_path, meta_path)
+
+    def map_column(self, meta: _Meta, name: str) -> np.ndarray:
+        dtype = _get_dtype(meta.codecs[name])
+        if meta.length == 0:
+            return np.empty(0, dtype=dtype)
+        # Files only grow, so an existing map stays valid. We only remap when more rows have been
+        # committed than the current map covers.
+        mapped = self._maps.get(name)
+        if mapped is None or len(mapped) < meta.length:
+            mapped = np.memmap(
+                self._column_path(name), dtype=dtype, mode="r", shape=(meta.length,)
+            )
+            self._maps[name] = mapped
+        return mapped[: meta.length]
+
+    def read_spans(
+        self, meta: _Meta, type_: type[Any]
+    ) -> list[tuple[Timestamp, Timestamp, list[Any]]]:
+        decoders = [
+            (self.map_column(meta, name), _get_decoder(precision))
+            for name, precision in meta.columns.items()
+        ]
+        result = []
+        for span in meta.spans:
+            values = [
+                decode(array[span.offset : span.offset + span.count]) for array, decode in decoders
+            ]
+            result.append((span.start, span.end, [type_(*row) for row in zip(*values)]))
+        return result
+
+    def append(self, meta: _Meta, items: list[Any]) -> None:
+        if len(items) == 0:
+            return
+
+        # All columns are encoded before anything is written, so that a value which cannot be
+        # represented rejects the whole batch.
+        data = {}
+        for (name, precision), values in zip(meta.columns.items(), zip(*items)):
+            codec = meta.codecs[name]
+            if codec == "d":
+                data[name] = np.array(_encode_decimals(values, precision), dtype=np.int64)
+            else:
+                data[name] = np.array(values, dtype=_get_dtype(codec))
+        for name, array in data.items():
+            self._write(name, meta.length, array)
+        meta.length += len(items)
+
+    def _write(self, name: str, offset: int, data: np.ndarray) -> None:
+        # Truncate any uncommitted data left over from an interrupted write before appending.
+        path = self._column_path(name)
+        with open(path, "ab") as f:
+            f.truncate(offset * data.itemsize)
+            f.write(data.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _column_path(self, name: str) -> Path:
+        return self.path / f"{name}.bin"
@@ -1,11 +1,5 @@
-from __future__ import annotations
-
 import sqlite3
-from collections import defaultdict
-from contextlib import contextmanager
-from threading import Lock
-from types import TracebackType
-from typing import Iterator, Optional
+from typing import Optional
 
 from .sqlite import SQLite
 
@@ -13,38 +7,17 @@ from .sqlite import SQLite
 class Memory(SQLite):
     """In-memory data storage. Uses SQLite's memory mode for implementation."""
 
-    def __init__(self) -> None:
-        super().__init__()
-        self._conns: dict[str, _ConnectionContext] = defaultdict(_ConnectionContext)
-
-    async def __aenter__(self) -> Memory:
-        return self
-
-    async def __aexit__(
-        self,
-        exc_type: Optional[type[BaseException]],
-        exc: Optional[BaseException],
-        tb: Optional[TracebackType],
-    ) -> None:
-        for ctx in self._conns.values():
-            assert ctx.connection
-            ctx.connection.close()
-
-    @contextmanager
-    def _connect(self, shard: str) -> Iterator[sqlite3.Connection]:
-        ctx = self._conns[shard]
-        with ctx.lock:
-            if not ctx.connection:
-                conn = sqlite3.connect(
-                    ":memory:",
-                    detect_types=sqlite3.PARSE_DECLTYPES,
-                    check_same_thread=False,
-                )
-                ctx.connection = conn
-            yield ctx.connection
+    def __init__(self, version: Optional[str] = None) -> None:
+        # Every in-memory connection is a separate database, so all access goes through a single
+        # connection per shard.
+        super().__init__(version, max_readers=0)
 
+    def _has_shard(self, shard: str) -> bool:
+        return shard in self._conns
 
-class _ConnectionContext:
-    def __init__(self) -> None:
-        self.connection: Optional[sqlite3.Connection] = None
-        self.lock = Lock()
+    def _open(self, shard: str) -> sqlite3.Connection:
+        return sqlite3.connect(
+            ":memory:",
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+        )
@@ -1,13 +1,17 @@
+from __future__ import annotations
+
 import asyncio
 import logging
 import sqlite3
-from collections import defaultdict
-from contextlib import closing
+from contextlib import contextmanager
 from decimal import Decimal
+from pathlib import Path
+from threading import Condition, Lock
+from types import TracebackType
 from typing import (
     Any,
     AsyncIterable,
-    ContextManager,
+    Iterator,
     NamedTuple,
     Optional,
     TypeVar,
@@ -15,17 +19,33 @@ from typing import (
     get_type_hints,
 )
 
+import numpy as np
+
 from juno import Interval, Timestamp, Timestamp_, json, serialization
 from juno.itertools import generate_missing_spans, merge_adjacent_spans
 from juno.path import home_path
 
-from .storage import Storage
+from .storage import Precision, Storage, get_field_precision, scale_decimals
 
 _log = logging.getLogger(__name__)
 
 # Version should be incremented every time a storage schema changes.
 _VERSION = "v55"
 
+# Pragmas applied once when a shard connection is opened. WAL allows readers to proceed while a
+# write is in progress and, together with `synchronous=NORMAL`, avoids an fsync on every commit.
+# Negative `cache_size` is in KiB.
+_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -65_536,  # 64 MiB.
+    "mmap_size": 268_435_456,  # 256 MiB.
+    "temp_store": "MEMORY",
+}
+# Default number of read-only connections kept per shard. With WAL, readers do not block each
+# other nor the writer, so reads from executor threads can run in parallel.
+_MAX_READERS = 4
+
 T = TypeVar("T")
 
 Primitive = Union[bool, int, float, Decimal, str]
@@ -47,11 +67,36 @@ sqlite3.register_converter("BOOLEAN", lambda v: bool(int(v)))
 
 
 class SQLite(Storage):
-    def __init__(self, version: Optional[str] = None) -> None:
+    def __init__(self, version: Optional[str] = None, max_readers: int = _MAX_READERS) -> None:
         self._version = _VERSION if version is None else version
-        self._tables: dict[Any, set[str]] = defaultdict(set)
+        self._max_readers = max_readers
+        self._conns: dict[str, _ConnectionContext] = {}
+        self._conns_lock = Lock()
         _log.info(f"sqlite version: {sqlite3.sqlite_version}; schema version: {self._version}")
 
+    async def __aenter__(self) -> SQLite:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        with self._conns_lock:
+            ctxs = list(self._conns.values())
+            self._conns.clear()
+        for ctx in ctxs:
+            with ctx.lock:
+                if ctx.connection:
+                    ctx.connection.close()
+                    ctx.connection = None
+            with ctx.readers_cond:
+                for reader in ctx.readers:
+                    reader.close()
+                ctx.readers.clear()
+                ctx.reader_count = 0
+
     async def stream_time_series_spans(
         self, shard: str, key: str, start: Timestamp = 0, end: Timestamp = Timestamp_.MAX_TIME
     ) -> AsyncIterable[tuple[Timestamp, Timestamp]]:
@@ -60,9 +105,11 @@ class SQLite(Storage):
                 f"streaming span(s) between {Timestamp_.format_span(start, end)} from shard "
                 f"{shard} {key}"
             )
-            with self._connect(shard) as conn:
-                span_key = f"{key}_{_SPAN_KEY}"
-                self._ensure_table(conn, span_key, Span)
+            span_key = f"{key}_{_SPAN_KEY}"
+            if not self._has_shard(shard):
+                return []
+            self._ensure_table_exists(shard, span_key, Span)
+            with self._read(shard) as conn:
                 return conn.execute(
                     f"SELECT * FROM {span_key} WHERE start < ? AND end > ? ORDER BY start",
                     [end, start],
@@ -85,8 +132,10 @@ class SQLite(Storage):
                 f"streaming items between {Timestamp_.format_span(start, end)} from shard {shard} "
                 f"{key}"
             )
-            with self._connect(shard) as conn:
-                self._ensure_table(conn, key, type_)
+            if not self._has_shard(shard):
+                return []
+            self._ensure_table_exists(shard, key, type_)
+            with self._read(shard) as conn:
                 return conn.execute(
                     f"SELECT * FROM {key} WHERE time >= ? AND time < ? ORDER BY time",
                     [start, end],
@@ -96,6 +145,55 @@ class SQLite(Storage):
         for row in rows:
             yield serialization.raw.deserialize(row, type_)
 
+    async def get_time_series_arrays(
+        self,
+        shard: str,
+        key: str,
+        type_: type[Any],
+        start: Timestamp,
+        end: Timestamp,
+        precision: Optional[Precision] = None,
+    ) -> dict[str, np.ndarray]:
+        # Decimals are stored as text. Without a precision, we let SQLite cast them to floats so
+        # that no `Decimal` or item objects are constructed. With a precision, the decimals are
+        # read as is and scaled to integers exactly.
+        type_hints = get_type_hints(type_)
+        precisions = {name: get_field_precision(precision, name) for name in type_hints}
+        cols = [
+            (
+                f"CAST({name} AS REAL)"
+                if field_type is Decimal and precisions[name] is None
+                else name
+            )
+            for name, field_type in type_hints.items()
+        ]
+
+        def inner() -> list[tuple[Any, ...]]:
+            _log.info(
+                f"getting item arrays between {Timestamp_.format_span(start, end)} from shard "
+                f"{shard} {key}"
+            )
+            if not self._has_shard(shard):
+                return []
+            self._ensure_table_exists(shard, key, type_)
+            with self._read(shard) as conn:
+                return conn.execute(
+                    f'SELECT {", ".join(cols)} FROM {key} WHERE time >= ? AND time < ? '
+                    "ORDER BY time",
+                    [start, end],
+                ).fetchall()
+
+        rows = await asyncio.get_running_loop().run_in_executor(None, inner)
+        columns = list(zip(*rows)) if len(rows) > 0 else [() for _ in type_hints]
+        return {
+            name: (
+                scale_decimals(column, column_precision)
+                if field_type is Decimal and (column_precision := precisions[name]) is not None
+                else np.array(column, dtype=_type_to_dtype(field_type))
+            )
+            for (name, field_type), column in zip(type_hints.items(), columns)
+        }
+
     async def store_time_series_and_span(
         self, shard: str, key: str, items: list[Any], start: Timestamp, end: Timestamp
     ) -> None:
@@ -112,9 +210,9 @@ class SQLite(Storage):
         def inner() -> None:
             span_key = f"{key}_{_SPAN_KEY}"
             with self._connect(shard) as conn:
-                self._ensure_table(conn, span_key, Span)
+                self._ensure_table(shard, conn, span_key, Span)
                 if len(items) > 0:
-                    self._ensure_table(conn, key, type_)
+                    self._ensure_table(shard, conn, key, type_)
 
                 c = conn.cursor()
                 existing_spans = c.execute(
@@ -155,8 +253,10 @@ class SQLite(Storage):
     async def get(self, shard: str, key: str, type_: type[T]) -> Optional[T]:
         def inner() -> Optional[T]:
             _log.info(f"getting {key} from shard {shard}")
-            with self._connect(shard) as conn:
-                self._ensure_table(conn, _KEY_VALUE_PAIR_KEY, KeyValuePair)
+            if not self._has_shard(shard):
+                return None
+            self._ensure_table_exists(shard, _KEY_VALUE_PAIR_KEY, KeyValuePair)
+            with self._read(shard) as conn:
                 row = conn.execute(
                     f"SELECT * FROM {_KEY_VALUE_PAIR_KEY} WHERE key=? LIMIT 1", [key]
                 ).fetchone()
@@ -169,7 +269,7 @@ class SQLite(Storage):
             _log.info(f"setting {key} to shard {shard}")
             value = json.dumps(serialization.raw.serialize(item))
             with self._connect(shard) as conn:
-                self._ensure_table(conn, _KEY_VALUE_PAIR_KEY, KeyValuePair)
+                self._ensure_table(shard, conn, _KEY_VALUE_PAIR_KEY, KeyValuePair)
                 conn.execute(
                     f"INSERT OR REPLACE INTO {_KEY_VALUE_PAIR_KEY} VALUES (?, ?)",
                     [key, value],
@@ -178,19 +278,113 @@ class SQLite(Storage):
 
         await asyncio.get_running_loop().run_in_executor(None, inner)
 
-    def _connect(self, shard: str) -> ContextManager[sqlite3.Connection]:
-        path = str(home_path("data") / f"{self._version}_{shard}.db")
+    @contextmanager
+    def _connect(self, shard: str) -> Iterator[sqlite3.Connection]:
+        # A single writer connection is kept open per shard and shared between executor threads.
+        # Access to it is serialized through the shard lock. Any transaction left open by a
+        # failed write is rolled back so that a later commit on the shared connection does not
+        # persist partial data.
+        ctx = self._get_context(shard)
+        with ctx.lock:
+            if not ctx.connection:
+                ctx.connection = self._open(shard)
+            try:
+                yield ctx.connection
+            except BaseException:
+                ctx.connection.rollback()
+                raise
+
+    @contextmanager
+    def _read(self, shard: str) -> Iterator[sqlite3.Connection]:
+        # Reads are served from a small pool of connections so that they do not queue up behind
+        # each other or behind a write. Without readers, the writer connection is used.
+        if self._max_readers <= 0:
+            with self._connect(shard) as writer:
+                yield writer
+            return
+
+        ctx = self._get_context(shard)
+        conn: Optional[sqlite3.Connection]
+        with ctx.readers_cond:
+            while len(ctx.readers) == 0 and ctx.reader_count >= self._max_readers:
+                ctx.readers_cond.wait()
+            if len(ctx.readers) > 0:
+                conn = ctx.readers.pop()
+            else:
+                ctx.reader_count += 1
+                conn = None
+        try:
+            if conn is None:
+                conn = self._open(shard)
+            yield conn
+        except BaseException:
+            if conn is not None:
+                conn.rollback()
+            raise
+        finally:
+            with ctx.readers_cond:
+                if conn is None:
+                    ctx.reader_count -= 1
+                else:
+                    ctx.readers.append(conn)
+                ctx.readers_cond.notify()
+
+    def _get_context(self, shard: str) -> _ConnectionContext:
+        with self._conns_lock:
+            ctx = self._conns.get(shard)
+            if ctx is None:
+                ctx = _ConnectionContext()
+                self._conns[shard] = ctx
+            return ctx
+
+    def _has_shard(self, shard: str) -> bool:
+        # Reading from a shard which does not exist yet returns nothing instead of creating an
+        # empty database file.
+        return shard in self._conns or self._shard_path(shard).exists()
+
+    def _shard_path(self, shard: str) -> Path:
+        return home_path("data") / f"{self._version}_{shard}.db"
+
+    def _open(self, shard: str) -> sqlite3.Connection:
+        path = str(self._shard_path(shard))
         _log.debug(f"opening shard {path}")
-        return closing(sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES))
+        conn = sqlite3.connect(
+            path,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+        )
+        for name, value in _PRAGMAS.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
 
-    def _ensure_table(self, conn: sqlite3.Connection, name: str, type_: type[Any]) -> None:
-        tables = self._tables[conn]
+    def _ensure_table(
+        self, shard: str, conn: sqlite3.Connection, name: str, type_: type[Any]
+    ) -> None:
+        # Schema state is tracked per shard, so it survives connections being reopened.
+        tables = self._conns[shard].tables
         if name not in tables:
             c = conn.cursor()
             _create_table(c, type_, name)
             conn.commit()
             tables.add(name)
 
+    def _ensure_table_exists(self, shard: str, name: str, type_: type[Any]) -> None:
+        # Tables are created through the writer connection before reading.
+        if name not in self._get_context(shard).tables:
+            with self._connect(shard) as conn:
+                self._ensure_table(shard, conn, name, type_)
+
+
+class _ConnectionContext:
+    def __init__(self) -> None:
+        self.connection: Optional[sqlite3.Connection] = None
+        self.lock = Lock()
+        # Idle reader connections and the total number of readers opened.
+        self.readers: list[sqlite3.Connection] = []
+        self.reader_count = 0
+        self.readers_cond = Condition()
+        self.tables: set[str] = set()
+
 
 def _create_table(c: sqlite3.Cursor, type_: type[Any], name: str) -> None:
     type_hints = get_type_hints(type_)
@@ -234,6 +428,16 @@ def _create_table(c: sqlite3.Cursor, type_: type[Any], name: str) -> None:
         )
 
 
+def _type_to_dtype(type_: type[Primitive]) -> type[np.generic]:
+    if type_ in {Interval, Timestamp, int}:
+        return np.int64
+    if type_ in {float, Decimal}:
+        return np.float64
+    if type_ is bool:
+        return np.bool_
+    raise NotImplementedError(f"Missing array conversion for type {type_}")
+
+
 def _type_to_sql_type(type_: type[Primitive]) -> str:
     if type_ in {Interval, Timestamp, int}:
         return "INTEGER"
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any, AsyncIterable, Optional, TypeVar
+from decimal import Decimal
+from typing import Any, AsyncIterable, Iterable, Mapping, Optional, TypeVar, Union, get_type_hints
+
+import numpy as np
 
 from juno import Timestamp
 from juno.contextlib import AsyncContextManager
 
 T = TypeVar("T")
 
+# Decimal precision of time series arrays. Either a precision for all decimal fields or a precision
+# per field name. Decimal fields missing from the mapping are returned as float64.
+Precision = Union[int, Mapping[str, int]]
+
 
 class Storage(AsyncContextManager, ABC):
     @abstractmethod
@@ -22,6 +29,33 @@ class Storage(AsyncContextManager, ABC):
     ) -> AsyncIterable[T]:
         yield  # type: ignore
 
+    async def get_time_series_arrays(
+        self,
+        shard: str,
+        key: str,
+        type_: type[Any],
+        start: Timestamp,
+        end: Timestamp,
+        precision: Optional[Precision] = None,
+    ) -> dict[str, np.ndarray]:
+        """
+        Returns a NumPy array per field of the time series items within the range. Decimal fields
+        are returned as float64 or, if precision is specified for the field, as int64 scaled by
+        `10 ** precision`.
+
+        Default implementation materializes the items. Storages should override it to build the
+        arrays without constructing individual items.
+        """
+        type_hints = get_type_hints(type_)
+        values: list[list[Any]] = [[] for _ in type_hints]
+        async for item in self.stream_time_series(shard, key, type_, start, end):
+            for column, value in zip(values, item):
+                column.append(value)
+        return {
+            name: _to_array(column, field_type, get_field_precision(precision, name))
+            for (name, field_type), column in zip(type_hints.items(), values)
+        }
+
     @abstractmethod
     async def store_time_series_and_span(
         self, shard: str, key: str, items: list[Any], start: Timestamp, end: Timestamp
@@ -39,3 +73,37 @@ class Storage(AsyncContextManager, ABC):
     @staticmethod
     def key(*items: Any) -> str:
         return "_".join(map(str, items))
+
+
+def get_field_precision(precision: Optional[Precision], name: str) -> Optional[int]:
+    if precision is None or isinstance(precision, int):
+        return precision
+    return precision.get(name)
+
+
+def scale_decimals(values: Iterable[Decimal], precision: int) -> np.ndarray:
+    """Scales decimals to int64 by `10 ** precision`. Raises `ValueError` instead of truncating a
+    value with more decimal places than the precision or overflowing int64."""
+    result = []
+    for value in values:
+        scaled = value.scaleb(precision)
+        integral = int(scaled)
+        if integral != scaled:
+            raise ValueError(f"Value {value} cannot be represented with precision {precision}")
+        result.append(integral)
+    try:
+        return np.array(result, dtype=np.int64)
+    except OverflowError as exc:
+        raise ValueError(f"Values with precision {precision} do not fit into int64") from exc
+
+
+def _to_array(values: list[Any], type_: Any, precision: Optional[int]) -> np.ndarray:
+    if type_ is Decimal:
+        if precision is None:
+            return np.array(values, dtype=np.float64)
+        return scale_decimals(values, precision)
+    if type_ is float:
+        return np.array(values, dtype=np.float64)
+    if type_ is bool:
+        return np.array(values, dtype=np.bool_)
+    return np.array(values, dtype=np.int64)
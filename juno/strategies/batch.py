@@ -0,0 +1,56 @@
+from decimal import Decimal
+from typing import Optional
+
+import numpy as np
+
+from juno import Advice
+
+# Helpers for the batch `compute` methods of signal strategies.
+#
+# `compute` takes whole candle arrays of a fresh strategy and returns an advice array of the same
+# length. Element `i` matches `advice` after the `i`-th candle was passed to `update`. Afterwards,
+# the strategy is in the same state as if all candles had been passed to `update`.
+
+ADVICE_DTYPE = np.int8
+
+
+def mature_mask(maturity: int, length: int) -> np.ndarray:
+    """Whether something with the given maturity is mature after each of `length` updates."""
+    return np.arange(1, length + 1) >= maturity
+
+
+def sticky_advice(
+    long: np.ndarray,
+    short: np.ndarray,
+    liquidate_long: Optional[np.ndarray] = None,
+    liquidate_short: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Advice of a strategy which keeps its last advice until a new one is signaled. Long takes
+    precedence over short. Liquidation conditions only apply while the position they liquidate is
+    being advised and take effect the first time they hold after it was signaled."""
+    length = len(long)
+    signaled = long | short
+    values = np.where(long, Advice.LONG, Advice.SHORT).astype(ADVICE_DTYPE)
+    # Index of the latest signal at or before each element, -1 before the first one.
+    last = np.maximum.accumulate(np.where(signaled, np.arange(length), -1))
+    result = np.where(last >= 0, values[np.maximum(last, 0)], Advice.NONE).astype(ADVICE_DTYPE)
+
+    if liquidate_long is None and liquidate_short is None:
+        return result
+
+    liquidate = np.zeros(length, dtype=bool)
+    if liquidate_long is not None:
+        liquidate |= (result == Advice.LONG) & liquidate_long
+    if liquidate_short is not None:
+        liquidate |= (result == Advice.SHORT) & liquidate_short
+    liquidate &= ~signaled
+    # Liquidated once the condition held at least once since the latest signal.
+    count = np.cumsum(liquidate)
+    since_signal = count - np.where(last >= 0, count[np.maximum(last, 0)], 0)
+    result[since_signal > 0] = Advice.LIQUIDATE
+    return result
+
+
+def to_decimal(value: float) -> Decimal:
+    """Converts a batch input back to the decimal type of candle prices."""
+    return Decimal(repr(float(value)))
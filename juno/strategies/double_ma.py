@@ -3,11 +3,15 @@ from __future__ import annotations
 import operator
 from dataclasses import dataclass
 
+import numpy as np
+
 from juno import Advice, Candle, CandleMeta, indicators
+from juno.components.chandler import CandleArrays
 from juno.constraints import Int, Pair
 from juno.indicators import MA, Ema
 from juno.inspect import Constructor, get_module_type
 
+from .batch import mature_mask, sticky_advice
 from .strategy import Signal, Strategy, ma_choices
 
 
@@ -79,3 +83,14 @@ class DoubleMA(Signal):
                 self._advice = Advice.LONG
             elif self._short_ma.value < self._long_ma.value:
                 self._advice = Advice.SHORT
+
+    def compute(self, candles: CandleArrays) -> np.ndarray:
+        short = self._short_ma.compute(candles.close)
+        long = self._long_ma.compute(candles.close)
+        mature = mature_mask(self._short_ma.maturity, len(short)) & mature_mask(
+            self._long_ma.maturity, len(long)
+        )
+        result = sticky_advice(mature & (short >= long), mature & (short < long))
+        if len(result) > 0:
+            self._advice = Advice(result[-1])
+        return result
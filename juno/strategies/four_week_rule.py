@@ -4,12 +4,17 @@ from collections import deque
 from dataclasses import dataclass
 from decimal import Decimal
 
+import numpy as np
+
 from juno import Advice, Candle, CandleMeta, indicators
+from juno.components.chandler import CandleArrays
 from juno.constraints import Int
 from juno.indicators import MA
+from juno.indicators.batch import as_array, rolling_max, rolling_min
 from juno.inspect import Constructor, get_module_type
 from juno.math import minmax
 
+from .batch import mature_mask, sticky_advice, to_decimal
 from .strategy import Signal, Strategy, ma_choices
 
 
@@ -87,3 +92,24 @@ class FourWeekRule(Signal):
                 self._advice = Advice.LIQUIDATE
 
         self._prices.append(candle.close)
+
+    def compute(self, candles: CandleArrays) -> np.ndarray:
+        close = as_array(candles.close)
+        ma = self._ma.compute(close)
+        length = len(close)
+        # Highest and lowest of the previous closes, excluding the current one.
+        period = self._t1 - 1
+        highest = np.concatenate(([np.nan], rolling_max(close, period)[:-1]))[:length]
+        lowest = np.concatenate(([np.nan], rolling_min(close, period)[:-1]))[:length]
+        mature = mature_mask(self._t1, length)
+        result = sticky_advice(
+            long=mature & (close >= highest),
+            short=mature & (close <= lowest),
+            liquidate_long=mature & (close <= ma),
+            liquidate_short=mature & (close >= ma),
+        )
+        self._t = min(length, self._t1)
+        self._prices.extend(map(to_decimal, close[-period:]))
+        if length > 0:
+            self._advice = Advice(result[-1])
+        return result
@@ -3,11 +3,16 @@ from __future__ import annotations
 from dataclasses import dataclass
 from decimal import Decimal
 
+import numpy as np
+
 from juno import Advice, Candle, CandleMeta, indicators
+from juno.components.chandler import CandleArrays
 from juno.constraints import Int
 from juno.indicators import MA, Ema2
+from juno.indicators.batch import as_array
 from juno.inspect import Constructor, get_module_type
 
+from .batch import mature_mask, sticky_advice
 from .strategy import Signal, Strategy, ma_choices
 
 
@@ -75,3 +80,19 @@ class SingleMA(Signal):
                 self._advice = Advice.SHORT
 
         self._previous_ma_value = self._ma.value
+
+    def compute(self, candles: CandleArrays) -> np.ndarray:
+        close = as_array(candles.close)
+        ma = self._ma.compute(close)
+        length = len(ma)
+        previous_ma = np.concatenate(([float(self._previous_ma_value)], ma[:-1]))
+        mature = mature_mask(self._t1, length)
+        result = sticky_advice(
+            long=mature & (close > ma) & (ma > previous_ma),
+            short=mature & (close < ma) & (ma < previous_ma),
+        )
+        self._t = min(length, self._t1)
+        if length > 0:
+            self._previous_ma_value = self._ma.value
+            self._advice = Advice(result[-1])
+        return result
@@ -5,10 +5,14 @@ from dataclasses import dataclass, field
 from enum import IntEnum
 from typing import Any, Optional, Union
 
+import numpy as np
+
 from juno import Advice, Candle
 from juno.common import CandleMeta
+from juno.components.chandler import CandleArrays
 from juno.constraints import Choice, Constraint
 from juno.indicators import Alma, Dema, Ema, Ema2, Kama, Sma, Smma
+from juno.indicators.registry import IndicatorRegistry, is_indicator
 
 
 class MidTrendPolicy(IntEnum):
@@ -179,6 +183,15 @@ class Strategy(ABC):
     def update(self, candle: Candle, meta: CandleMeta) -> None:
         pass
 
+    def share_indicators(self, registry: IndicatorRegistry) -> None:
+        """Replaces the indicators of the strategy, including the ones of nested strategies, with
+        ones shared through the registry."""
+        for name, value in list(vars(self).items()):
+            if is_indicator(value):
+                setattr(self, name, registry.share(value))
+            elif isinstance(value, Strategy):
+                value.share_indicators(registry)
+
     @staticmethod
     def validate_constraints(type_: type[Strategy], *args: Any) -> None:
         # Assumes ordered.
@@ -206,6 +219,12 @@ class Signal(Strategy):
     def advice(self) -> Advice:
         pass
 
+    def compute(self, candles: CandleArrays) -> np.ndarray:
+        """Computes the advice after each of the candles of a fresh strategy in one pass. Prices
+        are expected as float64. Leaves the strategy in the same state as if the candles had been
+        passed to `update`. Only supported by some strategies."""
+        raise NotImplementedError(f"{type(self).__name__} does not support batch computation")
+
 
 class Oscillator(Strategy):
     @property
@@ -3,11 +3,15 @@ from __future__ import annotations
 import operator
 from dataclasses import dataclass
 
+import numpy as np
+
 from juno import Advice, Candle, CandleMeta, indicators
+from juno.components.chandler import CandleArrays
 from juno.constraints import Int, Triple
 from juno.indicators import MA, Ema
 from juno.inspect import Constructor, get_module_type
 
+from .batch import mature_mask, sticky_advice
 from .strategy import Signal, Strategy, ma_choices
 
 
@@ -113,3 +117,23 @@ class TripleMA(Signal):
                 and self._short_ma.value < self._long_ma.value
             ):
                 self._advice = Advice.LIQUIDATE
+
+    def compute(self, candles: CandleArrays) -> np.ndarray:
+        short = self._short_ma.compute(candles.close)
+        medium = self._medium_ma.compute(candles.close)
+        long = self._long_ma.compute(candles.close)
+        length = len(short)
+        mature = (
+            mature_mask(self._short_ma.maturity, length)
+            & mature_mask(self._medium_ma.maturity, length)
+            & mature_mask(self._long_ma.maturity, length)
+        )
+        result = sticky_advice(
+            long=mature & (short > medium) & (medium > long),
+            short=mature & (short < medium) & (medium < long),
+            liquidate_long=mature & (short < medium) & (short < long),
+            liquidate_short=mature & (short > medium) & (short > long),
+        )
+        if length > 0:
+            self._advice = Advice(result[-1])
+        return result
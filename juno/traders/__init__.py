@@ -1,6 +1,7 @@
 from .basic import Basic, BasicConfig, BasicState
 from .multi import Multi, MultiConfig, MultiState
 from .trader import Trader
+from .vectorized import Vectorized, VectorizedSummary
 
 __all__ = [
     "Basic",
@@ -10,4 +11,6 @@ __all__ = [
     "MultiConfig",
     "MultiState",
     "Trader",
+    "Vectorized",
+    "VectorizedSummary",
 ]
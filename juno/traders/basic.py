@@ -2,9 +2,11 @@ import asyncio
 import logging
 from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import Awaitable, Callable, Literal, Optional, TypeVar, Union
+from typing import AsyncIterable, Callable, Iterable, Literal, Optional, TypeVar, Union
 from uuid import uuid4
 
+from asyncstdlib import list as list_async
+
 from juno import (
     Advice,
     BadOrder,
@@ -22,8 +24,10 @@ from juno.common import CandleMeta
 from juno.components import Chandler, Events, Informant, Orderbook, User
 from juno.custodians import Custodian, Stub
 from juno.exchanges import Exchange
+from juno.indicators.registry import IndicatorRegistry
 from juno.inspect import Constructor
 from juno.positioner import Positioner, SimulatedPositioner
+from juno.statistics import RunningStatistics, RunningStatisticsSnapshot
 from juno.stop_loss import Noop as NoopStopLoss
 from juno.stop_loss import StopLoss
 from juno.strategies import Changed, Signal
@@ -87,10 +91,19 @@ class BasicState:
     open_position: Optional[Position.Open] = None
     first_candle: Optional[Candle] = None
     last_candle: Optional[Candle] = None
+    # Rebuilt from positions if missing, for example for states persisted before statistics were
+    # kept.
+    statistics: Optional[RunningStatistics] = None
 
     id: str = field(default_factory=lambda: str(uuid4()))
     running: bool = False
 
+    def __post_init__(self) -> None:
+        if self.statistics is None:
+            self.statistics = RunningStatistics.restore(
+                self.starting_quote, self.config.interval, self.positions, self.open_positions
+            )
+
     @property
     def open_positions(self) -> list[Position.Open]:
         return [self.open_position] if self.open_position else []
@@ -254,6 +267,11 @@ class Basic(Trader[BasicConfig, BasicState], StartMixin):
 
     async def run(self, state: BasicState) -> TradingSummary:
         config = state.config
+        # Without anyone listening to trader events, a backtest has no reason to go through the
+        # event loop for every candle. Such candles are processed synchronously.
+        synchronous = config.mode is TradingMode.BACKTEST and not self._events.has_handlers(
+            config.channel, "candle", "positions_opened", "positions_closed"
+        )
 
         self._queues[state.id] = asyncio.Queue()
         state.running = True
@@ -261,16 +279,11 @@ class Basic(Trader[BasicConfig, BasicState], StartMixin):
             _log.info(
                 f"streaming candles between {Timestamp_.format_span(state.next_, config.end)}"
             )
-            async for candle, candle_meta in self._chandler.stream_concurrent_candles(
-                exchange=config.exchange,
-                entries=(
-                    [(config.symbol, config.interval, config.candle_type)]
-                    + state.strategy.extra_candles
-                ),
-                start=state.next_,
-                end=config.end,
-            ):
-                await self._tick(state, candle, candle_meta)
+            async for candle, candle_meta in self._stream_candles(state):
+                if synchronous:
+                    self._tick_simulated(state, candle, candle_meta)
+                else:
+                    await self._tick(state, candle, candle_meta)
             _log.info("ran out of candles; finishing")
         except BadOrder:
             _log.exception("bad order; finishing early")
@@ -290,6 +303,93 @@ class Basic(Trader[BasicConfig, BasicState], StartMixin):
         _log.info("finished")
         return self.build_summary(state)
 
+    async def load_candles(self, state: BasicState) -> list[tuple[Candle, CandleMeta]]:
+        """Loads the candles `run` would stream. Meant to be passed to `backtest`, possibly for
+        multiple states with the same candle configuration."""
+        return await list_async(self._stream_candles(state))
+
+    def backtest(
+        self, state: BasicState, candles: Iterable[tuple[Candle, CandleMeta]]
+    ) -> TradingSummary:
+        """Runs a backtest synchronously over preloaded candles. Produces the same summary as
+        `run` but does not emit trader events."""
+        config = state.config
+        assert config.mode is TradingMode.BACKTEST
+
+        state.running = True
+        try:
+            for candle, candle_meta in candles:
+                self._tick_simulated(state, candle, candle_meta)
+            _log.info("ran out of candles; finishing")
+        except BadOrder:
+            _log.exception("bad order; finishing early")
+        finally:
+            self._finish_backtest(state)
+
+        _log.info("finished")
+        return self.build_summary(state)
+
+    def backtest_many(
+        self, states: list[BasicState], candles: Iterable[tuple[Candle, CandleMeta]]
+    ) -> list[TradingSummary]:
+        """Runs a bank of backtests side by side over a single pass of preloaded candles, for
+        example for different parameters of a strategy. Identical indicators of the strategies
+        are only updated once per candle. Produces the same summaries as `backtest` would for
+        each of the states. Candles before the next candle time of a state are skipped for it."""
+        assert all(s.config.mode is TradingMode.BACKTEST for s in states)
+
+        registry = IndicatorRegistry()
+        for state in states:
+            state.strategy.share_indicators(registry)
+        starts = [state.next_ for state in states]
+
+        for state in states:
+            state.running = True
+        try:
+            for candle, candle_meta in candles:
+                registry.advance()
+                for state, start in zip(states, starts):
+                    if not state.running or candle.time < start:
+                        continue
+                    try:
+                        self._tick_simulated(state, candle, candle_meta)
+                    except BadOrder:
+                        _log.exception("bad order; finishing early")
+                        self._finish_backtest(state)
+            _log.info(
+                f"ran out of candles; finishing {len(states)} backtest(s) with {registry.size} "
+                "unique indicator(s)"
+            )
+        finally:
+            for state in states:
+                if state.running:
+                    self._finish_backtest(state)
+
+        _log.info("finished")
+        return [self.build_summary(state) for state in states]
+
+    def _finish_backtest(self, state: BasicState) -> None:
+        state.running = False
+
+        if state.close_on_exit and state.open_position:
+            assert state.last_candle
+            self._close_simulated_position(state, CloseReason.CANCELLED, state.last_candle)
+
+        if state.last_candle:
+            _log.info(f"last {state.config.candle_type} candle: {state.last_candle}")
+
+    def _stream_candles(self, state: BasicState) -> AsyncIterable[tuple[Candle, CandleMeta]]:
+        config = state.config
+        return self._chandler.stream_concurrent_candles(
+            exchange=config.exchange,
+            entries=(
+                [(config.symbol, config.interval, config.candle_type)]
+                + state.strategy.extra_candles
+            ),
+            start=state.next_,
+            end=config.end,
+        )
+
     async def _tick(
         self,
         state: BasicState,
@@ -297,10 +397,72 @@ class Basic(Trader[BasicConfig, BasicState], StartMixin):
         candle_meta: CandleMeta,
     ) -> None:
         config = state.config
-        is_main_candle = candle_meta == (config.symbol, config.interval, config.candle_type)
 
         await self._events.emit(config.channel, "candle", candle)
 
+        advice = self._update(state, candle, candle_meta)
+
+        queue = self._queues[state.id]
+
+        # Close existing position if requested.
+        await queue.join()
+        if state.open_position:
+            reason = self._get_close_reason(state, advice)
+            if reason is not None:
+                await process_task_on_queue(queue, self._close_position(state, reason, candle))
+
+        # Open new position if requested.
+        await queue.join()
+        if not state.open_position and state.open_new_positions:
+            short = self._get_open_short(state, advice)
+            if short is not None:
+                await process_task_on_queue(queue, self._open_position(state, short, candle))
+
+            state.stop_loss.clear(candle)
+            state.take_profit.clear(candle)
+
+        self._complete_tick(state, candle, candle_meta)
+
+    def _tick_simulated(
+        self,
+        state: BasicState,
+        candle: Candle,
+        candle_meta: CandleMeta,
+    ) -> None:
+        # Same as `_tick` but for backtesting without emitting events.
+        advice = self._update(state, candle, candle_meta)
+
+        if state.open_position:
+            reason = self._get_close_reason(state, advice)
+            if reason is not None:
+                self._close_simulated_position(state, reason, candle)
+
+        if not state.open_position and state.open_new_positions:
+            short = self._get_open_short(state, advice)
+            if short is not None:
+                self._open_simulated_position(state, short, candle)
+
+            state.stop_loss.clear(candle)
+            state.take_profit.clear(candle)
+
+        self._complete_tick(state, candle, candle_meta)
+
+    def warm_up(self, state: BasicState, candle: Candle, candle_meta: CandleMeta) -> None:
+        """Passes a candle to the strategy, stop loss and take profit of a state the same way a
+        tick without an open position would, but without acting on advice. Meant for carrying
+        them over candles preceding a backtest."""
+        config = state.config
+        if candle_meta == (config.symbol, config.interval, config.candle_type):
+            state.stop_loss.update(candle)
+            state.take_profit.update(candle)
+        state.strategy.update(candle, candle_meta)
+        state.stop_loss.clear(candle)
+        state.take_profit.clear(candle)
+
+    def _update(self, state: BasicState, candle: Candle, candle_meta: CandleMeta) -> Advice:
+        config = state.config
+        is_main_candle = candle_meta == (config.symbol, config.interval, config.candle_type)
+
         if is_main_candle:
             state.stop_loss.update(candle)
             state.take_profit.update(candle)
@@ -317,57 +479,51 @@ class Basic(Trader[BasicConfig, BasicState], StartMixin):
             _log.debug(f"received advice: {advice.name}")
             if advice is not Advice.NONE:
                 assert state.strategy.mature
+        return advice
 
-        queue = self._queues[state.id]
-        coro: Optional[Awaitable]
-
-        # Close existing position if requested.
-        await queue.join()
-        if state.open_position:
-            coro = None
-
-            if isinstance(state.open_position, Position.OpenLong):
-                if advice in {Advice.SHORT, Advice.LIQUIDATE}:
-                    coro = self._close_position(state, CloseReason.STRATEGY, candle)
-                elif state.open_position and state.stop_loss.upside_hit:
-                    assert advice is not Advice.LONG
-                    _log.info(f"upside stop loss hit at {config.stop_loss}; selling")
-                    coro = self._close_position(state, CloseReason.STOP_LOSS, candle)
-                elif state.open_position and state.take_profit.upside_hit:
-                    assert advice is not Advice.LONG
-                    _log.info(f"upside take profit hit at {config.take_profit}; selling")
-                    coro = self._close_position(state, CloseReason.TAKE_PROFIT, candle)
-            elif isinstance(state.open_position, Position.OpenShort):
-                if advice in {Advice.LONG, Advice.LIQUIDATE}:
-                    coro = self._close_position(state, CloseReason.STRATEGY, candle)
-                elif state.stop_loss.downside_hit:
-                    assert advice is not Advice.SHORT
-                    _log.info(f"downside stop loss hit at {config.stop_loss}; selling")
-                    coro = self._close_position(state, CloseReason.STOP_LOSS, candle)
-                elif state.take_profit.downside_hit:
-                    assert advice is not Advice.SHORT
-                    _log.info(f"downside take profit hit at {config.take_profit}; selling")
-                    coro = self._close_position(state, CloseReason.TAKE_PROFIT, candle)
-
-            if coro:
-                await process_task_on_queue(queue, coro)
-
-        # Open new position if requested.
-        await queue.join()
-        if not state.open_position and state.open_new_positions:
-            coro = None
-
-            if config.long and advice is Advice.LONG:
-                coro = self._open_position(state, False, candle)
-            elif config.short and advice is Advice.SHORT:
-                coro = self._open_position(state, True, candle)
-
-            if coro:
-                await process_task_on_queue(queue, coro)
-
-            state.stop_loss.clear(candle)
-            state.take_profit.clear(candle)
+    def _get_close_reason(self, state: BasicState, advice: Advice) -> Optional[CloseReason]:
+        config = state.config
+        if isinstance(state.open_position, Position.OpenLong):
+            if advice in {Advice.SHORT, Advice.LIQUIDATE}:
+                return CloseReason.STRATEGY
+            if state.stop_loss.upside_hit:
+                assert advice is not Advice.LONG
+                _log.info(f"upside stop loss hit at {config.stop_loss}; selling")
+                return CloseReason.STOP_LOSS
+            if state.take_profit.upside_hit:
+                assert advice is not Advice.LONG
+                _log.info(f"upside take profit hit at {config.take_profit}; selling")
+                return CloseReason.TAKE_PROFIT
+        elif isinstance(state.open_position, Position.OpenShort):
+            if advice in {Advice.LONG, Advice.LIQUIDATE}:
+                return CloseReason.STRATEGY
+            if state.stop_loss.downside_hit:
+                assert advice is not Advice.SHORT
+                _log.info(f"downside stop loss hit at {config.stop_loss}; selling")
+                return CloseReason.STOP_LOSS
+            if state.take_profit.downside_hit:
+                assert advice is not Advice.SHORT
+                _log.info(f"downside take profit hit at {config.take_profit}; selling")
+                return CloseReason.TAKE_PROFIT
+        return None
+
+    def _get_open_short(self, state: BasicState, advice: Advice) -> Optional[bool]:
+        # Whether to open a short (true) or long (false) position, if any.
+        config = state.config
+        if config.long and advice is Advice.LONG:
+            return False
+        if config.short and advice is Advice.SHORT:
+            return True
+        return None
 
+    def _complete_tick(self, state: BasicState, candle: Candle, candle_meta: CandleMeta) -> None:
+        config = state.config
+        if (
+            candle_meta == (config.symbol, config.interval, config.candle_type)
+            and state.next_ >= state.start
+        ):
+            assert state.statistics
+            state.statistics.update(candle.time + config.interval, {config.symbol: candle.close})
         if not state.first_candle:
             _log.info(f"first {config.candle_type} candle: {candle}")
             state.first_candle = candle
@@ -381,39 +537,85 @@ class Basic(Trader[BasicConfig, BasicState], StartMixin):
         candle: Candle,
     ) -> Position.Open:
         config = state.config
-        assert not state.open_position
 
-        (position,) = (
-            self._simulated_positioner.open_simulated_positions(
-                exchange=config.exchange,
-                entries=[
-                    (
-                        config.symbol,
-                        state.quote,
-                        short,
-                        candle.time + config.interval,
-                        candle.close,
-                    )
-                ],
-            )
-            if config.mode is TradingMode.BACKTEST
-            else await self._positioner.open_positions(
+        if config.mode is TradingMode.BACKTEST:
+            position = self._open_simulated_position(state, short, candle)
+        else:
+            assert not state.open_position
+            (position,) = await self._positioner.open_positions(
                 exchange=config.exchange,
                 custodian=config.custodian,
                 mode=config.mode,
                 entries=[(config.symbol, state.quote, short)],
             )
+            state.quote -= position.cost
+            state.open_position = position
+            assert state.statistics
+            state.statistics.open_position(position)
+
+        await self._events.emit(
+            config.channel, "positions_opened", [position], self.build_summary(state)
+        )
+        return position
+
+    def _open_simulated_position(
+        self,
+        state: BasicState,
+        short: bool,
+        candle: Candle,
+    ) -> Position.Open:
+        config = state.config
+        assert not state.open_position
+
+        (position,) = self._simulated_positioner.open_simulated_positions(
+            exchange=config.exchange,
+            entries=[
+                (
+                    config.symbol,
+                    state.quote,
+                    short,
+                    candle.time + config.interval,
+                    candle.close,
+                )
+            ],
         )
 
         state.quote -= position.cost
         state.open_position = position
+        assert state.statistics
+        state.statistics.open_position(position)
+        return position
+
+    async def _close_position(
+        self,
+        state: BasicState,
+        reason: CloseReason,
+        candle: Candle,
+    ) -> Position.Closed:
+        config = state.config
+
+        if config.mode is TradingMode.BACKTEST:
+            position = self._close_simulated_position(state, reason, candle)
+        else:
+            open_position = state.open_position
+            assert open_position
+            (position,) = await self._positioner.close_positions(
+                custodian=config.custodian,
+                mode=config.mode,
+                entries=[(open_position, reason)],
+            )
+            state.quote += position.gain
+            state.open_position = None
+            state.positions.append(position)
+            assert state.statistics
+            state.statistics.close_position(position)
 
         await self._events.emit(
-            config.channel, "positions_opened", [state.open_position], self.build_summary(state)
+            config.channel, "positions_closed", [position], self.build_summary(state)
         )
         return position
 
-    async def _close_position(
+    def _close_simulated_position(
         self,
         state: BasicState,
         reason: CloseReason,
@@ -424,27 +626,21 @@ class Basic(Trader[BasicConfig, BasicState], StartMixin):
 
         assert open_position
 
-        (position,) = (
-            self._simulated_positioner.close_simulated_positions(
-                entries=[(open_position, reason, candle.time + config.interval, candle.close)],
-            )
-            if config.mode is TradingMode.BACKTEST
-            else await self._positioner.close_positions(
-                custodian=config.custodian,
-                mode=config.mode,
-                entries=[(open_position, reason)],
-            )
+        (position,) = self._simulated_positioner.close_simulated_positions(
+            entries=[(open_position, reason, candle.time + config.interval, candle.close)],
         )
 
         state.quote += position.gain
         state.open_position = None
         state.positions.append(position)
-
-        await self._events.emit(
-            config.channel, "positions_closed", [position], self.build_summary(state)
-        )
+        assert state.statistics
+        state.statistics.close_position(position)
         return position
 
+    def build_running_statistics(self, state: BasicState) -> RunningStatisticsSnapshot:
+        assert state.statistics
+        return state.statistics.snapshot()
+
     def build_summary(self, state: BasicState) -> TradingSummary:
         config = state.config
         start = state.start if config.mode is TradingMode.BACKTEST else state.real_start
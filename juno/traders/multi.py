@@ -24,6 +24,7 @@ from juno.exchanges import Exchange
 from juno.inspect import Constructor
 from juno.math import rpstdev, split
 from juno.positioner import Positioner, SimulatedPositioner
+from juno.statistics import RunningStatistics, RunningStatisticsSnapshot
 from juno.stop_loss import Noop as NoopStopLoss
 from juno.stop_loss import StopLoss
 from juno.strategies import Changed, Signal
@@ -82,10 +83,19 @@ class MultiState:
     real_start: Timestamp
     open_new_positions: bool = True  # Whether new positions can be opened.
     positions: list[Position.Closed] = field(default_factory=list)
+    # Rebuilt from positions if missing, for example for states persisted before statistics were
+    # kept.
+    statistics: Optional[RunningStatistics] = None
 
     id: str = field(default_factory=lambda: str(uuid4()))
     running: bool = False
 
+    def __post_init__(self) -> None:
+        if self.statistics is None:
+            self.statistics = RunningStatistics.restore(
+                self.starting_quote, self.config.interval, self.positions, self.open_positions
+            )
+
     @property
     def open_positions(self) -> list[Position.Open]:
         return [s.open_position for s in self.symbol_states.values() if s.open_position]
@@ -331,6 +341,16 @@ class Multi(Trader[MultiConfig, MultiState], StartMixin):
             # Wait until we've received candle updates for all symbols.
             await candles_updated.wait()
 
+            assert state.statistics
+            state.statistics.update(
+                state.next_,
+                {
+                    s: ss.last_candle.close
+                    for s, ss in state.symbol_states.items()
+                    if ss.last_candle
+                },
+            )
+
             await self._try_close_existing_positions(state)
             await self._try_open_new_positions(state)
 
@@ -698,9 +718,11 @@ class Multi(Trader[MultiConfig, MultiState], StartMixin):
             )
         )
 
+        assert state.statistics
         for (symbol_state, _), position in zip(entries, positions):
             symbol_state.allocated_quote -= position.cost
             symbol_state.open_position = position
+            state.statistics.open_position(position)
 
         await self._events.emit(
             state.config.channel, "positions_opened", positions, self.build_summary(state)
@@ -751,12 +773,18 @@ class Multi(Trader[MultiConfig, MultiState], StartMixin):
 
             state.positions.append(position)
             symbol_state.open_position = None
+            assert state.statistics
+            state.statistics.close_position(position)
 
         await self._events.emit(
             state.config.channel, "positions_closed", positions, self.build_summary(state)
         )
         return positions
 
+    def build_running_statistics(self, state: MultiState) -> RunningStatisticsSnapshot:
+        assert state.statistics
+        return state.statistics.snapshot()
+
     def build_summary(self, state: MultiState) -> TradingSummary:
         config = state.config
         if config.end is not None and config.end <= state.real_start:  # Backtest.
@@ -5,6 +5,7 @@ from typing import Generic, Literal, Optional, TypeVar, Union
 from juno import CandleType, Interval, Timestamp
 from juno.brokers import Broker
 from juno.primitives.timestamp import Timestamp_
+from juno.statistics import RunningStatisticsSnapshot
 from juno.trading import CloseReason, Position, TradingSummary
 
 TC = TypeVar("TC")
@@ -53,6 +54,10 @@ class Trader(ABC, Generic[TC, TS]):
     def build_summary(self, state: TS) -> TradingSummary:
         pass
 
+    def build_running_statistics(self, state: TS) -> Optional[RunningStatisticsSnapshot]:
+        # Only available for traders keeping running statistics.
+        return None
+
     @staticmethod
     def adjust_start(
         start: Timestamp,
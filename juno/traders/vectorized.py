@@ -0,0 +1,130 @@
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+
+from juno import Advice, Symbol_
+from juno.components import Informant
+from juno.components.chandler import CandleArrays
+from juno.positioner import MARGIN_MULTIPLIER
+
+from .basic import BasicConfig
+
+_log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class VectorizedSummary:
+    advices: np.ndarray  # Advice acted upon for each candle. Unchanged advice is NONE.
+    open_times: np.ndarray
+    close_times: np.ndarray
+    shorts: np.ndarray
+    returns: np.ndarray  # ROI of each position, including fees and interest.
+
+    @property
+    def num_positions(self) -> int:
+        return len(self.returns)
+
+    @property
+    def roi(self) -> float:
+        # Each position is opened with all of the quote available.
+        return float(np.prod(1.0 + self.returns) - 1.0)
+
+
+class Vectorized:
+    """
+    Backtests a signal strategy with NumPy over whole candle arrays instead of going through the
+    candles one by one. Meant for screening a large number of strategy parameters; promising ones
+    should be confirmed with `Basic`.
+
+    Positions are opened and closed on the same candles as the `Basic` trader would, given the same
+    config. Returns include taker fees and borrow interest but ignore exchange filters and borrow
+    limits. Stop loss and take profit are not supported.
+    """
+
+    def __init__(self, informant: Informant) -> None:
+        self._informant = informant
+
+    def backtest(self, config: BasicConfig, candles: CandleArrays) -> VectorizedSummary:
+        """Expects the candles `Basic` would stream for the config, including the ones before the
+        start for warming up the strategy. Prices must be float64. Requires a strategy supporting
+        batch computation."""
+        if config.stop_loss is not None or config.take_profit is not None:
+            raise ValueError("Vectorized backtest does not support stop loss nor take profit")
+
+        time = candles.time
+        close = np.asarray(candles.close, dtype=np.float64)
+
+        advices = config.strategy.construct().compute(candles)
+        # Same as the `Changed` filter of `Basic`. Advice is ignored before the start.
+        if config.start is not None:
+            advices = np.where(time >= config.start, advices, Advice.NONE)
+        advices = _changed(advices)
+
+        # Position held after each candle: 1 for long, -1 for short and 0 for none.
+        targets = np.select(
+            [advices == Advice.LONG, advices == Advice.SHORT, advices == Advice.LIQUIDATE],
+            [int(config.long), -int(config.short), 0],
+            default=-2,
+        )
+        positions = _forward_fill(targets, missing=-2, initial=0)
+        previous = np.concatenate(([0], positions[:-1]))
+        opens = np.flatnonzero((positions != previous) & (positions != 0))
+        closes = np.flatnonzero((positions != previous) & (previous != 0))
+        if len(closes) < len(opens):
+            if config.close_on_exit:
+                closes = np.append(closes, len(time) - 1)
+            else:
+                opens = opens[:-1]
+
+        # Positions are opened and closed at the close of a candle.
+        open_times = time[opens] + config.interval
+        close_times = time[closes] + config.interval
+        shorts = positions[opens] < 0
+        ratios = close[closes] / close[opens]
+
+        fees, _ = self._informant.get_fees_filters(config.exchange, config.symbol)
+        fee = float(fees.taker)
+        returns = ratios * (1.0 - fee) ** 2 - 1.0
+        if shorts.any():
+            returns[shorts] = self._short_returns(
+                config, ratios[shorts], close_times[shorts] - open_times[shorts], fee
+            )
+
+        _log.info(f"backtested {len(returns)} position(s) over {len(time)} candle(s)")
+        return VectorizedSummary(
+            advices=advices,
+            open_times=open_times,
+            close_times=close_times,
+            shorts=shorts,
+            returns=returns,
+        )
+
+    def _short_returns(
+        self, config: BasicConfig, ratios: np.ndarray, durations: np.ndarray, fee: float
+    ) -> np.ndarray:
+        # Mirrors the simulated positioner. The collateral is used to borrow and sell base asset.
+        # Closing buys back the borrowed amount plus interest and fee.
+        base_asset, _ = Symbol_.assets(config.symbol)
+        borrow_info = self._informant.get_borrow_info(
+            exchange=config.exchange, asset=base_asset, account=config.symbol
+        )
+        # Interest is charged for every started interest interval.
+        periods = -(-durations // borrow_info.interest_interval)
+        interest = periods * float(borrow_info.interest_rate)
+        # The fee of the closing fill is both added to its size and counted as its cost.
+        returns = (MARGIN_MULTIPLIER - 1) * (
+            (1.0 - fee) - (1.0 + interest) * (1.0 + 2.0 * fee) * ratios
+        )
+        return np.maximum(returns, -1.0)
+
+
+def _changed(advices: np.ndarray) -> np.ndarray:
+    present = advices != Advice.NONE
+    previous = np.concatenate(([Advice.NONE], _forward_fill(advices, Advice.NONE)[:-1]))
+    return np.where(present & (advices != previous), advices, Advice.NONE).astype(advices.dtype)
+
+
+def _forward_fill(values: np.ndarray, missing: int, initial: int = Advice.NONE) -> np.ndarray:
+    indices = np.maximum.accumulate(np.where(values != missing, np.arange(len(values)), -1))
+    return np.where(indices >= 0, values[np.maximum(indices, 0)], initial)
@@ -15,6 +15,7 @@ from juno.brokers import Broker
 from juno.custodians import Custodian
 from juno.di import Container
 from juno.exchanges import Exchange
+from juno.exchanges.recording import init_exchanges
 from juno.inspect import map_concrete_module_types
 from juno.logging import create_handlers
 from juno.path import full_path
@@ -66,9 +67,8 @@ async def main() -> None:
     container = Container()
     container.add_singleton_instance(dict[str, Any], lambda: cfg)
     container.add_singleton_instance(Storage, lambda: config.init_instance(Storage, cfg))
-    container.add_singleton_instance(
-        list[Exchange], lambda: config.init_instances_mentioned_in_config(Exchange, cfg)
-    )
+    # Exchanges are recorded or replayed instead when configured with `exchange_recording`.
+    container.add_singleton_instance(list[Exchange], lambda: init_exchanges(cfg))
     # container.add_singleton_instance(
     #     list[Exchange], lambda: config.try_init_all_instances(Exchange, cfg)
     # )
@@ -0,0 +1,122 @@
+import logging
+import random
+from collections import deque
+from decimal import Decimal
+from statistics import median
+from time import perf_counter
+from typing import Any, Callable
+
+from more_itertools import pairwise
+
+from juno import indicators
+from juno.indicators.numeric import Numeric, numeric
+
+# Compares the per-update time of indicators with incremental updates against recomputing the
+# whole window on every update, as they used to.
+
+PERIODS = [10, 50, 200, 500]
+NUM_PRICES = 2000
+BACKENDS: list[Numeric] = ["decimal", "float"]
+
+
+class WindowKama(indicators.Kama):
+    def update(self, price: Decimal) -> Decimal:
+        price = self._num(price)
+        self._t = min(self._t + 1, self._t2)
+
+        if len(self._prices) > 0:
+            self._diffs.append(abs(price - self._prices[-1]))
+
+        if self._t == self._t1:
+            self.value = price
+        elif self._t >= self._t2:
+            diff_sum = sum(self._diffs)
+            if diff_sum == 0:
+                er = self._num("1.0")
+            else:
+                er = abs(price - self._prices[0]) / diff_sum
+            sc = (er * (self._short_alpha - self._long_alpha) + self._long_alpha) ** 2
+
+            self.value += sc * (price - self.value)
+
+        self._prices.append(price)
+        return self.value
+
+
+class WindowLsma(indicators.Lsma):
+    def update(self, price: Decimal) -> Decimal:
+        self._t = min(self._t + 1, self._t1)
+
+        self._prices.append(self._num(price))
+
+        if self._t >= self._t1:
+            y_sum = sum(self._prices, self._num("0.0"))
+            xy_sum = sum(
+                (x * y for x, y in zip(range(1, self._t1 + 1), self._prices)), self._num("0.0")
+            )
+            m = (self._t1 * xy_sum - self._x_sum * y_sum) / self._divisor
+            b = (y_sum * self._x2_sum - self._x_sum * xy_sum) / self._divisor
+            self.value = m * self._t1 + b
+
+        return self.value
+
+
+class WindowMmi(indicators.Mmi):
+    _window: deque[Decimal]
+
+    def __init__(self, period: int) -> None:
+        super().__init__(period)
+        self._window = deque(maxlen=period)
+
+    def update(self, price: Decimal) -> Decimal:
+        self._t = min(self._t + 1, self._t1)
+
+        self._window.append(self._num(price))
+
+        if self._t >= self._t1:
+            med = median(self._window)
+            nh = 0
+            nl = 0
+            for prev_price, next_price in pairwise(self._window):
+                if next_price > med and next_price > prev_price:
+                    nl += 1
+                if next_price < med and next_price < prev_price:
+                    nh += 1
+            self.value = self._num("100.0") * (nl + nh) / (self._t1 - 1)
+
+        return self.value
+
+
+def measure(factory: Callable[[int], Any], period: int, prices: list[Decimal]) -> float:
+    indicator = factory(period)
+    start = perf_counter()
+    for price in prices:
+        indicator.update(price)
+    return (perf_counter() - start) / len(prices)
+
+
+def main() -> None:
+    random.seed(0)
+    price = 100.0
+    prices = []
+    for _ in range(NUM_PRICES):
+        price *= 1.0 + random.gauss(0.0, 0.01)
+        prices.append(Decimal(f"{price:.8f}"))
+
+    for backend in BACKENDS:
+        for name, new, old in [
+            ("kama", indicators.Kama, WindowKama),
+            ("lsma", indicators.Lsma, WindowLsma),
+            ("mmi", indicators.Mmi, WindowMmi),
+        ]:
+            for period in PERIODS:
+                with numeric(backend):
+                    new_time = measure(new, period, prices)
+                    old_time = measure(old, period, prices)
+                logging.info(
+                    f"{backend} {name}({period}): incremental {new_time * 1e6:.2f}us, window "
+                    f"{old_time * 1e6:.2f}us per update ({old_time / new_time:.1f}x)"
+                )
+
+
+main()
@@ -0,0 +1,156 @@
+import argparse
+import random
+from decimal import Decimal
+from time import perf_counter
+from typing import Any, Callable
+
+from juno import Candle, Depth, Trade, json
+from juno.exchanges.binance import _to_levels
+
+# Compares decoding Binance market data payloads with `json.loads` against `json.loads_fast`,
+# both parsing only and decoding into the structures the exchange adapter yields. Depth levels are
+# decoded both by parsing every decimal, as the adapter used to, and by reusing parsed prices.
+#
+# Replays raw payloads, one per line. Both kline pages from the REST API and messages of combined
+# streams are supported. For example, recorded with:
+#   curl "https://api.binance.com/api/v3/klines?symbol=ETHBTC&interval=1m&limit=1000" >> payloads
+#   echo >> payloads
+#   websocat "wss://stream.binance.com:9443/stream?streams=ethbtc@depth@100ms/ethbtc@trade" \
+#       >> payloads
+# Without a recording, payloads are generated.
+
+parser = argparse.ArgumentParser()
+parser.add_argument("recording", nargs="?", default=None)
+parser.add_argument("--repeat", type=int, default=5)
+args = parser.parse_args()
+
+
+def load(path: str) -> list[str]:
+    with open(path) as f:
+        return [line for line in (line.strip() for line in f) if line]
+
+
+def generate() -> list[str]:
+    random.seed(0)
+
+    def price() -> str:
+        return f"{random.randint(68_000 - 500, 68_000 + 500) / 1_000_000:.8f}"
+
+    def size() -> str:
+        return f"{random.uniform(0.0, 100.0):.8f}"
+
+    def level() -> list[str]:
+        # A third of depth updates remove a level.
+        return [price(), "0.00000000" if random.random() < 0.3 else size()]
+
+    result = []
+    for page in range(10):
+        start = page * 1000 * 60_000
+        rows = [
+            [
+                start + i * 60_000,
+                price(),
+                price(),
+                price(),
+                price(),
+                size(),
+                start + (i + 1) * 60_000 - 1,
+                size(),
+                random.randint(0, 1000),
+                size(),
+                size(),
+                "0",
+            ]
+            for i in range(1000)
+        ]
+        result.append(json.dumps(rows, separators=(",", ":")))
+    for i in range(20_000):
+        data: dict[str, Any] = {
+            "e": "depthUpdate",
+            "E": i,
+            "s": "ETHBTC",
+            "U": i * 10,
+            "u": i * 10 + 9,
+            "b": [level() for _ in range(random.randint(0, 20))],
+            "a": [level() for _ in range(random.randint(0, 20))],
+        }
+        result.append(json.dumps({"stream": "ethbtc@depth@100ms", "data": data}))
+        data = {"e": "trade", "E": i, "s": "ETHBTC", "a": i, "p": price(), "q": size(), "T": i}
+        result.append(json.dumps({"stream": "ethbtc@trade", "data": data}))
+    return result
+
+
+def to_levels_uncached(levels: list[list[str]]) -> list[tuple[Decimal, Decimal]]:
+    return [(Decimal(p), Decimal(s)) for p, s in levels]
+
+
+def decode(
+    content: Any,
+    to_levels: Callable[[list[list[str]]], list[tuple[Decimal, Decimal]]] = _to_levels,
+) -> Any:
+    # Same as the exchange adapter.
+    if isinstance(content, list):
+        return [
+            Candle(
+                time=c[0],
+                open=Decimal(c[1]),
+                high=Decimal(c[2]),
+                low=Decimal(c[3]),
+                close=Decimal(c[4]),
+                volume=Decimal(c[5]),
+            )
+            for c in content
+        ]
+    stream, data = content["stream"], content["data"]
+    if "@depth" in stream:
+        return Depth.Update(
+            bids=to_levels(data["b"]),
+            asks=to_levels(data["a"]),
+            first_id=data["U"],
+            last_id=data["u"],
+        )
+    if stream.endswith("@trade"):
+        return Trade(
+            id=data["a"],
+            time=data["T"],
+            price=Decimal(data["p"]),
+            size=Decimal(data["q"]),
+        )
+    return None
+
+
+def measure(payloads: list[str], fn: Callable[[str], Any]) -> float:
+    best = float("inf")
+    for _ in range(args.repeat):
+        start = perf_counter()
+        for payload in payloads:
+            fn(payload)
+        best = min(best, perf_counter() - start)
+    return best
+
+
+payloads = load(args.recording) if args.recording else generate()
+num_mb = sum(len(p) for p in payloads) / 1_000_000
+fast_parser = "simplejson" if json.orjson is None else "orjson"
+print(f"decoding {len(payloads)} payloads of {num_mb:.1f} MB; fast parser is {fast_parser}")
+
+
+def decoder(
+    loads: Callable[[str], Any],
+    to_levels: Callable[[list[list[str]]], list[tuple[Decimal, Decimal]]],
+) -> Callable[[str], Any]:
+    return lambda payload: decode(loads(payload), to_levels)
+
+
+for name, loads, to_levels in [
+    ("loads", json.loads, to_levels_uncached),
+    ("loads_fast", json.loads_fast, to_levels_uncached),
+    ("loads_fast+cache", json.loads_fast, _to_levels),
+]:
+    parse_time = measure(payloads, loads)
+    decode_time = measure(payloads, decoder(loads, to_levels))
+    print(
+        f"{name:<16} parse {num_mb / parse_time:8.1f} MB/s {len(payloads) / parse_time:10,.0f} "
+        f"payloads/s; decode {num_mb / decode_time:8.1f} MB/s "
+        f"{len(payloads) / decode_time:10,.0f} payloads/s"
+    )
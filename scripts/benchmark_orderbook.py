@@ -0,0 +1,112 @@
+import argparse
+import logging
+import random
+from decimal import Decimal
+from time import perf_counter
+from typing import Any, Iterable
+
+from juno import Depth, json
+from juno.components.orderbook import PriceLevels
+
+# Compares applying depth updates to sorted price levels and reading the top of the book against
+# plain dicts sorted on every read, as the orderbook used to.
+#
+# Replays depth recorded with `exchange_stream_depth.py --record`. Without a recording, updates are
+# generated around a random walking price.
+
+parser = argparse.ArgumentParser()
+parser.add_argument("recording", nargs="?", default=None)
+parser.add_argument("--num-updates", type=int, default=50_000)
+parser.add_argument("--num-levels", type=int, default=5000)
+args = parser.parse_args()
+
+
+class DictLevels:
+    def __init__(self, descending: bool = False) -> None:
+        self._descending = descending
+        self._sizes: dict[Decimal, Decimal] = {}
+
+    def top(self, count: int) -> list[tuple[Decimal, Decimal]]:
+        return sorted(self._sizes.items(), reverse=self._descending)[:count]
+
+    def update(self, levels: Iterable[tuple[Decimal, Decimal]]) -> None:
+        for price, size in levels:
+            if size > 0:
+                self._sizes[price] = size
+            elif price in self._sizes:
+                del self._sizes[price]
+
+    def reset(self, levels: Iterable[tuple[Decimal, Decimal]]) -> None:
+        self._sizes = dict(levels)
+
+
+def load(path: str) -> list[Depth.Any]:
+    result: list[Depth.Any] = []
+    with open(path) as f:
+        for line in f:
+            value = json.loads(line)
+            bids = [(p, s) for p, s in value["bids"]]
+            asks = [(p, s) for p, s in value["asks"]]
+            result.append(
+                Depth.Snapshot(bids=bids, asks=asks)
+                if value["snapshot"]
+                else Depth.Update(bids=bids, asks=asks)
+            )
+    return result
+
+
+def generate(num_updates: int, num_levels: int) -> list[Depth.Any]:
+    random.seed(0)
+    step = Decimal("0.01")
+    mid = 10_000
+
+    def level(offset: int) -> tuple[Decimal, Decimal]:
+        return (mid + offset) * step, Decimal(random.randint(1, 1000)) / 100
+
+    result: list[Depth.Any] = [
+        Depth.Snapshot(
+            bids=[level(-i) for i in range(1, num_levels + 1)],
+            asks=[level(i) for i in range(1, num_levels + 1)],
+        )
+    ]
+    for _ in range(num_updates):
+        mid += random.randint(-2, 2)
+        bids = [level(-random.randint(1, 50)) for _ in range(random.randint(1, 10))]
+        asks = [level(random.randint(1, 50)) for _ in range(random.randint(1, 10))]
+        # Remove some levels.
+        bids += [(p, Decimal("0.0")) for p, _ in bids[: random.randint(0, 2)]]
+        asks += [(p, Decimal("0.0")) for p, _ in asks[: random.randint(0, 2)]]
+        result.append(Depth.Update(bids=bids, asks=asks))
+    return result
+
+
+def measure(bids: Any, asks: Any, depths: list[Depth.Any]) -> float:
+    start = perf_counter()
+    for depth in depths:
+        if isinstance(depth, Depth.Snapshot):
+            bids.reset(depth.bids)
+            asks.reset(depth.asks)
+        else:
+            bids.update(depth.bids)
+            asks.update(depth.asks)
+        # Same as the limit broker deciding where to place an order.
+        bids.top(2)
+        asks.top(2)
+    return (perf_counter() - start) / len(depths)
+
+
+def main() -> None:
+    depths = (
+        generate(args.num_updates, args.num_levels)
+        if args.recording is None
+        else load(args.recording)
+    )
+    sorted_time = measure(PriceLevels(descending=True), PriceLevels(), depths)
+    dict_time = measure(DictLevels(descending=True), DictLevels(), depths)
+    logging.info(
+        f"{len(depths)} depth update(s): sorted levels {sorted_time * 1e6:.2f}us, dict "
+        f"{dict_time * 1e6:.2f}us per update ({dict_time / sorted_time:.1f}x)"
+    )
+
+
+main()
@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import socket
+from contextlib import asynccontextmanager
+from time import perf_counter, process_time
+from typing import Any, AsyncContextManager, AsyncIterable, AsyncIterator, Callable
+
+from aiohttp import web
+
+from juno import json
+from juno.asyncio import cancel
+from juno.http import ClientSession, connect_refreshing_stream
+
+# Pushes messages through a local websocket server and compares receiving them:
+# - directly with aiohttp, as a baseline;
+# - with a task created and waited for every message, as `connect_refreshing_stream` used to;
+# - with `connect_refreshing_stream`.
+#
+# The server runs in a separate process so that the client CPU time only includes receiving.
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--num-messages", type=int, default=1_000_000)
+args = parser.parse_args()
+
+MESSAGE = '{"e":"trade","E":%d,"s":"ETHBTC","t":%d,"p":"0.07000000","q":"1.00000000"}'
+
+
+def serve(port: int, num_messages: int, ready: Any) -> None:
+    async def handle(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        for i in range(num_messages):
+            await ws.send_str(MESSAGE % (i, i))
+        # Kept open until the client closes.
+        await ws.receive()
+        return ws
+
+    async def main() -> None:
+        app = web.Application()
+        app.router.add_get("/", handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+        ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+@asynccontextmanager
+async def stream_direct(session: ClientSession, url: str) -> AsyncIterator[AsyncIterable[Any]]:
+    async def inner(ws: Any) -> AsyncIterable[Any]:
+        async for msg in ws:
+            yield json.loads(msg.data)
+
+    async with session.ws_connect(url) as ws:
+        yield inner(ws)
+
+
+@asynccontextmanager
+async def stream_task_per_message(
+    session: ClientSession, url: str
+) -> AsyncIterator[AsyncIterable[Any]]:
+    async def inner(ws: Any) -> AsyncIterable[Any]:
+        timeout_task = asyncio.create_task(asyncio.sleep(3600))
+        try:
+            while True:
+                receive_task = asyncio.create_task(ws.receive())
+                await asyncio.wait(
+                    (receive_task, timeout_task), return_when=asyncio.FIRST_COMPLETED
+                )
+                yield json.loads(receive_task.result().data)
+        finally:
+            await cancel(timeout_task)
+
+    async with session.ws_connect(url) as ws:
+        yield inner(ws)
+
+
+@asynccontextmanager
+async def stream_refreshing(session: ClientSession, url: str) -> AsyncIterator[AsyncIterable[Any]]:
+    async with connect_refreshing_stream(
+        session,
+        url=url,
+        interval=3600,
+        loads=json.loads,
+        take_until=lambda old, new: old["E"] < new["E"],
+    ) as stream:
+        yield stream
+
+
+async def measure(
+    name: str,
+    connect: Callable[[ClientSession, str], AsyncContextManager[AsyncIterable[Any]]],
+    url: str,
+) -> None:
+    async with ClientSession() as session, connect(session, url) as stream:
+        count = 0
+        start_wall, start_cpu = perf_counter(), process_time()
+        async for data in stream:
+            count += 1
+            if count == args.num_messages:
+                assert data["E"] == args.num_messages - 1
+                break
+        wall, cpu = perf_counter() - start_wall, process_time() - start_cpu
+    print(
+        f"{name:<16} {wall:8.2f}s wall {args.num_messages / wall:12,.0f} msg/s "
+        f"{cpu / args.num_messages * 1e6:8.2f}us cpu/msg"
+    )
+
+
+async def main() -> None:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(
+        target=serve, args=(port, args.num_messages, ready), daemon=True
+    )
+    server.start()
+    ready.wait()
+
+    url = f"http://127.0.0.1:{port}/"
+    print(f"receiving {args.num_messages:,} messages")
+    try:
+        await measure("direct", stream_direct, url)
+        await measure("task/message", stream_task_per_message, url)
+        await measure("refreshing", stream_refreshing, url)
+    finally:
+        server.terminate()
+
+
+logging.basicConfig(level=logging.WARNING)
+asyncio.run(main())
@@ -2,11 +2,13 @@ import argparse
 import asyncio
 import logging
 
+from juno import Depth, json
 from juno.exchanges import Exchange
 
 parser = argparse.ArgumentParser()
 parser.add_argument("-e", "--exchange", default="binance")
 parser.add_argument("-s", "--symbol", default="eth-btc")
+parser.add_argument("--record", default=None, help="file to append depth as JSON lines to")
 args = parser.parse_args()
 
 
@@ -15,6 +17,18 @@ async def main() -> None:
         async with exchange.connect_stream_depth(args.symbol) as stream:
             async for val in stream:
                 logging.info(val)
+                if args.record is not None:
+                    with open(args.record, "a") as f:
+                        f.write(
+                            json.dumps(
+                                {
+                                    "snapshot": isinstance(val, Depth.Snapshot),
+                                    "bids": val.bids,
+                                    "asks": val.asks,
+                                }
+                            )
+                            + "\n"
+                        )
 
 
 asyncio.run(main())
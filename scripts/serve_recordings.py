@@ -0,0 +1,26 @@
+import argparse
+import logging
+
+from aiohttp import web
+
+from juno.exchanges.recording import RecordingServer
+
+# Serves exchange recordings to replaying processes. Record with `main.py` and config:
+#   "exchange_recording": {"mode": "record", "directory": "recordings"}
+# Then replay against this server with:
+#   "exchange_recording": {"mode": "replay", "url": "http://127.0.0.1:8765"}
+
+parser = argparse.ArgumentParser()
+parser.add_argument("directory", nargs="?", default="recordings")
+parser.add_argument("-p", "--port", type=int, default=8765)
+parser.add_argument(
+    "--speed", type=float, default=1.0, help="speed relative to the recording; 0 for max"
+)
+args = parser.parse_args()
+
+logging.basicConfig(level=logging.INFO)
+web.run_app(
+    RecordingServer(args.directory, speed=args.speed or None).app,
+    host="127.0.0.1",
+    port=args.port,
+)
@@ -46,6 +46,9 @@ setup(
         "discord": [
             "discord.py",
         ],
+        "fast": [
+            "orjson",
+        ],
         "plotly": [
             "plotly",
         ],
@@ -12,7 +12,9 @@ class Chandler(components.Chandler):
         first_candle=Candle(),
         last_candle=Candle(),
         candle_intervals=[],
+        get_time_ms=lambda: 0,
     ):
+        self._get_time_ms = get_time_ms
         self.candles = candles
         self.future_candle_queues = defaultdict(asyncio.Queue)
         for k, cl in future_candles.items():
@@ -123,18 +123,26 @@ class BasicTypedDict(TypedDict):
         ([1, 2], Tuple[int, ...], (1, 2)),
         ("foo", Literal["foo"], "foo"),
         ({"value": 1}, BasicTypedDict, BasicTypedDict(value=1)),
+        ("decimal::Decimal", type[Decimal], Decimal),
     ],
 )
 def test_deserialize(obj, type_, expected_output) -> None:
     assert serialization.raw.deserialize(obj, type_) == expected_output
 
 
+def test_deserialize_float_parsed_as_decimal() -> None:
+    output = serialization.raw.deserialize(Decimal("1.5"), float)
+    assert type(output) is float
+    assert output == 1.5
+
+
 @pytest.mark.parametrize(
     "obj,type_,expected_output",
     [
         (BasicNamedTuple(1, 2), BasicNamedTuple, [1, 2]),
         (BasicEnum.VALUE, None, 1),
         (StringEnum.VALUE, None, "foo"),
+        (Decimal, None, "decimal::Decimal"),
     ],
 )
 def test_serialize(obj, type_, expected_output) -> None:
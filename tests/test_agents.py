@@ -1,8 +1,10 @@
 # These tests act as integration tests among various components. Only exchange is mocked.
 
 import asyncio
+import math
 from decimal import Decimal
-from typing import Callable
+from pathlib import Path
+from typing import Callable, Optional
 
 import pytest
 from pytest_mock import MockerFixture
@@ -19,10 +21,10 @@ from juno import (
     OrderStatus,
     serialization,
 )
-from juno.agents import Backtest, Live, Paper
+from juno.agents import Backtest, Live, Optimizer, Paper, WalkForward
 from juno.asyncio import cancel, resolved_stream, stream_queue
 from juno.brokers import Broker, Market
-from juno.components import Chandler, Informant, Orderbook, User
+from juno.components import Chandler, Informant, Orderbook, SharedCandles, User
 from juno.custodians import Custodian, Spot
 from juno.di import Container
 from juno.exchanges import Exchange
@@ -169,6 +171,189 @@ async def test_backtest_scenarios(mocker: MockerFixture, scenario_nr: int) -> No
         await agent.run(config)
 
 
+# Prices with more decimals than shared candles support are not shared.
+@pytest.mark.parametrize("shared_candles,decimals", [(False, 2), (True, 2), (True, 10)])
+async def test_optimizer(
+    mocker: MockerFixture, tmp_path: Path, shared_candles: bool, decimals: int
+) -> None:
+    exchange = mocker.MagicMock(Exchange, autospec=True)
+    exchange.list_candle_intervals.return_value = [1]
+    exchange.map_tickers.return_value = {}
+    exchange.get_exchange_info.return_value = ExchangeInfo(
+        fees={"__all__": Fees(Decimal("0.001"), Decimal("0.001"))},
+        filters={
+            "__all__": Filters(
+                price=Price(min=Decimal("0.01"), max=Decimal("10000.0"), step=Decimal("0.01")),
+                size=Size(min=Decimal("0.001"), max=Decimal("10000.0"), step=Decimal("0.001")),
+            )
+        },
+    )
+    candles = [
+        Candle(time=i, close=Decimal(f"{100 + 10 * math.sin(i / 5):.{decimals}f}"))
+        for i in range(100)
+    ]
+    exchange.stream_historical_candles.side_effect = lambda *args, **kwargs: resolved_stream(
+        *candles
+    )
+    results_file = str(tmp_path / "results.jsonl")
+
+    def get_config(num_samples: int) -> Optimizer.Config:
+        return Optimizer.Config(
+            exchange="magicmock",
+            interval=1,
+            start=0,
+            end=100,
+            quote=Decimal("100.0"),
+            strategy={"type": "doublema", "short_ma": "sma", "long_ma": "sma"},
+            trader={"type": "basic", "symbol": "eth-btc", "long": True, "short": False},
+            num_samples=num_samples,
+            num_workers=2,
+            results_file=results_file,
+        )
+
+    container = _get_container(exchange)
+    if shared_candles:
+        container.add_singleton_type(SharedCandles)
+    agent = container.resolve(Optimizer)
+    backtest_agent = container.resolve(Backtest)
+    async with container:
+        results = await agent.run(get_config(4))
+
+        assert len(results) == 4
+        rois = [r.core.roi for r in results]
+        assert rois == sorted(rois, reverse=True)
+        for result in results:
+            assert set(result.strategy.keys()) == {"short_period", "long_period"}
+            assert result.strategy["short_period"] < result.strategy["long_period"]
+
+        # Backtests each parameter set the same way as the backtest agent.
+        best = results[0]
+        summary = await backtest_agent.run(
+            Backtest.Config(
+                exchange="magicmock",
+                interval=1,
+                start=0,
+                end=100,
+                quote=Decimal("100.0"),
+                strategy={
+                    "type": "doublema",
+                    "short_ma": "sma",
+                    "long_ma": "sma",
+                    **best.strategy,
+                },
+                trader={"type": "basic", "symbol": "eth-btc", "long": True, "short": False},
+            )
+        )
+        assert CoreStatistics.compose(summary) == best.core
+
+        # Resumes from the results file. Only new samples are backtested.
+        initialize = mocker.spy(Basic, "initialize")
+        resumed_results = await agent.run(get_config(6))
+
+    assert initialize.call_count == 2
+    assert len(resumed_results) == 6
+    assert all(r in resumed_results for r in results)
+    with open(results_file) as f:
+        assert len(f.readlines()) == 6
+
+
+async def test_optimizer_grid_search_samples_whole_grid(mocker: MockerFixture) -> None:
+    exchange = mocker.MagicMock(Exchange, autospec=True)
+    exchange.list_candle_intervals.return_value = [1]
+    exchange.map_tickers.return_value = {}
+    exchange.get_exchange_info.return_value = ExchangeInfo()
+    exchange.stream_historical_candles.side_effect = lambda *args, **kwargs: resolved_stream(
+        *(Candle(time=i, close=Decimal("1.0")) for i in range(10))
+    )
+
+    container = _get_container(exchange)
+    agent = container.resolve(Optimizer)
+    async with container:
+        results = await agent.run(
+            Optimizer.Config(
+                exchange="magicmock",
+                interval=1,
+                start=0,
+                end=10,
+                quote=Decimal("1.0"),
+                strategy={"type": "doublema", "short_ma": "sma", "long_ma": "sma"},
+                trader={"type": "basic", "symbol": "eth-btc", "long": True, "short": False},
+                search="grid",
+                num_samples=10,
+                num_workers=1,
+            )
+        )
+
+    assert len(results) == 10
+    # Not only the first combinations of the grid which share the same short period.
+    assert len({r.strategy["short_period"] for r in results}) > 1
+
+
+@pytest.mark.parametrize("step", [None, 15])
+async def test_walk_forward(mocker: MockerFixture, step: Optional[int]) -> None:
+    exchange = mocker.MagicMock(Exchange, autospec=True)
+    exchange.list_candle_intervals.return_value = [1]
+    exchange.map_tickers.return_value = {}
+    exchange.get_exchange_info.return_value = ExchangeInfo(
+        fees={"__all__": Fees(Decimal("0.001"), Decimal("0.001"))},
+        filters={
+            "__all__": Filters(
+                price=Price(min=Decimal("0.01"), max=Decimal("10000.0"), step=Decimal("0.01")),
+                size=Size(min=Decimal("0.001"), max=Decimal("10000.0"), step=Decimal("0.001")),
+            )
+        },
+    )
+    candles = [
+        Candle(time=i, close=Decimal(f"{100 + 10 * math.sin(i / 5):.2f}")) for i in range(100)
+    ]
+    exchange.stream_historical_candles.side_effect = lambda symbol, interval, start, end: (
+        resolved_stream(*(c for c in candles if start <= c.time < end))
+    )
+    strategy = {"type": "doublema", "short_ma": "ema", "long_ma": "ema", "long_period": 12}
+    trader = {"type": "basic", "symbol": "eth-btc", "long": True, "short": False}
+    stop_loss = {"type": "trailing", "up_threshold": Decimal("0.05")}
+
+    container = _get_container(exchange)
+    agent = container.resolve(WalkForward)
+    backtest_agent = container.resolve(Backtest)
+    async with container:
+        results = await agent.run(
+            WalkForward.Config(
+                exchange="magicmock",
+                interval=1,
+                start=10,
+                end=100,
+                quote=Decimal("100.0"),
+                strategy=strategy,
+                trader=trader,
+                stop_loss=stop_loss,
+                window=30,
+                step=step,
+                num_workers=2,
+            )
+        )
+
+        window_starts = list(range(10, 100, step or 30))
+        assert [r.start for r in results] == window_starts
+        assert [r.end for r in results] == [min(s + 30, 100) for s in window_starts]
+        assert any(r.core.num_positions > 0 for r in results)
+        # Each window continues from the state of a strategy running since the start.
+        for result in results:
+            summary = await backtest_agent.run(
+                Backtest.Config(
+                    exchange="magicmock",
+                    interval=1,
+                    start=result.start,
+                    end=result.end,
+                    quote=Decimal("100.0"),
+                    strategy=strategy,
+                    trader={**trader, "adjusted_start": 10},
+                    stop_loss=stop_loss,
+                )
+            )
+            assert CoreStatistics.compose(summary) == result.core
+
+
 async def test_paper(mocker: MockerFixture) -> None:
     exchange = mocker.MagicMock(Exchange, autospec=True)
     exchange.list_candle_intervals.return_value = [1]
@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+
+from juno.aiolimiter import Priority, RateLimiter
+
+
+class FakeTime:
+    def __init__(self, time: float = 0.0) -> None:
+        self.time = time
+
+    def __call__(self) -> float:
+        return self.time
+
+
+async def test_rate_limiter_limits_weight_within_window() -> None:
+    time = FakeTime()
+    limiter = RateLimiter(2, 0.1, shares=dict.fromkeys(Priority, 1.0), get_time=time)
+    try:
+        await limiter.acquire()
+        await limiter.acquire()
+
+        task = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not task.done()
+
+        # Let through once the next window starts.
+        time.time = 0.1
+        await asyncio.wait_for(task, timeout=1.0)
+    finally:
+        limiter.close()
+
+
+async def test_rate_limiter_keeps_margin_from_window_edges() -> None:
+    time = FakeTime(0.1)
+    limiter = RateLimiter(1, 1, shares=dict.fromkeys(Priority, 1.0), get_time=time, margin=0.2)
+    try:
+        # Not let through before the window opens past its margin.
+        task = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not task.done()
+        time.time = 0.2
+        await asyncio.wait_for(task, timeout=1.0)
+
+        # Nor at the very end of the window and the start of the next one.
+        time.time = 0.9
+        task = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not task.done()
+        time.time = 1.1
+        await asyncio.sleep(0.15)
+        assert not task.done()
+        time.time = 1.2
+        await asyncio.wait_for(task, timeout=1.0)
+    finally:
+        limiter.close()
+
+
+def test_rate_limiter_margin_within_half_of_interval() -> None:
+    with pytest.raises(ValueError):
+        RateLimiter(1, 1, margin=0.5)
+
+
+async def test_rate_limiter_leaves_share_for_higher_priority() -> None:
+    limiter = RateLimiter(10, 60, get_time=FakeTime())
+    try:
+        await limiter.acquire(7, Priority.LOW)
+
+        low_task = asyncio.create_task(limiter.acquire(1, Priority.LOW))
+        await asyncio.sleep(0)
+        assert not low_task.done()
+
+        await limiter.acquire(2, Priority.NORMAL)
+        await limiter.acquire(1, Priority.HIGH)
+        assert limiter.used == 10
+        assert not low_task.done()
+        low_task.cancel()
+    finally:
+        limiter.close()
+
+
+async def test_rate_limiter_lets_through_higher_priority_first() -> None:
+    time = FakeTime()
+    limiter = RateLimiter(1, 0.1, shares=dict.fromkeys(Priority, 1.0), get_time=time)
+    try:
+        await limiter.acquire()
+
+        low_task = asyncio.create_task(limiter.acquire(priority=Priority.LOW))
+        high_task = asyncio.create_task(limiter.acquire(priority=Priority.HIGH))
+        await asyncio.sleep(0)
+
+        time.time = 0.1
+        await asyncio.wait_for(high_task, timeout=1.0)
+        assert not low_task.done()
+        low_task.cancel()
+    finally:
+        limiter.close()
+
+
+@pytest.mark.parametrize("reported,expected", [(9, 9), (2, 5)])
+async def test_rate_limiter_update_used(reported: int, expected: int) -> None:
+    time = FakeTime()
+    limiter = RateLimiter(10, 60, get_time=time)
+    try:
+        await limiter.acquire(5)
+        limiter.update_used(reported)
+        assert limiter.used == expected
+
+        time.time = 60.0
+        assert limiter.used == 0
+    finally:
+        limiter.close()
+
+
+async def test_rate_limiter_update_used_ignores_rolled_over_window() -> None:
+    time = FakeTime(59.7)
+    limiter = RateLimiter(1200, 60, get_time=time)
+    try:
+        window_start = await limiter.acquire(1000)
+        assert window_start == 0.0
+
+        # The response of a request sent at the end of a window arrives in the next one.
+        time.time = 60.3
+        limiter.update_used(1001, window_start)
+        assert limiter.used == 0
+        await asyncio.wait_for(limiter.acquire(400, Priority.LOW), timeout=1.0)
+    finally:
+        limiter.close()
+
+
+async def test_rate_limiter_shared_through_lock_file(tmp_path) -> None:
+    path = str(tmp_path / "limiter.lock")
+    time = FakeTime()
+    limiter1 = RateLimiter(10, 60, path=path, get_time=time)
+    limiter2 = RateLimiter(10, 60, path=path, get_time=time)
+    try:
+        await limiter1.acquire(6, Priority.HIGH)
+        await limiter2.acquire(4, Priority.HIGH)
+        assert limiter1.used == 10
+        assert limiter2.used == 10
+
+        task = asyncio.create_task(limiter1.acquire(1, Priority.HIGH))
+        await asyncio.sleep(0)
+        assert not task.done()
+        task.cancel()
+    finally:
+        limiter1.close()
+        limiter2.close()
@@ -0,0 +1,136 @@
+import asyncio
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from functools import partial
+from itertools import count
+from typing import AsyncIterator, Optional
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from juno import ExchangeException, Trade
+from juno.exchanges import Binance, binance
+
+
+class CombinedStreamServer:
+    # Emulates Binance combined stream connections. Every connection subscribed to a stream
+    # receives the same events of the stream, like when connected to the real exchange. Events of
+    # different streams are sent out of event time order by offsetting their times.
+
+    def __init__(self, time_offsets: Optional[dict[str, int]] = None) -> None:
+        self.requests: list[dict] = []
+        self._time_offsets = time_offsets or {}
+        self._subscriptions: dict[web.WebSocketResponse, set[str]] = {}
+        self._trade_ids: dict[str, count] = {}
+        self._time = count(1)
+
+    async def handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        subscriptions = self._subscriptions[ws] = set()
+        try:
+            async for msg in ws:
+                data = msg.json()
+                self.requests.append(data)
+                if data["method"] == "SUBSCRIBE":
+                    subscriptions.update(data["params"])
+                else:
+                    subscriptions.difference_update(data["params"])
+                await ws.send_json({"result": None, "id": data["id"]})
+        finally:
+            del self._subscriptions[ws]
+        return ws
+
+    async def publish(self) -> None:
+        while True:
+            time = next(self._time)
+            streams = set().union(*self._subscriptions.values())
+            for stream in sorted(streams):
+                trade_id = next(self._trade_ids.setdefault(stream, count(1)))
+                event_time = time * 100 + self._time_offsets.get(stream, 0)
+                data = {"E": event_time, "a": trade_id, "T": event_time, "p": "1.0", "q": "1.0"}
+                for ws, subscriptions in list(self._subscriptions.items()):
+                    if stream in subscriptions and not ws.closed:
+                        await ws.send_json({"stream": stream, "data": data})
+            await asyncio.sleep(0.001)
+
+
+@asynccontextmanager
+async def init_binance(
+    monkeypatch, server: Optional[CombinedStreamServer] = None, **kwargs
+) -> AsyncIterator[tuple[Binance, CombinedStreamServer]]:
+    server = server or CombinedStreamServer()
+    app = web.Application()
+    app.router.add_get("/stream", server.handle)
+    async with TestServer(app) as test_server:
+        monkeypatch.setattr(binance, "_BASE_WS_URL", str(test_server.make_url("")).rstrip("/"))
+        monkeypatch.setattr(binance, "CombinedStream", partial(binance.CombinedStream, **kwargs))
+        publish_task = asyncio.create_task(server.publish())
+        try:
+            async with Binance(api_key="", secret_key="") as exchange:
+                yield exchange, server
+        finally:
+            publish_task.cancel()
+
+
+@pytest.mark.parametrize("time_offset", [-500, 500])
+async def test_connect_stream_trades_multiplexed_over_refreshes(
+    monkeypatch, time_offset: int
+) -> None:
+    async with init_binance(
+        monkeypatch,
+        CombinedStreamServer(time_offsets={"ethbtc@trade": time_offset}),
+        refresh_interval=0.05,
+    ) as (exchange, server):
+        async with exchange.connect_stream_trades("eth-btc") as eth_stream:
+            async with exchange.connect_stream_trades("ltc-btc") as ltc_stream:
+                eth_trades = [t async for t in _take(eth_stream, 200)]
+                ltc_trades = [t async for t in _take(ltc_stream, 200)]
+
+        # Refreshed many times, yet neither missing nor duplicate trades.
+        assert sum(r["method"] == "SUBSCRIBE" for r in server.requests) > 2
+        for trades in [eth_trades, ltc_trades]:
+            assert all(isinstance(t, Trade) and t.price == Decimal("1.0") for t in trades)
+            ids = [t.id for t in trades]
+            assert ids == list(range(ids[0], ids[0] + len(ids)))
+
+
+async def test_connect_stream_unsubscribes(monkeypatch) -> None:
+    async with init_binance(monkeypatch) as (exchange, server):
+        async with exchange.connect_stream_trades("eth-btc") as eth_stream:
+            async with exchange.connect_stream_trades("ltc-btc") as ltc_stream:
+                await anext(aiter(ltc_stream))
+            await anext(aiter(eth_stream))
+            await anext(aiter(eth_stream))
+
+        assert [(r["method"], r["params"]) for r in server.requests] == [
+            ("SUBSCRIBE", ["ethbtc@trade"]),
+            ("SUBSCRIBE", ["ltcbtc@trade"]),
+            ("UNSUBSCRIBE", ["ltcbtc@trade"]),
+        ]
+
+
+async def test_connect_stream_slow_subscriber_fails(monkeypatch) -> None:
+    async with init_binance(monkeypatch, queue_size=4) as (exchange, _):
+        async with exchange.connect_stream_trades("eth-btc") as stream:
+            await asyncio.sleep(0.05)
+            with pytest.raises(ExchangeException):
+                async for _ in stream:
+                    pass
+
+
+async def _take(stream, num: int):
+    async for item in stream:
+        yield item
+        num -= 1
+        if num == 0:
+            break
+
+
+def test_to_levels() -> None:
+    levels = [["0.10000000", "1.50000000"], ["0.20000000", "0.00000000"]]
+    expected = [(Decimal("0.1"), Decimal("1.5")), (Decimal("0.2"), Decimal("0.0"))]
+    # Second time around, parsed prices are reused.
+    assert binance._to_levels(levels) == expected
+    assert binance._to_levels(levels) == expected
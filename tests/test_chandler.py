@@ -3,12 +3,15 @@ from contextlib import asynccontextmanager
 from decimal import Decimal
 from typing import Optional
 
+import numpy as np
 import pytest
 from asyncstdlib import list as list_async
 from pytest_mock import MockerFixture
 
 from juno import (
     Candle,
+    CandleMeta,
+    CandleType,
     ExchangeException,
     Interval,
     Interval_,
@@ -104,6 +107,168 @@ async def test_stream_candles(
     assert stored_spans == expected_spans
 
 
+async def test_stream_candles_backfill_concurrently(
+    mocker: MockerFixture, storage: fakes.Storage
+) -> None:
+    SYMBOL = "eth-btc"
+    INTERVAL = 1
+    candles = [Candle(time=i) for i in range(10) if i != 4]
+    exchange = mock_exchange(mocker, candle_intervals=[INTERVAL])
+
+    async def stream_historical_candles(symbol, interval, start, end):
+        # Delay earlier chunks more so that they complete out of order.
+        await asyncio.sleep((10 - start) / 1000)
+        for candle in candles:
+            if start <= candle.time < end:
+                yield candle
+
+    exchange.stream_historical_candles.side_effect = stream_historical_candles
+    chandler = Chandler(
+        storage=storage,
+        exchanges=[exchange],
+        get_time_ms=fakes.Time(100).get_time,
+        backfill_concurrency=3,
+        backfill_page_size=3,
+    )
+
+    output_candles = await chandler.list_candles(exchange.name, SYMBOL, INTERVAL, 0, 10)
+
+    shard = Storage.key(exchange.name, SYMBOL, INTERVAL)
+    stored_spans, stored_candles = await asyncio.gather(
+        list_async(storage.stream_time_series_spans(shard, "candle", 0, 10)),
+        list_async(storage.stream_time_series(shard, "candle", Candle, 0, 10)),
+    )
+    assert output_candles == candles
+    assert stored_candles == candles
+    assert stored_spans == [(0, 10)]
+    assert sorted((c[3], c[4]) for c in storage.store_time_series_and_span_calls) == [
+        (0, 3),
+        (3, 6),
+        (6, 9),
+        (9, 10),
+    ]
+
+
+async def test_stream_candles_resampled_from_local_lower_interval(
+    mocker: MockerFixture, storage: fakes.Storage
+) -> None:
+    exchange = mock_exchange(mocker, candle_intervals=[1, 3], candles=[Candle(time=6)])
+    chandler = Chandler(
+        storage=storage, exchanges=[exchange], get_time_ms=fakes.Time(100).get_time
+    )
+    await storage.store_time_series_and_span(
+        shard=Storage.key(exchange.name, "eth-btc", 1),
+        key="candle",
+        items=[
+            Candle(time=0, open=Decimal("1.0"), high=Decimal("2.0"), close=Decimal("1.5")),
+            Candle(time=1, high=Decimal("3.0"), low=Decimal("0.5"), volume=Decimal("1.0")),
+            Candle(time=2, close=Decimal("2.5"), volume=Decimal("2.0")),
+            Candle(time=4, open=Decimal("4.0"), close=Decimal("5.0")),
+        ],
+        start=0,
+        # Second interval is only partially covered. Needs to be fetched from the exchange.
+        end=5,
+    )
+
+    candles = await chandler.list_candles(exchange.name, "eth-btc", 3, 0, 9)
+
+    assert candles == [
+        Candle(
+            time=0,
+            open=Decimal("1.0"),
+            high=Decimal("3.0"),
+            low=Decimal("0.0"),
+            close=Decimal("2.5"),
+            volume=Decimal("3.0"),
+        ),
+        Candle(time=6),
+    ]
+    exchange.stream_historical_candles.assert_called_once_with(
+        symbol="eth-btc", interval=3, start=3, end=9
+    )
+    stored_spans = await list_async(
+        storage.stream_time_series_spans(Storage.key(exchange.name, "eth-btc", 3), "candle")
+    )
+    assert stored_spans == [(0, 9)]
+
+
+@pytest.mark.parametrize(
+    "interval,start,end,expected_times",
+    [
+        # 2020-01-06 is a Monday.
+        (
+            Interval_.WEEK,
+            "2020-01-06",
+            "2020-01-20",
+            ["2020-01-06", "2020-01-13"],
+        ),
+        (
+            Interval_.MONTH,
+            "2020-01-01",
+            "2020-03-01",
+            ["2020-01-01", "2020-02-01"],
+        ),
+    ],
+)
+async def test_stream_candles_resampled_week_and_month(
+    mocker: MockerFixture,
+    storage: fakes.Storage,
+    interval: Interval,
+    start: str,
+    end: str,
+    expected_times: list[str],
+) -> None:
+    exchange = mock_exchange(mocker, candle_intervals=[Interval_.DAY, interval])
+    chandler = Chandler(storage=storage, exchanges=[exchange])
+    start_time = Timestamp_.parse(start)
+    end_time = Timestamp_.parse(end)
+    days = list(range(start_time, end_time, Interval_.DAY))
+    await storage.store_time_series_and_span(
+        shard=Storage.key(exchange.name, "eth-btc", Interval_.DAY),
+        key="candle",
+        items=[Candle(time=t, volume=Decimal("1.0")) for t in days],
+        start=start_time,
+        end=end_time,
+    )
+
+    candles = await chandler.list_candles(exchange.name, "eth-btc", interval, start_time, end_time)
+
+    assert [c.time for c in candles] == [Timestamp_.parse(t) for t in expected_times]
+    assert sum(c.volume for c in candles) == len(days)
+    exchange.stream_historical_candles.assert_not_called()
+
+
+async def test_stream_candles_resampled_month_from_mid_day_span(
+    mocker: MockerFixture, storage: fakes.Storage
+) -> None:
+    jan = Timestamp_.parse("2020-01-01")
+    feb = Timestamp_.parse("2020-02-01")
+    mar = Timestamp_.parse("2020-03-01")
+    exchange = mock_exchange(
+        mocker, candle_intervals=[Interval_.HOUR, Interval_.MONTH], candles=[Candle(time=jan)]
+    )
+    chandler = Chandler(storage=storage, exchanges=[exchange])
+    source_start = Timestamp_.parse("2020-01-15T13:00:00")
+    await storage.store_time_series_and_span(
+        shard=Storage.key(exchange.name, "eth-btc", Interval_.HOUR),
+        key="candle",
+        items=[
+            Candle(time=t, volume=Decimal("1.0")) for t in range(source_start, mar, Interval_.HOUR)
+        ],
+        start=source_start,
+        end=mar,
+    )
+
+    candles = await chandler.list_candles(exchange.name, "eth-btc", Interval_.MONTH, jan, mar)
+
+    assert [c.time for c in candles] == [jan, feb]
+    # February is fully resampled from hourly candles.
+    assert candles[1].volume == (mar - feb) // Interval_.HOUR
+    exchange.stream_historical_candles.assert_called_once_with(
+        symbol="eth-btc", interval=Interval_.MONTH, start=jan, end=feb
+    )
+
+
 async def test_stream_future_candles_span_stored_until_cancelled(
     mocker: MockerFixture, storage: fakes.Storage
 ) -> None:
@@ -665,6 +830,72 @@ async def test_list_candles(
     assert len(candles) == 2
 
 
+@pytest.mark.parametrize("type_", ["regular", "heikin-ashi"])
+async def test_get_candle_arrays(
+    mocker: MockerFixture,
+    storage: fakes.Storage,
+    type_: CandleType,
+) -> None:
+    candles = [
+        Candle(
+            time=i,
+            open=Decimal(f"{i}.1"),
+            high=Decimal(f"{i + 1}.5"),
+            low=Decimal(f"{i}.0"),
+            close=Decimal(f"{i}.9"),
+            volume=Decimal(f"{i}0.25"),
+        )
+        for i in [0, 1, 3, 4]
+    ]
+    # First two candles exist locally, the rest are fetched from the exchange.
+    shard = Storage.key("magicmock", "eth-btc", 1)
+    await storage.store_time_series_and_span(shard, "candle", candles[:2], 0, 2)
+    exchange = mock_exchange(mocker, candle_intervals=[1], candles=candles[2:])
+    chandler = Chandler(storage=storage, exchanges=[exchange])
+
+    arrays = await chandler.get_candle_arrays(exchange.name, "eth-btc", 1, 0, 5, type_=type_)
+    expected = await chandler.list_candles(exchange.name, "eth-btc", 1, 0, 5, type_=type_)
+
+    assert arrays.time.tolist() == [c.time for c in expected]
+    for field in ["open", "high", "low", "close", "volume"]:
+        assert getattr(arrays, field) == pytest.approx(
+            [float(getattr(c, field)) for c in expected]
+        )
+
+
+async def test_get_candle_arrays_scaled_and_filled(
+    mocker: MockerFixture,
+    storage: fakes.Storage,
+) -> None:
+    candles = [Candle(time=1, close=Decimal("1.25")), Candle(time=3, close=Decimal("2.5"))]
+    exchange = mock_exchange(mocker, candle_intervals=[1], candles=candles)
+    chandler = Chandler(storage=storage, exchanges=[exchange])
+
+    scaled = await chandler.get_candle_arrays(exchange.name, "eth-btc", 1, 0, 5, precision=2)
+    filled = await chandler.get_candle_arrays(
+        exchange.name, "eth-btc", 1, 0, 5, fill_missing_with_nan=True
+    )
+
+    assert scaled.time.tolist() == [1, 3]
+    assert scaled.close.dtype == np.int64
+    assert scaled.close.tolist() == [125, 250]
+    assert filled.time.tolist() == [0, 1, 2, 3, 4]
+    assert np.isnan(filled.close[[0, 2, 4]]).all()
+    assert filled.close[[1, 3]].tolist() == [1.25, 2.5]
+
+
+async def test_map_candle_arrays(storage: fakes.Storage, mocker: MockerFixture) -> None:
+    exchange = mock_exchange(mocker, candle_intervals=[1], candles=[Candle(time=0)])
+    chandler = Chandler(storage=storage, exchanges=[exchange])
+
+    arrays = await chandler.map_candle_arrays(
+        exchange.name, [("eth-btc", 1, "regular"), ("ltc-btc", 1, "regular")], 0, 1
+    )
+
+    assert arrays.keys() == {("eth-btc", 1, "regular"), ("ltc-btc", 1, "regular")}
+    assert all(a.time.tolist() == [0] for a in arrays.values())
+
+
 async def test_map_symbol_interval_candles(storage: fakes.Storage, mocker: MockerFixture) -> None:
     exchange = mock_exchange(
         mocker,
@@ -901,3 +1132,59 @@ async def test_stream_concurrent_future_candles(
         (Candle(time=6, close=Decimal("3.0")), ("eth-btc", 3, "regular")),
         (Candle(time=5, close=Decimal("5.0")), ("eth-btc", 5, "regular")),
     ]
+
+
+@pytest.mark.parametrize("read_ahead", [1, 3, 256])
+async def test_stream_concurrent_candles_mixed_intervals(
+    mocker: MockerFixture,
+    storage: fakes.Storage,
+    read_ahead: int,
+) -> None:
+    mocker.patch("juno.components.chandler._CONCURRENT_READ_AHEAD", read_ahead)
+    exchange = mock_exchange(mocker, candle_intervals=[1, 2, 4])
+    candles = {
+        1: [Candle(time=t, close=Decimal("1.0")) for t in range(12) if t != 5],
+        2: [Candle(time=t, close=Decimal("2.0")) for t in range(0, 12, 2)],
+        4: [Candle(time=t, close=Decimal("4.0")) for t in range(0, 12, 4) if t != 4],
+    }
+
+    def stream_historical_candles(symbol, interval, start, end):
+        return resolved_stream(*(c for c in candles[interval] if start <= c.time < end))
+
+    exchange.stream_historical_candles.side_effect = stream_historical_candles
+    chandler = Chandler(
+        storage=storage,
+        exchanges=[exchange],
+        get_time_ms=fakes.Time(100).get_time,
+        resample_candles=False,
+    )
+    entries: list[CandleMeta] = [
+        ("eth-btc", 1, "regular"),
+        ("ltc-btc", 2, "regular"),
+        ("xmr-btc", 4, "regular"),
+    ]
+
+    output = await list_async(
+        chandler.stream_concurrent_candles(
+            exchange=exchange.name, entries=entries, start=1, end=11
+        )
+    )
+
+    # Ordered by close time; higher intervals first when closing at the same time.
+    expected = sorted(
+        (
+            (c, entry)
+            for entry in entries
+            for c in candles[entry[1]]
+            if Timestamp_.floor(1, entry[1]) <= c.time
+            and c.time + entry[1] <= Timestamp_.floor(11, entry[1])
+        ),
+        key=lambda x: (x[0].time + x[1][1], -x[1][1]),
+    )
+    assert output == expected
+    # Candles closing at time 4.
+    assert output[3:6] == [
+        (Candle(time=0, close=Decimal("4.0")), ("xmr-btc", 4, "regular")),
+        (Candle(time=2, close=Decimal("2.0")), ("ltc-btc", 2, "regular")),
+        (Candle(time=3, close=Decimal("1.0")), ("eth-btc", 1, "regular")),
+    ]
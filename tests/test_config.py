@@ -1,7 +1,8 @@
 import sys
+from decimal import Decimal
 from typing import NamedTuple
 
-from juno import Interval, Interval_, config
+from juno import Candle, Interval, Interval_, config, strategies
 
 
 class Foo(NamedTuple):
@@ -53,3 +54,18 @@ def test_list_names() -> None:
     expected_output = {"a", "b", "c", "e", "f", "g"}
     output = config.list_names(input_, "bar")
     assert output == expected_output
+
+
+def test_get_module_type_constructor_with_numeric_backend() -> None:
+    input_ = {
+        "type": "doublema",
+        "short_period": 2,
+        "long_period": 3,
+        "numeric": "float",
+    }
+
+    output = config.get_module_type_constructor(strategies, input_).construct()
+    output.update(Candle(time=0, close=Decimal("1.0")), ("eth-btc", 1, "regular"))
+
+    assert isinstance(output, strategies.DoubleMA)
+    assert isinstance(output._short_ma.value, float)
@@ -58,3 +58,19 @@ def assert_constraint_chaos(constraint: constraints.Constraint) -> None:
         assert constraint.validate(*value)
     else:
         assert constraint.validate(value)
+
+
+def test_constraint_values() -> None:
+    assert list(constraints.Int(1, 4).values()) == [1, 2, 3]
+    assert list(constraints.Uniform(Decimal("0.1"), Decimal("0.3")).values()) == [
+        Decimal("0.1"),
+        Decimal("0.2"),
+    ]
+    assert list(
+        constraints.ConstraintChoice(
+            [constraints.Constant(1), constraints.Choice([2, 1])]
+        ).values()
+    ) == [1, 2]
+    assert list(
+        constraints.Pair(constraints.Int(1, 4), operator.lt, constraints.Int(2, 4)).values()
+    ) == [(1, 2), (1, 3), (2, 3)]
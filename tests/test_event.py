@@ -14,3 +14,15 @@ async def test_events() -> None:
         raise exc
 
     assert await events.emit("channel", "foo") == [1, exc]
+
+
+def test_has_handlers() -> None:
+    events = Events()
+
+    @events.on("channel", "foo")
+    async def handle():
+        pass
+
+    assert events.has_handlers("channel", "bar", "foo")
+    assert not events.has_handlers("channel", "bar")
+    assert not events.has_handlers("other", "foo")
@@ -0,0 +1,149 @@
+import asyncio
+from itertools import count
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from juno import json
+from juno.http import ClientSession, connect_refreshing_stream
+
+
+async def test_connect_refreshing_stream_switches_over_without_gaps_nor_duplicates() -> None:
+    # Every connection receives the same events, like subscribers of an exchange stream.
+    connections: set[web.WebSocketResponse] = set()
+
+    async def handle(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        connections.add(ws)
+        try:
+            await ws.receive()
+        finally:
+            connections.discard(ws)
+        return ws
+
+    async def publish() -> None:
+        for time in count(1):
+            for ws in list(connections):
+                if not ws.closed:
+                    await ws.send_json({"E": time})
+            await asyncio.sleep(0.001)
+
+    num_connections = 0
+
+    async def on_connect(ws) -> None:
+        nonlocal num_connections
+        num_connections += 1
+
+    app = web.Application()
+    app.router.add_get("/", handle)
+    async with TestServer(app) as server, ClientSession() as session:
+        publish_task = asyncio.create_task(publish())
+        try:
+            async with connect_refreshing_stream(
+                session,
+                url=str(server.make_url("/")),
+                interval=0.02,
+                loads=json.loads,
+                take_until=lambda old, new: old["E"] < new["E"],
+                on_connect=on_connect,
+            ) as stream:
+                times = []
+                async for data in stream:
+                    times.append(data["E"])
+                    if len(times) == 200:
+                        break
+        finally:
+            publish_task.cancel()
+
+    assert num_connections > 2
+    assert times == list(range(times[0], times[0] + len(times)))
+
+
+async def test_connect_refreshing_stream_passes_through_responses() -> None:
+    # Every connection first responds to a request, like subscribing to an exchange stream.
+    connections: set[web.WebSocketResponse] = set()
+    connection_ids = count(1)
+
+    async def handle(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_json({"id": next(connection_ids)})
+        connections.add(ws)
+        try:
+            await ws.receive()
+        finally:
+            connections.discard(ws)
+        return ws
+
+    async def publish() -> None:
+        for time in count(1):
+            for ws in list(connections):
+                if not ws.closed:
+                    await ws.send_json({"E": time})
+            await asyncio.sleep(0.001)
+
+    app = web.Application()
+    app.router.add_get("/", handle)
+    async with TestServer(app) as server, ClientSession() as session:
+        publish_task = asyncio.create_task(publish())
+        try:
+            async with connect_refreshing_stream(
+                session,
+                url=str(server.make_url("/")),
+                interval=0.02,
+                loads=json.loads,
+                take_until=lambda old, new: old["E"] < new["E"],
+                passthrough=lambda data: "E" not in data,
+            ) as stream:
+                times, ids = [], []
+                async for data in stream:
+                    if "E" in data:
+                        times.append(data["E"])
+                    else:
+                        ids.append(data["id"])
+                    if len(times) == 200:
+                        break
+        finally:
+            publish_task.cancel()
+
+    # Responses of all connections switched over to.
+    assert len(ids) > 2
+    assert ids == list(range(1, len(ids) + 1))
+    assert times == list(range(times[0], times[0] + len(times)))
+
+
+async def test_connect_refreshing_stream_refreshes_silent_stream() -> None:
+    # Like a user data stream, the server sends nothing and drops connections after a while.
+    connections: list[web.WebSocketResponse] = []
+
+    async def handle(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        connections.append(ws)
+        try:
+            await asyncio.wait_for(ws.receive(), timeout=0.1)
+        except asyncio.TimeoutError:
+            await ws.close()
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/", handle)
+    async with TestServer(app) as server, ClientSession() as session:
+        async with connect_refreshing_stream(
+            session,
+            url=str(server.make_url("/")),
+            interval=0.02,
+            loads=json.loads,
+            take_until=lambda old, new: old["E"] < new["E"],
+            raise_on_disconnect=True,
+        ) as stream:
+            receive_task = asyncio.ensure_future(anext(aiter(stream)))
+            await asyncio.sleep(0.3)
+            assert not receive_task.done()
+
+            # Still streaming from the latest connection.
+            await connections[-1].send_json({"E": 1})
+            assert await asyncio.wait_for(receive_task, timeout=1.0) == {"E": 1}
+
+    assert len(connections) > 2
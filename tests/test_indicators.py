@@ -1,9 +1,15 @@
+from copy import deepcopy
 from decimal import Decimal
-from typing import TypedDict
+from statistics import median
+from typing import Any, Iterator, TypedDict
 
+import numpy as np
 import pytest
 
 from juno import indicators
+from juno.indicators.numeric import Numeric, get_numeric_type, numeric
+from juno.indicators.registry import IndicatorRegistry
+from juno.indicators.window import Window
 from juno.path import full_path, load_yaml_file
 
 
@@ -32,6 +38,13 @@ def data() -> IndicatorSources:
     }
 
 
+@pytest.fixture(autouse=True, params=["decimal", "float"])
+def backend(request) -> Iterator[Numeric]:
+    # Indicators constructed within the test use the numeric backend.
+    with numeric(request.param):
+        yield request.param
+
+
 def test_adx(data: IndicatorSources) -> None:
     _assert(indicators.Adx(14), data["tulip"]["adx"], 4)
 
@@ -137,6 +150,24 @@ def test_macd(data: IndicatorSources) -> None:
     _assert(indicators.Macd(12, 26, 9), data["tulip"]["macd"], 9)
 
 
+def test_mmi(data: IndicatorSources) -> None:
+    # No reference data available. Compare against recomputing the whole window every time.
+    inputs = data["tulip"]["sma"]["inputs"]
+    prices = [Decimal(p) for p in inputs[0]]
+    period = 5
+    outputs = []
+    for i in range(period - 1, len(prices)):
+        window = prices[i - period + 1 : i + 1]
+        med = median(window)
+        count = sum(
+            1
+            for prev, next_ in zip(window, window[1:])
+            if (next_ > med and next_ > prev) or (next_ < med and next_ < prev)
+        )
+        outputs.append(str(Decimal("100.0") * count / (period - 1)))
+    _assert(indicators.Mmi(period), {"inputs": inputs, "outputs": [outputs]}, 6)
+
+
 def test_obv(data: IndicatorSources) -> None:
     _assert(indicators.Obv(), data["tulip"]["obv"], 4)
 
@@ -174,29 +205,108 @@ def test_zlsma(data: IndicatorSources) -> None:
     _assert(indicators.Zlsma(2), data["trading_view"]["zlsma"], 2)
 
 
+def test_window() -> None:
+    num = get_numeric_type()
+    values = [num(v) for v in ["3", "1", "4", "1", "5", "9", "2", "6", "5", "3", "5"]]
+    window = Window(4, with_sum=True, with_min=True, with_max=True)
+    for i, value in enumerate(values):
+        evicted = window.append(value)
+        expected = values[max(i - 3, 0) : i + 1]
+        assert evicted == (values[i - 4] if i >= 4 else None)
+        assert list(window) == expected
+        assert window[0] == expected[0]
+        assert window[-1] == expected[-1]
+        assert window.full == (len(expected) == 4)
+        assert window.sum == sum(expected)
+        assert window.min == min(expected)
+        assert window.max == max(expected)
+
+
+def test_indicator_registry() -> None:
+    registry = IndicatorRegistry()
+    shared = [registry.share(indicators.Ema(3)) for _ in range(2)]
+    other = registry.share(indicators.Ema(4))
+    expected = indicators.Ema(3)
+    for price in ["1.0", "3.0", "2.0", "5.0"]:
+        registry.advance()
+        value = expected.update(Decimal(price))
+        assert [s.update(Decimal(price)) for s in shared] == [value, value]
+        other.update(Decimal(price))
+        assert shared[0].value == value
+    assert shared[0].mature
+    assert registry.size == 2
+
+    # Identical indicators fed different inputs cannot be shared.
+    registry.advance()
+    shared[0].update(Decimal("1.0"))
+    with pytest.raises(ValueError):
+        shared[1].update(Decimal("2.0"))
+
+
 def _assert(indicator, data: IndicatorData, precision: int) -> None:
     inputs = data["inputs"]
     expected_outputs = data["outputs"]
     input_len, output_len = len(inputs[0]), len(expected_outputs[0])
     offset = input_len - output_len
+    fresh_indicator = deepcopy(indicator)
+    streamed_outputs = []
     for i in range(0, input_len):
         input_ = [Decimal(input_[i]) for input_ in inputs]
         outputs = indicator.update(*input_)
         if not isinstance(outputs, tuple):
             outputs = (outputs,)
         assert len(outputs) == len(expected_outputs)
+        streamed_outputs.append(outputs)
 
         if i >= offset:
             assert indicator.mature
+            assert all(type(output) is get_numeric_type() for output in outputs)
             for j in range(0, len(outputs)):
                 expected_output = expected_outputs[j][i - offset]
                 # "*" is a special symbol and allows any value.
                 if expected_output != "*":
+                    # Expected value is converted to the type of the numeric backend. Floats
+                    # get a slightly larger tolerance to accept rounding errors of values which
+                    # are exactly at the tolerance.
+                    tolerance = 10**-precision
+                    if isinstance(outputs[j], float):
+                        tolerance *= 1 + 1e-6
                     assert outputs[j] == pytest.approx(
-                        Decimal(expected_output), abs=10**-precision
+                        type(outputs[j])(expected_output), abs=tolerance
                     ), (
                         f"Failed at index {i} offset {offset} with inputs {input_} and outputs "
                         f"{outputs}"
                     )
         else:
             assert not indicator.mature
+
+    _assert_compute(fresh_indicator, inputs, streamed_outputs)
+
+
+def _assert_compute(
+    indicator, inputs: list[list[str]], streamed_outputs: list[tuple[Any, ...]]
+) -> None:
+    # Batch computation matches streaming for every input, including before maturity.
+    arrays = [np.array([float(v) for v in input_]) for input_ in inputs]
+    batch_indicator = deepcopy(indicator)
+    batch_outputs = batch_indicator.compute(*arrays)
+    if not isinstance(batch_outputs, tuple):
+        batch_outputs = (batch_outputs,)
+    for j, batch_output in enumerate(batch_outputs):
+        assert batch_output.dtype == np.float64
+        np.testing.assert_allclose(
+            batch_output, [float(o[j]) for o in streamed_outputs], rtol=1e-9, atol=1e-9
+        )
+
+    # Streaming continues from the state left by a batch computation.
+    split = len(inputs[0]) // 2
+    indicator.compute(*(a[:split] for a in arrays))
+    for i in range(split, len(inputs[0])):
+        outputs = indicator.update(*(Decimal(input_[i]) for input_ in inputs))
+        if not isinstance(outputs, tuple):
+            outputs = (outputs,)
+        assert all(type(output) is get_numeric_type() for output in outputs)
+        assert [float(o) for o in outputs] == pytest.approx(
+            [float(o) for o in streamed_outputs[i]], rel=1e-9, abs=1e-9
+        )
+    assert indicator.mature == batch_indicator.mature
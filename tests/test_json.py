@@ -49,3 +49,10 @@ def test_loads(input_, expected_output) -> None:
     res = json.loads(input_)
     assert type(res) is type(expected_output)
     assert res == expected_output
+
+
+def test_loads_fast() -> None:
+    # Decimal values are strings in market data, so parsers agree.
+    input_ = '{"e":"depthUpdate","E":1,"U":2,"u":3,"b":[["0.10","2.0"]],"a":[]}'
+    assert json.loads_fast(input_) == json.loads(input_)
+    assert json.loads_fast(input_.encode()) == json.loads(input_)
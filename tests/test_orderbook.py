@@ -1,6 +1,7 @@
 import asyncio
 from contextlib import asynccontextmanager
 from decimal import Decimal
+from random import Random
 
 import pytest
 from pytest_mock import MockerFixture
@@ -8,6 +9,7 @@ from pytest_mock import MockerFixture
 from juno import Depth, ExchangeException, Filters
 from juno.asyncio import resolved_stream
 from juno.components import Orderbook
+from juno.components.orderbook import PriceLevels
 from juno.filters import Price, Size
 
 from .mocks import mock_exchange
@@ -19,6 +21,31 @@ FILTERS = Filters(
 )
 
 
+@pytest.mark.parametrize("descending", [False, True])
+def test_price_levels(descending: bool) -> None:
+    random = Random(1)
+    levels = PriceLevels(descending=descending)
+    expected: dict[Decimal, Decimal] = {}
+    levels.reset([(Decimal("5.0"), Decimal("1.0")), (Decimal("6.0"), Decimal("0.0"))])
+    expected[Decimal("5.0")] = Decimal("1.0")
+
+    for _ in range(1000):
+        price = Decimal(random.randint(1, 50)) / 10
+        # Removes levels about half of the time, including ones which do not exist.
+        size = Decimal(max(random.randint(-10, 10), 0))
+        levels.set(price, size)
+        if size > 0:
+            expected[price] = size
+        else:
+            expected.pop(price, None)
+
+        ordered = sorted(expected.items(), reverse=descending)
+        assert len(levels) == len(expected)
+        assert levels.best() == (ordered[0] if ordered else None)
+        assert levels.top(3) == ordered[:3]
+    assert levels.top() == list(levels) == sorted(expected.items(), reverse=descending)
+
+
 async def test_list_asks_bids(mocker: MockerFixture) -> None:
     snapshot = Depth.Snapshot(
         asks=[
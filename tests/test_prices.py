@@ -1,11 +1,13 @@
 from decimal import Decimal
 
+import numpy as np
 import pytest
 from pytest_mock import MockerFixture
 
 from juno import Asset, Candle, Symbol, Symbol_
 from juno.components import Prices
-from juno.components.prices import InsufficientPrices
+from juno.components.prices import InsufficientPrices, PriceMatrix
+from tests import fakes
 from tests.mocks import mock_chandler, mock_informant
 
 
@@ -73,6 +75,26 @@ async def test_map_asset_prices(
     assert output == expected_output
 
 
+async def test_map_asset_prices_indirect_prices_are_exact(mocker: MockerFixture) -> None:
+    candles = [Candle(time=0, open=Decimal("0.1"), close=Decimal("0.3"))]
+    prices = Prices(
+        informant=mock_informant(mocker, symbols=["eth-btc", "btc-usdt"]),
+        chandler=mock_chandler(
+            mocker, candles=candles, first_candle=candles[0], last_candle=candles[-1]
+        ),
+    )
+    output = await prices.map_asset_prices(
+        exchange="exchange",
+        assets=["eth"],
+        interval=1,
+        target_asset="usdt",
+        start=0,
+        end=1,
+    )
+    # Float products would be off, e.g. 0.1 * 0.1 = 0.010000000000000002.
+    assert output == {"eth": [Decimal("0.01"), Decimal("0.09")]}
+
+
 async def test_map_asset_prices_insufficient_prices(mocker: MockerFixture) -> None:
     prices = Prices(
         informant=mock_informant(mocker, symbols=["btc-usdt"]),
@@ -92,3 +114,65 @@ async def test_map_asset_prices_insufficient_prices(mocker: MockerFixture) -> No
             start=0,
             end=3,
         )
+
+
+async def test_map_asset_prices_extends_cached_prices(mocker: MockerFixture) -> None:
+    # The ETH candle at time 5 is missing.
+    chandler = fakes.Chandler(
+        candles={
+            ("exchange", "eth-btc", 1): [
+                Candle(time=i, open=Decimal(i + 1), close=Decimal(i + 2))
+                for i in range(10)
+                if i != 5
+            ],
+            ("exchange", "btc-usdt", 1): [
+                Candle(time=i, open=Decimal("2.0"), close=Decimal("3.0")) for i in range(10)
+            ],
+        },
+        first_candle=Candle(time=0),
+        last_candle=Candle(time=9),
+    )
+    stream_candles = mocker.spy(chandler, "stream_candles")
+    prices = Prices(informant=fakes.Informant(symbols=["eth-btc", "btc-usdt"]), chandler=chandler)
+
+    async def map_prices(start: int, end: int) -> PriceMatrix:
+        return await prices.map_asset_price_matrix(
+            exchange="exchange",
+            assets=["eth", "btc"],
+            interval=1,
+            target_asset="usdt",
+            start=start,
+            end=end,
+        )
+
+    output = await map_prices(4, 7)
+    assert output.assets == ["eth", "btc"]
+    # ETH is mapped indirectly through BTC.
+    np.testing.assert_array_equal(output.prices, [[10.0, 18.0, 18.0, 24.0], [2.0, 3.0, 3.0, 3.0]])
+    assert stream_candles.call_count == 2
+
+    # Within the cached span.
+    output = await map_prices(6, 7)
+    np.testing.assert_array_equal(output.prices, [[14.0, 24.0], [2.0, 3.0]])
+    assert stream_candles.call_count == 2
+
+    # Only candles outside of the cached span are fetched.
+    stream_candles.reset_mock()
+    output = await map_prices(2, 9)
+    np.testing.assert_array_equal(
+        output.prices,
+        [[6.0, 12.0, 15.0, 18.0, 18.0, 24.0, 27.0, 30.0], [2.0] + [3.0] * 7],
+    )
+    assert sorted(
+        (c.kwargs["symbol"], c.kwargs["start"], c.kwargs["end"])
+        for c in stream_candles.call_args_list
+    ) == [
+        ("btc-usdt", 2, 4),
+        ("btc-usdt", 7, 9),
+        ("eth-btc", 2, 4),
+        ("eth-btc", 7, 9),
+    ]
+
+    # The span cannot start with a missing candle.
+    with pytest.raises(ValueError):
+        await map_prices(5, 7)
@@ -0,0 +1,174 @@
+import asyncio
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from typing import AsyncIterator
+
+import aiohttp
+import pytest
+from aiohttp.test_utils import TestServer
+
+from juno import (
+    Candle,
+    Depth,
+    ExchangeException,
+    ExchangeInfo,
+    Fees,
+    InsufficientFunds,
+    OrderType,
+    Side,
+)
+from juno.exchanges import Exchange
+from juno.exchanges.recording import (
+    Recording,
+    RecordingServer,
+    RemoteRecording,
+    init_exchanges,
+    record,
+    replay,
+)
+from juno.filters import Filters, Price
+
+from . import mocks
+
+EXCHANGE_INFO = ExchangeInfo(
+    fees={"__all__": Fees(maker=Decimal("0.001"), taker=Decimal("0.002"))},
+    filters={"__all__": Filters(price=Price(min=Decimal("0.01")))},
+)
+CANDLES = [
+    Candle(time=0, close=Decimal("1.0")),
+    Candle(time=1, close=Decimal("2.0")),
+]
+STREAM_DEPTH = [
+    Depth.Snapshot(bids=[(Decimal("1.0"), Decimal("1.0"))], last_id=1),
+    Depth.Update(asks=[(Decimal("2.0"), Decimal("0.0"))], first_id=2, last_id=2),
+]
+
+
+async def record_exchange(mocker, path: str) -> None:
+    exchange = mocks.mock_exchange(
+        mocker,
+        exchange_info=EXCHANGE_INFO,
+        candles=CANDLES,
+        candle_intervals=[60_000],
+        can_edit_order=False,
+    )
+    exchange.place_order.side_effect = InsufficientFunds("no funds")
+    exchange.stream_depth_queue.put_nowait(STREAM_DEPTH[0])
+
+    async with record(exchange, path) as recorder:
+        assert await recorder.get_exchange_info() == EXCHANGE_INFO
+        assert [c async for c in recorder.stream_historical_candles("eth-btc", 1, 0, 2)] == CANDLES
+        with pytest.raises(InsufficientFunds):
+            await recorder.place_order("spot", "eth-btc", Side.BUY, OrderType.MARKET)
+        async with recorder.connect_stream_depth("eth-btc") as stream:
+            assert await anext(aiter(stream)) == STREAM_DEPTH[0]
+            await asyncio.sleep(0.1)
+            exchange.stream_depth_queue.put_nowait(STREAM_DEPTH[1])
+            assert await anext(aiter(stream)) == STREAM_DEPTH[1]
+
+
+async def assert_replays(exchange: Exchange) -> None:
+    assert not exchange.can_edit_order
+    assert exchange.list_candle_intervals() == [60_000]
+    assert await exchange.get_exchange_info() == EXCHANGE_INFO
+    assert [c async for c in exchange.stream_historical_candles("eth-btc", 1, 0, 2)] == CANDLES
+    with pytest.raises(InsufficientFunds):
+        await exchange.place_order("spot", "eth-btc", Side.BUY, OrderType.MARKET)
+    async with exchange.connect_stream_depth("eth-btc") as stream:
+        assert [await anext(aiter(stream)), await anext(aiter(stream))] == STREAM_DEPTH
+
+
+@asynccontextmanager
+async def serve(directory: str) -> AsyncIterator[str]:
+    async with TestServer(RecordingServer(directory, speed=None).app) as server:
+        yield str(server.make_url(""))
+
+
+async def test_replay_recording(mocker, tmp_path) -> None:
+    path = str(tmp_path / "exchange.jsonl.gz")
+    await record_exchange(mocker, path)
+
+    async with replay("exchange", Recording(path, speed=None)) as exchange:
+        assert type(exchange).__name__ == "exchange"
+        await assert_replays(exchange)
+
+
+async def test_replay_recording_from_server(mocker, tmp_path) -> None:
+    await record_exchange(mocker, str(tmp_path / "exchange.jsonl.gz"))
+
+    async with serve(str(tmp_path)) as url:
+        # Recordings are reloaded for every replay.
+        for _ in range(2):
+            async with replay("exchange", RemoteRecording(url, "exchange")) as exchange:
+                await assert_replays(exchange)
+
+
+@pytest.mark.parametrize("speed,min_delay,max_delay", [(1.0, 0.09, 1.0), (10.0, 0.009, 0.05)])
+async def test_replay_recording_paces_stream(
+    mocker, tmp_path, speed: float, min_delay: float, max_delay: float
+) -> None:
+    path = str(tmp_path / "exchange.jsonl.gz")
+    await record_exchange(mocker, path)
+
+    async with replay("exchange", Recording(path, speed=speed)) as exchange:
+        await exchange.get_exchange_info()
+        async for _ in exchange.stream_historical_candles("eth-btc", 1, 0, 2):
+            pass
+        with pytest.raises(InsufficientFunds):
+            await exchange.place_order("spot", "eth-btc", Side.BUY, OrderType.MARKET)
+        async with exchange.connect_stream_depth("eth-btc") as stream:
+            await anext(aiter(stream))
+            start = asyncio.get_running_loop().time()
+            await anext(aiter(stream))
+            assert min_delay <= asyncio.get_running_loop().time() - start < max_delay
+
+
+@pytest.mark.parametrize(
+    "error,expected_type,expected_match",
+    [
+        (ValueError("unexpected"), ValueError, "unexpected"),
+        # Not constructible from the message alone.
+        (
+            aiohttp.WebSocketError(aiohttp.WSCloseCode.GOING_AWAY, "closed"),
+            ExchangeException,
+            "WebSocketError: closed",
+        ),
+    ],
+)
+async def test_replay_recording_of_stream_failed_unexpectedly(
+    mocker, tmp_path, error: Exception, expected_type: type[Exception], expected_match: str
+) -> None:
+    path = str(tmp_path / "exchange.jsonl.gz")
+    exchange = mocks.mock_exchange(mocker)
+    exchange.stream_depth_queue.put_nowait(STREAM_DEPTH[0])
+    exchange.stream_depth_queue.put_nowait(error)
+    async with record(exchange, path) as recorder:
+        async with recorder.connect_stream_depth("eth-btc") as stream:
+            assert await anext(aiter(stream)) == STREAM_DEPTH[0]
+            with pytest.raises(type(error)):
+                await anext(aiter(stream))
+
+    async with replay("exchange", Recording(path, speed=None)) as exchange:
+        async with exchange.connect_stream_depth("eth-btc") as stream:
+            assert await anext(aiter(stream)) == STREAM_DEPTH[0]
+            with pytest.raises(expected_type, match=expected_match):
+                await asyncio.wait_for(anext(aiter(stream)), timeout=1.0)
+
+
+async def test_init_exchanges_for_replay(mocker, tmp_path) -> None:
+    await record_exchange(mocker, str(tmp_path / "binance.jsonl.gz"))
+
+    exchanges = init_exchanges(
+        {
+            "exchange": "binance",
+            "exchange_recording": {
+                "mode": "replay",
+                "directory": str(tmp_path),
+                "speed": None,
+            },
+        }
+    )
+
+    assert [type(e).__name__.lower() for e in exchanges] == ["binance"]
+    async with exchanges[0] as exchange:
+        await assert_replays(exchange)
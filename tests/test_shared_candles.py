@@ -0,0 +1,105 @@
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+
+import pytest
+from pytest_mock import MockerFixture
+
+from juno import Candle
+from juno.components import Chandler, SharedCandles
+from juno.components.shared_candles import iter_candles
+from tests.mocks import mock_exchange
+
+from . import fakes
+
+CANDLES = [
+    Candle(
+        time=i,
+        open=Decimal(f"{i}.1"),
+        high=Decimal(f"{i + 1}.5"),
+        low=Decimal(f"{i}.0"),
+        close=Decimal(f"{i}.9"),
+        volume=Decimal(f"{i}0.25"),
+    )
+    for i in range(5)
+]
+
+
+async def test_acquire_and_attach(mocker: MockerFixture, storage: fakes.Storage) -> None:
+    exchange = mock_exchange(mocker, candle_intervals=[1], candles=CANDLES)
+    chandler = Chandler(storage=storage, exchanges=[exchange])
+
+    async with SharedCandles(chandler) as publisher, SharedCandles(chandler) as subscriber:
+        published = await publisher.acquire(exchange.name, "eth-btc", 1, 0, 5, precision=2)
+        # Other instances attach to the published candles instead of loading them again.
+        acquired = await subscriber.acquire(exchange.name, "eth-btc", 1, 0, 5, precision=2)
+        attached = subscriber.attach(published.name)
+
+        assert exchange.stream_historical_candles.call_count == 1
+        assert acquired.name == attached.name == published.name
+        assert list(iter_candles(published.arrays, published.precision)) == CANDLES
+        assert list(iter_candles(attached.arrays, attached.precision)) == CANDLES
+        assert not attached.arrays.close.flags.writeable
+
+        # Another process attaches without the candles being pickled.
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            closes = executor.submit(_attach_and_sum_closes, published.name).result()
+        assert closes == sum(c.close for c in CANDLES)
+
+        names = [published.name, acquired.name, attached.name]
+        del published, acquired, attached
+        publisher.release(names[0])
+        subscriber.release(names[1])
+        subscriber.release(names[2])
+
+
+async def test_acquire_with_precision_per_column(
+    mocker: MockerFixture, storage: fakes.Storage
+) -> None:
+    # Volume would overflow int64 with the precision of prices.
+    candles = [
+        Candle(time=i, close=Decimal("0.00001234"), volume=Decimal("123456789012345.67"))
+        for i in range(2)
+    ]
+    exchange = mock_exchange(mocker, candle_intervals=[1], candles=candles)
+    chandler = Chandler(storage=storage, exchanges=[exchange])
+    precision = {"open": 8, "high": 8, "low": 8, "close": 8, "volume": 2}
+
+    async with SharedCandles(chandler) as shared_candles:
+        shared = await shared_candles.acquire(
+            exchange.name, "eth-btc", 1, 0, 2, precision=precision
+        )
+
+        assert shared.precision == precision
+        assert shared.arrays.volume.tolist() == [12345678901234567] * 2
+        assert list(iter_candles(shared.arrays, shared.precision)) == candles
+
+        name = shared.name
+        del shared
+        shared_candles.release(name)
+
+
+async def test_evict_unreferenced(mocker: MockerFixture, storage: fakes.Storage) -> None:
+    exchange = mock_exchange(mocker, candle_intervals=[1], candles=CANDLES)
+    chandler = Chandler(storage=storage, exchanges=[exchange])
+
+    async with SharedCandles(chandler, max_size=1) as shared_candles:
+        candles = await shared_candles.acquire(exchange.name, "eth-btc", 1, 0, 5)
+        # Referenced candles are kept even when over the size limit.
+        assert shared_candles.size > 0
+        name = candles.name
+
+        del candles
+        shared_candles.release(name)
+
+        assert shared_candles.size == 0
+        with pytest.raises(ValueError):
+            shared_candles.attach(name)
+
+
+def _attach_and_sum_closes(name: str) -> Decimal:
+    shared_candles = SharedCandles(Chandler(storage=fakes.Storage(), exchanges=[]))
+    candles = shared_candles.attach(name)
+    result = sum(c.close for c in iter_candles(candles.arrays, candles.precision))
+    del candles
+    shared_candles.release(name)
+    return Decimal(result)
@@ -1,12 +1,15 @@
 import asyncio
 import random
+import sqlite3
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from decimal import Decimal
 from typing import Any, NamedTuple, Optional, Union
 
+import numpy as np
 import pytest
 from asyncstdlib import list as list_async
+from pytest_lazy_fixtures import lf
 
 from juno import AssetInfo, Candle, ExchangeInfo, Fees, Fill, Filters, Ticker, Trade, storages
 from juno.trading import CloseReason, Position, TradingSummary
@@ -262,3 +265,256 @@ async def test_memory_get_set_dynamic_types(storage: storages.Storage) -> None:
     assert output.optional
     assert isinstance(output.optional, Concrete)
     assert output.optional.value == 1
+
+
+async def test_sqlite_reuses_connection_per_shard(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    async with storages.SQLite() as sqlite:
+        await sqlite.store_time_series_and_span("shard", "key", [Item(0)], 0, 1)
+        with sqlite._connect("shard") as conn1:
+            (journal_mode,) = conn1.execute("PRAGMA journal_mode").fetchone()
+        await sqlite.set("shard", "key", Item(1))
+        with sqlite._connect("shard") as conn2:
+            pass
+        with sqlite._connect("other_shard") as conn3:
+            pass
+
+        items = await list_async(sqlite.stream_time_series("shard", "key", Item))
+
+    assert journal_mode == "wal"
+    assert conn1 is conn2
+    assert conn1 is not conn3
+    assert items == [Item(0)]
+    assert len(sqlite._conns) == 0
+
+
+@pytest.fixture
+async def sqlite(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    async with storages.SQLite() as storage:
+        yield storage
+
+
+@pytest.mark.parametrize("storage", [lf("memory"), lf("sqlite")])
+async def test_failed_store_does_not_leave_partial_data(storage) -> None:
+    with pytest.raises(sqlite3.IntegrityError):
+        await storage.store_time_series_and_span(
+            "shard", "key", [Candle(time=0), Candle(time=0)], 0, 1
+        )
+    # A successful write on the same shard must not commit anything from the failed one.
+    await storage.set("shard", "key", Item(1))
+
+    spans = await list_async(storage.stream_time_series_spans("shard", "key"))
+    assert spans == []
+
+    await storage.store_time_series_and_span("shard", "key", [Candle(time=0)], 0, 1)
+    candles = await list_async(storage.stream_time_series("shard", "key", Candle))
+    assert candles == [Candle(time=0)]
+
+
+async def test_sqlite_reads_do_not_wait_for_writer(sqlite) -> None:
+    await sqlite.store_time_series_and_span("shard", "key", [Item(0)], 0, 1)
+
+    # Hold the writer connection while reading from other threads.
+    with sqlite._connect("shard"):
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                *(list_async(sqlite.stream_time_series("shard", "key", Item)) for _ in range(8))
+            ),
+            timeout=5,
+        )
+
+    assert all(items == [Item(0)] for items in results)
+    assert sqlite._conns["shard"].reader_count <= 4
+
+
+async def test_sqlite_read_does_not_create_shard(tmp_path, sqlite) -> None:
+    spans = await list_async(sqlite.stream_time_series_spans("shard", "key"))
+    items = await list_async(sqlite.stream_time_series("shard", "key", Item))
+    value = await sqlite.get("shard", "key", Item)
+
+    assert spans == []
+    assert items == []
+    assert value is None
+    assert list((tmp_path / ".juno" / "data").iterdir()) == []
+
+
+@pytest.fixture
+async def columnar(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    async with storages.Columnar() as storage:
+        yield storage
+
+
+@pytest.mark.parametrize(
+    "items",
+    [
+        [
+            Candle(time=0, close=Decimal("0.12345678")),
+            Candle(time=1, open=Decimal("1.0"), volume=Decimal("123456.5")),
+            Candle(time=3),
+        ],
+        [
+            Trade(id=1, time=0, price=Decimal("1.0"), size=Decimal("2.0")),
+            Trade(id=2, time=3, price=Decimal("4.0"), size=Decimal("5.0")),
+            Trade(id=3, time=3, price=Decimal("7.0"), size=Decimal("8.0")),
+        ],
+    ],
+)
+async def test_columnar_store_objects_and_span(columnar: storages.Columnar, items) -> None:
+    type_ = type(items[0])
+    start = items[0].time
+    end = items[-1].time + 1
+
+    await columnar.store_time_series_and_span("shard", "key", items, start, end)
+    output_spans, output_items, output_sub_items = await asyncio.gather(
+        list_async(columnar.stream_time_series_spans("shard", "key", start, end)),
+        list_async(columnar.stream_time_series("shard", "key", type_, start, end)),
+        list_async(columnar.stream_time_series("shard", "key", type_, 1, end)),
+    )
+
+    assert output_spans == [(start, end)]
+    assert output_items == items
+    assert output_sub_items == items[1:]
+
+
+async def test_columnar_stream_missing_series(columnar: storages.Columnar) -> None:
+    output_spans, output_items = await asyncio.gather(
+        list_async(columnar.stream_time_series_spans("shard", "key", 0, 10)),
+        list_async(columnar.stream_time_series("shard", "key", Candle, 0, 10)),
+    )
+
+    assert output_spans == []
+    assert output_items == []
+
+
+async def test_columnar_store_empty_series_then_items(columnar: storages.Columnar) -> None:
+    await columnar.store_time_series_and_span("shard", "key", items=[], start=0, end=5)
+    await columnar.store_time_series_and_span(
+        "shard", "key", items=[Candle(time=5), Candle(time=6)], start=5, end=7
+    )
+
+    output_spans, output_items = await asyncio.gather(
+        list_async(columnar.stream_time_series_spans("shard", "key", 0, 10)),
+        list_async(columnar.stream_time_series("shard", "key", Candle, 0, 10)),
+    )
+
+    assert output_spans == [(0, 7)]
+    assert output_items == [Candle(time=5), Candle(time=6)]
+
+
+async def test_columnar_store_out_of_order_and_overlapping(columnar: storages.Columnar) -> None:
+    await columnar.store_time_series_and_span("shard", "key", [Item(4), Item(5)], 4, 6)
+    await columnar.store_time_series_and_span("shard", "key", [Item(0), Item(1)], 0, 2)
+    await columnar.store_time_series_and_span("shard", "key", [Item(i) for i in range(0, 8)], 0, 8)
+
+    time_spans = await list_async(columnar.stream_time_series_spans("shard", "key"))
+    items = await list_async(columnar.stream_time_series("shard", "key", Item))
+    sub_items = await list_async(columnar.stream_time_series("shard", "key", Item, 1, 5))
+
+    assert time_spans == [(0, 8)]
+    assert items == [Item(i) for i in range(0, 8)]
+    assert sub_items == [Item(i) for i in range(1, 5)]
+
+
+@pytest.mark.parametrize(
+    "unrepresentable",
+    [
+        Candle(time=2, close=Decimal("60000.123456789012345")),
+        Candle(time=2, volume=Decimal("1e20")),
+    ],
+)
+async def test_columnar_falls_back_to_sqlite_beyond_precision(
+    columnar: storages.Columnar, unrepresentable: Candle
+) -> None:
+    candles = [Candle(time=0, close=Decimal("1.5")), Candle(time=1, close=Decimal("0.00000001"))]
+    await columnar.store_time_series_and_span("shard", "key", candles, 0, 2)
+    await columnar.store_time_series_and_span("shard", "key", [unrepresentable], 2, 3)
+    await columnar.store_time_series_and_span(
+        "shard", "key", [Candle(time=3, close=Decimal("2"))], 3, 4
+    )
+
+    spans = await list_async(columnar.stream_time_series_spans("shard", "key"))
+    items = await list_async(columnar.stream_time_series("shard", "key", Candle))
+    arrays = await columnar.get_time_series_arrays("shard", "key", Candle, 0, 4)
+    assert spans == [(0, 4)]
+    assert items == candles + [unrepresentable, Candle(time=3, close=Decimal("2"))]
+    assert arrays["time"].tolist() == [0, 1, 2, 3]
+
+
+async def test_columnar_keeps_precision_of_existing_series(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    candles = [Candle(time=0, close=Decimal("1.25")), Candle(time=1, close=Decimal("2"))]
+
+    async with storages.Columnar(decimal_precision=2) as storage:
+        await storage.store_time_series_and_span("shard", "key", candles[:1], 0, 1)
+    async with storages.Columnar(decimal_precision=8) as storage:
+        await storage.store_time_series_and_span("shard", "key", candles[1:], 1, 2)
+        arrays = await storage.get_time_series_arrays("shard", "key", Candle, 0, 2, precision=2)
+        # Not representable with the precision of the series.
+        await storage.store_time_series_and_span(
+            "shard", "key", [Candle(time=2, close=Decimal("0.001"))], 2, 3
+        )
+        items = await list_async(storage.stream_time_series("shard", "key", Candle))
+
+    assert arrays["close"].tolist() == [125, 200]
+    assert items == candles + [Candle(time=2, close=Decimal("0.001"))]
+
+
+async def test_columnar_set_get(columnar: storages.Columnar) -> None:
+    fees = {"foo": Fees(maker=Decimal("0.01"), taker=Decimal("0.02"))}
+
+    await columnar.set("shard", "key", fees)
+    out_fees = await columnar.get("shard", "key", dict[str, Fees])
+
+    assert out_fees == fees
+
+
+@pytest.mark.parametrize("storage", [lf("memory"), lf("columnar")])
+async def test_get_time_series_arrays(storage: storages.Storage) -> None:
+    candles = [
+        Candle(time=0, close=Decimal("1.5"), volume=Decimal("10")),
+        Candle(time=1, close=Decimal("0.25"), volume=Decimal("20")),
+        Candle(time=2, close=Decimal("3"), volume=Decimal("30")),
+    ]
+    await storage.store_time_series_and_span("shard", "key", candles, 0, 3)
+
+    floats = await storage.get_time_series_arrays("shard", "key", Candle, 1, 3)
+    scaled = await storage.get_time_series_arrays("shard", "key", Candle, 0, 3, precision=3)
+    empty = await storage.get_time_series_arrays("shard", "missing", Candle, 0, 3)
+
+    assert floats["time"].tolist() == [1, 2]
+    assert floats["close"].dtype == np.float64
+    assert floats["close"].tolist() == [0.25, 3.0]
+    assert scaled["close"].dtype == np.int64
+    assert scaled["close"].tolist() == [1500, 250, 3000]
+    assert scaled["volume"].tolist() == [10_000, 20_000, 30_000]
+    assert all(len(a) == 0 for a in empty.values())
+
+
+@pytest.mark.parametrize("storage", [lf("memory"), lf("columnar")])
+@pytest.mark.parametrize(
+    "close,precision",
+    [
+        (Decimal("1.25"), 1),  # Would be truncated.
+        (Decimal("123456789.0"), 12),  # Would overflow int64.
+    ],
+)
+async def test_get_time_series_arrays_not_representable_with_precision(
+    storage: storages.Storage, close: Decimal, precision: int
+) -> None:
+    await storage.store_time_series_and_span("shard", "key", [Candle(time=0, close=close)], 0, 1)
+
+    with pytest.raises(ValueError):
+        await storage.get_time_series_arrays("shard", "key", Candle, 0, 1, precision=precision)
+
+
+@pytest.mark.parametrize("storage", [lf("memory"), lf("columnar")])
+async def test_get_time_series_arrays_scaled_exactly(storage: storages.Storage) -> None:
+    # Scaled value does not fit into the 53-bit mantissa of a float.
+    candles = [Candle(time=0, close=Decimal("123456789.12345678"))]
+    await storage.store_time_series_and_span("shard", "key", candles, 0, 1)
+
+    scaled = await storage.get_time_series_arrays("shard", "key", Candle, 0, 1, precision=8)
+
+    assert scaled["close"].tolist() == [12_345_678_912_345_678]
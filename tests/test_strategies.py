@@ -1,11 +1,16 @@
 import operator
+from copy import deepcopy
+from decimal import Decimal
+from random import Random
 
+import numpy as np
 import pytest
 
 from juno import Advice, Candle, strategies
 from juno.common import CandleMeta
+from juno.components.chandler import CandleArrays
 from juno.constraints import Int, Pair
-from juno.strategies import MidTrendPolicy, Sig, Strategy
+from juno.strategies import MidTrendPolicy, Sig, Signal, Strategy
 
 
 class DummyStrategy(Strategy):
@@ -190,3 +195,51 @@ def test_sig_extra_maturity_changed_enabled(extra_maturity, advices, expected_ad
     sig.update(Candle(time=1), ("eth-btc", 1, "regular"))
 
     assert sig.advice is expected_advice
+
+
+@pytest.mark.parametrize(
+    "strategy",
+    [
+        strategies.DoubleMA(short_ma="sma", long_ma="ema", short_period=3, long_period=8),
+        strategies.DoubleMA(short_ma="kama", long_ma="smma", short_period=2, long_period=5),
+        strategies.TripleMA(
+            short_ma="ema",
+            medium_ma="dema",
+            long_ma="sma",
+            short_period=2,
+            medium_period=5,
+            long_period=9,
+        ),
+        strategies.FourWeekRule(period=6, ma="alma", ma_period=3),
+        strategies.SingleMA(ma="ema2", period=4),
+    ],
+)
+def test_signal_compute(strategy: Signal) -> None:
+    random = Random(1)
+    closes = [Decimal("10.00")]
+    for _ in range(199):
+        closes.append(max(closes[-1] + Decimal(random.randint(-50, 50)) / 100, Decimal("1.00")))
+    candles = [Candle(time=i, close=c) for i, c in enumerate(closes)]
+    arrays = CandleArrays(
+        *(np.array([float(getattr(c, f)) for c in candles]) for f in CandleArrays._fields)
+    )
+    meta: CandleMeta = ("eth-btc", 1, "regular")
+
+    streamed_strategy = deepcopy(strategy)
+    streamed = []
+    for candle in candles:
+        streamed_strategy.update(candle, meta)
+        streamed.append(streamed_strategy.advice)
+    assert set(streamed) - {Advice.NONE}
+
+    # Batch computation matches streaming for every candle.
+    computed = deepcopy(strategy).compute(arrays)
+    assert computed.tolist() == streamed
+
+    # Streaming continues from the state left by a batch computation.
+    split = len(candles) // 2
+    strategy.compute(CandleArrays(*(a[:split] for a in arrays)))
+    for i in range(split, len(candles)):
+        strategy.update(candles[i], meta)
+        assert strategy.advice is streamed[i]
+    assert strategy.mature
@@ -1,9 +1,11 @@
+from dataclasses import astuple
 from decimal import Decimal
 
+import numpy as np
 import pytest
 
-from juno import AssetInfo, Fill
-from juno.statistics import CoreStatistics
+from juno import AssetInfo, Fill, Interval_
+from juno.statistics import CoreStatistics, ExtendedStatistics, RunningStatistics
 from juno.trading import CloseReason, Position, TradingSummary
 
 
@@ -128,6 +130,242 @@ def test_empty_trading_summary() -> None:
     assert stats.max_drawdown == 0
 
 
+def test_extended_statistics() -> None:
+    day = Interval_.DAY
+    asset_info = AssetInfo(precision=8)
+    summary = TradingSummary(
+        start=0,
+        end=10 * day,
+        starting_assets={"btc": Decimal("1.0")},
+        positions=[
+            Position.Long.build(
+                exchange="exchange",
+                symbol="eth-btc",
+                open_time=day + 5,
+                open_fills=[
+                    Fill(
+                        price=Decimal("0.05"),
+                        size=Decimal("10.0"),
+                        quote=Decimal("0.5"),
+                        fee=Decimal("0.01"),
+                        fee_asset="eth",
+                    )
+                ],
+                close_time=4 * day,
+                close_fills=[
+                    Fill(
+                        price=Decimal("0.06"),
+                        size=Decimal("9.99"),
+                        quote=Decimal("0.5994"),
+                        fee=Decimal("0.0005994"),
+                        fee_asset="btc",
+                    )
+                ],
+                close_reason=CloseReason.STRATEGY,
+                base_asset_info=asset_info,
+                quote_asset_info=asset_info,
+            ),
+            Position.Short.build(
+                exchange="exchange",
+                symbol="ltc-btc",
+                collateral=Decimal("0.5"),
+                borrowed=Decimal("20.0"),
+                open_time=5 * day,
+                open_fills=[
+                    Fill(
+                        price=Decimal("0.01"),
+                        size=Decimal("20.0"),
+                        quote=Decimal("0.2"),
+                        fee=Decimal("0.0002"),
+                        fee_asset="btc",
+                    )
+                ],
+                close_time=8 * day + 100,
+                close_fills=[
+                    Fill(
+                        price=Decimal("0.009"),
+                        size=Decimal("20.001"),
+                        quote=Decimal("0.180009"),
+                        fee=Decimal("0.00018"),
+                        fee_asset="btc",
+                    )
+                ],
+                close_reason=CloseReason.STRATEGY,
+                interest=Decimal("0.001"),
+                quote_asset_info=asset_info,
+            ),
+            # Closed at the end; not part of the performance.
+            Position.Long.build(
+                exchange="exchange",
+                symbol="eth-btc",
+                open_time=9 * day,
+                open_fills=[
+                    Fill(
+                        price=Decimal("0.07"),
+                        size=Decimal("5.0"),
+                        quote=Decimal("0.35"),
+                        fee=Decimal("0.005"),
+                        fee_asset="eth",
+                    )
+                ],
+                close_time=10 * day,
+                close_fills=[
+                    Fill(
+                        price=Decimal("0.08"),
+                        size=Decimal("4.995"),
+                        quote=Decimal("0.3996"),
+                        fee=Decimal("0.0004"),
+                        fee_asset="btc",
+                    )
+                ],
+                close_reason=CloseReason.CANCELLED,
+                base_asset_info=asset_info,
+                quote_asset_info=asset_info,
+            ),
+        ],
+    )
+    # The benchmark has more price points than needed.
+    btc = ["100", "102", "99", "105", "110", "108", "111", "107", "115", "120", "118", "121"]
+    eth = ["5", "5.1", "4.9", "5.5", "6.6", "6.2", "6.0", "6.4", "7.0", "8.4", "9.4"]
+    ltc = ["1.0", "1.02", "0.98", "1.05", "1.1", "1.08", "1.0", "0.96", "1.04", "1.08", "1.06"]
+
+    stats = ExtendedStatistics.compose(
+        summary,
+        {
+            "btc": [Decimal(p) for p in btc],
+            "eth": [Decimal(p) for p in eth],
+            "ltc": [Decimal(p) for p in ltc],
+        },
+    )
+
+    # Values of the previous implementation iterating over per-day `Decimal` holdings with
+    # pandas.
+    assert astuple(stats) == pytest.approx(
+        astuple(
+            ExtendedStatistics(
+                total_return=0.37625568799999987,
+                annualized_return=11.656878783592733,
+                annualized_volatility=3.21890234635975,
+                annualized_downside_risk=2.369502135177953,
+                sharpe_ratio=3.6213831701901342,
+                sortino_ratio=4.91954770182863,
+                cagr=40020.117470093915,
+                alpha=1.6717684630268597,
+                beta=1.5786410935660937,
+            )
+        )
+    )
+
+
+def test_running_statistics() -> None:
+    stats = RunningStatistics(Decimal("100.0"), Interval_.DAY)
+
+    stats.update(1, {"eth-btc": Decimal("10.0")})
+    open_short = Position.OpenShort.build(
+        exchange="exchange",
+        symbol="eth-btc",
+        collateral=Decimal("50.0"),
+        borrowed=Decimal("5.0"),
+        time=1,
+        fills=[
+            Fill(
+                price=Decimal("10.0"),
+                size=Decimal("5.0"),
+                quote=Decimal("50.0"),
+                fee=Decimal("0.05"),
+                fee_asset="btc",
+            )
+        ],
+    )
+    stats.open_position(open_short)
+    assert stats.snapshot().equity == Decimal("99.95")  # 50 + 50 + 49.95 - 50
+
+    stats.update(2, {"eth-btc": Decimal("12.0")})
+    stats.update(3, {"eth-btc": Decimal("8.0")})
+    stats.close_position(
+        open_short.close(
+            interest=Decimal("0.0"),
+            time=3,
+            fills=[
+                Fill(
+                    price=Decimal("8.0"),
+                    size=Decimal("5.0"),
+                    quote=Decimal("40.0"),
+                    fee=Decimal("0.04"),
+                    fee_asset="btc",
+                )
+            ],
+            reason=CloseReason.STRATEGY,
+            quote_asset_info=AssetInfo(),
+        )
+    )
+    stats.update(4, {"eth-btc": Decimal("9.0")})
+    stats.open_position(
+        Position.OpenLong.build(
+            exchange="exchange",
+            symbol="eth-btc",
+            time=4,
+            fills=[
+                Fill(
+                    price=Decimal("9.0"),
+                    size=Decimal("10.0"),
+                    quote=Decimal("90.0"),
+                    fee=Decimal("0.1"),
+                    fee_asset="eth",
+                )
+            ],
+            base_asset_info=AssetInfo(),
+            quote_asset_info=AssetInfo(),
+        )
+    )
+    stats.update(5, {"eth-btc": Decimal("10.0")})
+
+    equity = np.array([100.0, 100.0, 89.95, 109.95, 109.91, 118.91])
+    returns = np.diff(np.log(equity))
+    neg_returns = returns[returns < 0]
+    snapshot = stats.snapshot()
+    assert snapshot.time == 5
+    assert snapshot.equity == Decimal("118.91")  # 109.91 - 90 + 9.9 * 10
+    assert snapshot.total_return == pytest.approx(0.1891)
+    assert snapshot.annualized_return == pytest.approx(365 * returns.mean())
+    assert snapshot.annualized_volatility == pytest.approx(np.sqrt(365) * returns.std())
+    assert snapshot.annualized_downside_risk == pytest.approx(np.sqrt(365) * neg_returns.std())
+    assert snapshot.sharpe_ratio == pytest.approx(
+        snapshot.annualized_return / snapshot.annualized_volatility
+    )
+    assert snapshot.max_drawdown == pytest.approx(0.1005)  # 1 - 89.95 / 100
+    assert snapshot.drawdown == 0
+    assert snapshot.num_positions == 1
+    assert snapshot.num_positions_in_profit == 1
+    assert snapshot.num_open_positions == 1
+
+
+def test_running_statistics_restore() -> None:
+    open_long = Position.OpenLong.build(
+        exchange="exchange",
+        symbol="ltc-btc",
+        time=1,
+        fills=[Fill.with_computed_quote(price=Decimal("2.0"), size=Decimal("5.0"))],
+        base_asset_info=AssetInfo(),
+        quote_asset_info=AssetInfo(),
+    )
+
+    stats = RunningStatistics.restore(
+        Decimal("100.0"),
+        Interval_.DAY,
+        positions=[new_closed_long_position(Decimal("-1.0"))],
+        open_positions=[open_long],
+    )
+    stats.update(2, {"ltc-btc": Decimal("3.0")})
+
+    snapshot = stats.snapshot()
+    assert snapshot.equity == Decimal("104.0")  # 100 - 1 - 10 + 5 * 3
+    assert snapshot.max_drawdown == 0
+    assert snapshot.num_positions == 1
+    assert snapshot.num_positions_in_loss == 1
+    assert snapshot.num_open_positions == 1
+
+
 def new_closed_long_position(profit: Decimal) -> Position.Long:
     size = abs(profit)
     open_price = Decimal("2.0")
@@ -1,12 +1,25 @@
 import asyncio
 from decimal import Decimal
+from random import Random
 
 import pytest
-
-from juno import Advice, BorrowInfo, Candle, Filters, stop_loss, take_profit, traders
+from pytest_mock import MockerFixture
+
+from juno import (
+    Advice,
+    BorrowInfo,
+    Candle,
+    Filters,
+    indicators,
+    serialization,
+    stop_loss,
+    take_profit,
+    traders,
+)
 from juno.asyncio import cancel
+from juno.components import Events
 from juno.inspect import GenericConstructor
-from juno.strategies import Fixed, MidTrendPolicy
+from juno.strategies import DoubleMA, Fixed, MidTrendPolicy
 from juno.trading import CloseReason, Position
 from tests import fakes
 
@@ -346,6 +359,44 @@ async def test_persist_and_resume(storage: fakes.Storage) -> None:
         assert candle_times[i] == i
 
 
+async def test_resume_state_persisted_without_statistics() -> None:
+    chandler = fakes.Chandler(
+        future_candles={("dummy", "eth-btc", 1): [Candle(time=0, close=Decimal("1.0"))]},
+    )
+    trader = traders.Basic(chandler=chandler, informant=fakes.Informant())
+    config = traders.BasicConfig(
+        exchange="dummy",
+        symbol="eth-btc",
+        interval=1,
+        start=0,
+        end=2,
+        quote=Decimal("1.0"),
+        strategy=GenericConstructor.from_type(Fixed, advices=[Advice.LONG, Advice.LIQUIDATE]),
+        long=True,
+        short=False,
+        close_on_exit=False,
+    )
+    state = await trader.initialize(config)
+
+    trader_run_task = asyncio.create_task(trader.run(state))
+    future_candle_queue = chandler.future_candle_queues[("dummy", "eth-btc", 1)]
+    await future_candle_queue.join()
+    await cancel(trader_run_task)
+    assert state.open_position
+
+    persisted = serialization.raw.serialize(state)
+    del persisted["statistics"]
+    state = serialization.raw.deserialize(persisted, traders.BasicState)
+    future_candle_queue.put_nowait(Candle(time=1, close=Decimal("2.0")))
+    summary = await trader.run(state)
+
+    snapshot = trader.build_running_statistics(state)
+    assert len(summary.positions) == 1
+    assert snapshot.num_positions == 1
+    assert snapshot.num_open_positions == 0
+    assert snapshot.equity == state.quote
+
+
 async def test_summary_end_on_cancel() -> None:
     chandler = fakes.Chandler(future_candles={("dummy", "eth-btc", 1): [Candle(time=0)]})
     time = fakes.Time(0)
@@ -509,3 +560,124 @@ async def test_open_new_positions() -> None:
     summary = await trader.run(state)
 
     assert len(summary.positions) == 0
+
+
+async def test_backtest_matches_run() -> None:
+    closes = ["10.0", "12.0", "9.0", "8.0", "11.0", "13.0", "12.0", "7.0", "10.0"]
+    chandler = fakes.Chandler(
+        candles={
+            ("dummy", "eth-btc", 1): [
+                Candle(time=i, close=Decimal(close)) for i, close in enumerate(closes)
+            ]
+        }
+    )
+    informant = fakes.Informant(
+        filters=Filters(isolated_margin=True),
+        borrow_info=BorrowInfo(limit=Decimal("1.0")),
+        margin_multiplier=2,
+    )
+    events = Events()
+    trader = traders.Basic(chandler=chandler, informant=informant, events=events)
+    config = traders.BasicConfig(
+        exchange="dummy",
+        symbol="eth-btc",
+        interval=1,
+        start=0,
+        end=len(closes),
+        quote=Decimal("10.0"),
+        strategy=GenericConstructor.from_type(
+            Fixed,
+            advices=[
+                Advice.LONG,
+                Advice.LONG,
+                Advice.SHORT,
+                Advice.SHORT,
+                Advice.LONG,
+                Advice.LONG,
+                Advice.LONG,
+                Advice.LONG,
+                Advice.SHORT,
+            ],
+        ),
+        stop_loss=GenericConstructor.from_type(stop_loss.Basic, Decimal("0.2")),
+        channel="backtest",
+    )
+
+    # Synchronous fast path when nobody listens to events.
+    expected = await trader.run(await trader.initialize(config))
+    state = await trader.initialize(config)
+    candles = await trader.load_candles(state)
+    summary = trader.backtest(state, candles)
+    assert summary == expected
+    snapshot = trader.build_running_statistics(state)
+    assert snapshot.equity == state.quote == Decimal("10.0") + summary.profit
+    assert snapshot.num_positions == len(summary.positions)
+    assert snapshot.num_open_positions == 0
+    assert snapshot.max_drawdown > 0
+
+    @events.on("backtest", "candle")
+    async def on_candle(candle: Candle) -> None:
+        pass
+
+    summary = await trader.run(await trader.initialize(config))
+    assert summary == expected
+    assert [p.close_reason for p in expected.positions] == [
+        CloseReason.STRATEGY,
+        CloseReason.STRATEGY,
+        CloseReason.STOP_LOSS,
+        CloseReason.CANCELLED,
+    ]
+
+
+async def test_backtest_many_matches_backtest(mocker: MockerFixture) -> None:
+    random = Random(1)
+    closes = [Decimal("100.0")]
+    for _ in range(99):
+        closes.append(closes[-1] + Decimal(random.randint(-300, 300)) / 100)
+    chandler = fakes.Chandler(
+        candles={
+            ("dummy", "eth-btc", 1): [
+                Candle(time=i, close=close) for i, close in enumerate(closes)
+            ]
+        }
+    )
+    informant = fakes.Informant(
+        filters=Filters(isolated_margin=True),
+        borrow_info=BorrowInfo(limit=Decimal("1000.0")),
+        margin_multiplier=2,
+    )
+    trader = traders.Basic(chandler=chandler, informant=informant)
+    configs = [
+        traders.BasicConfig(
+            exchange="dummy",
+            symbol="eth-btc",
+            interval=1,
+            start=start,
+            end=len(closes),
+            quote=Decimal("10.0"),
+            strategy=GenericConstructor.from_type(
+                DoubleMA,
+                short_ma="ema",
+                long_ma="ema",
+                short_period=short_period,
+                long_period=long_period,
+            ),
+        )
+        for start in [0, 10]
+        for short_period, long_period in [(2, 5), (2, 8), (5, 8)]
+    ]
+
+    expected = []
+    for config in configs:
+        state = await trader.initialize(config)
+        expected.append(trader.backtest(state, await trader.load_candles(state)))
+
+    states = [await trader.initialize(config) for config in configs]
+    candles = await trader.load_candles(states[0])
+    update = mocker.spy(indicators.Ema, "update")
+    summaries = trader.backtest_many(states, candles)
+
+    assert summaries == expected
+    assert all(len(summary.positions) > 0 for summary in summaries)
+    # Emas with periods 2, 5 and 8 for both starts.
+    assert update.call_count == 3 * len(closes) + 3 * (len(closes) - 10)
@@ -97,6 +97,11 @@ async def test_simple() -> None:
 
     summary = await trader_task
 
+    snapshot = trader.build_running_statistics(state)
+    assert snapshot.time == 4
+    assert snapshot.num_positions == len(summary.positions)
+    assert snapshot.num_open_positions == 0
+
     #     L - S S
     # ETH L - S S
     # LTC L - - -
@@ -0,0 +1,105 @@
+from decimal import Decimal
+from random import Random
+from typing import Optional
+
+import numpy as np
+import pytest
+
+from juno import BorrowInfo, Candle, Fees, Filters, Interval_, traders
+from juno.components.chandler import CandleArrays
+from juno.inspect import GenericConstructor
+from juno.strategies import Fixed, TripleMA
+from juno.trading import Position
+from tests import fakes
+
+
+@pytest.mark.parametrize(
+    "long,short,adjusted_start,close_on_exit",
+    [
+        (True, True, None, True),
+        (True, False, None, True),
+        (False, True, None, True),
+        (True, True, 40, False),
+    ],
+)
+async def test_matches_basic(
+    long: bool, short: bool, adjusted_start: Optional[int], close_on_exit: bool
+) -> None:
+    random = Random(1)
+    closes = [Decimal("100.00")]
+    for _ in range(299):
+        closes.append(max(closes[-1] + Decimal(random.randint(-200, 200)) / 100, Decimal("1.00")))
+    candles = [Candle(time=i * Interval_.HOUR, close=c) for i, c in enumerate(closes)]
+    informant = fakes.Informant(
+        fees=Fees(taker=Decimal("0.001")),
+        filters=Filters(isolated_margin=True),
+        borrow_info=BorrowInfo(
+            interest_interval=Interval_.HOUR, interest_rate=Decimal("0.0001"), limit=Decimal("1e9")
+        ),
+    )
+    quote = Decimal("1000000.0")
+    config = traders.BasicConfig(
+        exchange="dummy",
+        symbol="eth-btc",
+        interval=Interval_.HOUR,
+        start=None if adjusted_start is None else 50 * Interval_.HOUR,
+        adjusted_start=None if adjusted_start is None else adjusted_start * Interval_.HOUR,
+        end=len(candles) * Interval_.HOUR,
+        quote=quote,
+        strategy=GenericConstructor.from_type(
+            TripleMA,
+            short_ma="ema",
+            medium_ma="sma",
+            long_ma="ema",
+            short_period=2,
+            medium_period=5,
+            long_period=9,
+        ),
+        long=long,
+        short=short,
+        close_on_exit=close_on_exit,
+    )
+    basic = traders.Basic(
+        chandler=fakes.Chandler(candles={("dummy", "eth-btc", Interval_.HOUR): candles}),
+        informant=informant,
+    )
+    summary = await basic.run(await basic.initialize(config))
+
+    # Same candles as streamed by the trader, including the ones to warm up the strategy.
+    result = traders.Vectorized(informant=informant).backtest(
+        config, _to_arrays(candles[adjusted_start or 0 :])
+    )
+
+    assert result.num_positions == len(summary.positions) > 0
+    assert result.open_times.tolist() == [p.open_time for p in summary.positions]
+    assert result.close_times.tolist() == [p.close_time for p in summary.positions]
+    assert result.shorts.tolist() == [isinstance(p, Position.Short) for p in summary.positions]
+    assert result.returns.tolist() == pytest.approx(
+        [float(p.roi) for p in summary.positions], abs=1e-6
+    )
+    assert result.roi == pytest.approx(float(summary.profit / quote), abs=1e-6)
+
+
+def test_unsupported_strategy() -> None:
+    config = traders.BasicConfig(
+        exchange="dummy",
+        symbol="eth-btc",
+        interval=1,
+        end=1,
+        strategy=GenericConstructor.from_type(Fixed, advices=[]),
+    )
+    with pytest.raises(NotImplementedError):
+        traders.Vectorized(informant=fakes.Informant()).backtest(
+            config, _to_arrays([Candle(time=0, close=Decimal("1.0"))])
+        )
+
+
+def _to_arrays(candles: list[Candle]) -> CandleArrays:
+    return CandleArrays(
+        time=np.array([c.time for c in candles]),
+        open=np.array([float(c.open) for c in candles]),
+        high=np.array([float(c.high) for c in candles]),
+        low=np.array([float(c.low) for c in candles]),
+        close=np.array([float(c.close) for c in candles]),
+        volume=np.array([float(c.volume) for c in candles]),
+    )